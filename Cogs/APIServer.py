@@ -192,6 +192,14 @@ class APIServer(commands.Cog):
             except Exception as e:
                 logger.warning(f"Error during server shutdown: {e}")
 
+        # Persist write-behind app usage before the thread goes away
+        try:
+            from api.helpers import flush_app_usage
+
+            flush_app_usage()
+        except Exception as e:
+            logger.warning(f"Failed to flush app usage: {e}")
+
         # Only wait for thread if requested (called from non-async context)
         if wait_for_thread:
             logger.info("Waiting for API server thread to terminate...")
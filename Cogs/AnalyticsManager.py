@@ -104,7 +104,7 @@ class AnalyticsManager(commands.Cog):
 
             if self.error_tracker:
                 # Flush any pending errors
-                pass
+                self.error_tracker.shutdown()
 
         except Exception as e:
             logger.error(f"Error during shutdown: {e}", exc_info=True)
@@ -1,15 +1,21 @@
+import asyncio
 import json
 import logging
 import os
+import time
 
 import discord
 from discord.ext import commands
 
 import Config
 from Utils.EmbedUtils import set_pink_footer
+from Utils.LogStore import format_time, get_log_store
 
 logger = logging.getLogger(__name__)
 
+# Seconds of history counted in the !logs statistics
+LOG_STATS_WINDOW = 24 * 3600
+
 
 class CogReloadView(discord.ui.View):
     """Interactive view for selecting and reloading cogs"""
@@ -899,53 +905,33 @@ class CogManager(commands.Cog):
             if not actual_cog_name:
                 actual_cog_name = cog_name
 
-            # Read log file - use absolute path
-            log_file = os.path.join(os.getcwd(), "Logs", "HazeBot.log")
-
-            if not os.path.exists(log_file):
-                # Try to find the log file in parent directory or common locations
-                alternative_paths = [
-                    "Logs/HazeBot.log",
-                    os.path.join(os.path.dirname(os.path.dirname(__file__)), "Logs", "HazeBot.log"),
-                    "/home/liq/gitProjects/HazeBot/Logs/HazeBot.log",
-                ]
+            store = get_log_store()
+            if not store.exists():
+                error_embed = discord.Embed(
+                    title="❌ Log Store Not Found",
+                    description=(
+                        "The log store doesn't exist yet. The bot needs to be restarted to start logging to it."
+                    ),
+                    color=discord.Color.red(),
+                )
+                error_embed.add_field(name="📂 Expected Location", value=f"```{store.db_path}```", inline=False)
+                error_embed.add_field(
+                    name="💡 Solution", value="Restart the bot to activate file logging.", inline=False
+                )
+                set_pink_footer(error_embed, bot=self.bot.user)
 
-                for alt_path in alternative_paths:
-                    if os.path.exists(alt_path):
-                        log_file = alt_path
-                        break
+                if interaction:
+                    await interaction.followup.send(embed=error_embed, ephemeral=True)
                 else:
-                    # Still not found
-                    error_embed = discord.Embed(
-                        title="❌ Log File Not Found",
-                        description=(
-                            "The log file doesn't exist yet. The bot needs to be restarted to start logging to file."
-                        ),
-                        color=discord.Color.red(),
-                    )
-                    error_embed.add_field(name="📂 Expected Location", value=f"```{log_file}```", inline=False)
-                    error_embed.add_field(
-                        name="💡 Solution", value="Restart the bot to activate file logging.", inline=False
-                    )
-                    set_pink_footer(error_embed, bot=self.bot.user)
-
-                    if interaction:
-                        await interaction.followup.send(embed=error_embed, ephemeral=True)
-                    else:
-                        await ctx.send(embed=error_embed)
-                    return
-
-            # Read last 1000 lines to avoid memory issues
-            with open(log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                lines = lines[-1000:]  # Last 1000 lines
+                    await ctx.send(embed=error_embed)
+                return
 
-            # Filter logs for this cog using the actual file name (case-insensitive)
-            # Look for the cog prefix pattern like "[Changelog]" or "Changelog"
-            cog_filter = actual_cog_name.lower()
-            filtered_logs = [line for line in lines if cog_filter in line.lower()]
+            # Records are keyed by the cog's module/file name; both queries use the (cog, id) index
+            since = time.time() - LOG_STATS_WINDOW
+            recent_logs = await asyncio.to_thread(store.query, cog=actual_cog_name, limit=10)
+            level_counts = await asyncio.to_thread(store.level_counts, cog=actual_cog_name, since=since)
 
-            if not filtered_logs:
+            if not recent_logs:
                 embed = discord.Embed(
                     title=f"📋 Logs: {cog_name}",
                     description=f"No logs found for this cog in recent history.\n*Searching for: `{actual_cog_name}`*",
@@ -960,45 +946,34 @@ class CogManager(commands.Cog):
                 return
 
             # Count log levels
-            info_count = sum(1 for line in filtered_logs if " INFO " in line)
-            warning_count = sum(1 for line in filtered_logs if " WARNING " in line)
-            error_count = sum(1 for line in filtered_logs if " ERROR " in line)
-            debug_count = sum(1 for line in filtered_logs if " DEBUG " in line)
-
-            # Get recent logs (last 10)
-            recent_logs = filtered_logs[-10:]
+            info_count = level_counts.get("INFO", 0)
+            warning_count = level_counts.get("WARNING", 0)
+            error_count = level_counts.get("ERROR", 0) + level_counts.get("CRITICAL", 0)
+            debug_count = level_counts.get("DEBUG", 0)
 
             # Format logs for display
             formatted_logs = []
-            for log in recent_logs:
-                # Extract timestamp, level, and message
-                parts = log.strip().split(None, 3)
-                if len(parts) >= 4:
-                    # timestamp = parts[0]  # Not used
-                    time = parts[1]
-                    level = parts[2]
-                    message = parts[3] if len(parts) > 3 else ""
-
-                    # Censor sensitive information in logs
-                    message = self._censor_sensitive_data(message)
-
-                    # Shorten message if too long (single cutoff point)
-                    max_length = 100
-                    if len(message) > max_length:
-                        message = message[: max_length - 3] + "..."
-
-                    # Color code by level
-                    emoji = "ℹ️"
-                    if "ERROR" in level:
-                        emoji = "❌"
-                    elif "WARNING" in level:
-                        emoji = "⚠️"
-                    elif "INFO" in level:
-                        emoji = "ℹ️"
-                    elif "DEBUG" in level:
-                        emoji = "🔍"
-
-                    formatted_logs.append(f"{emoji} `{time}` {message}")
+            for record in recent_logs:
+                level = record["level"]
+
+                # Censor sensitive information in logs
+                message = self._censor_sensitive_data(record["message"])
+
+                # Shorten message if too long (single cutoff point)
+                max_length = 100
+                if len(message) > max_length:
+                    message = message[: max_length - 3] + "..."
+
+                # Color code by level
+                emoji = "ℹ️"
+                if level in ("ERROR", "CRITICAL"):
+                    emoji = "❌"
+                elif level == "WARNING":
+                    emoji = "⚠️"
+                elif level == "DEBUG":
+                    emoji = "🔍"
+
+                formatted_logs.append(f"{emoji} `{format_time(record['ts'])}` {message}")
 
             # Create embed
             embed = discord.Embed(
@@ -1030,9 +1005,10 @@ class CogManager(commands.Cog):
                     inline=False,
                 )
 
-            embed.add_field(name="💾 Total Entries", value=f"`{len(filtered_logs)}` log entries found", inline=True)
+            total = sum(level_counts.values())
+            embed.add_field(name="💾 Total Entries", value=f"`{total}` log entries in the last 24h", inline=True)
 
-            embed.add_field(name="📁 Log File", value=f"`{log_file}`", inline=True)
+            embed.add_field(name="📁 Log Store", value=f"`{store.db_path}`", inline=True)
 
             set_pink_footer(embed, bot=self.bot.user)
 
@@ -23,6 +23,7 @@ from Config import (
     get_data_dir,
     get_guild_id,
 )
+from Utils.ActivityStore import get_activity_store
 from Utils.EmbedUtils import set_pink_footer
 
 # Import all Views from separate module (prefixed with _ to avoid auto-loading as Cog)
@@ -30,9 +31,13 @@ from ._DailyMemeViews import (
     MemeHubView,
     is_mod_or_admin,
 )
+from ._DailyMemeCache import ListingCache, ShownMemeSet
 
 logger = logging.getLogger(__name__)
 
+# Seconds between appends of newly shown memes to shown_memes.log
+SHOWN_MEMES_FLUSH_INTERVAL = 60
+
 
 class DailyMeme(commands.Cog):
     """
@@ -67,17 +72,16 @@ class DailyMeme(commands.Cog):
         self._flaresolverr_rate_limit = 2  # seconds between FlareSolverr calls
         # Per-subreddit locks for true parallel fetching
         self._subreddit_locks = {}
-        # Cache for Reddit responses (subreddit -> {timestamp, data})
-        self._cache_duration = 3600  # 1 hour cache (Reddit hot posts stay relevant for a while)
-        self._reddit_cache_file = os.path.join(get_data_dir(), "reddit_cache.json")
-        self._reddit_cache = self.load_reddit_cache()
-        # Cache for shown memes (URL -> timestamp)
+        # Cache for Reddit/Lemmy listings (wall-clock stamped, stale-while-revalidate)
+        self._listing_cache = ListingCache(os.path.join(get_data_dir(), "meme_listing_cache.json"))
+        # Recently shown memes (hourly buckets of URL hashes, append-only log)
         self.meme_cache_hours = 24  # Keep memes in cache for 24 hours
-        self.shown_memes_file = os.path.join(get_data_dir(), "shown_memes.json")
-        self.shown_memes = self.load_shown_memes()
-        # Cache for meme requests (user_id -> count)
-        self.meme_requests_file = os.path.join(get_data_dir(), "meme_requests.json")
-        self.meme_requests = self.load_meme_requests()
+        self.shown_memes = ShownMemeSet(
+            os.path.join(get_data_dir(), "shown_memes.log"),
+            self.meme_cache_hours,
+            legacy_file=os.path.join(get_data_dir(), "shown_memes.json"),
+        )
+        self.flush_shown_memes_loop.start()
 
     def load_daily_config(self) -> dict:
         """Load daily meme configuration from file"""
@@ -205,97 +209,17 @@ class DailyMeme(commands.Cog):
         except Exception as e:
             logger.error(f"Error saving sources: {e}")
 
-    def load_shown_memes(self) -> dict:
-        """Load shown memes cache from file"""
-        try:
-            if os.path.exists(self.shown_memes_file):
-                with open(self.shown_memes_file, "r") as f:
-                    data = json.load(f)
-                    # Clean old entries (older than cache hours)
-                    current_time = datetime.now().timestamp()
-                    cache_seconds = self.meme_cache_hours * 3600
-                    cleaned = {
-                        url: timestamp for url, timestamp in data.items() if current_time - timestamp < cache_seconds
-                    }
-                    return cleaned
-        except Exception as e:
-            logger.error(f"Error loading shown memes cache: {e}")
-        return {}
-
-    def save_shown_memes(self) -> None:
-        """Save shown memes cache to file"""
-        try:
-            os.makedirs(os.path.dirname(self.shown_memes_file), exist_ok=True)
-            with open(self.shown_memes_file, "w") as f:
-                json.dump(self.shown_memes, f, indent=4)
-        except Exception as e:
-            logger.error(f"Error saving shown memes cache: {e}")
-
-    def load_meme_requests(self) -> dict:
-        """Load meme requests cache from file"""
-        try:
-            if os.path.exists(self.meme_requests_file):
-                with open(self.meme_requests_file, "r") as f:
-                    return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading meme requests: {e}")
-        return {}
-
-    def save_meme_requests(self) -> None:
-        """Save meme requests cache to file"""
-        try:
-            os.makedirs(os.path.dirname(self.meme_requests_file), exist_ok=True)
-            with open(self.meme_requests_file, "w") as f:
-                json.dump(self.meme_requests, f, indent=4)
-        except Exception as e:
-            logger.error(f"Error saving meme requests: {e}")
-
-    def load_reddit_cache(self) -> dict:
-        """Load Reddit API response cache from file"""
-        try:
-            if os.path.exists(self._reddit_cache_file):
-                with open(self._reddit_cache_file, "r") as f:
-                    data = json.load(f)
-                    # Clean old entries (older than cache duration)
-                    current_time = asyncio.get_event_loop().time()
-                    cleaned = {}
-                    for key, cache_entry in data.items():
-                        if current_time - cache_entry.get("timestamp", 0) < self._cache_duration:
-                            cleaned[key] = cache_entry
-                    return cleaned
-        except Exception as e:
-            logger.error(f"Error loading Reddit cache: {e}")
-        return {}
-
-    def save_reddit_cache(self) -> None:
-        """Save Reddit API response cache to file"""
-        try:
-            os.makedirs(os.path.dirname(self._reddit_cache_file), exist_ok=True)
-            with open(self._reddit_cache_file, "w") as f:
-                json.dump(self._reddit_cache, f, indent=4)
-        except Exception as e:
-            logger.error(f"Error saving Reddit cache: {e}")
-
     def is_meme_shown_recently(self, url: str) -> bool:
         """Check if a meme was shown recently"""
-        if url not in self.shown_memes:
-            return False
-
-        current_time = datetime.now().timestamp()
-        cache_seconds = self.meme_cache_hours * 3600
-
-        # Check if still in cache window
-        if current_time - self.shown_memes[url] < cache_seconds:
-            return True
-        else:
-            # Remove expired entry
-            del self.shown_memes[url]
-            return False
+        return url in self.shown_memes
 
     def mark_meme_as_shown(self, url: str) -> None:
-        """Mark a meme as shown"""
-        self.shown_memes[url] = datetime.now().timestamp()
-        self.save_shown_memes()
+        """Mark a meme as shown (written to disk by flush_shown_memes_loop)"""
+        self.shown_memes.add(url)
+
+    @tasks.loop(seconds=SHOWN_MEMES_FLUSH_INTERVAL)
+    async def flush_shown_memes_loop(self):
+        self.shown_memes.flush()
 
     def normalize_lemmy_community(self, community_input: str) -> str | None:
         """
@@ -381,9 +305,9 @@ class DailyMeme(commands.Cog):
         if self.daily_config.get("enabled", True) and not self.daily_meme_task.is_running():
             self.daily_meme_task.start()
             logger.info(f"⏰ Daily meme task started for {hour:02d}:{minute:02d}")
-            # Log Reddit cache status
-            if self._reddit_cache:
-                logger.info(f"💾 Loaded {len(self._reddit_cache)} cached Reddit responses from disk")
+            # Log listing cache status
+            if self._listing_cache:
+                logger.info(f"💾 Loaded {len(self._listing_cache)} cached meme listings from disk")
         elif not self.daily_config.get("enabled", True):
             logger.info("Daily meme task is disabled")
 
@@ -431,6 +355,10 @@ class DailyMeme(commands.Cog):
             self.daily_meme_task.cancel()
             logger.info("Daily Meme task cancelled")
 
+        self.flush_shown_memes_loop.cancel()
+        self.shown_memes.flush()
+        await self._listing_cache.close()
+
         if self.session and not self.session.closed:
             await self.session.close()
             logger.info("HTTP session closed")
@@ -490,24 +418,18 @@ class DailyMeme(commands.Cog):
             logger.error(f"FlareSolverr error: {e}")
             return None
 
-    async def fetch_reddit_meme(self, subreddit: str, sort: str = "hot") -> dict:
+    async def fetch_reddit_meme(self, subreddit: str, sort: str = "hot") -> list:
         """
-        Fetch a meme from Reddit using FlareSolverr (Reddit blocks direct API access)
-        Uses 5-minute cache to avoid repeated FlareSolverr calls
+        Fetch memes from Reddit, served from the listing cache when possible
+        (stale listings are returned immediately and refreshed in the background)
         sort: hot, top, new
         """
-        # Check cache first
-        cache_key = f"{subreddit}_{sort}"
-        if cache_key in self._reddit_cache:
-            cached = self._reddit_cache[cache_key]
-            cache_age = asyncio.get_event_loop().time() - cached["timestamp"]
-            if cache_age < self._cache_duration:
-                meme_count = len(cached["data"])
-                logger.info(f"⚡ Using cached data for r/{subreddit} (age: {int(cache_age)}s, {meme_count} memes)")
-                return cached["data"]
-            else:
-                logger.debug(f"⏰ Cache expired for r/{subreddit} (age: {cache_age:.1f}s)")
+        return await self._listing_cache.get(
+            f"reddit:{subreddit}:{sort}", lambda: self._fetch_reddit_listing(subreddit, sort), f"r/{subreddit}"
+        )
 
+    async def _fetch_reddit_listing(self, subreddit: str, sort: str) -> list:
+        """Fetch a subreddit listing using FlareSolverr (Reddit blocks direct API access)"""
         url = f"https://www.reddit.com/r/{subreddit}/{sort}.json?limit=50&t=day"
 
         try:
@@ -588,14 +510,6 @@ class DailyMeme(commands.Cog):
                     )
 
             logger.info(f"✅ Fetched {len(image_posts)} memes from r/{subreddit}")
-
-            # Cache the result
-            if image_posts:
-                self._reddit_cache[cache_key] = {"timestamp": asyncio.get_event_loop().time(), "data": image_posts}
-                logger.debug(f"💾 Cached {len(image_posts)} memes for r/{subreddit}")
-                # Save cache to disk
-                self.save_reddit_cache()
-
             return image_posts if image_posts else None
 
         except asyncio.TimeoutError:
@@ -607,7 +521,7 @@ class DailyMeme(commands.Cog):
 
     async def fetch_lemmy_meme(self, community: str) -> list:
         """
-        Fetch memes from Lemmy communities
+        Fetch memes from Lemmy communities, served from the listing cache when possible
 
         Args:
             community: Format "instance@community" (e.g., "lemmy.world@memes")
@@ -615,6 +529,12 @@ class DailyMeme(commands.Cog):
         Returns:
             List of meme dicts or None
         """
+        return await self._listing_cache.get(
+            f"lemmy:{community}", lambda: self._fetch_lemmy_listing(community), community
+        )
+
+    async def _fetch_lemmy_listing(self, community: str) -> list:
+        """Fetch the hot listing of a Lemmy community from its instance API"""
         try:
             # Parse instance@community format
             if "@" not in community:
@@ -812,13 +732,12 @@ class DailyMeme(commands.Cog):
                 return None
 
         # Filter out recently shown memes
-        fresh_memes = [meme for meme in all_memes if not self.is_meme_shown_recently(meme["url"])]
+        fresh_memes = self.shown_memes.filter_unseen(all_memes)
 
         # If all memes were shown recently, clear cache and use all memes
         if not fresh_memes:
             logger.info("All memes were shown recently, clearing cache")
             self.shown_memes.clear()
-            self.save_shown_memes()
             fresh_memes = all_memes
 
         # Sort by upvotes to get quality memes
@@ -1100,8 +1019,7 @@ class DailyMeme(commands.Cog):
             await self.post_meme(meme_data, ctx.channel, requested_by=ctx.author)
 
             user_id = str(ctx.author.id)
-            self.meme_requests[user_id] = self.meme_requests.get(user_id, 0) + 1
-            self.save_meme_requests()
+            get_activity_store().increment("meme_requests", user_id)
             logger.info(f"Meme fetched by {ctx.author} from {source_display} via command argument")
             return
 
@@ -1273,8 +1191,7 @@ class DailyMeme(commands.Cog):
             await interaction.followup.send("✅ Meme posted!", ephemeral=True)
 
             user_id = str(interaction.user.id)
-            self.meme_requests[user_id] = self.meme_requests.get(user_id, 0) + 1
-            self.save_meme_requests()
+            get_activity_store().increment("meme_requests", user_id)
             logger.info(f"Meme fetched by {interaction.user} from {source_display} via slash command")
             return
 
@@ -1,5 +1,6 @@
 """
-Gaming Hub Cog - Manages game requests and persistent views
+Gaming Hub Cog - Manages game requests and persistent views, and keeps the
+member presence index behind /api/gaming/members up to date
 """
 
 import asyncio
@@ -10,7 +11,8 @@ import os
 import discord
 from discord.ext import commands, tasks
 
-from Config import get_data_dir
+from Config import get_data_dir, get_guild_id
+from Utils.PresenceIndex import get_presence_index
 
 logger = logging.getLogger(__name__)
 
@@ -154,6 +156,7 @@ class GamingHub(commands.Cog):
         self.bot = bot
         self.game_requests_file = GAME_REQUESTS_FILE
         self.game_requests_data = []
+        self.presence_index = get_presence_index()
 
         # Load game requests data
         if os.path.exists(self.game_requests_file):
@@ -172,10 +175,13 @@ class GamingHub(commands.Cog):
         if self.bot.is_ready():
             await self._restore_game_request_views()
             self.cleanup_expired_requests.start()
+            self._rebuild_presence_index()
 
     async def cog_unload(self) -> None:
         """Called when the cog is unloaded."""
         self.cleanup_expired_requests.cancel()
+        # Nothing keeps the index current anymore
+        self.presence_index.reset()
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
@@ -183,6 +189,50 @@ class GamingHub(commands.Cog):
         await self._restore_game_request_views()
         if not self.cleanup_expired_requests.is_running():
             self.cleanup_expired_requests.start()
+        self._rebuild_presence_index()
+
+    # ===== Presence index (/api/gaming/members) =====
+
+    def _rebuild_presence_index(self) -> None:
+        """Index every guild member (on ready, also after a reconnect, and on cog load)"""
+        guild = self.bot.get_guild(get_guild_id())
+        if not guild:
+            logger.warning("Guild not found, member presence index not built")
+            return
+        self.presence_index.rebuild(guild.members)
+        logger.info(f"Indexed presence of {len(self.presence_index)} members")
+
+    def _is_indexed_guild(self, guild: discord.Guild) -> bool:
+        return guild is not None and guild.id == get_guild_id()
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before: discord.Member, after: discord.Member) -> None:
+        if self._is_indexed_guild(after.guild):
+            self.presence_index.update(after)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+        # Nickname / guild avatar changes
+        if self._is_indexed_guild(after.guild):
+            self.presence_index.update(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User) -> None:
+        # Username / global name / avatar changes arrive without a member
+        guild = self.bot.get_guild(get_guild_id())
+        member = guild.get_member(after.id) if guild else None
+        if member:
+            self.presence_index.update(member)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        if self._is_indexed_guild(member.guild):
+            self.presence_index.update(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member) -> None:
+        if self._is_indexed_guild(member.guild):
+            self.presence_index.remove(member.id)
 
     async def _restore_game_request_views(self) -> None:
         """Restore persistent game request views."""
@@ -1,7 +1,4 @@
-import json
 import logging
-import os
-import sqlite3
 from pathlib import Path
 from typing import Any, Callable, Dict, List
 
@@ -11,43 +8,24 @@ from discord.ext import commands
 
 import Config
 from Cogs.RocketLeague import RANK_EMOJIS, load_rl_accounts
-from Cogs.TicketSystem import load_tickets
-from Config import ACTIVITY_FILE, RL_TIER_ORDER, get_data_dir, get_guild_id
+from Cogs.TicketSystem import find_tickets
+from Config import RL_TIER_ORDER, get_guild_id
+from Utils.ActivityStore import COUNTERS as ACTIVITY_COUNTERS
+from Utils.ActivityStore import get_activity_store
 from Utils.CacheUtils import cache
+from Utils.DatabaseUtils import get_user_levels_db
 from Utils.EmbedUtils import set_pink_footer
+from Utils.LeaderboardIndex import get_source_version, leaderboard_index
 
 # Configure logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-# Helper to load activity data
-@cache(ttl_seconds=30)  # Cache for 30 seconds since activity data changes frequently
-async def load_activity() -> Dict[str, Any]:
-    if not os.path.exists(ACTIVITY_FILE):
-        return {}
-    with open(ACTIVITY_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-# Helper to load meme requests data
-@cache(ttl_seconds=30)  # Cache for 30 seconds
-async def load_meme_requests() -> Dict[str, int]:
-    file_path = os.path.join(get_data_dir(), "meme_requests.json")
-    if not os.path.exists(file_path):
-        return {}
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-# Helper to load memes generated data
-@cache(ttl_seconds=30)  # Cache for 30 seconds
-async def load_memes_generated() -> Dict[str, int]:
-    file_path = os.path.join(get_data_dir(), "memes_generated.json")
-    if not os.path.exists(file_path):
-        return {}
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+# Helper to load activity counter standings (flush + indexed query run on the store's executor)
+async def load_activity_top(counter: str, limit: int = 10) -> List[tuple]:
+    store = get_activity_store()
+    return await store.pool.call_async(store.top, counter, limit)
 
 
 # Helper to load XP/Level leaderboard
@@ -59,11 +37,7 @@ async def load_xp_leaderboard(limit: int = 10) -> List[Dict[str, Any]]:
         if not db_path.exists():
             return []
 
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute(
+        rows = await get_user_levels_db().fetchall_async(
             """
             SELECT user_id, username, total_xp, current_level
             FROM user_xp
@@ -72,8 +46,6 @@ async def load_xp_leaderboard(limit: int = 10) -> List[Dict[str, Any]]:
             """,
             (limit,),
         )
-        rows = cursor.fetchall()
-        conn.close()
 
         leaderboard = []
         for row in rows:
@@ -102,16 +74,10 @@ async def load_xp_leaderboard(limit: int = 10) -> List[Dict[str, Any]]:
         return []
 
 
-def save_activity(data: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(ACTIVITY_FILE), exist_ok=True)
-    with open(ACTIVITY_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
-
-
-# Helper to get activity for a user
+# Helper to get activity for a user (messages, images, meme_requests, memes_generated; runs on the store's executor)
 async def get_user_activity(user_id: str) -> Dict[str, int]:
-    activity = await load_activity()
-    return activity.get(str(user_id), {"messages": 0, "images": 0})
+    store = get_activity_store()
+    return await store.pool.call_async(store.get_user, str(user_id))
 
 
 class Leaderboard(commands.Cog):
@@ -127,14 +93,11 @@ class Leaderboard(commands.Cog):
     async def on_message(self, message: discord.Message) -> None:
         if message.author.bot:
             return
-        activity = await load_activity()
+        store = get_activity_store()
         user_id = str(message.author.id)
-        if user_id not in activity:
-            activity[user_id] = {"messages": 0, "images": 0}
-        activity[user_id]["messages"] += 1
+        store.increment("messages", user_id)
         if message.attachments:
-            activity[user_id]["images"] += len(message.attachments)
-        save_activity(activity)
+            store.increment("images", user_id, len(message.attachments))
 
     # Shared helper to create leaderboard embed
     def create_leaderboard_embed(
@@ -182,61 +145,26 @@ class Leaderboard(commands.Cog):
         set_pink_footer(embed, bot=self.bot.user)
         return embed
 
+    # Sorted standings from the leaderboard index (rebuilt only after the source changed)
+    async def get_standings(self, category: str) -> List[tuple]:
+        if category.startswith("rl_") and leaderboard_index.is_stale("rl"):
+            version = get_source_version("rl")
+            leaderboard_index.rebuild_rl(load_rl_accounts(), version)
+        elif category == "tickets" and leaderboard_index.is_stale("tickets"):
+            version = get_source_version("tickets")
+            leaderboard_index.rebuild_tickets(await find_tickets(status="Closed"), version)
+        return leaderboard_index.standings(category)
+
     # Helper to get top entries for a category (used for overview)
     async def get_top_entries(self, category: str, limit: int = 3) -> List[tuple]:
-        if category == "rl_overall":
-            accounts = load_rl_accounts()
-            data = {}
-            for uid, acc in accounts.items():
-                ranks = acc.get("ranks", {})
-                highest_tier = "Unranked"
-                for tier in ranks.values():
-                    if tier in RL_TIER_ORDER and RL_TIER_ORDER.index(tier) > RL_TIER_ORDER.index(highest_tier):
-                        highest_tier = tier
-                if highest_tier != "Unranked":
-                    data[uid] = RL_TIER_ORDER.index(highest_tier)
-            sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)
-            return [(uid, RL_TIER_ORDER[idx]) for uid, idx in sorted_data[:limit]]
-        elif category.startswith("rl_"):
-            playlist = category.split("_")[1]
-            accounts = load_rl_accounts()
-            data = {}
-            for uid, acc in accounts.items():
-                ranks = acc.get("ranks", {})
-                tier = ranks.get(playlist, "Unranked")
-                if tier != "Unranked":
-                    data[uid] = RL_TIER_ORDER.index(tier)
-            sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)
-            return [(uid, RL_TIER_ORDER[idx]) for uid, idx in sorted_data[:limit]]
+        if category.startswith("rl_"):
+            standings = await self.get_standings(category)
+            return [(uid, RL_TIER_ORDER[ordinal]) for uid, ordinal in standings[:limit]]
         elif category == "tickets":
-            tickets = await load_tickets()
-            data = {}
-            for ticket in tickets:
-                if ticket["status"] == "Closed":
-                    for key in ["claimed_by", "assigned_to"]:
-                        uid = ticket.get(key)
-                        if uid:
-                            data[uid] = data.get(uid, 0) + 1
-            sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)
-            return sorted_data[:limit]
-        elif category == "messages":
-            activity = await load_activity()
-            data = {uid: stats["messages"] for uid, stats in activity.items()}
-            sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)
-            return sorted_data[:limit]
-        elif category == "images":
-            activity = await load_activity()
-            data = {uid: stats["images"] for uid, stats in activity.items()}
-            sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)
-            return sorted_data[:limit]
-        elif category == "meme_requests":
-            meme_requests = await load_meme_requests()
-            sorted_data = sorted(meme_requests.items(), key=lambda x: x[1], reverse=True)
-            return sorted_data[:limit]
-        elif category == "memes_generated":
-            memes_generated = await load_memes_generated()
-            sorted_data = sorted(memes_generated.items(), key=lambda x: x[1], reverse=True)
-            return sorted_data[:limit]
+            standings = await self.get_standings(category)
+            return standings[:limit]
+        elif category in ACTIVITY_COUNTERS:
+            return await load_activity_top(category, limit)
         return []
 
     # Create overview embed with all leaderboards
@@ -300,66 +228,28 @@ class Leaderboard(commands.Cog):
             leaderboard = await load_xp_leaderboard(limit=10)
             embed = await self.create_xp_leaderboard_embed(leaderboard)
         elif category == "rl_overall":
-            accounts = load_rl_accounts()
-            data = {}
-            for uid, acc in accounts.items():
-                ranks = acc.get("ranks", {})
-                highest_tier = "Unranked"
-                for tier in ranks.values():
-                    if tier in RL_TIER_ORDER and RL_TIER_ORDER.index(tier) > RL_TIER_ORDER.index(highest_tier):
-                        highest_tier = tier
-                if highest_tier != "Unranked":
-                    data[uid] = RL_TIER_ORDER.index(highest_tier)
-            sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)
             embed = self.create_leaderboard_embed(
                 "Highest RL Ranks Overall",
-                sorted_data,
+                await self.get_standings(category),
                 lambda idx: f"{RANK_EMOJIS.get(RL_TIER_ORDER[idx], '<:unranked:1425389712276721725>')} {RL_TIER_ORDER[idx]}",
             )
         elif category.startswith("rl_"):
             playlist = category.split("_")[1]
-            accounts = load_rl_accounts()
-            data = {}
-            for uid, acc in accounts.items():
-                ranks = acc.get("ranks", {})
-                tier = ranks.get(playlist, "Unranked")
-                if tier != "Unranked":
-                    data[uid] = RL_TIER_ORDER.index(tier)
-            sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)
             embed = self.create_leaderboard_embed(
                 f"Highest RL Ranks {playlist.upper()}",
-                sorted_data,
+                await self.get_standings(category),
                 lambda idx: f"{RANK_EMOJIS.get(RL_TIER_ORDER[idx], '<:unranked:1425389712276721725>')} {RL_TIER_ORDER[idx]}",
             )
         elif category == "tickets":
-            tickets = await load_tickets()  # Added await since load_tickets is now async
-            data = {}
-            for ticket in tickets:
-                if ticket["status"] == "Closed":
-                    for key in ["claimed_by", "assigned_to"]:
-                        uid = ticket.get(key)
-                        if uid:
-                            data[uid] = data.get(uid, 0) + 1
-            sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)
-            embed = self.create_leaderboard_embed("Resolved Tickets", sorted_data)
+            embed = self.create_leaderboard_embed("Resolved Tickets", await self.get_standings(category))
         elif category == "messages":
-            activity = await load_activity()
-            data = {uid: stats["messages"] for uid, stats in activity.items()}
-            sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)
-            embed = self.create_leaderboard_embed("Most Messages", sorted_data)
+            embed = self.create_leaderboard_embed("Most Messages", await load_activity_top("messages"))
         elif category == "images":
-            activity = await load_activity()
-            data = {uid: stats["images"] for uid, stats in activity.items()}
-            sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)
-            embed = self.create_leaderboard_embed("Most Images Posted", sorted_data)
+            embed = self.create_leaderboard_embed("Most Images Posted", await load_activity_top("images"))
         elif category == "meme_requests":
-            meme_requests = await load_meme_requests()
-            sorted_data = sorted(meme_requests.items(), key=lambda x: x[1], reverse=True)
-            embed = self.create_leaderboard_embed("Most Meme Requests", sorted_data)
+            embed = self.create_leaderboard_embed("Most Meme Requests", await load_activity_top("meme_requests"))
         elif category == "memes_generated":
-            memes_generated = await load_memes_generated()
-            sorted_data = sorted(memes_generated.items(), key=lambda x: x[1], reverse=True)
-            embed = self.create_leaderboard_embed("Most Memes Generated", sorted_data)
+            embed = self.create_leaderboard_embed("Most Memes Generated", await load_activity_top("memes_generated"))
         else:
             embed = discord.Embed(
                 title="❌ Invalid Category",
@@ -12,6 +12,7 @@ Features:
 - Leaderboard & history tracking
 """
 
+import asyncio
 import logging
 import sqlite3
 from datetime import datetime, timezone
@@ -20,9 +21,10 @@ from typing import Optional
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 import Config
+from Utils.DatabaseUtils import get_user_levels_db
 from Config import (
     GUILD_ID,
     LEVEL_ICONS,
@@ -31,12 +33,41 @@ from Config import (
     MODERATOR_ROLE_ID,
     XP_CONFIG,
     calculate_level,
+    calculate_total_xp_for_level,
     get_guild_id,
     get_level_tier,
 )
 
 logger = logging.getLogger(__name__)
 
+# Seconds between write-behind flushes of buffered XP to user_levels.db
+XP_FLUSH_INTERVAL = 10
+
+# Map xp_type (from XP_CONFIG) to database column name
+XP_ACTIVITY_COLUMNS = {
+    # Legacy names (backward compatibility)
+    "meme_generated": "memes_generated",
+    "meme_fetched": "memes_fetched",
+    # New rebalanced names (12. Dez 2025)
+    "meme_fetch": "memes_fetched",
+    "meme_post": "memes_posted",
+    "meme_generate": "memes_generated",
+    "meme_generate_post": "generated_memes_posted",
+    # Community Posts & Engagement (16. Dez 2025)
+    "community_post_create": "community_posts_created",
+    "community_post_like": "community_posts_liked",
+    "meme_like": "memes_liked",
+    # Other activities
+    "message_sent": "messages_sent",
+    "image_sent": "images_sent",
+    "ticket_created": "tickets_created",
+    "ticket_resolved": "tickets_resolved",
+    "ticket_claimed": "tickets_claimed",
+    "game_request": "game_request",
+    "rl_account_linked": "rl_accounts_linked",
+    "rl_stats_checked": "rl_stats_checked",
+}
+
 
 class LevelSystem(commands.Cog):
     """
@@ -46,12 +77,21 @@ class LevelSystem(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.db_path = Path(Config.DATA_DIR) / "user_levels.db"
+        # Shared pooled connections (WAL, statement cache); async calls run on its executor
+        self.db = get_user_levels_db()
         self._cooldowns = {}  # user_id: last_message_time
         self._meme_fetch_cooldowns = {}  # user_id: last_meme_fetch_time
         self._community_post_cooldowns = {}  # user_id: last_post_time
         self._community_post_like_cooldowns = {}  # user_id: last_like_time
         self._meme_like_cooldowns = {}  # user_id: last_meme_like_time
 
+        # Resident XP table: user_id -> {username, total_xp, current_level, next_level_xp}
+        self._users = {}
+        # Write-behind buffer: user_id -> {username, xp, current_level, activities, last_xp_gain}
+        self._pending = {}
+        self._pending_history = []  # (user_id, old_level, new_level, total_xp, timestamp)
+        self._flush_lock = asyncio.Lock()
+
         # Debug: Log XP_CONFIG at init to verify community post XP types
         logger.info(f"🔍 [LevelSystem] XP_CONFIG keys loaded: {len(XP_CONFIG.keys())} types")
         if "community_post_like" in XP_CONFIG:
@@ -60,6 +100,13 @@ class LevelSystem(commands.Cog):
             logger.warning("⚠️ [LevelSystem] community_post_like NOT found in XP_CONFIG!")
 
         self._init_database()
+        self._load_users()
+        self.flush_xp_loop.start()
+
+    async def cog_unload(self):
+        """Stop the flush loop and write out any buffered XP"""
+        self.flush_xp_loop.cancel()
+        await self.flush_xp()
 
     def _init_database(self):
         """Initialize database with schema"""
@@ -67,7 +114,7 @@ class LevelSystem(commands.Cog):
             # Ensure Data directory exists
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-            conn = sqlite3.connect(self.db_path)
+            conn = self.db.acquire()
             cursor = conn.cursor()
 
             # Read and execute SQL schema
@@ -178,55 +225,30 @@ class LevelSystem(commands.Cog):
             logger.error(f"❌ Failed to initialize database: {e}")
             raise
 
-    def _get_or_create_user(self, user_id: str, username: str) -> dict:
-        """Get user data or create new entry"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT * FROM user_xp WHERE user_id = ?", (user_id,))
-            row = cursor.fetchone()
-
-            if row:
-                conn.close()
-                return dict(row)
-
-            # Create new user
-            now = datetime.now(timezone.utc).isoformat()
-            cursor.execute(
-                """
-                INSERT INTO user_xp (user_id, username, total_xp, current_level, created_at, updated_at)
-                VALUES (?, ?, 0, 1, ?, ?)
-            """,
-                (user_id, username, now, now),
-            )
-
-            conn.commit()
-            conn.close()
-
-            logger.info(f"➕ Created new user: {username} ({user_id})")
+    def _load_users(self):
+        """Load the resident XP table (user_xp is only written by this cog)"""
+        rows = self.db.fetchall("SELECT user_id, username, total_xp, current_level FROM user_xp")
+        for row in rows:
+            self._users[row["user_id"]] = {
+                "username": row["username"],
+                "total_xp": row["total_xp"],
+                "current_level": row["current_level"],
+                "next_level_xp": calculate_total_xp_for_level(row["current_level"] + 1),
+            }
 
-            return {
-                "user_id": user_id,
+    def _get_or_create_user(self, user_id: str, username: str) -> dict:
+        """Get resident user data or create new entry (inserted into the database on the next flush)"""
+        user_data = self._users.get(user_id)
+        if user_data is None:
+            user_data = {
                 "username": username,
                 "total_xp": 0,
                 "current_level": 1,
-                "memes_generated": 0,
-                "memes_fetched": 0,
-                "messages_sent": 0,
-                "images_sent": 0,
-                "tickets_created": 0,
-                "tickets_resolved": 0,
-                "game_requests": 0,
-                "last_xp_gain": None,
-                "created_at": now,
-                "updated_at": now,
+                "next_level_xp": calculate_total_xp_for_level(2),
             }
-
-        except Exception as e:
-            logger.error(f"❌ Error getting/creating user: {e}")
-            return None
+            self._users[user_id] = user_data
+            logger.info(f"➕ Created new user: {username} ({user_id})")
+        return user_data
 
     def _check_cooldown(self, user_id: str) -> bool:
         """Check if user is on cooldown for message XP"""
@@ -332,11 +354,6 @@ class LevelSystem(commands.Cog):
             Dict with xp_gained, total_xp, level, leveled_up or None if on cooldown
         """
         try:
-            # Get/Create User
-            user_data = self._get_or_create_user(user_id, username)
-            if not user_data:
-                return None
-
             # Cooldown Check
             if xp_type == "message_sent":
                 if not self._check_cooldown(user_id):
@@ -363,102 +380,141 @@ class LevelSystem(commands.Cog):
             xp_amount = amount if amount is not None else XP_CONFIG.get(xp_type, 0)
 
             if xp_amount == 0:
-                logger.warning(f"⚠️ Unknown XP type: {xp_type}")
+                logger.warning("⚠️ Unknown XP type: %s", xp_type)
                 logger.debug(
-                    f"🔍 DEBUG: xp_type='{xp_type}', amount={amount}, XP_CONFIG has key: {xp_type in XP_CONFIG}"
+                    "🔍 DEBUG: xp_type='%s', amount=%s, XP_CONFIG has key: %s", xp_type, amount, xp_type in XP_CONFIG
                 )
-                logger.debug(f"🔍 DEBUG: Available XP types: {list(XP_CONFIG.keys())}")
+                logger.debug("🔍 DEBUG: Available XP types: %s", XP_CONFIG.keys())
                 return None
 
-            # Update User Data
+            # Update resident user data; level only needs recomputing once the next threshold is crossed
+            user_data = self._get_or_create_user(user_id, username)
             old_level = user_data["current_level"]
             new_xp = user_data["total_xp"] + xp_amount
-            new_level = calculate_level(new_xp)
+            new_level = old_level
+            if new_xp >= user_data["next_level_xp"] or xp_amount < 0:
+                new_level = calculate_level(new_xp)
+                user_data["current_level"] = new_level
+                user_data["next_level_xp"] = calculate_total_xp_for_level(new_level + 1)
+            user_data["total_xp"] = new_xp
 
-            # Update Database
-            self._update_user_xp(user_id, xp_type, xp_amount, new_xp, new_level)
+            # Buffer the delta for the next flush
+            self._buffer_xp(user_id, user_data, xp_type, xp_amount)
 
             # Level Up Event
             if new_level > old_level:
                 await self._handle_level_up(user_id, username, old_level, new_level, new_xp)
 
-            logger.info(f"✅ {username} gained {xp_amount} XP ({xp_type}) → Level {new_level} ({new_xp} total XP)")
+            logger.info(
+                "✅ %s gained %s XP (%s) → Level %s (%s total XP)", username, xp_amount, xp_type, new_level, new_xp
+            )
 
             return {"xp_gained": xp_amount, "total_xp": new_xp, "level": new_level, "leveled_up": new_level > old_level}
 
         except Exception as e:
-            logger.error(f"❌ Error adding XP: {e}")
+            logger.error("❌ Error adding XP: %s", e)
             return None
 
-    def _update_user_xp(self, user_id: str, xp_type: str, xp_amount: int, new_xp: int, new_level: int):
-        """Update user XP in database"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+    def _buffer_xp(self, user_id: str, user_data: dict, xp_type: str, xp_amount: int):
+        """Record an XP gain in the write-behind buffer"""
+        pending = self._pending.get(user_id)
+        if pending is None:
+            pending = {"username": user_data["username"], "xp": 0, "activities": {}}
+            self._pending[user_id] = pending
 
-            # Map xp_type (from XP_CONFIG) to database column name
-            column_mapping = {
-                # Legacy names (backward compatibility)
-                "meme_generated": "memes_generated",
-                "meme_fetched": "memes_fetched",
-                # New rebalanced names (12. Dez 2025)
-                "meme_fetch": "memes_fetched",
-                "meme_post": "memes_posted",
-                "meme_generate": "memes_generated",
-                "meme_generate_post": "generated_memes_posted",
-                # Community Posts & Engagement (16. Dez 2025)
-                "community_post_create": "community_posts_created",
-                "community_post_like": "community_posts_liked",
-                "meme_like": "memes_liked",
-                # Other activities
-                "message_sent": "messages_sent",
-                "image_sent": "images_sent",
-                "ticket_created": "tickets_created",
-                "ticket_resolved": "tickets_resolved",
-                "ticket_claimed": "tickets_claimed",
-                "game_request": "game_request",
-                "rl_account_linked": "rl_accounts_linked",
-                "rl_stats_checked": "rl_stats_checked",
-            }
+        pending["xp"] += xp_amount
+        pending["current_level"] = user_data["current_level"]
+        pending["last_xp_gain"] = datetime.now(timezone.utc).isoformat()
 
-            activity_column = column_mapping.get(xp_type)
-            now = datetime.now(timezone.utc).isoformat()
+        # Only count activity if xp_type is mapped to a column (not for manual/bonus XP)
+        activity_column = XP_ACTIVITY_COLUMNS.get(xp_type)
+        if activity_column:
+            pending["activities"][activity_column] = pending["activities"].get(activity_column, 0) + 1
 
-            # Update total_xp, level, timestamps
-            # Only increment activity column if xp_type is mapped to a column
-            if activity_column:
-                # Update with activity column increment
-                cursor.execute(
-                    f"""
-                    UPDATE user_xp
-                    SET total_xp = ?,
-                        current_level = ?,
-                        {activity_column} = {activity_column} + 1,
-                        last_xp_gain = ?,
-                        updated_at = ?
-                    WHERE user_id = ?
-                """,
-                    (new_xp, new_level, now, now, user_id),
-                )
-            else:
-                # Update without activity column (for manual/bonus XP)
-                cursor.execute(
-                    """
-                    UPDATE user_xp
-                    SET total_xp = ?,
-                        current_level = ?,
-                        last_xp_gain = ?,
-                        updated_at = ?
-                    WHERE user_id = ?
-                """,
-                    (new_xp, new_level, now, now, user_id),
-                )
+    @tasks.loop(seconds=XP_FLUSH_INTERVAL)
+    async def flush_xp_loop(self):
+        await self.flush_xp()
 
-            conn.commit()
-            conn.close()
+    async def flush_xp(self) -> int:
+        """
+        Write buffered XP to the database in one transaction
 
-        except Exception as e:
-            logger.error(f"❌ Error updating user XP: {e}")
+        Returns:
+            Number of users flushed
+        """
+        async with self._flush_lock:
+            if not self._pending and not self._pending_history:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            history, self._pending_history = self._pending_history, []
+
+            try:
+                await self.db.run_async(self._write_pending, pending, history)
+            except Exception as e:
+                logger.error(f"❌ Failed to flush XP for {len(pending)} users: {e}")
+                self._requeue(pending, history)
+                return 0
+
+            return len(pending)
+
+    def _requeue(self, pending: dict, history: list):
+        """Merge a failed batch back into the buffer (newer gains may have arrived meanwhile)"""
+        for user_id, entry in pending.items():
+            newer = self._pending.get(user_id)
+            if newer is None:
+                self._pending[user_id] = entry
+                continue
+            newer["xp"] += entry["xp"]
+            for column, count in entry["activities"].items():
+                newer["activities"][column] = newer["activities"].get(column, 0) + count
+        self._pending_history = history + self._pending_history
+
+    @staticmethod
+    def _write_pending(conn: sqlite3.Connection, pending: dict, history: list):
+        """Apply buffered XP deltas and level history (runs on the database executor)"""
+        now = datetime.now(timezone.utc).isoformat()
+
+        # New users are created here; existing rows are left untouched
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO user_xp (user_id, username, total_xp, current_level, created_at, updated_at)
+            VALUES (?, ?, 0, 1, ?, ?)
+        """,
+            [(user_id, entry["username"], now, now) for user_id, entry in pending.items()],
+        )
+
+        conn.executemany(
+            """
+            UPDATE user_xp
+            SET total_xp = total_xp + ?,
+                current_level = ?,
+                last_xp_gain = ?,
+                updated_at = ?
+            WHERE user_id = ?
+        """,
+            [
+                (entry["xp"], entry["current_level"], entry["last_xp_gain"], now, user_id)
+                for user_id, entry in pending.items()
+            ],
+        )
+
+        # One statement per activity column (column names come from XP_ACTIVITY_COLUMNS only)
+        by_column = {}
+        for user_id, entry in pending.items():
+            for column, count in entry["activities"].items():
+                by_column.setdefault(column, []).append((count, user_id))
+        for column, params in by_column.items():
+            conn.executemany(f"UPDATE user_xp SET {column} = {column} + ? WHERE user_id = ?", params)
+
+        if history:
+            conn.executemany(
+                """
+                INSERT INTO level_history (user_id, old_level, new_level, total_xp, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                history,
+            )
 
     async def _handle_level_up(self, user_id: str, username: str, old_level: int, new_level: int, total_xp: int):
         """Handle level-up event with embed notification"""
@@ -624,26 +680,9 @@ class LevelSystem(commands.Cog):
         return embed
 
     def _save_level_history(self, user_id: str, old_level: int, new_level: int, total_xp: int):
-        """Save level-up to history"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            now = datetime.now(timezone.utc).isoformat()
-
-            cursor.execute(
-                """
-                INSERT INTO level_history (user_id, old_level, new_level, total_xp, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-            """,
-                (user_id, old_level, new_level, total_xp, now),
-            )
-
-            conn.commit()
-            conn.close()
-
-        except Exception as e:
-            logger.error(f"❌ Error saving level history: {e}")
+        """Save level-up to history (written with the next XP flush)"""
+        now = datetime.now(timezone.utc).isoformat()
+        self._pending_history.append((user_id, old_level, new_level, total_xp, now))
 
     # Message Listener for automatic XP
     @commands.Cog.listener()
@@ -760,7 +799,7 @@ class LevelSystem(commands.Cog):
             logger.info(f"🛡️ {user.name} promoted to Moderator by {author.name}")
 
             # Save to database
-            self._save_mod_promotion(user_id=str(user.id), promoted_by=str(author.id))
+            await self._save_mod_promotion(user_id=str(user.id), promoted_by=str(author.id))
 
             # Send celebration embed
             channel = self.bot.get_channel(LEVEL_UP_CHANNEL_ID)
@@ -772,7 +811,7 @@ class LevelSystem(commands.Cog):
                 )
 
                 # Update database with message ID
-                self._update_mod_promotion_message(str(user.id), str(message.id))
+                await self._update_mod_promotion_message(str(user.id), str(message.id))
 
                 logger.info(f"👑 Mod promotion celebration posted for {user.name}")
 
@@ -833,15 +872,12 @@ class LevelSystem(commands.Cog):
 
         return embed
 
-    def _save_mod_promotion(self, user_id: str, promoted_by: str):
+    async def _save_mod_promotion(self, user_id: str, promoted_by: str):
         """Save mod promotion to database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
             now = datetime.now(timezone.utc).isoformat()
 
-            cursor.execute(
+            await self.db.execute_async(
                 """
                 INSERT INTO mod_promotions (user_id, promoted_by, timestamp)
                 VALUES (?, ?, ?)
@@ -849,20 +885,14 @@ class LevelSystem(commands.Cog):
                 (user_id, promoted_by, now),
             )
 
-            conn.commit()
-            conn.close()
-
         except Exception as e:
             logger.error(f"❌ Error saving mod promotion: {e}")
 
-    def _update_mod_promotion_message(self, user_id: str, message_id: str):
+    async def _update_mod_promotion_message(self, user_id: str, message_id: str):
         """Update mod promotion with message ID"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
             # Use subquery instead of ORDER BY in UPDATE (SQLite limitation)
-            cursor.execute(
+            await self.db.execute_async(
                 """
                 UPDATE mod_promotions
                 SET message_id = ?
@@ -877,9 +907,6 @@ class LevelSystem(commands.Cog):
                 (message_id, user_id),
             )
 
-            conn.commit()
-            conn.close()
-
         except Exception as e:
             logger.error(f"❌ Error updating mod promotion message: {e}")
 
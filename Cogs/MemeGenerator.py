@@ -15,9 +15,9 @@ from Config import (
     IMGFLIP_USERNAME,
     MEME_TEMPLATES_CACHE_DURATION,
     MEME_TEMPLATES_CACHE_FILE,
-    get_data_dir,
     get_guild_id,
 )
+from Utils.ActivityStore import get_activity_store
 from Utils.EmbedUtils import set_pink_footer
 
 logger = logging.getLogger(__name__)
@@ -416,8 +416,7 @@ class MemePreviewView(discord.ui.View):
 
         # Track generated meme
         user_id = str(self.user.id)
-        self.cog.memes_generated[user_id] = self.cog.memes_generated.get(user_id, 0) + 1
-        self.cog.save_memes_generated()
+        get_activity_store().increment("memes_generated", user_id)
 
         # Confirm to user
         if self.post_to_channel_id and target_channel != self.channel:
@@ -454,10 +453,6 @@ class MemeGenerator(commands.Cog):
         self.templates_last_fetched = 0
         self._setup_done = False
 
-        # Meme generation tracking
-        self.memes_generated_file = os.path.join(get_data_dir(), "memes_generated.json")
-        self.memes_generated = self.load_memes_generated()
-
     async def _setup_cog(self) -> None:
         """Setup the cog - called on ready and after reload"""
         # Create HTTP session if not exists
@@ -569,25 +564,6 @@ class MemeGenerator(commands.Cog):
             logger.error(f"Error fetching templates: {e}")
             return self.templates
 
-    def load_memes_generated(self) -> dict:
-        """Load memes generated count from file"""
-        try:
-            if os.path.exists(self.memes_generated_file):
-                with open(self.memes_generated_file, "r") as f:
-                    return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading memes generated: {e}")
-        return {}
-
-    def save_memes_generated(self) -> None:
-        """Save memes generated count to file"""
-        try:
-            os.makedirs(os.path.dirname(self.memes_generated_file), exist_ok=True)
-            with open(self.memes_generated_file, "w") as f:
-                json.dump(self.memes_generated, f, indent=4)
-        except Exception as e:
-            logger.error(f"Error saving memes generated: {e}")
-
     async def create_meme(
         self, template_id: str, text0: str = "", text1: str = "", font: str = "impact"
     ) -> Optional[str]:
@@ -11,7 +11,6 @@ import Config
 from Cogs.Leaderboard import get_user_activity
 from Cogs.ModPerks import load_mod_data
 from Cogs.RocketLeague import RANK_EMOJIS, get_highest_rl_rank
-from Cogs.TicketSystem import load_tickets
 from Config import (
     ADMIN_ROLE_ID,
     CHANGELOG_ROLE_ID,
@@ -22,6 +21,7 @@ from Config import (
     get_guild_id,
 )
 from Utils.EmbedUtils import set_pink_footer
+from Utils.TicketStore import get_ticket_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,16 +38,8 @@ async def get_warning_count(user_id: int) -> int:
 
 # Helper to get resolved ticket count for a user
 async def get_resolved_ticket_count(user_id: int) -> int:
-    tickets = await load_tickets()
-    resolved_count = 0
-    for ticket in tickets:
-        if ticket["status"] == "Closed" and (
-            ticket.get("claimed_by") == user_id
-            or ticket.get("assigned_to") == user_id
-            or ticket.get("closed_by") == user_id
-        ):
-            resolved_count += 1
-    return resolved_count
+    store = get_ticket_store()
+    return await store.pool.call_async(store.resolved_count, user_id)
 
 
 # Helper to get XP/Level data for a user
@@ -91,42 +83,6 @@ def get_user_xp_data(user_id: int) -> Optional[dict]:
         return None
 
 
-# Helper to load meme requests
-def load_meme_requests() -> dict:
-    """Load meme requests from file"""
-    import json
-    import os
-
-    from Config import get_data_dir
-
-    file_path = os.path.join(get_data_dir(), "meme_requests.json")
-    try:
-        if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading meme requests: {e}")
-    return {}
-
-
-# Helper to load memes generated
-def load_memes_generated() -> dict:
-    """Load memes generated from file"""
-    import json
-    import os
-
-    from Config import get_data_dir
-
-    file_path = os.path.join(get_data_dir(), "memes_generated.json")
-    try:
-        if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading memes generated: {e}")
-    return {}
-
-
 class Profile(commands.Cog):
     """
     👤 Profile Cog: Shows user profile with avatar, join date, roles, and custom stats.
@@ -190,10 +146,8 @@ class Profile(commands.Cog):
 
         # Activity stats
         activity = await get_user_activity(member.id)
-        meme_requests = load_meme_requests()
-        memes_generated = load_memes_generated()
-        meme_request_count = meme_requests.get(str(member.id), 0)
-        meme_generated_count = memes_generated.get(str(member.id), 0)
+        meme_request_count = activity["meme_requests"]
+        meme_generated_count = activity["memes_generated"]
         embed.add_field(
             name="Activity",
             value=(
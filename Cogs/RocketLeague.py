@@ -22,11 +22,11 @@ from Config import (
     RL_CONGRATS_REPLIES,
     RL_CONGRATS_VIEWS_FILE,
     RL_RANK_PROMOTION_CONFIG,
-    RL_TIER_ORDER,
     get_guild_id,
 )
 from Utils.CacheUtils import file_cache
 from Utils.EmbedUtils import set_pink_footer
+from Utils.LeaderboardIndex import highest_rl_tier, invalidate_leaderboard
 
 logger = logging.getLogger(__name__)
 
@@ -232,6 +232,7 @@ def save_rl_accounts(accounts: Dict[str, Any]) -> None:
     os.makedirs(os.path.dirname(RL_ACCOUNTS_FILE), exist_ok=True)
     with open(RL_ACCOUNTS_FILE, "w") as f:
         json.dump(accounts, f, indent=4)
+    invalidate_leaderboard("rl")
 
 
 def get_highest_rl_rank(user_id: str) -> Optional[str]:
@@ -242,12 +243,7 @@ def get_highest_rl_rank(user_id: str) -> Optional[str]:
     user_data = accounts.get(str(user_id))
     if not user_data:
         return None
-    ranks = user_data.get("ranks", {})
-    highest_tier = "Unranked"
-    for playlist, tier in ranks.items():
-        if tier in RL_TIER_ORDER and RL_TIER_ORDER.index(tier) > RL_TIER_ORDER.index(highest_tier):
-            highest_tier = tier
-    return highest_tier
+    return highest_rl_tier(user_data.get("ranks", {}))
 
 
 class CongratsButton(discord.ui.Button):
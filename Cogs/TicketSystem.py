@@ -1,5 +1,6 @@
 import asyncio
-import json
+import html
+import io
 import logging
 import os
 import re
@@ -8,7 +9,7 @@ import traceback
 import uuid
 from datetime import datetime, timedelta
 from email.message import EmailMessage
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
 
 import discord
 from discord import app_commands
@@ -20,76 +21,57 @@ from Config import (
     MODERATOR_ROLE_ID,
     TICKETS_CATEGORY_ID,
     TRANSCRIPT_CHANNEL_ID,
-    get_data_dir,
     get_guild_id,
 )
 from Utils.EmbedUtils import set_pink_footer
+from Utils.LoopBridge import get_loop_bridge
+from Utils.TicketStore import MAX_REOPENS, get_ticket_store
 
 logger = logging.getLogger(__name__)
 
-# === Path to JSON file ===
-TICKET_FILE = f"{get_data_dir()}/tickets.json"
-TICKET_COUNTER_FILE = f"{get_data_dir()}/ticket_counter.json"
+
+# === Ticket persistence (Data/tickets.db, see Utils/TicketStore.py) ===
+# Store calls run on the database executor so the event loop never waits on SQLite
+async def _store_call(method_name: str, *args, **kwargs) -> Any:
+    store = get_ticket_store()
+    return await store.pool.call_async(getattr(store, method_name), *args, **kwargs)
 
 
-# === Helper functions for JSON persistence ===
-# Removed @cache decorator - tickets change frequently, cache causes issues
 async def load_tickets() -> List[Dict[str, Any]]:
-    os.makedirs(os.path.dirname(TICKET_FILE), exist_ok=True)
-    if not os.path.exists(TICKET_FILE):
-        with open(TICKET_FILE, "w") as f:
-            json.dump([], f)
-    try:
-        with open(TICKET_FILE, "r") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        logger.error(f"Error loading {get_data_dir()}/tickets.json – resetting file.")
-        return []
+    return await _store_call("all")
+
+
+async def find_tickets(**filters: Any) -> List[Dict[str, Any]]:
+    """Tickets matching status / user_id / claimed_by (see TicketStore.find)"""
+    return await _store_call("find", **filters)
+
+
+async def get_ticket_by_channel(channel_id: int) -> Optional[Dict[str, Any]]:
+    return await _store_call("get_by_channel", channel_id)
+
+
+async def get_ticket_by_id(ticket_id: str) -> Optional[Dict[str, Any]]:
+    return await _store_call("get_by_id", ticket_id)
 
 
 async def delete_ticket(channel_id: int) -> None:
-    tickets = await load_tickets()
-    tickets = [t for t in tickets if t["channel_id"] != channel_id]
-    with open(TICKET_FILE, "w") as f:
-        json.dump(tickets, f, indent=2)
+    await _store_call("delete", channel_id)
 
 
 async def save_ticket(ticket: Dict[str, Any]) -> None:
-    tickets = await load_tickets()
-    tickets.append(ticket)
-    with open(TICKET_FILE, "w") as f:
-        json.dump(tickets, f, indent=2)
+    await _store_call("insert", ticket)
+    # Fresh channel: nothing to backfill, on_message captures the transcript from here on
+    await _store_call("set_transcript_checkpoint", ticket["ticket_id"], ticket["channel_id"])
+    _live_transcripts.add(ticket["channel_id"])
 
 
 async def update_ticket(channel_id: int, updates: Dict[str, Any]) -> None:
-    tickets = await load_tickets()
-    for ticket in tickets:
-        if ticket["channel_id"] == channel_id:
-            ticket.update(updates)
-            break
-    with open(TICKET_FILE, "w") as f:
-        json.dump(tickets, f, indent=2)
+    await _store_call("update", channel_id, updates)
 
 
-# === Counter functions for ticket numbering ===
-async def load_counter() -> int:
-    os.makedirs(os.path.dirname(TICKET_COUNTER_FILE), exist_ok=True)
-    if not os.path.exists(TICKET_COUNTER_FILE):
-        with open(TICKET_COUNTER_FILE, "w") as f:
-            json.dump({"next_num": 1}, f)
-        return 1
-    try:
-        with open(TICKET_COUNTER_FILE, "r") as f:
-            data = json.load(f)
-            return data.get("next_num", 1)
-    except json.JSONDecodeError:
-        logger.error(f"Error loading {get_data_dir()}/ticket_counter.json – resetting file.")
-        return 1
-
-
-async def save_counter(num: int) -> None:
-    with open(TICKET_COUNTER_FILE, "w") as f:
-        json.dump({"next_num": num}, f)
+# === Ticket numbering ===
+async def allocate_ticket_num() -> int:
+    return await _store_call("allocate_ticket_num")
 
 
 # === Permission helper function ===
@@ -152,35 +134,172 @@ def replace_mentions(content: str, guild: discord.Guild) -> str:
     return content
 
 
-# === Transcript creation ===
-async def create_transcript(channel: discord.TextChannel) -> str:
-    transcript = []
-    async for msg in channel.history(limit=None, oldest_first=True):
-        timestamp = msg.created_at.strftime("%Y-%m-%d %H:%M")
-        author = msg.author.name
-        content = replace_mentions(msg.content or "[Attachment/Embed]", channel.guild)
-        transcript.append(f"[{timestamp}] {author}: {content}")
-    return "\n".join(transcript)
+# === Transcript capture ===
+# Messages are stored as they arrive (on_message); closing a ticket only fetches the history
+# after the transcript checkpoint, i.e. what the bot missed while it was offline or disconnected.
+
+# Ticket channels whose transcript has been captured without gaps since this process synced them
+_live_transcripts: Set[int] = set()
+
+# Stored messages read per page when rendering a transcript
+TRANSCRIPT_PAGE_SIZE = 500
+
+# Transcript text shown in the transcript channel embed (5 fields of 1024)
+TRANSCRIPT_EMBED_CHARS = 5 * 1024
+
+
+def _avatar_url(user: discord.abc.User) -> Optional[str]:
+    """Avatar URL with fallback"""
+    try:
+        if user.display_avatar:
+            return str(user.display_avatar.url)
+        if user.avatar:
+            return str(user.avatar.url)
+    except (AttributeError, Exception) as e:
+        logger.debug(f"Could not get avatar for user {user.id}: {e}")
+    return None
+
+
+def _staff_role(member: discord.abc.User) -> Optional[str]:
+    """'admin', 'moderator' or None (for the app's role badge)"""
+    for role in getattr(member, "roles", None) or []:
+        if role.id == ADMIN_ROLE_ID:
+            return "admin"
+        if role.id == MODERATOR_ROLE_ID:
+            return "moderator"
+    return None
+
+
+def _find_member_by_name(guild: Optional[discord.Guild], name: str) -> Optional[discord.Member]:
+    if not guild:
+        return None
+    for member in guild.members:
+        if name in (member.name, member.display_name, member.global_name):
+            return member
+    return None
+
+
+def message_to_dict(message: discord.Message) -> Dict[str, Any]:
+    """
+    Serialize a ticket channel message (WebSocket payload, transcript row and app mirror row)
+
+    Messages the bot relays from the app ("**[Admin Panel - name]:**" / "**[name]:**") get
+    the avatar and role badge of the app user they came from, resolved once here instead of
+    on every read.
+    """
+    avatar_url = None
+    user_role = _staff_role(message.author)
+    is_admin = user_role is not None
+
+    if message.author.bot:
+        relay = re.match(r"\*\*\[(?:Admin Panel - )?([^\]]+)\]:\*\*", message.content)
+        if relay:
+            is_admin = is_admin or message.content.startswith("**[Admin Panel")
+            sender = _find_member_by_name(message.guild, relay.group(1))
+            if sender:
+                avatar_url = _avatar_url(sender)
+                if message.content.startswith("**[Admin Panel"):
+                    user_role = _staff_role(sender)
+
+    if avatar_url is None:
+        avatar_url = _avatar_url(message.author)
+
+    return {
+        "id": str(message.id),
+        "author_id": str(message.author.id),
+        "author_name": message.author.name,
+        "author_avatar": avatar_url,
+        "content": message.content,
+        "timestamp": message.created_at.isoformat(),
+        "is_bot": message.author.bot,
+        "is_admin": is_admin,
+        "role": user_role,  # 'admin', 'moderator', or None
+    }
+
+
+async def record_message(ticket: Dict[str, Any], message: discord.Message) -> Dict[str, Any]:
+    """Store a live ticket message (transcript + app mirror) and return its serialized form"""
+    message_data = message_to_dict(message)
+    await _store_call(
+        "append_message",
+        ticket["ticket_id"],
+        message_data,
+        advance_checkpoint=message.channel.id in _live_transcripts,
+    )
+    return message_data
+
+
+def read_app_messages(bot: commands.Bot, ticket: Dict[str, Any], after: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Messages for the app's ticket chat from the local mirror (blocking, for the API threads)
+
+    Tickets whose history was never captured (opened before the ticket store kept
+    messages) are backfilled from Discord once; afterwards reads stay local.
+    """
+    store = get_ticket_store()
+    if store.transcript_checkpoint(ticket["ticket_id"]) is None:
+        channel = bot.get_channel(ticket.get("channel_id"))
+        if channel:
+            # Concurrent readers of the same ticket share one backfill
+            get_loop_bridge(bot.loop).call(
+                "tickets.backfill", sync_transcript, channel, ticket, key=ticket["ticket_id"], timeout=30
+            )
+    return store.app_messages(ticket["ticket_id"], after=after)
+
+
+async def sync_transcript(channel: discord.TextChannel, ticket: Dict[str, Any]) -> None:
+    """Store the channel history after the transcript checkpoint (everything, for tickets never captured)"""
+    checkpoint = await _store_call("transcript_checkpoint", ticket["ticket_id"])
+    after = discord.Object(id=checkpoint) if checkpoint else None
+    batch = []
+    async for msg in channel.history(limit=None, after=after, oldest_first=True):
+        batch.append(message_to_dict(msg))
+        if len(batch) >= 100:
+            await _store_call("append_history", ticket["ticket_id"], batch)
+            batch = []
+    await _store_call("append_history", ticket["ticket_id"], batch)
+    _live_transcripts.add(channel.id)
+
+
+def iter_transcript_lines(ticket_id: str, guild: discord.Guild) -> Iterator[str]:
+    """Transcript lines from the ticket store, page by page (blocking, consume off the event loop)"""
+    store = get_ticket_store()
+    after = None
+    while True:
+        page = store.messages(ticket_id, after=after, limit=TRANSCRIPT_PAGE_SIZE)
+        for message in page:
+            timestamp = datetime.fromisoformat(message["timestamp"]).strftime("%Y-%m-%d %H:%M")
+            content = replace_mentions(message["content"] or "[Attachment/Embed]", guild)
+            yield f"[{timestamp}] {message['author_name']}: {content}"
+        if len(page) < TRANSCRIPT_PAGE_SIZE:
+            return
+        after = int(page[-1]["id"])
+
+
+def transcript_preview(lines: Iterable[str], max_chars: int) -> str:
+    """Start of a transcript, one character longer than max_chars if it continues"""
+    preview, length = [], 0
+    for line in lines:
+        preview.append(line)
+        length += len(line) + 1
+        if length > max_chars:
+            break
+    return "\n".join(preview)[: max_chars + 1]
 
 
 # === Optional email sending ===
 
 
 # --- HTML transcript helper ---
-def build_transcript_html(
-    transcript_text: str,
+def iter_transcript_html(
+    transcript_lines: Iterable[str],
     ticket: Dict[str, Any],
     guild_name: str,
     creator_name: str,
     claimer_name: str,
     assigned_name: str,
-) -> str:
-    # Split transcript into lines and format as HTML
-    transcript_lines = transcript_text.splitlines()
-    transcript_html = "".join(
-        f'<tr><td style="padding:4px 8px;font-family:monospace;font-size:13px;border-bottom:1px solid #eee;vertical-align:top;">{line.replace(chr(10), "<br>")}</td></tr>'
-        for line in transcript_lines
-    )
+) -> Iterator[str]:
+    """Transcript HTML in chunks (head, one table row per line, footer)"""
     # Ticket meta info
     meta_html = f"""
         <table style="margin-bottom:18px;font-family:sans-serif;font-size:15px;">
@@ -192,8 +311,7 @@ def build_transcript_html(
             <tr><td><b>Assigned to:</b></td><td>{assigned_name or "-"}</td></tr>
         </table>
     """
-    # Main HTML
-    html = f"""
+    yield f"""
     <html>
     <head>
     <meta charset="utf-8">
@@ -207,33 +325,42 @@ def build_transcript_html(
                 <tr><th style="text-align:left;padding:8px 8px 8px 8px;background:#f5f5fa;color:#ad1457;font-size:15px;font-family:sans-serif;">Transcript</th></tr>
             </thead>
             <tbody>
-                {transcript_html}
+    """
+    for line in transcript_lines:
+        # One row per message (multi-line messages keep their line breaks)
+        yield (
+            '<tr><td style="padding:4px 8px;font-family:monospace;font-size:13px;border-bottom:1px solid #eee;'
+            f'vertical-align:top;">{"<br>".join(html.escape(line).splitlines())}</td></tr>'
+        )
+    yield """
             </tbody>
         </table>
         <div style="margin-top:24px;font-size:13px;color:#888;font-family:sans-serif;">This transcript was generated automatically by HazeWorldBot.</div>
     </body>
     </html>
     """
-    return html
 
 
 def send_transcript_email(
     to_email: str,
-    transcript_text: str,
+    transcript_lines: Iterable[str],
     ticket: Dict[str, Any],
     guild_name: str,
     creator_name: str,
     claimer_name: str,
     assigned_name: str,
 ) -> None:
+    """Render and send the transcript email (blocking: run with asyncio.to_thread)"""
     try:
         subject = f"{guild_name} - Ticket Transcript - Ticket #{ticket['ticket_num']} - Type: {ticket['type']} - Creator: {creator_name}"
-        html_body = build_transcript_html(
-            transcript_text, ticket, guild_name, creator_name, claimer_name, assigned_name
-        )
+        html_body = io.StringIO()
+        for chunk in iter_transcript_html(
+            transcript_lines, ticket, guild_name, creator_name, claimer_name, assigned_name
+        ):
+            html_body.write(chunk)
         msg = EmailMessage()
         msg.set_content("This is an HTML email. Please view it in an HTML-compatible email client.")
-        msg.add_alternative(html_body, subtype="html")
+        msg.add_alternative(html_body.getvalue(), subtype="html")
         msg["Subject"] = subject
         msg["From"] = os.getenv("SMTP_USER")
         msg["To"] = to_email
@@ -329,17 +456,13 @@ class TicketView(discord.ui.View):
 async def create_ticket(
     interaction: discord.Interaction, ticket_type: str, initial_message: Optional[str] = None
 ) -> None:
-    # Load tickets for cooldown check and ticket number calculation
-    tickets = await load_tickets()
-
     # Check cooldown: 1 hour between ticket creations per user (except admins/mods)
     is_admin_or_mod = any(role.id in [ADMIN_ROLE_ID, MODERATOR_ROLE_ID] for role in interaction.user.roles)
     if not is_admin_or_mod:
         now = datetime.now()
-        user_tickets = [t for t in tickets if t["user_id"] == interaction.user.id]
-        if user_tickets:
-            last_ticket = max(user_tickets, key=lambda t: datetime.fromisoformat(t["created_at"]))
-            if now - datetime.fromisoformat(last_ticket["created_at"]) < timedelta(hours=1):
+        last_created_at = await _store_call("last_created_at", interaction.user.id)
+        if last_created_at:
+            if now - datetime.fromisoformat(last_created_at) < timedelta(hours=1):
                 await interaction.response.send_message(
                     "You can only create a new ticket every 1 hour.", ephemeral=True
                 )
@@ -359,16 +482,8 @@ async def create_ticket(
     moderator_role = discord.utils.get(guild.roles, id=MODERATOR_ROLE_ID)
     if moderator_role:
         overwrites[moderator_role] = discord.PermissionOverwrite(view_channel=True)
-    # Calculate ticket_num as the next highest number (no reuse of deleted IDs)
-    existing_nums = [t.get("ticket_num", 0) for t in tickets]
-    max_existing = max(existing_nums) if existing_nums else 0
-    current_counter = await load_counter()
-    if current_counter <= max_existing:
-        ticket_num = max_existing + 1
-        await save_counter(ticket_num + 1)
-    else:
-        ticket_num = current_counter
-        await save_counter(ticket_num + 1)
+    # Next ticket number (no reuse of deleted IDs)
+    ticket_num = await allocate_ticket_num()
     channel = await guild.create_text_channel(
         name=f"ticket-{ticket_num}-{ticket_type}-{interaction.user.name}",
         overwrites=overwrites,
@@ -490,8 +605,7 @@ class AssignSelect(discord.ui.Select):
             await interaction.response.send_message("No moderators available.", ephemeral=True)
             return
         user_id = int(self.values[0])
-        tickets = await load_tickets()
-        ticket = next((t for t in tickets if t["channel_id"] == interaction.channel.id), None)
+        ticket = await get_ticket_by_channel(interaction.channel.id)
         if not ticket:
             await interaction.response.send_message("Ticket not found.", ephemeral=True)
             return
@@ -515,8 +629,7 @@ class AssignView(discord.ui.View):
 
 # === Helper function to update embed and disable buttons ===
 async def update_embed_and_disable_buttons(interaction: discord.Interaction) -> None:
-    tickets = await load_tickets()
-    ticket = next((t for t in tickets if t["channel_id"] == interaction.channel.id), None)
+    ticket = await get_ticket_by_channel(interaction.channel.id)
     if ticket and ticket.get("embed_message_id"):
         embed = create_ticket_embed(ticket, interaction.client.user)
         view = TicketControlView()
@@ -583,8 +696,11 @@ async def close_ticket_async(
         success_msg += f"\n\n**Closing Message:** {close_message}"
     await channel.send(success_msg)
 
-    # Create transcript after sending the closing message
-    transcript = await create_transcript(channel)
+    # Store what the live capture missed (incl. the closing message), then render from the store off the loop
+    await sync_transcript(channel, ticket)
+    transcript = await asyncio.to_thread(
+        lambda: transcript_preview(iter_transcript_lines(ticket["ticket_id"], channel.guild), TRANSCRIPT_EMBED_CHARS)
+    )
 
     # === SEND EMAIL WITH TRANSCRIPT ===
     # Get names for meta info
@@ -603,9 +719,10 @@ async def close_ticket_async(
     # Use SUPPORT_EMAIL from .env as recipient
     to_email = os.getenv("SUPPORT_EMAIL")
     if to_email:
-        send_transcript_email(
+        await asyncio.to_thread(
+            send_transcript_email,
             to_email,
-            transcript,
+            iter_transcript_lines(ticket["ticket_id"], channel.guild),
             ticket,
             guild_name,
             creator_name,
@@ -713,6 +830,11 @@ async def close_ticket_with_message(
     # Defer the interaction to prevent timeout
     await interaction.response.defer(ephemeral=True)
 
+    # Update status, closed_at and who closed the ticket (no-op if it was closed concurrently)
+    if not await _store_call("close", interaction.channel.id, interaction.user.id):
+        await interaction.followup.send("Ticket is already closed.", ephemeral=True)
+        return
+
     # Send confirmation to user immediately via followup
     await interaction.followup.send("✅ Ticket is being closed...", ephemeral=True)
 
@@ -720,10 +842,6 @@ async def close_ticket_with_message(
     msg = await interaction.channel.send("🔒 Closing ticket...")
     followup = interaction.followup
 
-    # Update status and track who closed the ticket
-    update_dict = {"status": "Closed", "closed_by": interaction.user.id}
-    await update_ticket(interaction.channel.id, update_dict)
-
     # XP Reward for closing ticket (Mod only)
     is_mod_or_admin = any(role.id in [ADMIN_ROLE_ID, MODERATOR_ROLE_ID] for role in interaction.user.roles)
     if is_mod_or_admin:
@@ -785,15 +903,15 @@ async def claim_ticket_from_api(
         if not has_permission:
             return {"success": False, "error": "Not authorized"}
 
-        # Update ticket in database
-        await update_ticket(channel_id, {"claimed_by": user_id, "status": "Claimed"})
+        # Update ticket in database (only if nobody claimed it in the meantime)
+        if not await _store_call("claim", channel_id, user_id, status="Claimed"):
+            return {"success": False, "error": "Ticket already claimed"}
 
         # Send message to channel (visible for all users)
         await channel.send(f"🎫 **Ticket claimed by {claimer.display_name}**\nStatus changed to: **Claimed**")
 
         # Update embed and disable Claim button
-        tickets = await load_tickets()
-        updated_ticket = next((t for t in tickets if t["channel_id"] == channel_id), None)
+        updated_ticket = await get_ticket_by_channel(channel_id)
         if updated_ticket and updated_ticket.get("embed_message_id"):
             embed = create_ticket_embed(updated_ticket, bot.user)
             view = TicketControlView()
@@ -845,8 +963,7 @@ async def assign_ticket_from_api(
         await channel.send(f"👤 **Ticket assigned to {assignee.display_name}** ({assignee.mention})")
 
         # Update embed and disable Assign button
-        tickets = await load_tickets()
-        updated_ticket = next((t for t in tickets if t["channel_id"] == channel_id), None)
+        updated_ticket = await get_ticket_by_channel(channel_id)
         if updated_ticket and updated_ticket.get("embed_message_id"):
             embed = create_ticket_embed(updated_ticket, bot.user)
             view = TicketControlView()
@@ -894,20 +1011,13 @@ async def close_ticket_from_api(
         if not channel:
             return {"success": False, "error": "Channel not found"}
 
-        if ticket.get("status") == "Closed":
+        # Set status, closed_at and closed_by in one conditional write (fails if already closed)
+        if not await _store_call("close", channel_id, closed_by):
             return {"success": False, "error": "Ticket already closed"}
 
         # Send closing message placeholder
         closing_msg = await channel.send("🔒 Closing ticket...")
 
-        # 🐛 BUG FIX: Set both status AND closed_at immediately to prevent race condition
-        # Also track who closed the ticket for activity stats
-        update_dict = {"status": "Closed", "closed_at": datetime.now().isoformat()}
-        if closed_by:
-            update_dict["closed_by"] = closed_by
-
-        await update_ticket(channel_id, update_dict)
-
         # Use existing close_ticket_async function (handles transcript, email, archive, etc.)
         # Pass None for followup since we don't have an interaction
         asyncio.create_task(close_ticket_async(bot, channel, ticket, None, closing_msg, close_message))
@@ -935,7 +1045,7 @@ async def reopen_ticket_from_api(bot: commands.Bot, channel_id: int, ticket: Dic
         if ticket.get("status") != "Closed":
             return {"success": False, "error": "Ticket is not closed"}
 
-        if ticket.get("reopen_count", 0) >= 3:
+        if ticket.get("reopen_count", 0) >= MAX_REOPENS:
             return {"success": False, "error": "This ticket cannot be reopened more than 3 times"}
 
         # Restore send permissions for creator
@@ -954,16 +1064,10 @@ async def reopen_ticket_from_api(bot: commands.Bot, channel_id: int, ticket: Dic
                 logger.error(f"Error restoring permissions for creator: {e}")
                 return {"success": False, "error": f"Failed to restore permissions: {str(e)}"}
 
-        # Update ticket status
-        await update_ticket(
-            channel_id,
-            {
-                "status": "Open",
-                "claimed_by": None,
-                "assigned_to": None,
-                "reopen_count": ticket.get("reopen_count", 0) + 1,
-            },
-        )
+        # Update ticket status (conditional: still closed and below the reopen limit)
+        reopen_count = await _store_call("reopen", channel_id)
+        if reopen_count is None:
+            return {"success": False, "error": "Ticket is not closed"}
 
         # Unarchive channel
         await channel.edit(archived=False)
@@ -988,7 +1092,6 @@ async def reopen_ticket_from_api(bot: commands.Bot, channel_id: int, ticket: Dic
                 logger.warning(f"Embed message for ticket {ticket['ticket_num']} not found during reopen.")
 
         # Send reopen message
-        reopen_count = ticket.get("reopen_count", 0) + 1
         await channel.send(
             f"🔓 **Ticket has been reopened!**\nStatus changed to: **Open**\nReopen count: {reopen_count}/3"
         )
@@ -1008,12 +1111,14 @@ class TicketControlView(discord.ui.View):
 
     @discord.ui.button(label="Claim", style=discord.ButtonStyle.blurple, emoji="👋", custom_id="ticket:claim")
     async def claim(self, interaction: discord.Interaction, button: discord.ui.Button):
-        tickets = await load_tickets()
-        ticket = next((t for t in tickets if t["channel_id"] == interaction.channel.id), None)
+        ticket = await get_ticket_by_channel(interaction.channel.id)
         if not ticket or not is_allowed_for_ticket_actions(interaction.user, ticket, "Claim"):
             await interaction.response.send_message("Not authorized.", ephemeral=True)
             return
-        await update_ticket(interaction.channel.id, {"claimed_by": interaction.user.id})
+        # Conditional write: a concurrent claim (button or admin API) wins only once
+        if not await _store_call("claim", interaction.channel.id, interaction.user.id):
+            await interaction.response.send_message("Ticket is already claimed.", ephemeral=True)
+            return
         await update_embed_and_disable_buttons(interaction)
         await interaction.response.send_message(f"{interaction.user.mention} has claimed the ticket.", ephemeral=False)
         logger.info(f"Ticket in {interaction.channel} claimed by {interaction.user}.")
@@ -1038,8 +1143,7 @@ class TicketControlView(discord.ui.View):
 
     @discord.ui.button(label="Assign", style=discord.ButtonStyle.gray, emoji="📋", custom_id="ticket:assign")
     async def assign(self, interaction: discord.Interaction, button: discord.ui.Button):
-        tickets = await load_tickets()
-        ticket = next((t for t in tickets if t["channel_id"] == interaction.channel.id), None)
+        ticket = await get_ticket_by_channel(interaction.channel.id)
         if not ticket or not is_allowed_for_ticket_actions(interaction.user, ticket, "Assign"):
             await interaction.response.send_message("Not authorized.", ephemeral=True)
             return
@@ -1059,8 +1163,7 @@ class TicketControlView(discord.ui.View):
 
     @discord.ui.button(label="Status", style=discord.ButtonStyle.green, emoji="📊", custom_id="ticket:status")
     async def status(self, interaction: discord.Interaction, button: discord.ui.Button):
-        tickets = await load_tickets()
-        ticket = next((t for t in tickets if t["channel_id"] == interaction.channel.id), None)
+        ticket = await get_ticket_by_channel(interaction.channel.id)
         if ticket:
             embed = create_ticket_embed(ticket, interaction.client.user)
             await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -1069,8 +1172,7 @@ class TicketControlView(discord.ui.View):
 
     @discord.ui.button(label="Close", style=discord.ButtonStyle.red, emoji="🔒", custom_id="ticket:close")
     async def close(self, interaction: discord.Interaction, button: discord.ui.Button):
-        tickets = await load_tickets()
-        ticket = next((t for t in tickets if t["channel_id"] == interaction.channel.id), None)
+        ticket = await get_ticket_by_channel(interaction.channel.id)
         if not ticket or not is_allowed_for_ticket_actions(interaction.user, ticket, "Close"):
             await interaction.response.send_message("Not authorized.", ephemeral=True)
             return
@@ -1079,15 +1181,14 @@ class TicketControlView(discord.ui.View):
 
     @discord.ui.button(label="Reopen", style=discord.ButtonStyle.secondary, emoji="🔓", custom_id="ticket:reopen")
     async def reopen(self, interaction: discord.Interaction, button: discord.ui.Button):
-        tickets = await load_tickets()
-        ticket = next((t for t in tickets if t["channel_id"] == interaction.channel.id), None)
+        ticket = await get_ticket_by_channel(interaction.channel.id)
         if not ticket:
             await interaction.response.send_message("Ticket not found.", ephemeral=True)
             return
         if ticket["status"] != "Closed":
             await interaction.response.send_message("Ticket is already open.", ephemeral=True)
             return
-        if ticket.get("reopen_count", 0) >= 3:
+        if ticket.get("reopen_count", 0) >= MAX_REOPENS:
             await interaction.response.send_message("This ticket cannot be reopened more than 3 times.", ephemeral=True)
             return
         if not is_allowed_for_ticket_actions(interaction.user, ticket, "Reopen"):
@@ -1109,19 +1210,12 @@ class TicketControlView(discord.ui.View):
             except Exception as e:
                 logger.error(f"Error restoring permissions for creator: {e}")
 
-        # Reopen: Set status to Open, unarchive, increase reopen_count
-        await update_ticket(
-            interaction.channel.id,
-            {
-                "status": "Open",
-                "claimed_by": None,
-                "assigned_to": None,
-                "reopen_count": ticket.get("reopen_count", 0) + 1,
-            },
-        )
+        # Reopen: Set status to Open, unarchive, increase reopen_count (conditional, see TicketStore.reopen)
+        if await _store_call("reopen", interaction.channel.id) is None:
+            await interaction.response.send_message("Ticket is already open.", ephemeral=True)
+            return
         await interaction.channel.edit(archived=False)
         await update_embed_and_disable_buttons(interaction)
-        await update_ticket(interaction.channel.id, {"status": "Open"})
         await interaction.response.send_message(f"{interaction.user.mention} has reopened the ticket.", ephemeral=False)
         logger.info(f"Ticket #{ticket['ticket_num']} reopened by {interaction.user}.")
 
@@ -1153,7 +1247,7 @@ class TicketControlView(discord.ui.View):
 class TicketSystem(commands.Cog):
     """
     🎫 Ticket System Cog: Allows creating and managing support tickets.
-    Modular and persistent with JSON.
+    Modular and persistent with SQLite.
     """
 
     def __init__(self, bot: commands.Bot) -> None:
@@ -1219,6 +1313,9 @@ class TicketSystem(commands.Cog):
                                     item.disabled = True
                         await msg.edit(embed=embed, view=view)
                         logger.info(f"View for ticket #{ticket['ticket_num']} restored.")
+                    if channel and ticket["status"] != "Closed":
+                        # Catch up on messages sent while the bot was offline, live capture continues from here
+                        await sync_transcript(channel, ticket)
                     await asyncio.sleep(6)  # Further increased sleep to avoid rate limits on server
                 except Exception as e:
                     logger.error(f"Error restoring view for ticket {ticket['ticket_num']}: {e}")
@@ -1231,48 +1328,32 @@ class TicketSystem(commands.Cog):
     async def on_ready(self) -> None:
         await self._restore_ticket_views()
 
+    # Messages sent while disconnected aren't replayed: the next close fetches them from the checkpoint
+    @commands.Cog.listener()
+    async def on_disconnect(self) -> None:
+        _live_transcripts.clear()
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
-        """Listen for messages in ticket channels and notify WebSocket clients"""
-        # Ignore bot messages or non-ticket channels
-        if message.author.bot or not message.channel:
+        """Capture messages in ticket channels for the transcript and notify WebSocket clients"""
+        if not message.channel:
             return
 
         # Check if this is a ticket channel
-        tickets = await load_tickets()
-        ticket = next((t for t in tickets if t["channel_id"] == message.channel.id), None)
+        ticket = await get_ticket_by_channel(message.channel.id)
         if not ticket:
             return
 
-        # Get avatar URL with fallback
-        avatar_url = None
+        # Capture for the transcript and the app mirror (bot messages too, they are part of it)
         try:
-            if message.author.display_avatar:
-                avatar_url = str(message.author.display_avatar.url)
-            elif message.author.avatar:
-                avatar_url = str(message.author.avatar.url)
-        except (AttributeError, Exception) as e:
-            logger.debug(f"Could not get avatar for user {message.author.id}: {e}")
-
-        # Check if author has admin role
-        is_admin = False
-        if hasattr(message.author, "roles") and message.author.roles:
-            for role in message.author.roles:
-                if role.id == Config.ADMIN_ROLE_ID or role.id == Config.MODERATOR_ROLE_ID:
-                    is_admin = True
-                    break
-
-        # Prepare message data
-        message_data = {
-            "id": str(message.id),
-            "author_id": str(message.author.id),
-            "author_name": message.author.name,
-            "author_avatar": avatar_url,
-            "content": message.content,
-            "timestamp": message.created_at.isoformat(),
-            "is_bot": message.author.bot,
-            "is_admin": is_admin,
-        }
+            message_data = await record_message(ticket, message)
+        except Exception as e:
+            logger.error(f"Failed to store message for ticket {ticket['ticket_num']}: {e}")
+            message_data = message_to_dict(message)
+
+        # Notifications only for user messages
+        if message.author.bot:
+            return
 
         # Notify WebSocket clients
         try:
@@ -1309,7 +1390,7 @@ class TicketSystem(commands.Cog):
         await self.bot.wait_until_ready()
         while not self.bot.is_closed():
             logger.info("Checking old tickets for deletion...")
-            tickets = await load_tickets()
+            tickets = await find_tickets(status="Closed")
             now = datetime.now()
             to_delete = []
             for ticket in tickets:
@@ -1328,9 +1409,7 @@ class TicketSystem(commands.Cog):
                             f"Ticket {ticket_identifier} missing closed_at, auto-fixed to: {ticket['closed_at']}"
                         )
                         closed_at_str = ticket["closed_at"]
-                        # Save the fix back to file
-                        with open(TICKET_FILE, "w") as f:
-                            json.dump(tickets, f, indent=2)
+                        await update_ticket(ticket["channel_id"], {"closed_at": closed_at_str})
 
                     # Handle both string and datetime objects
                     try:
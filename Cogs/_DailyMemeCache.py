@@ -0,0 +1,302 @@
+"""
+🎭 DailyMeme Caches
+Listing cache for Reddit (via FlareSolverr) / Lemmy and the "recently shown"
+set used to avoid repeating memes. Prefixed with _ so it isn't auto-loaded as a Cog.
+
+ListingCache:
+- Entries are stamped with wall-clock time (time.time()), so the copy in
+  Data/meme_listing_cache.json stays valid across restarts
+- Fresh entries are served directly; stale entries are served immediately
+  while a background task refreshes them (stale-while-revalidate)
+- Concurrent misses/refreshes of the same key share a single fetch
+- Writes are coalesced: one atomic temp file + os.replace per FLUSH_DELAY,
+  plus a final flush when the cog unloads
+
+ShownMemeSet:
+- Stores a 64-bit hash of the normalized image URL in hourly buckets; buckets
+  older than the dedup window are dropped as a whole instead of scanning entries
+- Persisted as an append-only log (one "<timestamp> <hash>" line per meme) that
+  is flushed periodically and compacted once expired lines dominate it
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+# Use DailyMeme logger name so COG_PREFIXES applies correctly
+logger = logging.getLogger("Cogs.DailyMeme")
+
+# Seconds a listing is served without refreshing it
+LISTING_FRESH_SECONDS = 3600
+
+# Seconds a listing may still be served (while refreshing) before it is dropped
+LISTING_STALE_SECONDS = 24 * 3600
+
+# Seconds to wait before writing changed listings to disk
+FLUSH_DELAY = 30
+
+# Granularity of the shown-memes buckets (an entry may outlive the window by up to this)
+SHOWN_BUCKET_SECONDS = 3600
+
+# Never compact a shown-memes log shorter than this
+SHOWN_COMPACT_MIN_LINES = 1000
+
+Fetcher = Callable[[], Awaitable[Optional[List[dict]]]]
+
+
+class ListingCache:
+    """Wall-clock listing cache with stale-while-revalidate and single-flight fetches"""
+
+    def __init__(
+        self,
+        cache_file: str,
+        fresh_seconds: int = LISTING_FRESH_SECONDS,
+        stale_seconds: int = LISTING_STALE_SECONDS,
+    ) -> None:
+        self.cache_file = cache_file
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: Dict[str, dict] = self._load()  # key -> {"fetched_at", "data"}
+        self._inflight: Dict[str, asyncio.Task] = {}  # key -> running fetch
+        self._flush_task: Optional[asyncio.Task] = None
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> Dict[str, dict]:
+        """Load persisted listings, dropping anything past the stale window"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r") as f:
+                    data = json.load(f)
+                now = time.time()
+                return {
+                    key: entry
+                    for key, entry in data.items()
+                    if entry.get("data") and now - entry.get("fetched_at", 0) < self.stale_seconds
+                }
+        except Exception as e:
+            logger.error(f"Error loading meme listing cache: {e}")
+        return {}
+
+    def _write(self, snapshot: Dict[str, dict]) -> None:
+        """Atomically replace the cache file (runs in a worker thread)"""
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_file, self.cache_file)
+
+    async def _delayed_flush(self) -> None:
+        try:
+            await asyncio.sleep(FLUSH_DELAY)
+            await self.flush()
+        finally:
+            self._flush_task = None
+
+    def _schedule_flush(self) -> None:
+        self._dirty = True
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def flush(self) -> None:
+        """Write the listings to disk if anything changed since the last write"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write, dict(self._entries))
+        except Exception as e:
+            self._dirty = True
+            logger.error(f"Error saving meme listing cache: {e}")
+
+    async def close(self) -> None:
+        """Stop pending background work and persist the current listings"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        for task in list(self._inflight.values()):
+            task.cancel()
+        self._inflight.clear()
+        await self.flush()
+
+    def _refresh(self, key: str, fetch: Fetcher) -> asyncio.Task:
+        """Start (or join) the fetch for key"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_fetch(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _run_fetch(self, key: str, fetch: Fetcher) -> Optional[List[dict]]:
+        data = await fetch()
+        if data:
+            self._entries[key] = {"fetched_at": time.time(), "data": data}
+            self._schedule_flush()
+        return data
+
+    async def get(self, key: str, fetch: Fetcher, label: str = None) -> Optional[List[dict]]:
+        """
+        Get the listing for key, fetching it with fetch() when needed
+
+        Args:
+            key: Cache key (e.g. "reddit:memes:hot", "lemmy:lemmy.world@memes")
+            fetch: Coroutine function returning the listing, or None on failure
+            label: Human readable source name for logging
+
+        Returns:
+            The cached or freshly fetched listing, or None if nothing is available.
+            A failed refresh keeps serving the stale listing until it expires.
+        """
+        label = label or key
+        entry = self._entries.get(key)
+        if entry:
+            age = time.time() - entry["fetched_at"]
+            if age < self.fresh_seconds:
+                logger.info(f"⚡ Using cached data for {label} (age: {int(age)}s, {len(entry['data'])} memes)")
+                return entry["data"]
+            if age < self.stale_seconds:
+                logger.info(f"♻️ Serving stale data for {label} (age: {int(age)}s), refreshing in background")
+                self._refresh(key, fetch)
+                return entry["data"]
+            del self._entries[key]
+
+        # Shielded: a caller giving up (e.g. command timeout) must not cancel the shared fetch
+        return await asyncio.shield(self._refresh(key, fetch))
+
+
+def meme_url_key(url: str) -> str:
+    """Hash of a normalized image URL (case-insensitive host, no query/fragment/trailing slash)"""
+    parts = urlsplit(url.strip())
+    if parts.netloc:
+        identity = f"{parts.netloc.lower()}{parts.path.rstrip('/')}"
+    else:
+        identity = url.strip()
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ShownMemeSet:
+    """Time-bucketed set of recently shown meme URLs with an append-only log"""
+
+    def __init__(self, log_file: str, window_hours: int, legacy_file: str = None) -> None:
+        self.log_file = log_file
+        self.window_seconds = window_hours * 3600
+        self._buckets: Dict[int, Set[str]] = {}  # bucket -> url keys shown in it
+        self._pending: List[Tuple[int, str]] = []  # (timestamp, key) not yet appended
+        self._log_lines = 0
+        self._load(legacy_file)
+
+    def __len__(self) -> int:
+        self._expire()
+        return sum(len(keys) for keys in self._buckets.values())
+
+    def _oldest_live_bucket(self, now: float) -> int:
+        return int((now - self.window_seconds) // SHOWN_BUCKET_SECONDS)
+
+    def _expire(self) -> None:
+        oldest = self._oldest_live_bucket(time.time())
+        for bucket in [b for b in self._buckets if b < oldest]:
+            del self._buckets[bucket]
+
+    def _insert(self, timestamp: float, key: str) -> None:
+        self._buckets.setdefault(int(timestamp // SHOWN_BUCKET_SECONDS), set()).add(key)
+
+    def _load(self, legacy_file: str = None) -> None:
+        """Replay the log (or import the old url -> timestamp JSON once)"""
+        oldest = self._oldest_live_bucket(time.time())
+        try:
+            if os.path.exists(self.log_file):
+                with open(self.log_file, "r") as f:
+                    for line in f:
+                        self._log_lines += 1
+                        try:
+                            timestamp, key = line.split()
+                            timestamp = float(timestamp)
+                        except ValueError:
+                            continue
+                        if timestamp // SHOWN_BUCKET_SECONDS >= oldest:
+                            self._insert(timestamp, key)
+            elif legacy_file and os.path.exists(legacy_file):
+                with open(legacy_file, "r") as f:
+                    legacy = json.load(f)
+                for url, timestamp in legacy.items():
+                    if timestamp // SHOWN_BUCKET_SECONDS >= oldest:
+                        self._insert(timestamp, meme_url_key(url))
+                self._compact()
+                logger.info(f"💾 Imported {len(self)} shown memes from {os.path.basename(legacy_file)}")
+        except Exception as e:
+            logger.error(f"Error loading shown memes: {e}")
+
+        if self._log_lines > max(SHOWN_COMPACT_MIN_LINES, 2 * len(self)):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the log with live entries only (atomic temp file + os.replace)"""
+        self._expire()
+        lines = [
+            f"{bucket * SHOWN_BUCKET_SECONDS} {key}\n"
+            for bucket in sorted(self._buckets)
+            for key in self._buckets[bucket]
+        ]
+        os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+        tmp_file = f"{self.log_file}.tmp"
+        with open(tmp_file, "w") as f:
+            f.writelines(lines)
+        os.replace(tmp_file, self.log_file)
+        self._log_lines = len(lines)
+        self._pending.clear()
+
+    def add(self, url: str) -> None:
+        """Mark a meme as shown (persisted on the next flush)"""
+        now = time.time()
+        key = meme_url_key(url)
+        self._insert(now, key)
+        self._pending.append((int(now), key))
+
+    def filter_unseen(self, memes: Iterable[dict]) -> List[dict]:
+        """Memes whose URL wasn't shown within the window (one pass over the live buckets)"""
+        self._expire()
+        seen = set().union(*self._buckets.values())
+        return [meme for meme in memes if meme_url_key(meme["url"]) not in seen]
+
+    def __contains__(self, url: str) -> bool:
+        self._expire()
+        key = meme_url_key(url)
+        return any(key in keys for keys in self._buckets.values())
+
+    def clear(self) -> None:
+        """Forget everything (truncates the log)"""
+        self._buckets.clear()
+        try:
+            self._compact()
+        except OSError as e:
+            logger.error(f"Error clearing shown memes: {e}")
+
+    def _append(self, entries: List[Tuple[int, str]]) -> None:
+        os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+        with open(self.log_file, "a") as f:
+            f.writelines(f"{timestamp} {key}\n" for timestamp, key in entries)
+
+    def flush(self) -> None:
+        """Append pending entries to the log, compacting it when mostly expired"""
+        if self._pending:
+            entries, self._pending = self._pending, []
+            try:
+                self._append(entries)
+                self._log_lines += len(entries)
+            except OSError as e:
+                self._pending = entries + self._pending
+                logger.error(f"Error saving shown memes: {e}")
+                return
+        if self._log_lines > max(SHOWN_COMPACT_MIN_LINES, 2 * len(self)):
+            try:
+                self._compact()
+            except OSError as e:
+                logger.error(f"Error compacting shown memes: {e}")
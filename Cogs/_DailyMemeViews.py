@@ -20,6 +20,7 @@ from Config import (
     MEME_SOURCES,
     MODERATOR_ROLE_ID,
 )
+from Utils.ActivityStore import get_activity_store
 from Utils.EmbedUtils import set_pink_footer
 
 if TYPE_CHECKING:
@@ -126,8 +127,7 @@ class MemeHubView(discord.ui.View):
 
             # Increment meme request count
             user_id = str(interaction.user.id)
-            self.cog.meme_requests[user_id] = self.cog.meme_requests.get(user_id, 0) + 1
-            self.cog.save_meme_requests()
+            get_activity_store().increment("meme_requests", user_id)
         else:
             await interaction.followup.send("❌ Couldn't fetch a meme right now. Try again later!", ephemeral=True)
 
@@ -314,8 +314,7 @@ class SourceSelectionView(discord.ui.View):
 
             # Increment meme request count
             user_id = str(interaction.user.id)
-            self.cog.meme_requests[user_id] = self.cog.meme_requests.get(user_id, 0) + 1
-            self.cog.save_meme_requests()
+            get_activity_store().increment("meme_requests", user_id)
 
         return callback
 
@@ -728,6 +728,9 @@ RL_TIER_ORDER = [
     "Supersonic Legend",
 ]
 
+# Tier -> ordinal (position in RL_TIER_ORDER) for O(1) rank comparisons
+RL_TIER_RANK = {tier: ordinal for ordinal, tier in enumerate(RL_TIER_ORDER)}
+
 # Rank Emojis
 RANK_EMOJIS = {
     "Supersonic Legend": "<:ssl:1425389967030489139>",
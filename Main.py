@@ -4,6 +4,10 @@ Runs only the Discord bot without the API server
 """
 
 import logging
+import os
+
+# This process rotates Logs/HazeBot.log (read by Utils.Logger, so set before importing it)
+os.environ.setdefault("HAZEBOT_LOG_ROTATE", "1")
 
 # Setup logging first
 logging.basicConfig(
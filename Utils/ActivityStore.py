@@ -0,0 +1,184 @@
+"""
+Activity counter store (messages, images, meme requests, generated memes)
+
+Counters live in Data/activity.db (one row per counter + user) instead of the
+activity.json / meme_requests.json / memes_generated.json files that were
+rewritten in full on every increment.
+
+- increment() only bumps an in-memory delta; a background thread flushes the
+  coalesced deltas as `count = count + ?` UPSERTs every flush_interval seconds
+- top() answers leaderboard queries from the (counter, count) index
+- The legacy JSON files are imported once when the table is empty
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import Config
+from Utils.DatabaseUtils import get_pool
+from Utils.Logger import Logger
+
+# Counter names (also the keys returned by get_user)
+COUNTERS = ("messages", "images", "meme_requests", "memes_generated")
+
+# Seconds between write-behind flushes of pending increments
+ACTIVITY_FLUSH_INTERVAL = 15
+
+
+def _load_legacy_json(file_path: Path) -> dict:
+    """Load one of the old JSON counter files (missing or broken files count as empty)"""
+    try:
+        if file_path.exists():
+            with open(file_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+    except (OSError, ValueError) as e:
+        Logger.warning(f"⚠️ Could not import {file_path.name}: {e}")
+    return {}
+
+
+def _init_activity_db(conn: sqlite3.Connection) -> None:
+    """Create the counter table and import the legacy JSON files on first use"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS activity_counters (
+            counter TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (counter, user_id)
+        ) WITHOUT ROWID
+    """)
+    # Top-K per counter straight from the index
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_activity_counters_top ON activity_counters(counter, count DESC)")
+
+    if conn.execute("SELECT 1 FROM activity_counters LIMIT 1").fetchone():
+        return
+
+    data_dir = Path(Config.get_data_dir())
+    rows = []
+    for user_id, stats in _load_legacy_json(data_dir / "activity.json").items():
+        for counter in ("messages", "images"):
+            if stats.get(counter):
+                rows.append((counter, str(user_id), int(stats[counter])))
+    for counter in ("meme_requests", "memes_generated"):
+        for user_id, count in _load_legacy_json(data_dir / f"{counter}.json").items():
+            if count:
+                rows.append((counter, str(user_id), int(count)))
+
+    if rows:
+        conn.executemany("INSERT OR REPLACE INTO activity_counters (counter, user_id, count) VALUES (?, ?, ?)", rows)
+        Logger.info(f"✅ Imported {len(rows)} activity counters from legacy JSON files")
+
+
+class ActivityCounterStore:
+    """
+    Per-user activity counters with write-behind persistence.
+
+    Safe to use from the bot event loop and the Flask threads alike: increments
+    only take a short lock, disk writes happen on the flush thread.
+    """
+
+    def __init__(self, db_path: Path, flush_interval: int = ACTIVITY_FLUSH_INTERVAL):
+        self.pool = get_pool(db_path, _init_activity_db)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], int] = defaultdict(int)  # (counter, user_id) -> delta
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True, name="ActivityFlush")
+        self._flush_thread.start()
+
+    def increment(self, counter: str, user_id: str, amount: int = 1) -> None:
+        """Bump a user's counter (memory only, flushed later)"""
+        if counter not in COUNTERS:
+            raise ValueError(f"Unknown activity counter: {counter}")
+        with self._lock:
+            self._pending[(counter, str(user_id))] += amount
+
+    def flush(self) -> int:
+        """
+        Write pending increments in one transaction
+
+        Returns:
+            Number of counters written
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, defaultdict(int)
+
+        try:
+            self.pool.executemany(
+                """
+                INSERT INTO activity_counters (counter, user_id, count) VALUES (?, ?, ?)
+                ON CONFLICT(counter, user_id) DO UPDATE SET count = count + excluded.count
+            """,
+                [(counter, user_id, delta) for (counter, user_id), delta in pending.items()],
+            )
+            return len(pending)
+        except sqlite3.Error as e:
+            Logger.error(f"❌ Failed to flush activity counters: {e}")
+            # Put the deltas back so they go out with the next flush
+            with self._lock:
+                for key, delta in pending.items():
+                    self._pending[key] += delta
+            return 0
+
+    def top(self, counter: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Top users for a counter as [(user_id, count)], highest first"""
+        self.flush()
+        rows = self.pool.fetchall(
+            """
+            SELECT user_id, count FROM activity_counters
+            WHERE counter = ? AND count > 0
+            ORDER BY count DESC
+            LIMIT ?
+        """,
+            (counter, limit),
+        )
+        return [(row["user_id"], row["count"]) for row in rows]
+
+    def get_user(self, user_id: str) -> Dict[str, int]:
+        """All counters for one user (including increments not flushed yet)"""
+        user_id = str(user_id)
+        stats = {counter: 0 for counter in COUNTERS}
+        for row in self.pool.fetchall("SELECT counter, count FROM activity_counters WHERE user_id = ?", (user_id,)):
+            stats[row["counter"]] = row["count"]
+        with self._lock:
+            for counter in COUNTERS:
+                stats[counter] += self._pending.get((counter, user_id), 0)
+        return stats
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def shutdown(self) -> None:
+        """Stop the background flusher and persist pending increments"""
+        self._stop_event.set()
+        self.flush()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_activity_store() -> ActivityCounterStore:
+    """Get (or lazily create) the shared store for Data/activity.db"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ActivityCounterStore(Path(Config.get_data_dir()) / "activity.db")
+    return _store
+
+
+def flush_activity() -> None:
+    """Flush pending increments (called on shutdown)"""
+    if _store is not None:
+        _store.flush()
+
+
+atexit.register(flush_activity)
@@ -0,0 +1,333 @@
+"""
+Shared SQLite access layer for the bot databases (user_levels.db, community_posts.db)
+
+- Persistent pooled connections: connect + PRAGMA setup + schema init happen once, not per call
+- WAL journal and synchronous=NORMAL, set once per connection
+- Larger per-connection prepared statement cache (sqlite3 cached_statements)
+- Async helpers run queries on a small executor so the discord event loop never blocks on SQLite
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import Config
+from Utils.Logger import Logger
+
+# Idle connections kept per database (more are opened on demand and closed on release)
+POOL_SIZE = 8
+
+# Prepared statements cached per connection (sqlite3 default: 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Executor threads per database for the async helpers
+EXECUTOR_WORKERS = 2
+
+
+class PooledConnection:
+    """
+    sqlite3.Connection proxy handed out by SQLitePool.acquire()
+
+    close() returns the connection to the pool instead of closing it, so legacy
+    code that does `conn = get_db(); ...; conn.close()` keeps working unchanged.
+    """
+
+    def __init__(self, pool: "SQLitePool", connection: sqlite3.Connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name: str) -> Any:
+        if self._connection is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(self._connection, name)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        # Same semantics as sqlite3.Connection: commit on success, rollback on error
+        if exc_type is None:
+            self._connection.commit()
+        else:
+            self._connection.rollback()
+        return False
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._pool.release(self._connection)
+            self._connection = None
+
+
+class SQLitePool:
+    """Connection pool + executor for one SQLite database file"""
+
+    def __init__(self, db_path: Path, initializer: Optional[Callable[[sqlite3.Connection], None]] = None):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            initializer: Optional schema setup, run once with the first connection
+        """
+        self.db_path = Path(db_path)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=POOL_SIZE)
+        self._init_lock = threading.Lock()
+        self._initializer = initializer
+        self._initialized = initializer is None
+        self._executor = ThreadPoolExecutor(
+            max_workers=EXECUTOR_WORKERS, thread_name_prefix=f"sqlite-{self.db_path.stem}"
+        )
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection with the shared PRAGMA setup"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            str(self.db_path), timeout=30.0, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _ensure_initialized(self, conn: sqlite3.Connection) -> None:
+        """Run the schema initializer exactly once per pool"""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._initializer(conn)
+            conn.commit()
+            self._initialized = True
+
+    # ==================== Sync API ====================
+
+    def acquire(self) -> PooledConnection:
+        """Check out a connection (call .close() on it to give it back)"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        self._ensure_initialized(conn)
+        return PooledConnection(self, conn)
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool (rolled back if a transaction was left open)"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed:
+                raise queue.Full
+            self._idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; commits on success, rolls back on error"""
+        pooled = self.acquire()
+        conn = pooled._connection
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pooled.close()
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Run a write statement and return the affected row count"""
+        with self.connection() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def executemany(self, sql: str, seq_of_params: Sequence[Sequence[Any]]) -> int:
+        with self.connection() as conn:
+            return conn.executemany(sql, seq_of_params).rowcount
+
+    def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call func(conn, *args, **kwargs) inside one transaction"""
+        with self.connection() as conn:
+            return func(conn, *args, **kwargs)
+
+    # ==================== Async API (executor-backed) ====================
+
+    async def run_async(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func(conn, *args, **kwargs) on the pool's executor without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self.run, func, *args, **kwargs))
+
+    async def fetchone_async(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.fetchone, sql, params)
+
+    async def fetchall_async(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.fetchall, sql, params)
+
+    async def execute_async(self, sql: str, params: Sequence[Any] = ()) -> int:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.execute, sql, params)
+
+    async def call_async(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run any blocking callable that uses this pool (e.g. a repository method) on its executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def close(self) -> None:
+        """Close idle connections and stop the executor"""
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# ==================== Registry ====================
+
+_pools: Dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: Path, initializer: Optional[Callable[[sqlite3.Connection], None]] = None) -> SQLitePool:
+    """Get (or create) the shared pool for a database file"""
+    key = os.path.abspath(str(db_path))
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SQLitePool(Path(db_path), initializer)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    """Close every pool (bot shutdown)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        try:
+            pool.close()
+        except Exception as e:
+            Logger.error(f"Failed to close SQLite pool {pool.db_path}: {e}")
+
+
+atexit.register(close_all_pools)
+
+
+def import_legacy_post_likes(conn: sqlite3.Connection, likes_file: Path) -> int:
+    """
+    Import likes from community_post_likes.json ({post_id: [discord_id, ...]}) into post_likes
+
+    Safe to run repeatedly: existing likes are kept and like_count is recomputed afterwards.
+
+    Returns:
+        Number of likes read from the file
+    """
+    if not likes_file.exists():
+        return 0
+    with open(likes_file, "r", encoding="utf-8") as f:
+        likes = json.load(f)
+
+    rows = [(int(post_id), str(user_id)) for post_id, user_ids in likes.items() for user_id in user_ids]
+    conn.executemany("INSERT OR IGNORE INTO post_likes (post_id, user_id) VALUES (?, ?)", rows)
+    conn.execute("""
+        UPDATE community_posts
+        SET like_count = (SELECT COUNT(*) FROM post_likes WHERE post_likes.post_id = community_posts.id)
+    """)
+    return len(rows)
+
+
+def _migrate_community_posts(conn: sqlite3.Connection) -> None:
+    """Bring databases created from older schema versions up to date"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(community_posts)")}
+    if "like_count" not in columns:
+        conn.execute("ALTER TABLE community_posts ADD COLUMN like_count INTEGER NOT NULL DEFAULT 0")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS post_likes (
+            post_id INTEGER NOT NULL,
+            user_id TEXT NOT NULL,
+            created_at TEXT DEFAULT (datetime('now')),
+            PRIMARY KEY (post_id, user_id)
+        ) WITHOUT ROWID
+    """)
+    # Keyset pagination indexes for the feed (schema 1.2.0)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_posts_active_feed
+        ON community_posts(created_at DESC, id DESC) WHERE is_deleted = 0
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_posts_active_type_by_date
+        ON community_posts(post_type, created_at DESC, id DESC) WHERE is_deleted = 0
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_posts_active_author_by_date
+        ON community_posts(author_id, created_at DESC, id DESC) WHERE is_deleted = 0
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    # One-shot import of the old JSON like store
+    if not conn.execute("SELECT 1 FROM schema_info WHERE key = 'likes_imported_at'").fetchone():
+        imported = import_legacy_post_likes(conn, Path(Config.DATA_DIR) / "community_post_likes.json")
+        conn.execute("INSERT INTO schema_info (key, value) VALUES ('likes_imported_at', datetime('now'))")
+        if imported:
+            Logger.info(f"✅ Imported {imported} community post likes from community_post_likes.json")
+    conn.execute("INSERT OR REPLACE INTO schema_info (key, value) VALUES ('version', '1.2.0')")
+
+
+def _init_community_posts(conn: sqlite3.Connection) -> None:
+    """Create community_posts.db from init_community_posts.sql if the schema is missing, then migrate it"""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='community_posts'").fetchone():
+        _create_community_posts(conn)
+    _migrate_community_posts(conn)
+
+
+def _create_community_posts(conn: sqlite3.Connection) -> None:
+    # Try multiple locations for init script
+    init_script_locations = [
+        Path(Config.DATA_DIR) / "init_community_posts.sql",  # Local copy
+        Path(__file__).parent.parent / "sql" / "schemas" / "init_community_posts.sql",  # Git-tracked
+    ]
+    for location in init_script_locations:
+        if location.exists():
+            with open(location, "r", encoding="utf-8") as f:
+                conn.executescript(f.read())
+            Logger.info(f"✅ Initialized community_posts.db in {Config.DATA_DIR} from {location}")
+            return
+
+    Logger.error(f"❌ init_community_posts.sql not found in: {', '.join(str(loc) for loc in init_script_locations)}")
+    raise FileNotFoundError("Community posts schema not found")
+
+
+def get_user_levels_db() -> SQLitePool:
+    """Pool for Data/user_levels.db (schema is owned by the LevelSystem cog)"""
+    return get_pool(Path(Config.DATA_DIR) / "user_levels.db")
+
+
+def get_community_posts_db() -> SQLitePool:
+    """Pool for Data/community_posts.db (initialized from init_community_posts.sql and migrated on first use)"""
+    return get_pool(Path(Config.DATA_DIR) / "community_posts.db", _init_community_posts)
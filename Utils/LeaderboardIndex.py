@@ -0,0 +1,121 @@
+"""
+Leaderboard index: pre-sorted standings for the RL rank and ticket leaderboards
+
+Standings are built once from the source data and kept sorted, so top(category, k)
+is a slice instead of a reload + full sort per view. Writers call
+invalidate_leaderboard(source) after changing a source ("rl" from
+save_rl_accounts, "tickets" from TicketStore writes); the next read
+rebuilds that source's standings.
+
+Activity categories (messages, images, memes) are served by the indexed
+ActivityCounterStore and don't go through here.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from Config import RL_TIER_ORDER, RL_TIER_RANK
+
+# Playlists shown as rl_<playlist> categories
+RL_PLAYLISTS = ("1v1", "2v2", "3v3", "4v4")
+
+# Leaderboard sources and the categories built from them
+SOURCE_CATEGORIES = {
+    "rl": ("rl_overall",) + tuple(f"rl_{playlist}" for playlist in RL_PLAYLISTS),
+    "tickets": ("tickets",),
+}
+
+_versions_lock = threading.Lock()
+_source_versions = {source: 0 for source in SOURCE_CATEGORIES}
+
+
+def invalidate_leaderboard(source: str) -> None:
+    """Mark a source's standings as stale (safe to call from any thread)"""
+    with _versions_lock:
+        _source_versions[source] += 1
+
+
+def get_source_version(source: str) -> int:
+    with _versions_lock:
+        return _source_versions[source]
+
+
+def highest_rl_tier(ranks: Dict[str, str]) -> str:
+    """Highest tier across playlists ("Unranked" if none)"""
+    best = 0
+    for tier in ranks.values():
+        ordinal = RL_TIER_RANK.get(tier, 0)
+        if ordinal > best:
+            best = ordinal
+    return RL_TIER_ORDER[best]
+
+
+def _sorted_standings(data: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    # Stable sort keeps insertion order for ties (same as the old per-view sort)
+    return sorted(data.items(), key=lambda x: x[1], reverse=True)
+
+
+class LeaderboardIndex:
+    """Sorted standings per category, rebuilt lazily after their source is invalidated"""
+
+    def __init__(self):
+        self._standings: Dict[str, List[Tuple[str, Any]]] = {}
+        self._built_versions: Dict[str, Optional[int]] = {source: None for source in SOURCE_CATEGORIES}
+
+    def is_stale(self, source: str) -> bool:
+        return self._built_versions[source] != get_source_version(source)
+
+    def rebuild_rl(self, accounts: Dict[str, Any], version: int) -> None:
+        """
+        Rebuild the RL standings (values are tier ordinals)
+
+        Args:
+            accounts: Contents of rl_accounts.json
+            version: get_source_version("rl") taken before the accounts were loaded
+        """
+        overall = {}
+        playlists = {playlist: {} for playlist in RL_PLAYLISTS}
+        for uid, acc in accounts.items():
+            ranks = acc.get("ranks", {})
+            best = 0
+            for playlist, tier in ranks.items():
+                ordinal = RL_TIER_RANK.get(tier, 0)
+                if ordinal > best:
+                    best = ordinal
+                if ordinal and playlist in playlists:
+                    playlists[playlist][uid] = ordinal
+            if best:
+                overall[uid] = best
+
+        self._standings["rl_overall"] = _sorted_standings(overall)
+        for playlist, data in playlists.items():
+            self._standings[f"rl_{playlist}"] = _sorted_standings(data)
+        self._built_versions["rl"] = version
+
+    def rebuild_tickets(self, tickets: List[Dict[str, Any]], version: int) -> None:
+        """
+        Rebuild the resolved-tickets standings (claimed_by / assigned_to of closed tickets)
+
+        Args:
+            tickets: Tickets from the ticket store (only closed ones are counted)
+            version: get_source_version("tickets") taken before the tickets were loaded
+        """
+        data = {}
+        for ticket in tickets:
+            if ticket["status"] == "Closed":
+                for key in ["claimed_by", "assigned_to"]:
+                    uid = ticket.get(key)
+                    if uid:
+                        data[uid] = data.get(uid, 0) + 1
+        self._standings["tickets"] = _sorted_standings(data)
+        self._built_versions["tickets"] = version
+
+    def standings(self, category: str) -> List[Tuple[str, Any]]:
+        """Full sorted standings for a category (build the source first)"""
+        return self._standings.get(category, [])
+
+    def top(self, category: str, limit: int) -> List[Tuple[str, Any]]:
+        return self._standings.get(category, [])[:limit]
+
+
+leaderboard_index = LeaderboardIndex()
@@ -0,0 +1,214 @@
+"""
+Structured log store (Logs/HazeBot.db) behind /api/logs, /api/cogs/<cog>/logs and !logs
+
+- LogStoreHandler inserts one row per record (time, level, logger, cog, message,
+  traceback); it runs on the logging QueueListener thread, never on the caller
+- Indexed by time and by (cog, id) / (level, id), so tail and filter queries walk
+  the newest rows through an index instead of reading a whole log file
+- Rows older than LOG_RETENTION_DAYS are pruned from the listener thread; the
+  human-readable Logs/HazeBot.log next to it is size-rotated by Utils.Logger
+  (in the bot process only, see LOG_ROTATE_ENV)
+- Plain sqlite3 on purpose: Utils.DatabaseUtils logs through Utils.Logger itself
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+LOG_DIR = "Logs"
+LOG_FILE = os.path.join(LOG_DIR, "HazeBot.log")
+LOG_DB_FILE = os.path.join(LOG_DIR, "HazeBot.db")
+
+# Text log rotation (bytes per segment, rotated segments kept)
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+
+# Set to "1" by the bot entry points (Main.py, start_with_api.py): only that process
+# rotates the text log; other writers (e.g. gunicorn API workers) append and reopen
+LOG_ROTATE_ENV = "HAZEBOT_LOG_ROTATE"
+
+# Days of structured log rows kept in HazeBot.db
+LOG_RETENTION_DAYS = 14
+
+# Seconds between retention sweeps
+LOG_PRUNE_INTERVAL = 3600
+
+
+def _init_log_db(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS logs (
+            id INTEGER PRIMARY KEY,
+            ts REAL NOT NULL,
+            level TEXT NOT NULL,
+            logger TEXT NOT NULL,
+            cog TEXT,
+            message TEXT NOT NULL,
+            exc TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs(ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_cog ON logs(cog COLLATE NOCASE, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_level ON logs(level, id)")
+    conn.commit()
+
+
+def cog_of(logger_name: str) -> Optional[str]:
+    """Cog module of a logger name ("Cogs.DailyMeme" -> "DailyMeme"), None for non-cog loggers"""
+    parts = logger_name.split(".")
+    if len(parts) >= 2 and parts[0] == "Cogs":
+        return parts[1]
+    return None
+
+
+def normalize_level(level: Optional[str]) -> Optional[str]:
+    """Accept the short names used in the text log (WARN) as well as logging's names"""
+    if not level:
+        return None
+    level = level.upper()
+    return "WARNING" if level == "WARN" else level
+
+
+class LogStoreHandler(logging.Handler):
+    """Writes records to the structured log store (meant to sit behind a QueueListener)"""
+
+    def __init__(self, db_path: str = LOG_DB_FILE):
+        super().__init__()
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_prune = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            _init_log_db(self._conn)
+        return self._conn
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            exc = record.exc_text
+            if not exc and record.exc_info:
+                exc = logging.Formatter().formatException(record.exc_info)
+
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO logs (ts, level, logger, cog, message, exc) VALUES (?, ?, ?, ?, ?, ?)",
+                (record.created, record.levelname, record.name, cog_of(record.name), record.getMessage(), exc),
+            )
+            if record.created - self._last_prune > LOG_PRUNE_INTERVAL:
+                self._last_prune = record.created
+                conn.execute("DELETE FROM logs WHERE ts < ?", (record.created - LOG_RETENTION_DAYS * 86400,))
+            conn.commit()
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        super().close()
+
+
+class LogStore:
+    """Read side of HazeBot.db (API threads and cogs; one connection per thread)"""
+
+    def __init__(self, db_path: str = LOG_DB_FILE):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.db_path)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            _init_log_db(conn)
+            self._local.conn = conn
+        return conn
+
+    def query(
+        self,
+        cog: str = None,
+        level: str = None,
+        search: str = None,
+        limit: int = 500,
+        before_id: int = None,
+    ) -> List[dict]:
+        """
+        Newest matching records, returned oldest first (like a tail)
+
+        Args:
+            cog: Cog module name (case-insensitive, e.g. "DailyMeme")
+            level: DEBUG/INFO/WARNING (or WARN)/ERROR/CRITICAL
+            search: Case-insensitive substring of the message
+            before_id: Only records older than this id (paging further back)
+        """
+        clauses, params = [], []
+        if cog:
+            clauses.append("cog = ? COLLATE NOCASE")
+            params.append(cog)
+        level = normalize_level(level)
+        if level:
+            clauses.append("level = ?")
+            params.append(level)
+        if search:
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("message LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if before_id:
+            clauses.append("id < ?")
+            params.append(before_id)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = (
+            self._connection()
+            .execute(
+                f"SELECT id, ts, level, logger, cog, message, exc FROM logs {where} ORDER BY id DESC LIMIT ?",
+                (*params, limit),
+            )
+            .fetchall()
+        )
+        return [dict(row) for row in reversed(rows)]
+
+    def level_counts(self, cog: str = None, since: float = None) -> Dict[str, int]:
+        """Records per level (optionally for one cog and/or since a unix timestamp)"""
+        clauses, params = [], []
+        if since is not None:
+            first = self._connection().execute("SELECT MIN(id) FROM logs WHERE ts >= ?", (since,)).fetchone()[0]
+            if first is None:
+                return {}
+            clauses.append("id >= ?")
+            params.append(first)
+        if cog:
+            clauses.append("cog = ? COLLATE NOCASE")
+            params.append(cog)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(f"SELECT level, COUNT(*) FROM logs {where} GROUP BY level", params)
+        return {level: count for level, count in rows}
+
+
+def format_time(ts: float) -> str:
+    """HH:MM:SS in local time, as shown in the text log"""
+    return time.strftime("%H:%M:%S", time.localtime(ts))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_log_store() -> LogStore:
+    """Get (or lazily create) the shared log store reader"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LogStore()
+    return _store
@@ -1,5 +1,10 @@
 # 📦 Built-in modules
+import atexit
 import logging
+import multiprocessing
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
 from typing import Tuple
 
 # 📥 Custom modules
@@ -16,6 +21,14 @@ from Config import (
     CommandPrefix,
     LogLevel,
 )  # Assuming CommandPrefix is available in HazeWorldBot Config
+from Utils.LogStore import (
+    LOG_DB_FILE,
+    LOG_FILE,
+    LOG_FILE_BACKUPS,
+    LOG_FILE_MAX_BYTES,
+    LOG_ROTATE_ENV,
+    LogStoreHandler,
+)
 
 
 # 💡 Custom highlighter for log messages (adapted for HazeWorldBot)
@@ -83,8 +96,21 @@ class EmojiRichFormatter(logging.Formatter):
         return ""
 
 
-# 🌱 Initialize and define logging
-def InitLogging() -> Tuple[RichConsole, logging.Logger, RichHandler]:
+# 📨 Hands records to the listener thread: the message is merged on the calling thread (args may
+# be mutated afterwards), everything else - Rich rendering, file and log store writes - happens later
+class LogQueueHandler(QueueHandler):
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            # Text copy for the file/log store; exc_info stays for Rich tracebacks on the console
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+
+# 🖥️ Rich console handler (file: where to render, default stdout)
+def BuildConsoleHandler(file=None) -> Tuple[RichConsole, RichHandler]:
     # 🎨 Pastel theme dictionary for log highlighting (adapted for HazeWorldBot)
     ThemeDict = {
         "log.time": "bright_black",
@@ -116,6 +142,7 @@ def InitLogging() -> Tuple[RichConsole, logging.Logger, RichHandler]:
         log_path=False,
         highlighter=Highlighter(),
         color_system="truecolor",
+        file=file,
     )
 
     ConsoleHandler = RichHandler(
@@ -130,39 +157,69 @@ def InitLogging() -> Tuple[RichConsole, logging.Logger, RichHandler]:
     )
 
     ConsoleHandler.setFormatter(EmojiRichFormatter())  # Use custom formatter with emojis
+    return Console, ConsoleHandler
+
+
+# 📝 Persistent logs: size-rotated text log + structured log store (Utils/LogStore.py)
+# Rotation isn't safe across processes: only the rotating (bot) process renames segments,
+# everyone else appends and reopens the file once it was rotated away
+def BuildFileHandlers(
+    log_file: str = LOG_FILE, db_file: str = LOG_DB_FILE, rotate: bool = True
+) -> Tuple[logging.Handler, ...]:
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
 
-    # 📝 Add file handler for persistent logs
-    import os
+    if rotate:
+        TextHandler = RotatingFileHandler(
+            log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8"
+        )
+    else:
+        TextHandler = WatchedFileHandler(log_file, encoding="utf-8")
+    TextHandler.setFormatter(EmojiRichFormatter())
+    TextHandler.setLevel(LogLevel)
+
+    StoreHandler = LogStoreHandler(db_file)
+    StoreHandler.setLevel(LogLevel)
+    return TextHandler, StoreHandler
+
+
+# 🌱 Initialize and define logging
+def InitLogging() -> Tuple[RichConsole, logging.Logger, RichHandler]:
+    Console, ConsoleHandler = BuildConsoleHandler()
 
-    log_dir = "Logs"
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, "HazeBot.log")
+    # 📨 All output runs on one QueueListener thread; logging calls only enqueue the record
+    # (per-handler levels still apply: cog loggers may go below LogLevel on the console only)
+    # Child processes (e.g. spawned image resize workers re-importing the entry script) log to the
+    # console only: the rotating log and the log store are owned by the bot process
+    if multiprocessing.parent_process() is None:
+        FileHandlers = BuildFileHandlers(rotate=os.environ.get(LOG_ROTATE_ENV) == "1")
+    else:
+        FileHandlers = ()
+    LogQueue = queue.SimpleQueue()
+    LogListener = QueueListener(LogQueue, ConsoleHandler, *FileHandlers, respect_handler_level=True)
+    LogListener.start()
+    atexit.register(LogListener.stop)  # Runs before logging.shutdown, so the queue is drained first
 
-    FileHandler = logging.FileHandler(log_file, encoding="utf-8")
-    FileHandler.setFormatter(EmojiRichFormatter())
-    FileHandler.setLevel(LogLevel)
+    QueuedHandler = LogQueueHandler(LogQueue)
 
-    logging.basicConfig(level=LogLevel, handlers=[ConsoleHandler, FileHandler], force=True)
+    logging.basicConfig(level=LogLevel, handlers=[QueuedHandler], force=True)
 
     Logger = logging.getLogger("rich")
     Logger.handlers.clear()
-    Logger.addHandler(ConsoleHandler)
-    Logger.addHandler(FileHandler)  # Add file handler to logger
+    Logger.addHandler(QueuedHandler)
     Logger.propagate = False
 
     # Set up Discord loggers with Rich (adapted)
     for logger_name in ["discord", "discord.client", "discord.gateway"]:
         discord_logger = logging.getLogger(logger_name)
         discord_logger.handlers.clear()
-        discord_logger.addHandler(ConsoleHandler)
-        discord_logger.addHandler(FileHandler)  # Add file handler to Discord loggers
+        discord_logger.addHandler(QueuedHandler)
         discord_logger.propagate = False
 
     # Apply per-cog log levels
     for cog_name, level in COG_LOG_LEVELS.items():
         cog_logger = logging.getLogger(f"Cogs.{cog_name}")
         cog_logger.setLevel(level)
-        Logger.info(f"🎯 Set log level for {cog_name} to {logging.getLevelName(level)}")
+        Logger.info("🎯 Set log level for %s to %s", cog_name, logging.getLevelName(level))
 
     return Console, Logger, ConsoleHandler
 
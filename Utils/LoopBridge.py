@@ -0,0 +1,352 @@
+"""
+Bridge from the API threads (Flask/gevent) to the bot's event loop
+
+Replaces asyncio.run_coroutine_threadsafe(...).result(timeout=...) in the routes:
+
+- Submissions are queued and handed to the loop in batches: the first call into an
+  empty queue schedules one call_soon_threadsafe hop, and every call queued before
+  that hop runs is started by it (call_many() queues several operations at once)
+- Calls with the same name and key share one in-flight coroutine (single-flight),
+  so e.g. ten app clients asking for the same player stats cause one lookup
+- Backpressure: when too many calls are unfinished, or queued calls have waited
+  too long for the loop to pick them up, new calls fail fast with LoopBusyError
+  (503 in the API) instead of piling up behind a saturated loop
+- Per-call latency histograms (queue + run time) and a "loop.hop" histogram with
+  the time queued calls waited for the loop (i.e. loop lag), see stats()
+- Waiting inside a gevent greenlet parks only that greenlet; the hub keeps
+  serving other requests while the bot loop works
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import CancelledError, Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+try:
+    import gevent
+    import gevent.event
+except ImportError:  # bot-side callers / plain threads
+    gevent = None
+
+# Unfinished calls (queued or running on the loop) before new calls are rejected
+LOOP_BRIDGE_MAX_PENDING = 64
+
+# Seconds a queued call may wait for the loop to pick it up before new calls are rejected
+LOOP_BRIDGE_MAX_HOP_WAIT = 2.0
+
+# Default seconds to wait for a result
+LOOP_BRIDGE_TIMEOUT = 10
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+# Histogram name of the submission -> loop pick-up delay
+HOP_STAT = "loop.hop"
+
+CoroutineFunction = Callable[..., Awaitable[Any]]
+
+
+class LoopBusyError(Exception):
+    """The bot event loop is saturated; the call was not submitted"""
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (not thread-safe, guarded by the bridge lock)"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float, error: bool = False) -> None:
+        index = 0
+        while index < len(LATENCY_BUCKETS_MS) and ms > LATENCY_BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.errors += error
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the p-th percentile (max for the open bucket)"""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def to_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+class _Call:
+    __slots__ = ("name", "func", "args", "kwargs", "future", "queued_at")
+
+    def __init__(self, name: str, func: CoroutineFunction, args: tuple, kwargs: dict):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.queued_at = time.perf_counter()
+
+
+def wait_for(future: Future, timeout: float):
+    """
+    Result of a concurrent future, waiting without blocking the gevent hub
+
+    Inside a greenlet, whichever thread completes the future (bot loop, process
+    pool manager, ...) wakes the hub through an async watcher; anywhere else this
+    is a plain future.result(timeout). Used for every cross-thread wait in the API.
+
+    Raises:
+        concurrent.futures.TimeoutError: No result within timeout (the call keeps running)
+    """
+    if gevent is None or not isinstance(gevent.getcurrent(), gevent.Greenlet) or future.done():
+        return future.result(timeout)
+
+    hub = gevent.get_hub()
+    watcher = hub.loop.async_()
+    done = gevent.event.Event()
+    watcher.start(done.set)
+    try:
+        future.add_done_callback(lambda _: watcher.send())
+        done.wait(timeout)
+    finally:
+        watcher.close()
+    return future.result(0)
+
+
+class LoopBridge:
+    """Batched, single-flight submission of coroutines to one event loop"""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        max_pending: int = LOOP_BRIDGE_MAX_PENDING,
+        max_hop_wait: float = LOOP_BRIDGE_MAX_HOP_WAIT,
+    ):
+        self.loop = loop
+        self.max_pending = max_pending
+        self.max_hop_wait = max_hop_wait
+        self._lock = threading.Lock()
+        self._queue: List[_Call] = []
+        self._pending = 0
+        self._rejected = 0
+        self._coalesced = 0
+        self._hops = 0
+        self._inflight: Dict[Tuple[str, Hashable], Future] = {}
+        self._stats: Dict[str, LatencyHistogram] = {}
+
+    # ==================== Submission (API threads) ====================
+
+    def _check_capacity(self, count: int) -> None:
+        """Raise LoopBusyError if count more calls would overload the loop (lock held)"""
+        busy = None
+        if self._pending + count > self.max_pending:
+            busy = f"{self._pending} calls pending"
+        elif self._queue and time.perf_counter() - self._queue[0].queued_at > self.max_hop_wait:
+            busy = f"queued calls waiting {time.perf_counter() - self._queue[0].queued_at:.1f}s for the loop"
+        if busy:
+            self._rejected += count
+            raise LoopBusyError(f"Bot event loop is busy ({busy}), try again shortly")
+
+    def _enqueue(self, calls: Sequence[_Call]) -> None:
+        """Queue calls and schedule a drain hop if none is pending (lock held)"""
+        schedule = not self._queue
+        self._queue.extend(calls)
+        self._pending += len(calls)
+        if schedule:
+            try:
+                self.loop.call_soon_threadsafe(self._drain)
+            except RuntimeError:  # loop closed
+                del self._queue[-len(calls) :]
+                self._pending -= len(calls)
+                raise LoopBusyError("Bot event loop is not running")
+
+    def submit(self, name: str, func: CoroutineFunction, *args, key: Hashable = None, **kwargs) -> Future:
+        """
+        Schedule func(*args, **kwargs) on the loop without waiting for it
+
+        Args:
+            name: Call name for the latency stats (e.g. "tickets.claim")
+            func: Coroutine function; only called on the loop, and not at all when
+                the call joins an in-flight one
+            key: Calls with the same name and key share one in-flight run (None: never shared)
+
+        Raises:
+            LoopBusyError: The loop is saturated
+        """
+        with self._lock:
+            if key is not None:
+                future = self._inflight.get((name, key))
+                if future is not None:
+                    self._coalesced += 1
+                    return future
+
+            self._check_capacity(1)
+            call = _Call(name, func, args, kwargs)
+            self._enqueue([call])
+
+            if key is not None:
+                inflight_key = (name, key)
+                self._inflight[inflight_key] = call.future
+                call.future.add_done_callback(lambda _: self._forget(inflight_key))
+            return call.future
+
+    def call(
+        self,
+        name: str,
+        func: CoroutineFunction,
+        *args,
+        key: Hashable = None,
+        timeout: float = LOOP_BRIDGE_TIMEOUT,
+        **kwargs,
+    ):
+        """
+        Run func(*args, **kwargs) on the loop and return its result (see submit())
+
+        Raises:
+            LoopBusyError: The loop is saturated
+            concurrent.futures.TimeoutError: No result within timeout
+        """
+        return wait_for(self.submit(name, func, *args, key=key, **kwargs), timeout)
+
+    def call_many(
+        self,
+        calls: Sequence[Tuple[str, CoroutineFunction, tuple]],
+        timeout: float = LOOP_BRIDGE_TIMEOUT,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Run several (name, func, args) calls concurrently, handed to the loop in one hop
+
+        Returns:
+            Results in call order (exceptions in place if return_exceptions)
+
+        Raises:
+            LoopBusyError: The loop is saturated (nothing was submitted)
+            concurrent.futures.TimeoutError: Not all results arrived within timeout
+        """
+        if not calls:
+            return []
+        batch = [_Call(name, func, tuple(args), {}) for name, func, args in calls]
+        with self._lock:
+            self._check_capacity(len(batch))
+            self._enqueue(batch)
+
+        deadline = time.monotonic() + timeout
+        results = []
+        for call in batch:
+            try:
+                results.append(wait_for(call.future, max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                raise
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def _forget(self, inflight_key: Tuple[str, Hashable]) -> None:
+        with self._lock:
+            self._inflight.pop(inflight_key, None)
+
+    # ==================== Execution (bot loop) ====================
+
+    def _drain(self) -> None:
+        """Start every queued call (one loop hop per batch)"""
+        with self._lock:
+            batch, self._queue = self._queue, []
+            if batch:
+                self._hops += 1
+                self._record(HOP_STAT, (time.perf_counter() - batch[0].queued_at) * 1000)
+        for call in batch:
+            if call.future.set_running_or_notify_cancel():
+                self.loop.create_task(self._run(call))
+            else:
+                self._finish(call, error=True)
+
+    async def _run(self, call: _Call) -> None:
+        error = False
+        try:
+            result = await call.func(*call.args, **call.kwargs)
+        except asyncio.CancelledError:
+            error = True
+            call.future.set_exception(CancelledError())
+            raise
+        except Exception as e:
+            error = True
+            call.future.set_exception(e)
+        else:
+            call.future.set_result(result)
+        finally:
+            self._finish(call, error)
+
+    def _finish(self, call: _Call, error: bool) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._record(call.name, (time.perf_counter() - call.queued_at) * 1000, error)
+
+    def _record(self, name: str, ms: float, error: bool = False) -> None:
+        histogram = self._stats.get(name)
+        if histogram is None:
+            histogram = self._stats[name] = LatencyHistogram()
+        histogram.add(ms, error)
+
+    # ==================== Stats ====================
+
+    def stats(self) -> dict:
+        """Queue state, counters and latency histograms per call name"""
+        with self._lock:
+            oldest = self._queue[0].queued_at if self._queue else None
+            return {
+                "pending": self._pending,
+                "queued": len(self._queue),
+                "oldest_queued_ms": round((time.perf_counter() - oldest) * 1000, 1) if oldest else 0,
+                "inflight_keys": len(self._inflight),
+                "hops": self._hops,
+                "coalesced": self._coalesced,
+                "rejected": self._rejected,
+                "max_pending": self.max_pending,
+                "calls": {name: histogram.to_dict() for name, histogram in sorted(self._stats.items())},
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._coalesced = self._rejected = self._hops = 0
+
+
+_bridges: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LoopBridge]" = weakref.WeakKeyDictionary()
+_bridges_lock = threading.Lock()
+
+
+def get_loop_bridge(loop: asyncio.AbstractEventLoop) -> LoopBridge:
+    """Get (or lazily create) the bridge for an event loop (normally bot.loop)"""
+    bridge = _bridges.get(loop)
+    if bridge is None:
+        with _bridges_lock:
+            bridge = _bridges.get(loop)
+            if bridge is None:
+                bridge = _bridges[loop] = LoopBridge(loop)
+    return bridge
@@ -0,0 +1,241 @@
+"""
+Presence index behind /api/gaming/members
+
+- One entry per (non-bot) guild member, built on the bot loop from GamingHub's
+  on_presence_update / on_member_join / on_member_update / on_user_update /
+  on_member_remove listeners instead of walking guild.members per request
+- Entries are stored pre-serialized (JSON) and kept in display order (online
+  first, then display name), so a full listing is a join of ready strings
+- Every visible change bumps a version counter; changes_since(version) returns
+  only the members changed or removed after it, so polling clients get deltas
+- The counter starts at the wall clock in microseconds (and rebuilds move it up
+  to it), so a version handed out by an earlier bot process is always below the
+  floor of the current one and gets a full listing instead of a wrong delta
+- Removed members are kept as tombstones (up to PRESENCE_TOMBSTONE_LIMIT);
+  clients older than the oldest dropped tombstone get a full listing instead
+- The "using_app" flag comes from the app usage tracker and is synced on read
+  (sync_app_users), which only touches members whose flag actually changed
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+# Removed members remembered for deltas (older clients get a full listing)
+PRESENCE_TOMBSTONE_LIMIT = 1000
+
+SortKey = Tuple[bool, str, str]
+
+
+def member_entry(member: discord.Member, using_app: bool) -> Dict[str, Any]:
+    """Member data as listed by /api/gaming/members (status + first non-custom activity)"""
+    status = str(member.status) if member.status else "offline"
+    activity_data = None
+
+    # Skip custom status activities; the first real one (game, streaming, ...) is shown
+    for activity in member.activities or ():
+        if activity.type == discord.ActivityType.custom:
+            continue
+
+        activity_data = {
+            "type": str(activity.type).replace("ActivityType.", "").lower(),
+            "name": activity.name,
+        }
+
+        # Add game-specific details
+        if getattr(activity, "details", None):
+            activity_data["details"] = activity.details
+        if getattr(activity, "state", None):
+            activity_data["state"] = activity.state
+        if getattr(activity, "large_image_url", None):
+            activity_data["image_url"] = activity.large_image_url
+        elif getattr(activity, "small_image_url", None):
+            activity_data["image_url"] = activity.small_image_url
+        break
+
+    return {
+        "id": str(member.id),
+        "username": member.name,
+        "display_name": member.display_name,
+        "avatar_url": str(member.display_avatar.url) if member.display_avatar else None,
+        "status": status,
+        "activity": activity_data,
+        "using_app": using_app,
+    }
+
+
+def _epoch() -> int:
+    """Version seed: wall clock in microseconds (stays below 2**53 for JSON clients)"""
+    return time.time_ns() // 1000
+
+
+def _sort_key(entry: Dict[str, Any]) -> SortKey:
+    return (entry["status"] == "offline", entry["display_name"].lower(), entry["id"])
+
+
+class PresenceIndex:
+    """Sorted, versioned, pre-serialized member entries (written on the bot loop, read by API threads)"""
+
+    def __init__(self, tombstone_limit: int = PRESENCE_TOMBSTONE_LIMIT):
+        self.tombstone_limit = tombstone_limit
+        self._lock = threading.Lock()
+        self._ready = False
+        self._version = _epoch()
+        self._floor = self._version  # deltas are only complete for since >= floor
+        self._entries: Dict[str, Dict[str, Any]] = {}  # member id -> entry
+        self._json: Dict[str, str] = {}  # member id -> serialized entry
+        self._keys: Dict[str, SortKey] = {}  # member id -> position key in _order
+        self._order: List[SortKey] = []
+        self._changes: "OrderedDict[str, int]" = OrderedDict()  # member id -> version, oldest change first
+        self._tombstones: deque = deque()  # (version, member id) of removals
+        self._app_users: Set[str] = set()
+        self._listing: Optional[Tuple[int, int, str]] = None  # (version, count, joined member JSON)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ==================== Writes (bot loop) ====================
+
+    def _bump(self, member_id: str) -> None:
+        """Record a change of member_id (lock held)"""
+        self._version += 1
+        self._changes[member_id] = self._version
+        self._changes.move_to_end(member_id)
+
+    def _put(self, entry: Dict[str, Any]) -> bool:
+        """Insert or replace an entry; False if nothing visible changed (lock held)"""
+        member_id = entry["id"]
+        serialized = json.dumps(entry, separators=(",", ":"))
+        if self._json.get(member_id) == serialized:
+            return False
+
+        key = _sort_key(entry)
+        old_key = self._keys.get(member_id)
+        if old_key != key:
+            if old_key is not None:
+                del self._order[bisect_left(self._order, old_key)]
+            insort(self._order, key)
+            self._keys[member_id] = key
+
+        self._entries[member_id] = entry
+        self._json[member_id] = serialized
+        self._bump(member_id)
+        return True
+
+    def rebuild(self, members: Iterable[discord.Member]) -> None:
+        """Replace the index with the given members (on ready / cog load); old versions become invalid"""
+        with self._lock:
+            entries = [member_entry(m, str(m.id) in self._app_users) for m in members if not m.bot]
+            self._entries = {entry["id"]: entry for entry in entries}
+            self._json = {entry["id"]: json.dumps(entry, separators=(",", ":")) for entry in entries}
+            self._keys = {entry["id"]: _sort_key(entry) for entry in entries}
+            self._order = sorted(self._keys.values())
+            self._changes.clear()
+            self._tombstones.clear()
+            self._version = max(self._version + 1, _epoch())
+            self._floor = self._version
+            self._ready = True
+
+    def update(self, member: discord.Member) -> bool:
+        """Refresh one member (presence, name, avatar or join); True if the listing changed"""
+        if member.bot or not self._ready:
+            return False
+        with self._lock:
+            return self._put(member_entry(member, str(member.id) in self._app_users))
+
+    def remove(self, member_id: int) -> bool:
+        """Drop a member that left the guild; True if it was listed"""
+        member_id = str(member_id)
+        with self._lock:
+            key = self._keys.pop(member_id, None)
+            if key is None:
+                return False
+            del self._order[bisect_left(self._order, key)]
+            del self._entries[member_id]
+            del self._json[member_id]
+            self._bump(member_id)
+            self._tombstones.append((self._version, member_id))
+
+            while len(self._tombstones) > self.tombstone_limit:
+                version, dropped = self._tombstones.popleft()
+                if self._changes.get(dropped) == version:
+                    del self._changes[dropped]
+                self._floor = max(self._floor, version)
+            return True
+
+    def sync_app_users(self, app_users: Set[str]) -> None:
+        """Apply the current app user set, re-serializing only members whose flag changed"""
+        with self._lock:
+            if app_users == self._app_users:
+                return
+            changed = app_users ^ self._app_users
+            self._app_users = set(app_users)
+            for member_id in changed:
+                entry = self._entries.get(member_id)
+                if entry is not None:
+                    self._put(dict(entry, using_app=member_id in app_users))
+
+    def reset(self) -> None:
+        """Stop serving (the cog maintaining the index was unloaded)"""
+        with self._lock:
+            self._ready = False
+
+    # ==================== Reads (API threads) ====================
+
+    def listing_json(self) -> Tuple[int, int, str]:
+        """(version, member count, JSON array of all members in display order); cached per version"""
+        with self._lock:
+            if self._listing is None or self._listing[0] != self._version:
+                members = ",".join(self._json[key[2]] for key in self._order)
+                self._listing = (self._version, len(self._order), f"[{members}]")
+            return self._listing
+
+    def changes_since(self, since: int) -> Optional[Tuple[int, str, List[str]]]:
+        """
+        Members changed after version since
+
+        Returns:
+            (version, JSON array of changed members in display order, removed member ids),
+            or None if since is too old (or from before a rebuild) and a full listing is needed
+        """
+        with self._lock:
+            if since < self._floor or since > self._version:
+                return None
+            changed, removed = [], []
+            for member_id in reversed(self._changes):
+                if self._changes[member_id] <= since:
+                    break
+                if member_id in self._keys:
+                    changed.append(self._keys[member_id])
+                else:
+                    removed.append(member_id)
+            changed.sort()
+            members = ",".join(self._json[key[2]] for key in changed)
+            return self._version, f"[{members}]", removed
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_presence_index() -> PresenceIndex:
+    """Get (or lazily create) the shared presence index"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PresenceIndex()
+    return _index
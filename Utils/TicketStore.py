@@ -0,0 +1,509 @@
+"""
+Ticket repository (tickets, ticket numbers, ticket messages)
+
+Tickets live in Data/tickets.db instead of tickets.json / ticket_counter.json,
+which were loaded, mutated and rewritten in full for every change.
+
+- Lookups by channel_id, ticket_id, status, creator and claimer are index lookups
+- update() writes only the given fields of one ticket; claim() / close() / reopen()
+  are conditional single-row UPDATEs, so concurrent Discord button clicks and admin
+  API calls can't overwrite each other
+- Ticket numbers come from a counter row that is bumped atomically
+- Ticket messages are kept in an append-only table; a per-ticket checkpoint
+  records up to which message ID that table is a complete transcript, so closing
+  a ticket only has to fetch the Discord history after it
+- The same table mirrors the app's ticket chat: rows carry the sender role and an
+  in_app flag (bot chatter filtered out at write time), and app_messages() serves
+  the latest messages or an after=<message_id> delta without touching Discord
+- The legacy JSON files are imported once when the tables are empty
+
+All methods are blocking (fast, single-row SQLite work). From the bot event loop
+use the async wrappers in Cogs/TicketSystem.py, which run them on the pool executor.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import Config
+from Utils.DatabaseUtils import get_pool
+from Utils.LeaderboardIndex import invalidate_leaderboard
+from Utils.Logger import Logger
+
+# Ticket fields stored as columns (anything else goes into the extra JSON column)
+TICKET_COLUMNS = (
+    "ticket_id",
+    "ticket_num",
+    "user_id",
+    "channel_id",
+    "type",
+    "status",
+    "claimed_by",
+    "assigned_to",
+    "closed_by",
+    "created_at",
+    "closed_at",
+    "embed_message_id",
+    "reopen_count",
+    "initial_message",
+)
+
+# Reopens allowed per ticket
+MAX_REOPENS = 3
+
+# Messages returned per app ticket view request (latest N, or N after a cursor)
+APP_MESSAGES_LIMIT = 100
+
+# Bot messages that belong in the app's ticket chat (everything else from bots is Discord-only chatter)
+_APP_BOT_MESSAGE_PREFIXES = ("**Initial details", "**Subject:", "**[Admin Panel")
+_APP_BOT_MESSAGE_MARKERS = (
+    "Ticket successfully closed",
+    "Ticket claimed by",
+    "Ticket assigned to",
+    "Ticket has been reopened",
+)
+
+_MESSAGE_COLUMNS = (
+    "id",
+    "author_id",
+    "author_name",
+    "author_avatar",
+    "content",
+    "timestamp",
+    "is_bot",
+    "is_admin",
+    "role",
+)
+
+_SELECT_MESSAGES = """
+    SELECT message_id, author_id, author_name, author_avatar, content, created_at, is_bot, is_admin, role
+    FROM ticket_messages
+"""
+
+_INSERT_MESSAGE = """
+    INSERT OR IGNORE INTO ticket_messages
+    (ticket_id, message_id, author_id, author_name, author_avatar, content, created_at, is_bot, is_admin, role, in_app)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def is_app_message(content: Optional[str], is_bot: bool) -> bool:
+    """Whether a ticket message is shown in the app (user messages, app/admin panel relays, status notes)"""
+    if not is_bot:
+        return True
+    content = content or ""
+    # User messages sent from the app are relayed by the bot as "**[username]:** ..."
+    if content.startswith("**[") and "]:**" in content:
+        return True
+    return content.startswith(_APP_BOT_MESSAGE_PREFIXES) or any(m in content for m in _APP_BOT_MESSAGE_MARKERS)
+
+
+def _load_legacy_json(file_path: Path, default: Any) -> Any:
+    """Load one of the old JSON files (missing or broken files count as empty)"""
+    try:
+        if file_path.exists():
+            with open(file_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+    except (OSError, ValueError) as e:
+        Logger.warning(f"⚠️ Could not import {file_path.name}: {e}")
+    return default
+
+
+def _message_params(ticket_id: str, message: Dict[str, Any]) -> tuple:
+    return (
+        ticket_id,
+        int(message["id"]),
+        message.get("author_id"),
+        message.get("author_name"),
+        message.get("author_avatar"),
+        message.get("content"),
+        message["timestamp"],
+        1 if message.get("is_bot") else 0,
+        1 if message.get("is_admin") else 0,
+        message.get("role"),
+        1 if is_app_message(message.get("content"), message.get("is_bot")) else 0,
+    )
+
+
+def _message_row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    values = tuple(row)
+    return dict(zip(_MESSAGE_COLUMNS, (str(values[0]), *values[1:6], bool(values[6]), bool(values[7]), values[8])))
+
+
+def _ticket_params(ticket: Dict[str, Any]) -> tuple:
+    extra = {k: v for k, v in ticket.items() if k not in TICKET_COLUMNS}
+    values = [ticket.get(column) for column in TICKET_COLUMNS]
+    values[TICKET_COLUMNS.index("reopen_count")] = ticket.get("reopen_count") or 0
+    return tuple(values) + (json.dumps(extra) if extra else None,)
+
+
+_INSERT_TICKET = f"""
+    INSERT INTO tickets ({", ".join(TICKET_COLUMNS)}, extra)
+    VALUES ({", ".join("?" for _ in TICKET_COLUMNS)}, ?)
+"""
+
+
+def _migrate_ticket_messages(conn: sqlite3.Connection) -> None:
+    """Add the app mirror columns to a ticket_messages table created before they existed"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(ticket_messages)")}
+    if "in_app" in columns:
+        return
+    conn.execute("ALTER TABLE ticket_messages ADD COLUMN role TEXT")
+    conn.execute("ALTER TABLE ticket_messages ADD COLUMN in_app INTEGER NOT NULL DEFAULT 1")
+    hidden = [
+        (ticket_id, message_id)
+        for ticket_id, message_id, content in conn.execute(
+            "SELECT ticket_id, message_id, content FROM ticket_messages WHERE is_bot = 1"
+        )
+        if not is_app_message(content, True)
+    ]
+    conn.executemany("UPDATE ticket_messages SET in_app = 0 WHERE ticket_id = ? AND message_id = ?", hidden)
+
+
+def _init_tickets_db(conn: sqlite3.Connection) -> None:
+    """Create the ticket tables and import the legacy JSON files on first use"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tickets (
+            ticket_id TEXT PRIMARY KEY,
+            ticket_num INTEGER NOT NULL UNIQUE,
+            user_id INTEGER NOT NULL,
+            channel_id INTEGER UNIQUE,
+            type TEXT,
+            status TEXT NOT NULL DEFAULT 'Open' COLLATE NOCASE,
+            claimed_by INTEGER,
+            assigned_to INTEGER,
+            closed_by INTEGER,
+            created_at TEXT NOT NULL,
+            closed_at TEXT,
+            embed_message_id INTEGER,
+            reopen_count INTEGER NOT NULL DEFAULT 0,
+            initial_message TEXT,
+            extra TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status, ticket_num DESC)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_creator ON tickets(user_id, created_at DESC)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tickets_claimed_by ON tickets(claimed_by) WHERE claimed_by IS NOT NULL"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tickets_assigned_to ON tickets(assigned_to) WHERE assigned_to IS NOT NULL"
+    )
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ticket_counters (
+            name TEXT PRIMARY KEY,
+            next_num INTEGER NOT NULL
+        )
+    """)
+    # Append-only: rows are never updated, only removed together with their ticket
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ticket_messages (
+            ticket_id TEXT NOT NULL,
+            message_id INTEGER NOT NULL,
+            author_id TEXT,
+            author_name TEXT,
+            author_avatar TEXT,
+            content TEXT,
+            created_at TEXT NOT NULL,
+            is_bot INTEGER NOT NULL DEFAULT 0,
+            is_admin INTEGER NOT NULL DEFAULT 0,
+            role TEXT,
+            in_app INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (ticket_id, message_id)
+        ) WITHOUT ROWID
+    """)
+    _migrate_ticket_messages(conn)
+
+    # Every message of the ticket with an ID <= checkpoint is in ticket_messages
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ticket_transcripts (
+            ticket_id TEXT PRIMARY KEY,
+            checkpoint INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+    if conn.execute("SELECT 1 FROM ticket_counters").fetchone():
+        return
+
+    data_dir = Path(Config.get_data_dir())
+    tickets = _load_legacy_json(data_dir / "tickets.json", [])
+    if tickets:
+        conn.executemany(_INSERT_TICKET.replace("INSERT", "INSERT OR IGNORE", 1), [_ticket_params(t) for t in tickets])
+        Logger.info(f"✅ Imported {len(tickets)} tickets from tickets.json")
+
+    # Never hand out a number that was used before (same rule as the old counter file)
+    counter = _load_legacy_json(data_dir / "ticket_counter.json", {}).get("next_num", 1)
+    max_num = conn.execute("SELECT COALESCE(MAX(ticket_num), 0) FROM tickets").fetchone()[0]
+    conn.execute("INSERT INTO ticket_counters (name, next_num) VALUES ('ticket', ?)", (max(counter, max_num + 1),))
+
+
+class TicketStore:
+    """SQLite-backed ticket repository"""
+
+    def __init__(self, db_path: Path):
+        self.pool = get_pool(db_path, _init_tickets_db)
+
+    @staticmethod
+    def _to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        ticket = {column: row[column] for column in TICKET_COLUMNS}
+        if row["extra"]:
+            ticket.update(json.loads(row["extra"]))
+        return ticket
+
+    def _select(self, where: str = "", params: tuple = (), order: str = "ticket_num") -> List[Dict[str, Any]]:
+        rows = self.pool.fetchall(f"SELECT * FROM tickets {where} ORDER BY {order}", params)
+        return [self._to_dict(row) for row in rows]
+
+    # ==================== Reads ====================
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Every ticket, oldest first (same order as tickets.json)"""
+        return self._select()
+
+    def get_by_channel(self, channel_id: int) -> Optional[Dict[str, Any]]:
+        return self._to_dict(self.pool.fetchone("SELECT * FROM tickets WHERE channel_id = ?", (channel_id,)))
+
+    def get_by_id(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        return self._to_dict(self.pool.fetchone("SELECT * FROM tickets WHERE ticket_id = ?", (ticket_id,)))
+
+    def find(
+        self, status: Optional[str] = None, user_id: Optional[int] = None, claimed_by: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Tickets by status (case-insensitive), creator and/or claimer, newest ticket number first"""
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if claimed_by is not None:
+            clauses.append("claimed_by = ?")
+            params.append(claimed_by)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._select(where, tuple(params), order="ticket_num DESC")
+
+    def last_created_at(self, user_id: int) -> Optional[str]:
+        """created_at of a user's most recent ticket (for the creation cooldown)"""
+        row = self.pool.fetchone("SELECT MAX(created_at) FROM tickets WHERE user_id = ?", (user_id,))
+        return row[0]
+
+    def resolved_count(self, user_id: int) -> int:
+        """Closed tickets a staff member claimed, was assigned to or closed"""
+        row = self.pool.fetchone(
+            """
+            SELECT COUNT(*) FROM tickets
+            WHERE status = 'Closed' AND (claimed_by = ? OR assigned_to = ? OR closed_by = ?)
+        """,
+            (user_id, user_id, user_id),
+        )
+        return row[0]
+
+    # ==================== Writes ====================
+
+    def allocate_ticket_num(self) -> int:
+        """Reserve the next ticket number (atomic, numbers are never reused)"""
+
+        def _allocate(conn: sqlite3.Connection) -> int:
+            conn.execute("UPDATE ticket_counters SET next_num = next_num + 1 WHERE name = 'ticket'")
+            return conn.execute("SELECT next_num - 1 FROM ticket_counters WHERE name = 'ticket'").fetchone()[0]
+
+        return self.pool.run(_allocate)
+
+    def insert(self, ticket: Dict[str, Any]) -> None:
+        """Store a new ticket (ticket_num from allocate_ticket_num())"""
+        self.pool.execute(_INSERT_TICKET, _ticket_params(ticket))
+        invalidate_leaderboard("tickets")
+
+    def update(self, channel_id: int, updates: Dict[str, Any]) -> bool:
+        """Write only the given fields of one ticket (returns False if there is no such ticket)"""
+        columns = {k: v for k, v in updates.items() if k in TICKET_COLUMNS}
+        extra = {k: v for k, v in updates.items() if k not in TICKET_COLUMNS}
+
+        def _update(conn: sqlite3.Connection) -> bool:
+            changed = True
+            if columns:
+                assignments = ", ".join(f"{column} = ?" for column in columns)
+                cursor = conn.execute(
+                    f"UPDATE tickets SET {assignments} WHERE channel_id = ?", (*columns.values(), channel_id)
+                )
+                changed = cursor.rowcount > 0
+            if extra:
+                row = conn.execute("SELECT extra FROM tickets WHERE channel_id = ?", (channel_id,)).fetchone()
+                if row is None:
+                    return False
+                merged = dict(json.loads(row["extra"] or "{}"), **extra)
+                conn.execute("UPDATE tickets SET extra = ? WHERE channel_id = ?", (json.dumps(merged), channel_id))
+            return changed
+
+        changed = self.pool.run(_update)
+        invalidate_leaderboard("tickets")
+        return changed
+
+    def claim(self, channel_id: int, user_id: int, status: Optional[str] = None) -> bool:
+        """Claim an unclaimed, open ticket (False if someone else got there first)"""
+        sql = "UPDATE tickets SET claimed_by = ?"
+        params: list = [user_id]
+        if status:
+            sql += ", status = ?"
+            params.append(status)
+        sql += " WHERE channel_id = ? AND claimed_by IS NULL AND status != 'Closed'"
+        claimed = self.pool.execute(sql, (*params, channel_id)) > 0
+        invalidate_leaderboard("tickets")
+        return claimed
+
+    def close(self, channel_id: int, closed_by: Optional[int] = None) -> bool:
+        """Close an open ticket and stamp closed_at (False if it was already closed)"""
+        closed = (
+            self.pool.execute(
+                """
+                UPDATE tickets SET status = 'Closed', closed_at = ?, closed_by = COALESCE(?, closed_by)
+                WHERE channel_id = ? AND status != 'Closed'
+            """,
+                (datetime.now().isoformat(), closed_by, channel_id),
+            )
+            > 0
+        )
+        invalidate_leaderboard("tickets")
+        return closed
+
+    def reopen(self, channel_id: int) -> Optional[int]:
+        """
+        Reopen a closed ticket (clears claim/assignment)
+
+        Returns:
+            New reopen_count, or None if the ticket isn't closed or hit MAX_REOPENS
+        """
+
+        def _reopen(conn: sqlite3.Connection) -> Optional[int]:
+            cursor = conn.execute(
+                """
+                UPDATE tickets
+                SET status = 'Open', claimed_by = NULL, assigned_to = NULL, reopen_count = reopen_count + 1
+                WHERE channel_id = ? AND status = 'Closed' AND reopen_count < ?
+            """,
+                (channel_id, MAX_REOPENS),
+            )
+            if not cursor.rowcount:
+                return None
+            return conn.execute("SELECT reopen_count FROM tickets WHERE channel_id = ?", (channel_id,)).fetchone()[0]
+
+        reopen_count = self.pool.run(_reopen)
+        invalidate_leaderboard("tickets")
+        return reopen_count
+
+    def delete(self, channel_id: int) -> None:
+        """Remove a ticket and its messages"""
+
+        def _delete(conn: sqlite3.Connection) -> None:
+            row = conn.execute("SELECT ticket_id FROM tickets WHERE channel_id = ?", (channel_id,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM ticket_messages WHERE ticket_id = ?", (row["ticket_id"],))
+                conn.execute("DELETE FROM ticket_transcripts WHERE ticket_id = ?", (row["ticket_id"],))
+                conn.execute("DELETE FROM tickets WHERE ticket_id = ?", (row["ticket_id"],))
+
+        self.pool.run(_delete)
+        invalidate_leaderboard("tickets")
+
+    # ==================== Messages ====================
+
+    def append_message(self, ticket_id: str, message: Dict[str, Any], advance_checkpoint: bool = False) -> None:
+        """
+        Store a ticket message (same dict shape as the WebSocket new_message payload)
+
+        Args:
+            advance_checkpoint: The message arrived live and nothing before it was missed,
+                so the transcript is complete up to this message
+        """
+
+        def _append(conn: sqlite3.Connection) -> None:
+            conn.execute(_INSERT_MESSAGE, _message_params(ticket_id, message))
+            if advance_checkpoint:
+                # UPDATE only: a ticket without a checkpoint still needs its history backfilled
+                conn.execute(
+                    "UPDATE ticket_transcripts SET checkpoint = MAX(checkpoint, ?) WHERE ticket_id = ?",
+                    (int(message["id"]), ticket_id),
+                )
+
+        self.pool.run(_append)
+
+    def append_history(self, ticket_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Store a batch of channel history read in order after the checkpoint, and advance it"""
+        if not messages:
+            return
+
+        def _append(conn: sqlite3.Connection) -> None:
+            conn.executemany(_INSERT_MESSAGE, [_message_params(ticket_id, message) for message in messages])
+            self._set_checkpoint(conn, ticket_id, max(int(message["id"]) for message in messages))
+
+        self.pool.run(_append)
+
+    @staticmethod
+    def _set_checkpoint(conn: sqlite3.Connection, ticket_id: str, message_id: int) -> None:
+        conn.execute(
+            """
+            INSERT INTO ticket_transcripts (ticket_id, checkpoint) VALUES (?, ?)
+            ON CONFLICT(ticket_id) DO UPDATE SET checkpoint = MAX(checkpoint, excluded.checkpoint)
+        """,
+            (ticket_id, message_id),
+        )
+
+    def set_transcript_checkpoint(self, ticket_id: str, message_id: int) -> None:
+        """Mark the transcript complete up to message_id (a new ticket's channel ID: nothing to backfill)"""
+        self.pool.run(self._set_checkpoint, ticket_id, message_id)
+
+    def transcript_checkpoint(self, ticket_id: str) -> Optional[int]:
+        """Message ID up to which the stored transcript is complete (None: history never captured)"""
+        row = self.pool.fetchone("SELECT checkpoint FROM ticket_transcripts WHERE ticket_id = ?", (ticket_id,))
+        return row[0] if row else None
+
+    def messages(
+        self, ticket_id: str, after: Optional[int] = None, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Stored messages of a ticket, oldest first (only those with a message ID > after, at most limit)"""
+        rows = self.pool.fetchall(
+            f"{_SELECT_MESSAGES} WHERE ticket_id = ? AND message_id > ? ORDER BY message_id LIMIT ?",
+            (ticket_id, after or 0, limit if limit is not None else -1),
+        )
+        return [_message_row_to_dict(row) for row in rows]
+
+    def app_messages(
+        self, ticket_id: str, after: Optional[int] = None, limit: int = APP_MESSAGES_LIMIT
+    ) -> List[Dict[str, Any]]:
+        """
+        Messages shown in the app's ticket chat, oldest first
+
+        Without after: the latest `limit` messages. With after: the first `limit`
+        messages with a message ID > after (delta since the client's newest message).
+        """
+        if after is not None:
+            rows = self.pool.fetchall(
+                f"{_SELECT_MESSAGES} WHERE ticket_id = ? AND in_app = 1 AND message_id > ? ORDER BY message_id LIMIT ?",
+                (ticket_id, after, limit),
+            )
+            return [_message_row_to_dict(row) for row in rows]
+
+        rows = self.pool.fetchall(
+            f"{_SELECT_MESSAGES} WHERE ticket_id = ? AND in_app = 1 ORDER BY message_id DESC LIMIT ?",
+            (ticket_id, limit),
+        )
+        return [_message_row_to_dict(row) for row in reversed(rows)]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_ticket_store() -> TicketStore:
+    """Get (or lazily create) the shared store for Data/tickets.db"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TicketStore(Path(Config.get_data_dir()) / "tickets.db")
+    return _store
@@ -6,6 +6,10 @@ Design goals:
 - Expose async APIs so callers in async contexts can await them
 - Run blocking file I/O and firebase-admin network calls in a threadpool
   (using asyncio.to_thread) to avoid blocking the event loop
+- Keep tokens and settings in memory (reloaded when another process changed the file,
+  changes applied to the current file under a cross-process lock)
+- Send one multicast request per 500 devices instead of one request per device,
+  with a bounded number of requests in flight
 """
 
 import json
@@ -13,8 +17,11 @@ import logging
 import os
 import asyncio
 import re
+import threading
 import html as html_module
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
+
+from Utils.FileLock import file_lock
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +29,19 @@ logger = logging.getLogger(__name__)
 _firebase_app = None
 _fcm_enabled = False
 
+# FCM accepts at most 500 tokens per multicast request
+FCM_MULTICAST_LIMIT = 500
+
+# Multicast requests in flight at once (each holds a worker thread while firebase-admin does HTTP)
+PUSH_CONCURRENCY = 4
+
+DEFAULT_NOTIFICATION_SETTINGS = {
+    "ticket_new_messages": True,
+    "ticket_mentions": True,
+    "ticket_created": True,
+    "ticket_assigned": True,
+}
+
 
 def strip_formatting(text: str) -> str:
     """Remove HTML/Markdown formatting from notification text
@@ -108,68 +128,139 @@ def is_fcm_enabled() -> bool:
     return _fcm_enabled
 
 
-async def load_notification_tokens() -> Dict[str, List[str]]:
-    """Load FCM tokens from JSON file in a thread to avoid blocking."""
-    from Config import get_data_dir
-
-    token_file = f"{get_data_dir()}/notification_tokens.json"
-    os.makedirs(os.path.dirname(token_file), exist_ok=True)
-
-    def _read_tokens():
-        logger.debug(f"📂 Loading tokens from: {token_file}")
-        if not os.path.exists(token_file):
-            logger.warning(f"⚠️ Token file not found, creating: {token_file}")
-            with open(token_file, "w") as f:
-                json.dump({}, f)
-            return {}
+class _JsonFileStore:
+    """
+    In-memory copy of a JSON file in the data dir
+
+    The bot and the API workers each hold a copy, so reads reload the file when its
+    mtime changed, and every change is applied to the current file contents under a
+    cross-process file lock and written back atomically (temp file + rename) from a
+    worker thread. Safe to use from several event loops (bot loop, Flask async views).
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._data: Optional[Dict[str, Any]] = None
+        self._mtime: Optional[int] = None  # mtime of the file _data was read from / written to
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _path(self) -> str:
+        from Config import get_data_dir
+
+        return os.path.join(get_data_dir(), self.filename)
 
+    def _stat(self) -> Optional[int]:
         try:
-            with open(token_file, "r") as f:
-                tokens = json.load(f)
-                logger.debug(f"📱 Loaded {len(tokens)} user(s) with FCM tokens from {token_file}")
-                logger.debug(f"📱 User IDs in tokens: {list(tokens.keys())}")
-                return tokens
+            return os.stat(self._path()).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read(self) -> Dict[str, Any]:
+        path = self._path()
+        logger.debug(f"📂 Loading {self.filename} from: {path}")
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
         except json.JSONDecodeError as e:
-            logger.error(f"❌ Error loading notification_tokens.json: {e}")
+            logger.error(f"❌ Error loading {self.filename}: {e}")
             return {}
 
-    return await asyncio.to_thread(_read_tokens)
+    def _reload_if_changed(self) -> None:
+        """Re-read the file if another process (or nobody yet) wrote it since we last saw it"""
+        mtime = self._stat()
+        if self._data is not None and mtime == self._mtime:
+            return
+        data = self._read()
+        with self._lock:
+            self._data = data
+            self._mtime = mtime
+
+    def _update(self, mutate: Callable[[Dict[str, Any]], bool]) -> bool:
+        """Apply mutate to the current file contents and write them back (worker thread)"""
+        path = self._path()
+        with self._write_lock, file_lock(path):
+            self._reload_if_changed()
+            with self._lock:
+                if not mutate(self._data):
+                    return False
+                content = json.dumps(self._data, indent=2)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            self._mtime = self._stat()
+            return True
 
+    async def _ensure_loaded(self) -> None:
+        if self._data is None or self._stat() != self._mtime:
+            await asyncio.to_thread(self._reload)
+
+    def _reload(self) -> None:
+        with self._write_lock:  # don't let a slow read overwrite a newer local write
+            self._reload_if_changed()
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Copy of the data (one level deep: values are lists/dicts per user)"""
+        await self._ensure_loaded()
+        with self._lock:
+            return {key: value.copy() for key, value in self._data.items()}
+
+    async def get(self, key: str) -> Any:
+        await self._ensure_loaded()
+        with self._lock:
+            value = self._data.get(key)
+            return value.copy() if value is not None else None
+
+    async def update(self, mutate: Callable[[Dict[str, Any]], bool]) -> bool:
+        """Apply mutate(data) to the current file contents; write back if it returns True"""
+        return await asyncio.to_thread(self._update, mutate)
+
+    async def replace(self, data: Dict[str, Any]) -> None:
+        def _replace(current: Dict[str, Any]) -> bool:
+            current.clear()
+            current.update(data)
+            return True
 
-async def save_notification_tokens(tokens: Dict[str, List[str]]) -> None:
-    """Save FCM tokens to JSON file in a thread."""
-    from Config import get_data_dir
+        await self.update(_replace)
 
-    token_file = f"{get_data_dir()}/notification_tokens.json"
 
-    def _write_tokens():
-        with open(token_file, "w") as f:
-            json.dump(tokens, f, indent=2)
+_token_store = _JsonFileStore("notification_tokens.json")
+_settings_store = _JsonFileStore("notification_settings.json")
 
-    await asyncio.to_thread(_write_tokens)
+
+async def load_notification_tokens() -> Dict[str, List[str]]:
+    """FCM tokens per user (copy of the in-memory store)"""
+    return await _token_store.snapshot()
+
+
+async def save_notification_tokens(tokens: Dict[str, List[str]]) -> None:
+    """Replace all FCM tokens and write them back"""
+    await _token_store.replace(tokens)
 
 
 async def register_token(user_id: str, fcm_token: str, device_info: Optional[str] = None) -> bool:
     """Register or update FCM token for a user."""
     try:
-        tokens = await load_notification_tokens()
-
         user_id_str = str(user_id)
         logger.info(f"🔐 Registering FCM token for user_id={user_id} (as string: '{user_id_str}')")
         logger.debug(f"🔐 Device info: {device_info}")
         logger.debug(f"🔐 Token preview: {fcm_token[:50]}...")
 
-        if user_id_str not in tokens:
-            tokens[user_id_str] = []
-            logger.debug(f"🔐 Created new token list for user {user_id_str}")
-
-        if fcm_token not in tokens[user_id_str]:
-            tokens[user_id_str].append(fcm_token)
-            await save_notification_tokens(tokens)
-            logger.info(f"✅ Registered NEW FCM token for user {user_id} (total: {len(tokens[user_id_str])} tokens)")
+        def _add(tokens: Dict[str, List[str]]) -> bool:
+            user_tokens = tokens.setdefault(user_id_str, [])
+            if fcm_token in user_tokens:
+                return False
+            user_tokens.append(fcm_token)
             return True
 
-        logger.info(f"ℹ️ FCM token already registered for user {user_id} (no changes needed)")
+        if await _token_store.update(_add):
+            logger.info(f"✅ Registered NEW FCM token for user {user_id}")
+        else:
+            logger.info(f"ℹ️ FCM token already registered for user {user_id} (no changes needed)")
         return True
 
     except Exception as e:
@@ -183,15 +274,17 @@ async def register_token(user_id: str, fcm_token: str, device_info: Optional[str
 async def unregister_token(user_id: str, fcm_token: str) -> bool:
     """Remove FCM token for a user."""
     try:
-        tokens = await load_notification_tokens()
         user_id_str = str(user_id)
 
-        if user_id_str in tokens and fcm_token in tokens[user_id_str]:
+        def _remove(tokens: Dict[str, List[str]]) -> bool:
+            if fcm_token not in tokens.get(user_id_str, []):
+                return False
             tokens[user_id_str].remove(fcm_token)
             if not tokens[user_id_str]:
                 del tokens[user_id_str]
+            return True
 
-            await save_notification_tokens(tokens)
+        if await _token_store.update(_remove):
             logger.info(f"✅ Unregistered FCM token for user {user_id}")
             return True
 
@@ -204,67 +297,31 @@ async def unregister_token(user_id: str, fcm_token: str) -> bool:
 
 
 async def load_notification_settings() -> Dict[str, Dict[str, bool]]:
-    """Load notification settings from JSON file in a thread."""
-    from Config import get_data_dir
-
-    settings_file = f"{get_data_dir()}/notification_settings.json"
-    os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-
-    def _read_settings():
-        if not os.path.exists(settings_file):
-            with open(settings_file, "w") as f:
-                json.dump({}, f)
-            return {}
-
-        try:
-            with open(settings_file, "r") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            logger.error("Error loading notification_settings.json")
-            return {}
-
-    return await asyncio.to_thread(_read_settings)
+    """Notification settings per user (copy of the in-memory store)"""
+    return await _settings_store.snapshot()
 
 
 async def save_notification_settings(settings: Dict[str, Dict[str, bool]]) -> None:
-    """Save notification settings to JSON file in a thread."""
-    from Config import get_data_dir
-
-    settings_file = f"{get_data_dir()}/notification_settings.json"
-
-    def _write_settings():
-        with open(settings_file, "w") as f:
-            json.dump(settings, f, indent=2)
-
-    await asyncio.to_thread(_write_settings)
+    """Replace all notification settings and write them back"""
+    await _settings_store.replace(settings)
 
 
 async def get_user_notification_settings(user_id: str) -> Dict[str, bool]:
     """Get notification settings for a user. Returns defaults if none exist."""
-    settings = await load_notification_settings()
-    user_id_str = str(user_id)
-
-    default_settings = {
-        "ticket_new_messages": True,
-        "ticket_mentions": True,
-        "ticket_created": True,
-        "ticket_assigned": True,
-    }
-
-    return settings.get(user_id_str, default_settings)
+    settings = await _settings_store.get(str(user_id))
+    return settings if settings is not None else dict(DEFAULT_NOTIFICATION_SETTINGS)
 
 
 async def update_user_notification_settings(user_id: str, new_settings: Dict[str, bool]) -> bool:
     """Update and persist a user's notification settings."""
     try:
-        settings = await load_notification_settings()
         user_id_str = str(user_id)
 
-        if user_id_str not in settings:
-            settings[user_id_str] = {}
+        def _update(settings: Dict[str, Dict[str, bool]]) -> bool:
+            settings.setdefault(user_id_str, {}).update(new_settings)
+            return True
 
-        settings[user_id_str].update(new_settings)
-        await save_notification_settings(settings)
+        await _settings_store.update(_update)
         logger.info(f"✅ Updated notification settings for user {user_id}")
         return True
 
@@ -273,10 +330,7 @@ async def update_user_notification_settings(user_id: str, new_settings: Dict[str
         return False
 
 
-async def check_user_notification_enabled(user_id: str, notification_type: str) -> bool:
-    """Return whether a specific notification type is enabled for a user."""
-    settings = await get_user_notification_settings(user_id)
-
+def _is_type_enabled(settings: Dict[str, bool], notification_type: str) -> bool:
     # First check if notifications are globally enabled for this user
     if not settings.get("notifications_enabled", True):
         return False
@@ -285,6 +339,118 @@ async def check_user_notification_enabled(user_id: str, notification_type: str)
     return settings.get(notification_type, True)
 
 
+async def check_user_notification_enabled(user_id: str, notification_type: str) -> bool:
+    """Return whether a specific notification type is enabled for a user."""
+    return _is_type_enabled(await get_user_notification_settings(user_id), notification_type)
+
+
+def _build_payload(title: str, body: str, data: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Data-only FCM payload (the app's background handler shows it, grouped by ticket)"""
+    # Strip formatting from title and body for clean notifications
+    clean_title = strip_formatting(title) if title else title
+    clean_body = strip_formatting(body) if body else body
+
+    # Truncate body to reasonable length (100 chars)
+    if clean_body and len(clean_body) > 100:
+        clean_body = clean_body[:97] + "..."
+
+    payload = dict(data or {})
+    payload["click_action"] = "FLUTTER_NOTIFICATION_CLICK"
+    payload["title"] = clean_title
+    payload["body"] = clean_body
+    return {k: str(v) for k, v in payload.items()}
+
+
+def _is_invalid_token_error(error: Exception) -> bool:
+    """The token will never work again (app uninstalled, token rotated, wrong project, malformed)"""
+    from firebase_admin import exceptions, messaging
+
+    return isinstance(
+        error, (messaging.UnregisteredError, messaging.SenderIdMismatchError, exceptions.InvalidArgumentError)
+    )
+
+
+async def _deliver(
+    user_ids: List[str], title: str, body: str, data: Optional[Dict[str, Any]], notification_type: Optional[str]
+) -> Dict[str, int]:
+    """
+    Send one notification to all devices of the given users
+
+    Returns:
+        Devices reached per user ID (users without a successful send are missing)
+    """
+    from firebase_admin import messaging
+
+    tokens = await _token_store.snapshot()
+    settings = await _settings_store.snapshot() if notification_type else {}
+
+    # (user, token) pairs of everyone who wants this notification type
+    targets = []
+    seen_tokens = set()
+    for user_id in dict.fromkeys(str(u) for u in user_ids):
+        if notification_type:
+            user_settings = settings.get(user_id, DEFAULT_NOTIFICATION_SETTINGS)
+            if not _is_type_enabled(user_settings, notification_type):
+                logger.info("User %s has %s disabled, skipping notification", user_id, notification_type)
+                continue
+        user_tokens = tokens.get(user_id)
+        if not user_tokens:
+            logger.debug("📱 No FCM tokens registered for user %s", user_id)
+            continue
+        for token in user_tokens:
+            if token not in seen_tokens:
+                seen_tokens.add(token)
+                targets.append((user_id, token))
+
+    if not targets:
+        return {}
+
+    payload = _build_payload(title, body, data)
+    android = messaging.AndroidConfig(priority="high")
+    semaphore = asyncio.Semaphore(PUSH_CONCURRENCY)
+
+    async def _send_batch(batch):
+        message = messaging.MulticastMessage(data=payload, tokens=[token for _, token in batch], android=android)
+        async with semaphore:
+            try:
+                response = await asyncio.to_thread(messaging.send_each_for_multicast, message)
+            except Exception as e:
+                # Whole request failed (network, auth): nothing was sent, but the tokens are fine
+                logger.warning(f"❌ Multicast request for {len(batch)} device(s) failed: {e}")
+                return [(user_id, token, e) for user_id, token in batch]
+        return [(user_id, token, result.exception) for (user_id, token), result in zip(batch, response.responses)]
+
+    batches = [targets[i : i + FCM_MULTICAST_LIMIT] for i in range(0, len(targets), FCM_MULTICAST_LIMIT)]
+    results = [result for batch in await asyncio.gather(*(_send_batch(b) for b in batches)) for result in batch]
+
+    delivered: Dict[str, int] = {}
+    invalid: Dict[str, set] = {}
+    for user_id, token, error in results:
+        if error is None:
+            delivered[user_id] = delivered.get(user_id, 0) + 1
+        elif _is_invalid_token_error(error):
+            invalid.setdefault(user_id, set()).add(token)
+        else:
+            logger.warning("❌ Failed to send to token of user %s: %s", user_id, error)
+
+    # Remove invalid tokens (one write for the whole fan-out)
+    if invalid:
+
+        def _prune(current: Dict[str, List[str]]) -> bool:
+            for user_id, bad_tokens in invalid.items():
+                if user_id in current:
+                    current[user_id] = [t for t in current[user_id] if t not in bad_tokens]
+                    if not current[user_id]:
+                        del current[user_id]
+            return True
+
+        await _token_store.update(_prune)
+        removed = sum(len(t) for t in invalid.values())
+        logger.info("🗑️ Removed %d invalid token(s) of %d user(s)", removed, len(invalid))
+
+    return delivered
+
+
 async def send_notification(
     user_id: str,
     title: str,
@@ -307,110 +473,20 @@ async def send_notification(
         username: Optional username for logging (e.g., '.inventory')
     """
     if not _fcm_enabled:
-        logger.debug(f"FCM disabled, skipping notification for user {user_id}")
+        logger.debug("FCM disabled, skipping notification for user %s", user_id)
         return False
 
-    if notification_type:
-        if not await check_user_notification_enabled(user_id, notification_type):
-            logger.info(f"User {user_id} has {notification_type} disabled, skipping notification")
-            return False
-
     try:
-        from firebase_admin import messaging
-
-        tokens = await load_notification_tokens()
-        user_id_str = str(user_id)
-
-        logger.debug(f"🔍 Looking for tokens for user_id={user_id} (as string: '{user_id_str}')")
-        logger.debug(f"🔍 Available user IDs in tokens: {list(tokens.keys())}")
-        logger.debug(f"🔍 Token dict has {len(tokens)} users total")
-
-        if user_id_str not in tokens or not tokens[user_id_str]:
-            logger.debug(f"📱 No FCM tokens registered for user {user_id}")
-            logger.debug(f"📱 Checked for user_id_str='{user_id_str}' in tokens keys: {list(tokens.keys())}")
-            return False
-
-        user_tokens = tokens[user_id_str]
-        logger.debug(f"📱 Found {len(user_tokens)} FCM token(s) for user {user_id}")
-
-        # Strip formatting from title and body for clean notifications
-        clean_title = strip_formatting(title) if title else title
-        clean_body = strip_formatting(body) if body else body
-
-        # Truncate body to reasonable length (100 chars)
-        if clean_body and len(clean_body) > 100:
-            clean_body = clean_body[:97] + "..."
-
-        notification_data = data or {}
-        notification_data["click_action"] = "FLUTTER_NOTIFICATION_CLICK"
-        notification_data = {k: str(v) for k, v in notification_data.items()}
-
-        # Extract ticket_id for grouping (if available)
-        ticket_id = notification_data.get("ticket_id")
-        group_key = f"ticket_{ticket_id}" if ticket_id else None
+        delivered = await _deliver([user_id], title, body, data, notification_type)
 
-        # Send to each token individually
-        success_count = 0
-        failed_tokens = []
-
-        for token in user_tokens:
-            try:
-                # Build AndroidNotification with grouping support
-                android_notification = messaging.AndroidNotification(
-                    sound="default",
-                    channel_id="hazebot_tickets",
-                    icon="ic_notification",  # Monochrome notification icon
-                    color="#FF6B35",  # Orange accent color for icon tint
-                )
-
-                # Add grouping tag if we have a ticket_id
-                if group_key:
-                    android_notification.tag = group_key  # Groups notifications by ticket
-
-                # ✅ FIX: Use data-only message to prevent Firebase auto-display
-                # The app's background handler will show custom notification with grouping
-                # Add title/body to data payload for the app to display
-                notification_data["title"] = clean_title
-                notification_data["body"] = clean_body
-
-                message = messaging.Message(
-                    data=notification_data,  # Data-only message (no notification payload)
-                    token=token,
-                    android=messaging.AndroidConfig(
-                        priority="high",
-                        # Remove notification config - data-only messages don't use it
-                    ),
-                )
-
-                def _send_message(msg):
-                    return messaging.send(msg)
-
-                message_id = await asyncio.to_thread(_send_message, message)
-                logger.debug(f"📱 Sent to token: {message_id}")
-                success_count += 1
-
-            except Exception as token_error:
-                logger.warning(f"❌ Failed to send to token: {token_error}")
-                failed_tokens.append(token)
-
-        # Remove failed tokens
-        if failed_tokens:
-            tokens[user_id_str] = [t for t in user_tokens if t not in failed_tokens]
-            if not tokens[user_id_str]:
-                del tokens[user_id_str]
-            await save_notification_tokens(tokens)
-            logger.info(f"🗑️ Removed {len(failed_tokens)} invalid tokens for user {user_id}")
-
-        success = success_count > 0
-        if success:
-            # Display username if available, otherwise just user_id
-            user_display = f"{username} (ID: {user_id})" if username else user_id
-            logger.info(f"✅ Sent notification to {user_display} ({success_count}/{len(user_tokens)} devices)")
+        # Display username if available, otherwise just user_id
+        user_display = f"{username} (ID: {user_id})" if username else user_id
+        devices = delivered.get(str(user_id), 0)
+        if devices:
+            logger.info("✅ Sent notification to %s (%d device(s))", user_display, devices)
         else:
-            user_display = f"{username} (ID: {user_id})" if username else user_id
-            logger.warning(f"⚠️ Failed to send notification to {user_display}")
-
-        return success
+            logger.warning("⚠️ Failed to send notification to %s", user_display)
+        return devices > 0
 
     except Exception as e:
         logger.error(f"❌ Error sending notification: {e}")
@@ -424,9 +500,17 @@ async def send_notification_to_multiple_users(
     data: Optional[Dict[str, Any]] = None,
     notification_type: Optional[str] = None,
 ) -> int:
-    """Send notification to multiple users and return count of successes."""
-    success_count = 0
-    for user_id in user_ids:
-        if await send_notification(user_id, title, body, data, notification_type):
-            success_count += 1
-    return success_count
+    """Send one notification to multiple users (batched across users) and return count of users reached."""
+    if not _fcm_enabled:
+        logger.debug("FCM disabled, skipping notification for %d user(s)", len(user_ids))
+        return 0
+
+    try:
+        delivered = await _deliver(user_ids, title, body, data, notification_type)
+        devices = sum(delivered.values())
+        logger.info("✅ Sent notification to %d/%d user(s) (%d device(s))", len(delivered), len(user_ids), devices)
+        return len(delivered)
+
+    except Exception as e:
+        logger.error(f"❌ Error sending notification to multiple users: {e}")
+        return 0
@@ -4,10 +4,12 @@ Handles all /api/admin/* and /api/logs endpoints for administrative functions
 """
 
 from datetime import datetime
-from pathlib import Path
 
 from flask import Blueprint, jsonify, request
 
+from Utils.LogStore import cog_of, format_time, get_log_store
+from Utils.LoopBridge import LoopBusyError, get_loop_bridge
+
 # Will be initialized by init_admin_routes()
 Config = None
 logger = None
@@ -69,6 +71,9 @@ def init_admin_routes(
     vf["admin.get_cache_stats_endpoint"] = token_required(
         require_permission("all")(vf["admin.get_cache_stats_endpoint"])
     )
+    vf["admin.get_loop_bridge_stats_endpoint"] = token_required(
+        require_permission("all")(vf["admin.get_loop_bridge_stats_endpoint"])
+    )
     vf["admin.clear_cache_endpoint"] = token_required(require_permission("all")(vf["admin.clear_cache_endpoint"]))
     vf["admin.invalidate_cache_key_endpoint"] = token_required(
         require_permission("all")(vf["admin.invalidate_cache_key_endpoint"])
@@ -83,6 +88,9 @@ def init_admin_routes(
         vf["admin.get_analytics_export"] = token_required(require_permission("all")(vf["admin.get_analytics_export"]))
         vf["admin.get_analytics_stats"] = token_required(require_permission("all")(vf["admin.get_analytics_stats"]))
         vf["admin.cleanup_analytics"] = token_required(require_permission("all")(vf["admin.cleanup_analytics"]))
+        vf["admin.get_analytics_rollup_lag"] = token_required(
+            require_permission("all")(vf["admin.get_analytics_rollup_lag"])
+        )
 
 
 # ===== ACTIVE SESSIONS =====
@@ -195,10 +203,24 @@ def get_active_sessions_endpoint():
 @admin_bp.route("/api/admin/cache/stats", methods=["GET"])
 def get_cache_stats_endpoint():
     """Get cache statistics (Admin only)"""
+    from api.auth import get_token_cache_stats
+
     stats = get_cache_stats()
+    stats["auth"] = get_token_cache_stats()
     return jsonify(stats)
 
 
+@admin_bp.route("/api/admin/loop-bridge/stats", methods=["GET"])
+def get_loop_bridge_stats_endpoint():
+    """API -> bot loop bridge: pending calls, coalescing/backpressure counters, latency histograms (Admin only)"""
+    from flask import current_app
+
+    bot = current_app.config.get("bot_instance")
+    if not bot:
+        return jsonify({"error": "Bot not initialized"}), 503
+    return jsonify(get_loop_bridge(bot.loop).stats())
+
+
 @admin_bp.route("/api/admin/cache/clear", methods=["POST"])
 def clear_cache_endpoint():
     """Clear entire cache (Admin only)"""
@@ -234,89 +256,46 @@ def get_logs():
         level = request.args.get("level", None)  # Filter by log level (INFO, WARNING, ERROR, DEBUG)
         limit = int(request.args.get("limit", 500))  # Number of lines to return
         search = request.args.get("search", None)  # Search term
+        before = request.args.get("before", None, type=int)  # Only entries older than this id (paging)
 
-        # Read log file
-        log_file = Path(__file__).parent.parent / "Logs" / "HazeBot.log"
-
-        if not log_file.exists():
-            return jsonify({"error": "Log file not found", "logs": []}), 404
+        # Newest matching records straight from the structured log store index
+        store = get_log_store()
+        if not store.exists():
+            return jsonify({"error": "Log store not found", "logs": []}), 404
 
-        # Read last N lines
-        with open(log_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            lines = lines[-limit * 2 :]  # Read more to account for filtering
-
-        # Parse and filter logs
-        parsed_logs = []
-        for line in lines:
-            # Skip empty lines
-            if not line.strip():
-                continue
-
-            # Apply filters
-            if cog_name and cog_name.lower() not in line.lower():
-                continue
-
-            if level and level.upper() not in line:
-                continue
+        # Cog filter may be a loaded cog's class name (e.g. "ChangelogCog"); records are keyed by module
+        from flask import current_app
 
-            if search and search.lower() not in line.lower():
-                continue
+        bot = current_app.config.get("bot_instance")
+        cog_filter = cog_name
+        if cog_name and bot and bot.get_cog(cog_name):
+            cog_filter = cog_of(type(bot.get_cog(cog_name)).__module__) or cog_name
 
-            # Parse log line - format: [timestamp] emoji LEVEL | message
-            # Example: [23:23:44] 💖  INFO    │ message
-            try:
-                # Extract timestamp
-                timestamp_match = line.find("[")
-                timestamp_end = line.find("]")
-                timestamp = line[timestamp_match + 1 : timestamp_end] if timestamp_match != -1 else ""
-
-                # Extract level
-                level_match = None
-                for log_level in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
-                    if log_level in line:
-                        level_match = log_level
-                        break
-
-                # Extract message (everything after │ or after level)
-                separator_idx = line.find("│")
-                if separator_idx != -1:
-                    message = line[separator_idx + 1 :].strip()
-                else:
-                    # Fallback: take everything after level
-                    if level_match:
-                        level_idx = line.find(level_match) + len(level_match)
-                        message = line[level_idx:].strip()
-                    else:
-                        message = line.strip()
-
-                parsed_logs.append(
-                    {
-                        "timestamp": timestamp,
-                        "level": level_match or "INFO",
-                        "message": message,
-                        "raw": line.strip(),
-                    }
-                )
-            except Exception:
-                # If parsing fails, just include the raw line
-                parsed_logs.append(
-                    {
-                        "timestamp": "",
-                        "level": "UNKNOWN",
-                        "message": line.strip(),
-                        "raw": line.strip(),
-                    }
-                )
+        records = store.query(cog=cog_filter, level=level, search=search, limit=limit, before_id=before)
 
-        # Limit final results
-        parsed_logs = parsed_logs[-limit:]
+        parsed_logs = []
+        for record in records:
+            timestamp = format_time(record["ts"])
+            level_name = record["level"]
+            message = record["message"]
+            prefix = Config.COG_PREFIXES.get(record["cog"], "") if record["cog"] else ""
+            if prefix:
+                message = f"{prefix} {message}"
+            if record["exc"]:
+                message = f"{message}\n{record['exc']}"
+            parsed_logs.append(
+                {
+                    "id": record["id"],
+                    "timestamp": timestamp,
+                    "level": level_name,
+                    "cog": record["cog"],
+                    "message": message,
+                    "raw": f"[{timestamp}] {level_name:<7} │ {message}",
+                }
+            )
 
         # Get available cogs from bot instance
-        from flask import current_app
-
         available_cogs = []
-        bot = current_app.config.get("bot_instance")
         if bot:
             available_cogs = sorted([cog for cog in bot.cogs.keys()])
 
@@ -330,6 +309,7 @@ def get_logs():
                     "search": search,
                 },
                 "logs": parsed_logs,
+                "next_before": parsed_logs[0]["id"] if len(parsed_logs) == limit else None,
                 "available_cogs": available_cogs,
             }
         )
@@ -485,6 +465,21 @@ def get_analytics_stats():
         return jsonify({"error": str(e)}), 500
 
 
+@admin_bp.route("/api/admin/analytics/rollup-lag", methods=["GET"])
+def get_analytics_rollup_lag():
+    """Get how far the daily rollups are behind the raw sessions (monitoring)"""
+    try:
+        if analytics_aggregator is None:
+            return jsonify({"error": "Analytics not enabled"}), 503
+
+        lag = analytics_aggregator.get_rollup_lag()
+
+        return jsonify({"success": True, "lag": lag})
+    except Exception as e:
+        logger.error(f"Failed to get analytics rollup lag: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @admin_bp.route("/api/admin/analytics/cleanup", methods=["POST"])
 def cleanup_analytics():
     """
@@ -535,7 +530,6 @@ def send_level_up_notification():
         
         # Create and send embed
         import discord
-        import asyncio
         
         async def send_embed():
             channel = bot.get_channel(level_up_channel_id)
@@ -558,15 +552,16 @@ def send_level_up_notification():
             await channel.send(embed=embed)
             return True, "Message sent successfully"
         
-        # Run the async function using asyncio.run_coroutine_threadsafe
-        future = asyncio.run_coroutine_threadsafe(send_embed(), bot.loop)
-        success, message = future.result(timeout=10)
+        # Run the async function on the bot's event loop
+        success, message = get_loop_bridge(bot.loop).call("admin.level_up_notification", send_embed, timeout=10)
         
         if success:
             return jsonify({"success": True, "message": message})
         else:
             return jsonify({"error": message}), 500
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Failed to send level-up notification: {e}")
         return jsonify({"error": str(e)}), 500
@@ -14,15 +14,23 @@ Performance:
 - Sub-millisecond query times for dashboard
 """
 
+from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Any
 import logging
+import threading
 
 from api.analytics_db import AnalyticsDatabase
 
 logger = logging.getLogger(__name__)
 
+# Seconds between batched flushes of accumulated session activity
+SESSION_FLUSH_INTERVAL = 5
+
+# Seconds between materializer runs that bring the daily rollups up to date
+ROLLUP_INTERVAL = 60
+
 
 class AnalyticsAggregator:
     """High-performance analytics aggregator with SQLite backend"""
@@ -32,13 +40,109 @@ class AnalyticsAggregator:
 
         Args:
             analytics_file: Legacy parameter (parent directory used for DB location)
-            batch_interval: Legacy parameter (ignored - SQLite writes are fast enough)
+            batch_interval: Legacy parameter (ignored - session activity flushes every SESSION_FLUSH_INTERVAL)
             cache_ttl: Legacy parameter (ignored - SQLite has built-in query cache)
         """
         # Initialize SQLite database
         db_path = analytics_file.parent / "analytics.db"
         self.db = AnalyticsDatabase(db_path)
 
+        # Per-session activity accumulator, flushed as one transaction every few seconds
+        # {session_id: {"actions": int, "endpoints": {endpoint: count}, "last_seen": iso}}
+        self._pending_activity = {}
+        self._pending_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True, name="AnalyticsFlush")
+        self._flush_thread.start()
+
+        # Daily rollups (daily_stats/user_stats and friends) are maintained in the background
+        self._rollup_lock = threading.Lock()
+        self._rollup_thread = threading.Thread(target=self._rollup_loop, daemon=True, name="AnalyticsRollup")
+        self._rollup_thread.start()
+
+    def _flush_loop(self) -> None:
+        """Background loop that periodically flushes accumulated session activity"""
+        while not self._stop_event.wait(SESSION_FLUSH_INTERVAL):
+            try:
+                self.flush_pending()
+            except Exception as e:
+                logger.error(f"Failed to flush session activity: {e}")
+
+    def _rollup_loop(self) -> None:
+        """Background loop that materializes the daily rollups and archives completed months
+
+        Rollups run first: only rolled-up sessions are archived (see SessionPartitionManager).
+        """
+        while True:
+            try:
+                self.materialize_rollups()
+            except Exception as e:
+                logger.error(f"Failed to materialize analytics rollups: {e}")
+            try:
+                with self._rollup_lock:
+                    self.db.partitions.archive_months()
+            except Exception as e:
+                logger.error(f"Failed to archive analytics partitions: {e}")
+            if self._stop_event.wait(ROLLUP_INTERVAL):
+                break
+
+    def materialize_rollups(self, rebuild: bool = False) -> Dict[str, int]:
+        """Roll up sessions written since the last run (or everything if rebuild)
+
+        Returns:
+            {"sessions": new sessions rolled up, "days": days recomputed, "users": users refreshed}
+        """
+        with self._rollup_lock:
+            result = self.db.materialize_rollups(rebuild=rebuild)
+        if result["days"]:
+            logger.debug(
+                f"Rollups materialized: {result['sessions']} new sessions, {result['days']} days, "
+                f"{result['users']} users"
+            )
+        return result
+
+    def get_rollup_lag(self) -> Dict[str, Any]:
+        """Get materializer lag for monitoring
+
+        Returns:
+            Dict with pending_sessions (not yet rolled up), dirty_days (queued for recompute),
+            high_water_mark, last_run, seconds_since_last_run and unflushed_sessions
+            (activity still buffered in memory)
+        """
+        lag = self.db.get_rollup_lag()
+        lag["seconds_since_last_run"] = None
+        if lag["last_run"]:
+            lag["seconds_since_last_run"] = round(
+                (datetime.utcnow() - datetime.fromisoformat(lag["last_run"])).total_seconds(), 1
+            )
+        with self._pending_lock:
+            lag["unflushed_sessions"] = len(self._pending_activity)
+        return lag
+
+    def flush_pending(self) -> int:
+        """Write accumulated session activity to the database in one batch
+
+        Returns:
+            Number of sessions flushed
+        """
+        with self._pending_lock:
+            if not self._pending_activity:
+                return 0
+            pending = self._pending_activity
+            self._pending_activity = {}
+
+        activity = [
+            {
+                "session_id": session_id,
+                "actions": data["actions"],
+                "endpoints": dict(data["endpoints"]),
+                "last_seen": data["last_seen"],
+            }
+            for session_id, data in pending.items()
+        ]
+        self.db.apply_session_activity(activity)
+        return len(activity)
+
     # ===========================
     # Public API Methods
     # ===========================
@@ -94,41 +198,23 @@ class AnalyticsAggregator:
             logger.warning(f"Failed to create session {session_id} (duplicate?)")
 
     def update_session(self, session_id: str, endpoint: str, action: str = "API_CALL") -> None:
-        """Update session with new activity"""
+        """Record session activity (accumulated in memory, flushed in batches)"""
         now = datetime.utcnow().isoformat()
 
-        # Get current session
-        session = self.db.get_session(session_id)
-        if not session:
-            # Session not in DB yet - will be created on next start_session call
-            # This can happen due to race conditions or server restarts
-            logger.debug(f"Session {session_id} not in DB yet, skipping update")
-            return
-
-        # Update actions count
-        session["actions_count"] += 1
+        with self._pending_lock:
+            data = self._pending_activity.get(session_id)
+            if data is None:
+                data = {"actions": 0, "endpoints": defaultdict(int), "last_seen": now}
+                self._pending_activity[session_id] = data
 
-        # Update endpoints_used
-        if endpoint not in session["endpoints_used"]:
-            session["endpoints_used"][endpoint] = 0
-        session["endpoints_used"][endpoint] += 1
-
-        # Update timestamps and duration
-        session["ended_at"] = now
-        try:
-            started = datetime.fromisoformat(session["started_at"])
-            ended = datetime.fromisoformat(now)
-            duration = (ended - started).total_seconds() / 60
-            session["duration_minutes"] = round(duration, 2)
-        except Exception as e:
-            logger.error(f"Failed to calculate duration: {e}")
-
-        # Save updated session
-        self.db.update_session(session_id, session)
-        logger.debug(f"Session updated: {session_id} -> {endpoint}")
+            data["actions"] += 1
+            data["endpoints"][endpoint] += 1
+            data["last_seen"] = now
 
     def end_session(self, session_id: str) -> None:
         """Record session end"""
+        # Make sure accumulated activity lands before the row is rewritten
+        self.flush_pending()
         now = datetime.utcnow().isoformat()
 
         # Get current session
@@ -137,18 +223,18 @@ class AnalyticsAggregator:
             logger.warning(f"Session {session_id} not found for end")
             return
 
-        # Update end time and duration
-        session["ended_at"] = now
+        # Update end time and duration (only these columns - counters are owned by the flusher)
+        updates = {"ended_at": now}
         try:
             started = datetime.fromisoformat(session["started_at"])
             ended = datetime.fromisoformat(now)
             duration = (ended - started).total_seconds() / 60
-            session["duration_minutes"] = round(duration, 2)
+            updates["duration_minutes"] = round(duration, 2)
         except Exception as e:
             logger.error(f"Failed to calculate duration: {e}")
 
         # Save updated session
-        self.db.update_session(session_id, session)
+        self.db.update_session(session_id, updates)
         logger.debug(f"Session ended: {session_id}")
 
     def add_screen_visit(self, session_id: str, screen_name: str) -> None:
@@ -160,7 +246,7 @@ class AnalyticsAggregator:
 
         if screen_name not in session["screens_visited"]:
             session["screens_visited"].append(screen_name)
-            self.db.update_session(session_id, session)
+            self.db.update_session(session_id, {"screens_visited": session["screens_visited"]})
             logger.debug(f"Screen visit recorded: {session_id} -> {screen_name}")
 
     def get_inactive_users_analysis(self, days: int = 30) -> Dict[str, Any]:
@@ -200,21 +286,12 @@ class AnalyticsAggregator:
         """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
 
-        # Query: Get users with their last session data
-        # Only include users who haven't been active since cutoff
+        # user_stats is maintained by the rollup materializer (one row per user)
         query = """
-            SELECT 
-                discord_id,
-                username,
-                MAX(ended_at) as last_seen,
-                app_version,
-                platform,
-                device_info
-            FROM sessions
-            WHERE ended_at IS NOT NULL
-            GROUP BY discord_id
-            HAVING MAX(ended_at) < ?
-            ORDER BY last_seen DESC
+            SELECT discord_id, username, last_ended_at, last_app_version, last_platform, last_device_info
+            FROM user_stats
+            WHERE last_ended_at IS NOT NULL AND last_ended_at < ?
+            ORDER BY last_ended_at DESC
         """
 
         inactive_users = []
@@ -283,8 +360,14 @@ class AnalyticsAggregator:
             start_date=cutoff.date().isoformat(), end_date=now.date().isoformat()
         )
 
-        # Convert daily stats list to dict (for backward compatibility)
-        daily_stats = {stat["date"]: stat for stat in daily_stats_list}
+        # Convert daily stats list to dict (for backward compatibility: unique_users is a list of IDs)
+        daily_user_ids = self.db.get_daily_user_ids(
+            start_date=cutoff.date().isoformat(), end_date=now.date().isoformat()
+        )
+        daily_stats = {}
+        for stat in daily_stats_list:
+            stat["unique_users"] = daily_user_ids.get(stat["date"], [])
+            daily_stats[stat["date"]] = stat
 
         # Get user stats
         user_stats_list = self.db.get_user_stats()
@@ -296,9 +379,11 @@ class AnalyticsAggregator:
                 "first_seen": stat["first_seen"],
                 "last_seen": stat["last_seen"],
                 "total_sessions": stat["total_sessions"],
-                "total_time_minutes": stat["total_time_minutes"],
-                "avg_session_duration": stat["avg_session_duration"],
-                "device_history": stat["device_history"],
+                "total_time_minutes": stat["total_duration_minutes"],
+                "avg_session_duration": (
+                    round(stat["total_duration_minutes"] / stat["total_sessions"], 2) if stat["total_sessions"] else 0
+                ),
+                "device_history": stat.get("device_history") or [],
             }
             for stat in user_stats_list
         }
@@ -312,49 +397,52 @@ class AnalyticsAggregator:
         }
 
     def get_summary_stats(self) -> Dict[str, Any]:
-        """Get summary statistics for dashboard"""
+        """Get summary statistics for dashboard (read from the daily rollups)
+
+        Session totals for the last 7 days cover the last 7 calendar days (UTC, including today).
+        """
         now = datetime.utcnow()
         week_ago = now - timedelta(days=7)
         month_ago = now - timedelta(days=30)
 
-        # Get all user stats
-        all_users = self.db.get_user_stats()
+        # One row per user - no session scan
+        users = self.db.get_user_counts(active_since=[week_ago.isoformat(), month_ago.isoformat()])
+        total_users, (active_7d, active_30d) = users["total"], users["active"]
 
-        # Count active users
-        active_7d = sum(1 for user in all_users if datetime.fromisoformat(user["last_seen"]) > week_ago)
-        active_30d = sum(1 for user in all_users if datetime.fromisoformat(user["last_seen"]) > month_ago)
+        totals_7d = self.db.get_rollup_totals(start_date=(now - timedelta(days=6)).date().isoformat())
+        totals_all = self.db.get_rollup_totals()
 
-        # Get recent sessions
-        recent_sessions = self.db.get_sessions(start_date=week_ago.isoformat(), end_date=now.isoformat())
-
-        total_sessions_7d = len(recent_sessions)
-        avg_duration_7d = (
-            sum(s["duration_minutes"] for s in recent_sessions) / total_sessions_7d if total_sessions_7d > 0 else 0
-        )
-
-        # Get total session count
-        all_sessions = self.db.get_sessions(start_date=datetime(2000, 1, 1).isoformat(), end_date=now.isoformat())
+        total_sessions_7d = totals_7d["sessions"]
+        avg_duration_7d = totals_7d["duration_minutes"] / total_sessions_7d if total_sessions_7d > 0 else 0
 
         return {
-            "total_users": len(all_users),
+            "total_users": total_users,
             "active_users_7d": active_7d,
             "active_users_30d": active_30d,
-            "total_sessions": len(all_sessions),
+            "total_sessions": totals_all["sessions"],
             "total_sessions_7d": total_sessions_7d,
             "avg_session_duration_7d": round(avg_duration_7d, 2),
+            "platforms_7d": totals_7d["platforms"],
+            "app_versions_7d": totals_7d["app_versions"],
+            "top_endpoints_7d": self.db.get_top_endpoints(start_date=(now - timedelta(days=6)).date().isoformat()),
+            "rollup_lag": self.get_rollup_lag(),
             "last_updated": datetime.utcnow().isoformat(),
         }
 
     def force_flush(self) -> int:
-        """Force immediate processing of queued updates
+        """Force immediate processing of queued session updates
 
-        Legacy method for backward compatibility - SQLite writes are immediate
+        Returns:
+            Number of sessions flushed
         """
-        logger.debug("force_flush called (no-op for SQLite backend)")
-        return 0
+        return self.flush_pending()
 
     def cleanup_old_sessions(self, days_to_keep: int = 90) -> int:
-        """Remove sessions older than specified days to prevent database bloat
+        """Drop monthly partitions that are entirely older than days_to_keep
+
+        Retention works on whole months: a month is dropped (DROP TABLE, no
+        DELETE/VACUUM) once its last day is older than the cutoff. Daily rollups
+        of dropped months are kept.
 
         Args:
             days_to_keep: Number of days to retain
@@ -364,67 +452,51 @@ class AnalyticsAggregator:
         """
         cutoff = datetime.utcnow() - timedelta(days=days_to_keep)
 
-        # Get count before deletion
-        old_sessions = self.db.get_sessions(start_date=datetime(2000, 1, 1).isoformat(), end_date=cutoff.isoformat())
+        with self._rollup_lock:
+            dropped = self.db.partitions.drop_partitions(before=cutoff)
 
-        count = len(old_sessions)
-
-        if count > 0:
-            # Delete old sessions
-            for session in old_sessions:
-                self.db.conn.execute("DELETE FROM sessions WHERE session_id = ?", (session["session_id"],))
-            self.db.conn.commit()
-
-            # Vacuum to reclaim space
-            self.db.conn.execute("VACUUM")
-
-        return count
+        return sum(dropped.values())
 
     def reprocess_all_sessions(self) -> Dict[str, int]:
-        """Reprocess all sessions to rebuild user_stats and daily_stats
+        """Reprocess all sessions to rebuild the daily rollups, user_stats and daily_stats
 
-        Legacy method - with SQLite, stats are automatically maintained via triggers
+        Idempotent - recomputes every day that still has sessions; rollups of dropped months are kept.
         """
-        logger.debug("reprocess_all_sessions called (no-op for SQLite backend)")
-
-        # Return current counts
-        all_users = self.db.get_user_stats()
-        all_sessions = self.db.get_sessions(
-            start_date=datetime(2000, 1, 1).isoformat(), end_date=datetime.utcnow().isoformat()
-        )
+        self.flush_pending()
+        result = self.materialize_rollups(rebuild=True)
 
         return {
-            "sessions_processed": len(all_sessions),
-            "total_users": len(all_users),
-            "total_days": len(
-                self.db.get_daily_stats(
-                    start_date=datetime(2000, 1, 1).date().isoformat(), end_date=datetime.utcnow().date().isoformat()
-                )
-            ),
+            "sessions_processed": self.db.get_rollup_totals()["sessions"],
+            "total_users": self.db.get_user_counts()["total"],
+            "total_days": result["days"],
         }
 
     def force_archive(self) -> Dict[str, int]:
-        """Manually trigger archiving of old months
+        """Manually trigger archiving of completed months into sessions_YYYYMM partitions
 
-        Legacy method - SQLite handles data retention differently
+        Returns:
+            {month: sessions archived}
         """
-        logger.debug("force_archive called (no-op for SQLite backend)")
-        return {}
+        self.materialize_rollups()  # sessions that aren't rolled up yet stay hot
+        with self._rollup_lock:
+            archived = self.db.partitions.archive_months()
 
-    def get_archive_stats(self) -> Dict[str, Any]:
-        """Get statistics about archived months
+        logger.info(f"Archived {sum(archived.values())} sessions across {len(archived)} months")
+        return archived
 
-        Legacy method - SQLite doesn't use monthly archives
-        """
-        return {
-            "archive_enabled": False,
-            "archived_months": 0,
-            "total_archived_sessions": 0,
-            "months": [],
-            "note": "SQLite backend doesn't use monthly archives - all data is in database",
-        }
+    def get_archive_stats(self) -> Dict[str, Any]:
+        """Get statistics about archived months (one partition per month)"""
+        return self.db.partitions.get_stats()
 
     def shutdown(self) -> None:
         """Gracefully shutdown the analytics system"""
+        # Stop background flusher and persist pending activity
+        self._stop_event.set()
+        self.flush_pending()
+        try:
+            self.materialize_rollups()
+        except Exception as e:
+            logger.error(f"Failed to materialize analytics rollups on shutdown: {e}")
+
         # Close database connection (quiet)
         self.db.close()
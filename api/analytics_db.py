@@ -13,10 +13,21 @@ Key Features:
 import sqlite3
 import json
 import threading
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
+from collections import defaultdict
 from contextlib import contextmanager
 from Utils.Logger import Logger as logger
+from api.analytics_partitioning import (
+    SESSION_COLUMNS,
+    SESSION_ENDPOINTS_INDEXES,
+    SESSION_ENDPOINTS_TABLE_SQL,
+    SESSIONS_INDEXES,
+    SESSIONS_TABLE_SQL,
+    SessionPartitionManager,
+)
+from api.feature_analytics import FEATURE_CATEGORIES
 
 
 class AnalyticsDatabase:
@@ -33,6 +44,8 @@ class AnalyticsDatabase:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._local = threading.local()
         self._lock = threading.Lock()
+        # Completed months live in sessions_YYYYMM partitions
+        self.partitions = SessionPartitionManager(self)
 
         # Create tables if they don't exist
         self._initialize_database()
@@ -67,25 +80,9 @@ class AnalyticsDatabase:
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sessions'")
             _tables_exist = cursor.fetchone() is not None
 
-            # Sessions table - Core analytics data
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS sessions (
-                    session_id TEXT PRIMARY KEY,
-                    discord_id TEXT NOT NULL,
-                    username TEXT NOT NULL,
-                    started_at TEXT NOT NULL,
-                    ended_at TEXT,
-                    duration_minutes REAL DEFAULT 0,
-                    platform TEXT,
-                    device_info TEXT,
-                    app_version TEXT,
-                    ip_address TEXT,
-                    actions_count INTEGER DEFAULT 0,
-                    endpoints_used TEXT,  -- JSON: {"endpoint": count}
-                    screens_visited TEXT,  -- JSON array
-                    created_at TEXT DEFAULT (datetime('now'))
-                )
-            """)
+            # Sessions table - Core analytics data (hot table; completed months are
+            # moved to sessions_YYYYMM partitions with the same layout)
+            cursor.execute(SESSIONS_TABLE_SQL.format(table="sessions"))
 
             # User stats table - Aggregated per user
             cursor.execute("""
@@ -135,17 +132,197 @@ class AnalyticsDatabase:
                 )
             """)
 
+            # Metadata table - schema/mapping versions and materializer state
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+
+            # Feature categories lookup - endpoint -> feature (mirrors FEATURE_CATEGORIES)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS feature_categories (
+                    endpoint TEXT PRIMARY KEY,
+                    category TEXT NOT NULL
+                ) WITHOUT ROWID
+            """)
+
+            # Session endpoints table - Normalized per-session endpoint histogram
+            # Session columns and the feature category are denormalized so dashboard
+            # aggregates are covering-index scans (no join back to sessions).
+            # sessions.endpoints_used is kept as a JSON snapshot for exports.
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='session_endpoints'")
+            session_endpoints_exist = cursor.fetchone() is not None
+
+            cursor.execute(SESSION_ENDPOINTS_TABLE_SQL.format(table="session_endpoints"))
+
+            if not session_endpoints_exist:
+                # One-time backfill from the legacy JSON column
+                cursor.execute("""
+                    INSERT OR IGNORE INTO session_endpoints (
+                        session_id, endpoint, count, started_at, discord_id, username
+                    )
+                    SELECT s.session_id, e.key, CAST(e.value AS INTEGER), s.started_at, s.discord_id, s.username
+                    FROM sessions s, json_each(s.endpoints_used) e
+                    WHERE s.endpoints_used IS NOT NULL AND json_valid(s.endpoints_used)
+                """)
+            else:
+                columns = {row[1] for row in cursor.execute("PRAGMA table_info(session_endpoints)")}
+                if "category" not in columns:
+                    # Upgrade from the endpoint-only layout
+                    for column in ("started_at TEXT", "discord_id TEXT", "username TEXT"):
+                        cursor.execute(f"ALTER TABLE session_endpoints ADD COLUMN {column}")
+                    cursor.execute("ALTER TABLE session_endpoints ADD COLUMN category TEXT NOT NULL DEFAULT 'Other'")
+                    cursor.execute("""
+                        UPDATE session_endpoints SET (started_at, discord_id, username) = (
+                            SELECT s.started_at, s.discord_id, s.username
+                            FROM sessions s WHERE s.session_id = session_endpoints.session_id
+                        )
+                    """)
+                    cursor.execute("DELETE FROM analytics_meta WHERE key = 'feature_categories'")
+
+            # Partition registry + sessions_all view
+            self.partitions.initialize(cursor)
+
+            # Re-categorize stored endpoints only when FEATURE_CATEGORIES changed
+            categories_signature = json.dumps(FEATURE_CATEGORIES, sort_keys=True)
+            cursor.execute("SELECT value FROM analytics_meta WHERE key = 'feature_categories'")
+            row = cursor.fetchone()
+            if row is None or row[0] != categories_signature:
+                cursor.execute("DELETE FROM feature_categories")
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO feature_categories (endpoint, category) VALUES (?, ?)",
+                    [
+                        (endpoint, category)
+                        for category, endpoints in FEATURE_CATEGORIES.items()
+                        for endpoint in endpoints
+                    ],
+                )
+                for table in self.partitions.endpoint_tables(cursor=cursor):
+                    cursor.execute(f"""
+                        UPDATE {table} SET category = COALESCE(
+                            (SELECT fc.category FROM feature_categories fc WHERE fc.endpoint = {table}.endpoint),
+                            'Other'
+                        )
+                    """)
+                cursor.execute(
+                    "INSERT OR REPLACE INTO analytics_meta (key, value) VALUES ('feature_categories', ?)",
+                    (categories_signature,),
+                )
+
+            # Rollup tables - Maintained incrementally by materialize_rollups()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_daily (
+                    date TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    app_version TEXT NOT NULL,
+                    sessions INTEGER NOT NULL DEFAULT 0,
+                    actions INTEGER NOT NULL DEFAULT 0,
+                    duration_minutes REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (date, platform, app_version)
+                ) WITHOUT ROWID
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_daily_users (
+                    date TEXT NOT NULL,
+                    discord_id TEXT NOT NULL,
+                    username TEXT,
+                    sessions INTEGER NOT NULL DEFAULT 0,
+                    actions INTEGER NOT NULL DEFAULT 0,
+                    duration_minutes REAL NOT NULL DEFAULT 0,
+                    first_started TEXT,
+                    last_seen TEXT,
+                    last_ended_at TEXT,
+                    platform TEXT,
+                    app_version TEXT,
+                    device_info TEXT,
+                    devices TEXT,  -- JSON array of distinct device_info
+                    PRIMARY KEY (date, discord_id)
+                ) WITHOUT ROWID
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_daily_endpoints (
+                    date TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (date, endpoint)
+                ) WITHOUT ROWID
+            """)
+
+            # Days whose already-rolled-up sessions changed since the last materializer run
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_dirty_days (
+                    date TEXT PRIMARY KEY
+                ) WITHOUT ROWID
+            """)
+
+            # One-time backfill: months archived before archiving waited for the materializer
+            # may never have been rolled up, so queue every archived day for recomputation
+            cursor.execute("SELECT 1 FROM analytics_meta WHERE key = 'rollup_partitions_backfilled'")
+            if cursor.fetchone() is None:
+                for partition in self.partitions.get_partitions(cursor):
+                    cursor.execute(
+                        f"INSERT OR IGNORE INTO rollup_dirty_days (date) "
+                        f"SELECT DISTINCT substr(started_at, 1, 10) FROM {partition['sessions_table']}"
+                    )
+                self._set_meta(cursor, "rollup_partitions_backfilled", datetime.utcnow().isoformat())
+
+            # user_stats columns filled by the materializer (inactive users / export)
+            user_stats_columns = {row[1] for row in cursor.execute("PRAGMA table_info(user_stats)")}
+            for column in (
+                "last_ended_at TEXT",
+                "last_app_version TEXT",
+                "last_platform TEXT",
+                "last_device_info TEXT",
+                "device_history TEXT",
+            ):
+                if column.split()[0] not in user_stats_columns:
+                    cursor.execute(f"ALTER TABLE user_stats ADD COLUMN {column}")
+
+            # Sessions at or below the high-water mark are already rolled up: changes to them
+            # mark their day dirty. Newer rows are picked up through the high-water mark alone.
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_sessions_rollup_update AFTER UPDATE ON sessions
+                WHEN OLD.rowid <= COALESCE(
+                    (SELECT CAST(value AS INTEGER) FROM analytics_meta WHERE key = 'rollup_high_water_mark'), 0
+                )
+                BEGIN
+                    INSERT OR IGNORE INTO rollup_dirty_days (date) VALUES (substr(OLD.started_at, 1, 10));
+                    INSERT OR IGNORE INTO rollup_dirty_days (date) VALUES (substr(NEW.started_at, 1, 10));
+                END
+            """)
+            # Deleting the newest rows lets SQLite reuse their rowids, so pull the
+            # high-water mark back to the surviving MAX(rowid)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_sessions_rollup_delete AFTER DELETE ON sessions
+                WHEN OLD.rowid <= COALESCE(
+                    (SELECT CAST(value AS INTEGER) FROM analytics_meta WHERE key = 'rollup_high_water_mark'), 0
+                )
+                BEGIN
+                    INSERT OR IGNORE INTO rollup_dirty_days (date) VALUES (substr(OLD.started_at, 1, 10));
+                    UPDATE analytics_meta SET value = (SELECT COALESCE(MAX(rowid), 0) FROM sessions)
+                    WHERE key = 'rollup_high_water_mark'
+                      AND CAST(value AS INTEGER) > (SELECT COALESCE(MAX(rowid), 0) FROM sessions);
+                END
+            """)
+
             # Create optimized indexes
             indexes = [
-                # Sessions indexes
-                "CREATE INDEX IF NOT EXISTS idx_sessions_discord_id ON sessions(discord_id)",
-                "CREATE INDEX IF NOT EXISTS idx_sessions_started_at ON sessions(started_at)",
-                "CREATE INDEX IF NOT EXISTS idx_sessions_ended_at ON sessions(ended_at)",
-                "CREATE INDEX IF NOT EXISTS idx_sessions_platform ON sessions(platform)",
+                # Sessions indexes (shared with the monthly partitions)
+                *[sql.format(name="sessions", table="sessions") for sql in SESSIONS_INDEXES],
+                # Session endpoints indexes - covering and ordered like the feature GROUP BYs,
+                # so aggregates stream in index order instead of sorting millions of rows
+                *[sql.format(name="session_endpoints", table="session_endpoints") for sql in SESSION_ENDPOINTS_INDEXES],
                 # User stats indexes
                 "CREATE INDEX IF NOT EXISTS idx_user_stats_username ON user_stats(username)",
                 "CREATE INDEX IF NOT EXISTS idx_user_stats_last_seen ON user_stats(last_seen)",
                 "CREATE INDEX IF NOT EXISTS idx_user_stats_total_sessions ON user_stats(total_sessions DESC)",
+                "CREATE INDEX IF NOT EXISTS idx_user_stats_last_ended_at ON user_stats(last_ended_at)",
+                # Rollup indexes (per-user history for user_stats / new-user detection)
+                "CREATE INDEX IF NOT EXISTS idx_rollup_daily_users_user ON rollup_daily_users(discord_id, date)",
                 # Daily stats indexes
                 "CREATE INDEX IF NOT EXISTS idx_daily_stats_date ON daily_stats(date DESC)",
                 # Error logs indexes
@@ -250,16 +427,121 @@ class AnalyticsDatabase:
             logger.error(f"Failed to update session {session_id}: {e}")
             return False
 
+    def apply_session_activity(self, activity: List[Dict[str, Any]]) -> int:
+        """
+        Apply accumulated session activity in a single transaction
+
+        Endpoint counts are upserted into session_endpoints and the session row is
+        updated in place (counters, ended_at, duration, endpoints_used snapshot),
+        so no read-modify-write round-trip is needed. Sessions already archived
+        into a sessions_YYYYMM partition are updated there and their day is queued
+        for the rollups. Activity for sessions that don't exist (yet) is dropped.
+
+        Args:
+            activity: List of {"session_id", "actions", "endpoints": {endpoint: count}, "last_seen"}
+
+        Returns:
+            Number of sessions updated
+        """
+        if not activity:
+            return 0
+
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                remaining = {item["session_id"]: item for item in activity}
+                updated = 0
+
+                for sessions_table, endpoints_table in self.partitions.table_pairs(cursor):
+                    if not remaining:
+                        break
+                    items = self._sessions_in(cursor, sessions_table, remaining)
+                    if not items:
+                        continue
+                    self._apply_activity_to(cursor, sessions_table, endpoints_table, items)
+                    if sessions_table != "sessions":
+                        # Partition rows are all rolled up and have no triggers: mark their days dirty
+                        cursor.executemany(
+                            f"INSERT OR IGNORE INTO rollup_dirty_days (date) "
+                            f"SELECT substr(started_at, 1, 10) FROM {sessions_table} WHERE session_id = ?",
+                            [(item["session_id"],) for item in items],
+                        )
+                    for item in items:
+                        del remaining[item["session_id"]]
+                    updated += len(items)
+
+                return updated
+        except Exception as e:
+            logger.error(f"Failed to apply session activity ({len(activity)} sessions): {e}")
+            return 0
+
+    @staticmethod
+    def _sessions_in(
+        cursor: sqlite3.Cursor, sessions_table: str, items: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """The activity items whose session is stored in sessions_table"""
+        ids = list(items)
+        found = []
+        for start in range(0, len(ids), 500):  # stay below SQLite's bound parameter limit
+            chunk = ids[start : start + 500]
+            cursor.execute(
+                f"SELECT session_id FROM {sessions_table} WHERE session_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            found.extend(items[row[0]] for row in cursor.fetchall())
+        return found
+
+    @staticmethod
+    def _apply_activity_to(
+        cursor: sqlite3.Cursor, sessions_table: str, endpoints_table: str, items: List[Dict[str, Any]]
+    ) -> None:
+        """Upsert endpoint counts and update the session rows of one sessions/endpoints table pair"""
+        cursor.executemany(
+            f"""
+            INSERT INTO {endpoints_table} (
+                session_id, endpoint, count, started_at, discord_id, username, category
+            )
+            SELECT
+                s.session_id, ?, ?, s.started_at, s.discord_id, s.username,
+                COALESCE((SELECT fc.category FROM feature_categories fc WHERE fc.endpoint = ?), 'Other')
+            FROM {sessions_table} s
+            WHERE s.session_id = ?
+            ON CONFLICT(session_id, endpoint) DO UPDATE SET count = count + excluded.count
+        """,
+            [
+                (endpoint, count, endpoint, item["session_id"])
+                for item in items
+                for endpoint, count in item["endpoints"].items()
+            ],
+        )
+
+        cursor.executemany(
+            f"""
+            UPDATE {sessions_table} SET
+                actions_count = actions_count + ?,
+                ended_at = ?,
+                duration_minutes = ROUND((julianday(?) - julianday(started_at)) * 1440.0, 2),
+                endpoints_used = (
+                    SELECT json_group_object(endpoint, count)
+                    FROM {endpoints_table}
+                    WHERE {endpoints_table}.session_id = {sessions_table}.session_id
+                )
+            WHERE session_id = ?
+        """,
+            [(item["actions"], item["last_seen"], item["last_seen"], item["session_id"]) for item in items],
+        )
+
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get session by ID"""
+        """Get session by ID (hot table first, then partitions newest first)"""
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,))
-                row = cursor.fetchone()
+                for table in self.partitions.session_tables(cursor=cursor):
+                    cursor.execute(f"SELECT {SESSION_COLUMNS} FROM {table} WHERE session_id = ?", (session_id,))
+                    row = cursor.fetchone()
 
-                if row:
-                    return self._row_to_dict(row)
+                    if row:
+                        return self._row_to_dict(row)
                 return None
         except Exception as e:
             logger.error(f"Failed to get session {session_id}: {e}")
@@ -275,6 +557,8 @@ class AnalyticsDatabase:
         """
         Get sessions with optional filters
 
+        Only the partitions overlapping [start_date, end_date] are queried.
+
         Args:
             discord_id: Filter by user
             start_date: Filter by start date (ISO format)
@@ -288,20 +572,25 @@ class AnalyticsDatabase:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
 
-                query = "SELECT * FROM sessions WHERE 1=1"
-                params = []
+                where = "WHERE 1=1"
+                filter_params = []
 
                 if discord_id:
-                    query += " AND discord_id = ?"
-                    params.append(discord_id)
+                    where += " AND discord_id = ?"
+                    filter_params.append(discord_id)
 
                 if start_date:
-                    query += " AND started_at >= ?"
-                    params.append(start_date)
+                    where += " AND started_at >= ?"
+                    filter_params.append(start_date)
 
                 if end_date:
-                    query += " AND started_at <= ?"
-                    params.append(end_date)
+                    where += " AND started_at <= ?"
+                    filter_params.append(end_date)
+
+                # Filters are repeated per partition so each one can use its own indexes
+                tables = self.partitions.session_tables(start_date, end_date, cursor=cursor)
+                query = " UNION ALL ".join(f"SELECT {SESSION_COLUMNS} FROM {table} {where}" for table in tables)
+                params = filter_params * len(tables)
 
                 query += " ORDER BY started_at DESC"
 
@@ -317,6 +606,438 @@ class AnalyticsDatabase:
             logger.error(f"Failed to get sessions: {e}")
             return []
 
+    def get_feature_usage(self, start_date: str) -> Dict[str, Any]:
+        """
+        Aggregate endpoint usage per feature category in SQL
+
+        Both queries walk a covering index of session_endpoints that is ordered
+        like the GROUP BY, so no session rows or JSON are materialized and no
+        temporary sort is needed. Each relevant partition is aggregated on its
+        own and the (small) results are merged here.
+
+        Args:
+            start_date: Only include sessions started after this ISO timestamp
+
+        Returns:
+            {
+                "total_users": int,
+                "endpoint_usage": [(category, endpoint, uses), ...],
+                "user_usage": [(category, discord_id, username, uses), ...],
+            }
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                endpoint_usage = defaultdict(int)
+                user_usage = defaultdict(int)
+
+                for table in self.partitions.endpoint_tables(start_date, cursor=cursor):
+                    cursor.execute(
+                        f"""
+                        SELECT category, endpoint, SUM(count)
+                        FROM {table}
+                        WHERE started_at > ?
+                        GROUP BY category, endpoint
+                    """,
+                        (start_date,),
+                    )
+                    for category, endpoint, uses in cursor.fetchall():
+                        endpoint_usage[(category, endpoint)] += uses
+
+                    cursor.execute(
+                        f"""
+                        SELECT category, discord_id, username, SUM(count)
+                        FROM {table}
+                        WHERE started_at > ?
+                        GROUP BY category, discord_id, username
+                    """,
+                        (start_date,),
+                    )
+                    for category, user_id, username, uses in cursor.fetchall():
+                        user_usage[(category, user_id, username)] += uses
+
+                cursor.execute(
+                    f"""
+                    SELECT COUNT(DISTINCT discord_id)
+                    FROM {self.partitions.sessions_source(start_date, cursor=cursor)}
+                    WHERE started_at > ?
+                """,
+                    (start_date,),
+                )
+                total_users = cursor.fetchone()[0]
+
+                return {
+                    "total_users": total_users,
+                    "endpoint_usage": [(*key, uses) for key, uses in endpoint_usage.items()],
+                    "user_usage": [(*key, uses) for key, uses in user_usage.items()],
+                }
+        except Exception as e:
+            logger.error(f"Failed to aggregate feature usage: {e}")
+            return {"total_users": 0, "endpoint_usage": [], "user_usage": []}
+
+    # ==================== Rollup Operations ====================
+
+    def materialize_rollups(self, rebuild: bool = False) -> Dict[str, int]:
+        """
+        Bring the daily rollups up to date
+
+        New sessions are found through a high-water mark on sessions.rowid; changes
+        to already rolled-up sessions are queued in rollup_dirty_days by triggers.
+        Each affected day is recomputed from scratch, so running this twice (or
+        after a crash) yields the same result. user_stats and daily_stats are
+        refreshed from the rollups for the affected users and days.
+
+        Args:
+            rebuild: Recompute every day that still has sessions (hot table or
+                partition); rollups of dropped partitions are kept as they are
+
+        Returns:
+            {"sessions": new sessions rolled up, "days": days recomputed, "users": users refreshed}
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            if conn.in_transaction:
+                conn.commit()
+            # Take the write lock up front so the sessions snapshot can't move underneath us
+            cursor.execute("BEGIN IMMEDIATE")
+
+            if rebuild:
+                # Days are recomputed one by one below; days without sessions keep their rows
+                cursor.execute("DELETE FROM rollup_dirty_days")
+                high_water_mark = 0
+            else:
+                high_water_mark = self._get_meta_int(cursor, "rollup_high_water_mark")
+
+            cursor.execute("SELECT COALESCE(MAX(rowid), 0) FROM sessions")
+            target = cursor.fetchone()[0]
+
+            cursor.execute(
+                """
+                INSERT OR IGNORE INTO rollup_dirty_days (date)
+                SELECT DISTINCT substr(started_at, 1, 10) FROM sessions WHERE rowid > ? AND rowid <= ?
+            """,
+                (high_water_mark, target),
+            )
+            if rebuild:
+                # Archived months are not covered by the rowid high-water mark
+                for partition in self.partitions.get_partitions(cursor):
+                    cursor.execute(
+                        f"INSERT OR IGNORE INTO rollup_dirty_days (date) "
+                        f"SELECT DISTINCT substr(started_at, 1, 10) FROM {partition['sessions_table']}"
+                    )
+            cursor.execute("SELECT date FROM rollup_dirty_days ORDER BY date")
+            days = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS rollup_affected_users (discord_id TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM temp.rollup_affected_users")
+            if rebuild:
+                # Refresh every user, and drop user_stats rows no rollup backs anymore
+                for source in ("rollup_daily_users", "user_stats"):
+                    cursor.execute(f"INSERT OR IGNORE INTO temp.rollup_affected_users SELECT discord_id FROM {source}")
+
+            for day in days:
+                self._rollup_day(cursor, day)
+            users = self._refresh_user_stats(cursor)
+            for day in days:
+                self._refresh_daily_stats(cursor, day)
+
+            cursor.execute("DELETE FROM rollup_dirty_days")
+            cursor.execute("DELETE FROM temp.rollup_affected_users")
+            self._set_meta(cursor, "rollup_high_water_mark", target)
+            self._set_meta(cursor, "rollup_last_run", datetime.utcnow().isoformat())
+
+        return {"sessions": max(target - high_water_mark, 0), "days": len(days), "users": users}
+
+    def _rollup_day(self, cursor: sqlite3.Cursor, day: str) -> None:
+        """Recompute all rollup rows of one day (sessions are bucketed by started_at)"""
+        params = {"day": day}
+        day_filter = "started_at >= :day AND started_at < date(:day, '+1 day')"
+        sessions = self.partitions.sessions_source(day, f"{day}T23:59:59.999999", cursor=cursor)
+
+        # Users that drop out of this day still need their user_stats refreshed
+        cursor.execute(
+            "INSERT OR IGNORE INTO temp.rollup_affected_users "
+            "SELECT discord_id FROM rollup_daily_users WHERE date = :day",
+            params,
+        )
+        for table in ("rollup_daily", "rollup_daily_users", "rollup_daily_endpoints"):
+            cursor.execute(f"DELETE FROM {table} WHERE date = :day", params)
+
+        cursor.execute(
+            f"""
+            INSERT INTO rollup_daily (date, platform, app_version, sessions, actions, duration_minutes)
+            SELECT :day, COALESCE(platform, 'Unknown'), COALESCE(app_version, 'Unknown'),
+                   COUNT(*), COALESCE(SUM(actions_count), 0), COALESCE(SUM(duration_minutes), 0)
+            FROM {sessions}
+            WHERE {day_filter}
+            GROUP BY 2, 3
+        """,
+            params,
+        )
+
+        cursor.execute(
+            f"""
+            INSERT INTO rollup_daily_users (
+                date, discord_id, username, sessions, actions, duration_minutes, first_started,
+                last_seen, last_ended_at, platform, app_version, device_info, devices
+            )
+            SELECT :day, a.discord_id, l.username, a.sessions, a.actions, a.duration_minutes, a.first_started,
+                   a.last_seen, a.last_ended_at, l.platform, l.app_version, l.device_info, a.devices
+            FROM (
+                SELECT discord_id, COUNT(*) AS sessions, COALESCE(SUM(actions_count), 0) AS actions,
+                       COALESCE(SUM(duration_minutes), 0) AS duration_minutes, MIN(started_at) AS first_started,
+                       MAX(COALESCE(ended_at, started_at)) AS last_seen, MAX(ended_at) AS last_ended_at,
+                       json_group_array(DISTINCT device_info) FILTER (WHERE device_info IS NOT NULL) AS devices
+                FROM {sessions}
+                WHERE {day_filter}
+                GROUP BY discord_id
+            ) a
+            JOIN (
+                -- Bare columns come from the latest session of the day
+                SELECT discord_id, MAX(started_at) AS latest, username, platform, app_version, device_info
+                FROM {sessions}
+                WHERE {day_filter}
+                GROUP BY discord_id
+            ) l USING (discord_id)
+        """,
+            params,
+        )
+
+        cursor.execute(
+            f"""
+            INSERT INTO rollup_daily_endpoints (date, endpoint, count)
+            SELECT :day, e.key, SUM(e.value)
+            FROM {sessions} s, json_each(CASE WHEN json_valid(s.endpoints_used) THEN s.endpoints_used END) e
+            WHERE s.started_at >= :day AND s.started_at < date(:day, '+1 day')
+            GROUP BY e.key
+        """,
+            params,
+        )
+
+        cursor.execute(
+            "INSERT OR IGNORE INTO temp.rollup_affected_users "
+            "SELECT discord_id FROM rollup_daily_users WHERE date = :day",
+            params,
+        )
+
+    def _refresh_user_stats(self, cursor: sqlite3.Cursor) -> int:
+        """Rebuild user_stats rows of temp.rollup_affected_users from their daily rollups"""
+        cursor.execute("DELETE FROM user_stats WHERE discord_id IN (SELECT discord_id FROM temp.rollup_affected_users)")
+        cursor.execute("""
+            INSERT INTO user_stats (
+                discord_id, username, total_sessions, total_duration_minutes, total_actions,
+                first_seen, last_seen, last_ended_at, last_app_version, last_platform,
+                last_device_info, device_history, updated_at
+            )
+            SELECT a.discord_id, l.username, a.total_sessions, a.total_duration_minutes, a.total_actions,
+                   a.first_seen, a.last_seen, a.last_ended_at, l.app_version, l.platform, l.device_info,
+                   (
+                       SELECT json_group_array(DISTINCT d.value)
+                       FROM rollup_daily_users r, json_each(r.devices) d
+                       WHERE r.discord_id = a.discord_id
+                   ),
+                   datetime('now')
+            FROM (
+                SELECT discord_id, SUM(sessions) AS total_sessions,
+                       ROUND(SUM(duration_minutes), 2) AS total_duration_minutes, SUM(actions) AS total_actions,
+                       MIN(first_started) AS first_seen, MAX(last_seen) AS last_seen,
+                       MAX(last_ended_at) AS last_ended_at
+                FROM rollup_daily_users
+                WHERE discord_id IN (SELECT discord_id FROM temp.rollup_affected_users)
+                GROUP BY discord_id
+            ) a
+            JOIN (
+                -- Bare columns come from the user's latest day
+                SELECT discord_id, MAX(date) AS latest, username, platform, app_version, device_info
+                FROM rollup_daily_users
+                WHERE discord_id IN (SELECT discord_id FROM temp.rollup_affected_users)
+                GROUP BY discord_id
+            ) l USING (discord_id)
+        """)
+        cursor.execute("SELECT COUNT(*) FROM temp.rollup_affected_users")
+        return cursor.fetchone()[0]
+
+    def _refresh_daily_stats(self, cursor: sqlite3.Cursor, day: str) -> None:
+        """Rebuild the daily_stats row of one day from its rollups"""
+        params = {"day": day}
+        cursor.execute("DELETE FROM daily_stats WHERE date = :day", params)
+        cursor.execute(
+            """
+            INSERT INTO daily_stats (
+                date, total_sessions, unique_users, total_actions, total_duration_minutes,
+                avg_session_duration, new_users, platforms, top_endpoints
+            )
+            SELECT
+                :day,
+                SUM(sessions),
+                (SELECT COUNT(*) FROM rollup_daily_users WHERE date = :day),
+                SUM(actions),
+                ROUND(SUM(duration_minutes), 2),
+                ROUND(SUM(duration_minutes) / SUM(sessions), 2),
+                (
+                    SELECT COUNT(*) FROM rollup_daily_users u
+                    WHERE u.date = :day AND NOT EXISTS (
+                        SELECT 1 FROM rollup_daily_users p WHERE p.discord_id = u.discord_id AND p.date < :day
+                    )
+                ),
+                (
+                    SELECT json_group_object(platform, total) FROM (
+                        SELECT platform, SUM(sessions) AS total FROM rollup_daily WHERE date = :day GROUP BY platform
+                    )
+                ),
+                (
+                    SELECT json_group_object(endpoint, count) FROM (
+                        SELECT endpoint, count FROM rollup_daily_endpoints
+                        WHERE date = :day ORDER BY count DESC LIMIT 10
+                    )
+                )
+            FROM rollup_daily
+            WHERE date = :day
+            HAVING SUM(sessions) > 0
+        """,
+            params,
+        )
+
+    def get_rollup_lag(self) -> Dict[str, Any]:
+        """
+        Get how far the rollups are behind the sessions table
+
+        Returns:
+            {
+                "pending_sessions": sessions above the high-water mark,
+                "dirty_days": days queued for recomputation,
+                "high_water_mark": last rolled-up sessions.rowid,
+                "last_run": ISO timestamp of the last materializer run (or None),
+            }
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                high_water_mark = self._get_meta_int(cursor, "rollup_high_water_mark")
+
+                cursor.execute("SELECT COUNT(*) FROM sessions WHERE rowid > ?", (high_water_mark,))
+                pending_sessions = cursor.fetchone()[0]
+
+                cursor.execute("SELECT COUNT(*) FROM rollup_dirty_days")
+                dirty_days = cursor.fetchone()[0]
+
+                cursor.execute("SELECT value FROM analytics_meta WHERE key = 'rollup_last_run'")
+                row = cursor.fetchone()
+
+                return {
+                    "pending_sessions": pending_sessions,
+                    "dirty_days": dirty_days,
+                    "high_water_mark": high_water_mark,
+                    "last_run": row[0] if row else None,
+                }
+        except Exception as e:
+            logger.error(f"Failed to get rollup lag: {e}")
+            return {"pending_sessions": 0, "dirty_days": 0, "high_water_mark": 0, "last_run": None}
+
+    def get_rollup_totals(self, start_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Sum the daily rollups from start_date (YYYY-MM-DD, inclusive) on
+
+        Returns:
+            {"sessions", "actions", "duration_minutes", "platforms": {...}, "app_versions": {...}}
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT platform, app_version, SUM(sessions), SUM(actions), SUM(duration_minutes)
+                    FROM rollup_daily
+                    WHERE date >= ?
+                    GROUP BY platform, app_version
+                """,
+                    (start_date or "",),
+                )
+
+                totals = {"sessions": 0, "actions": 0, "duration_minutes": 0.0, "platforms": {}, "app_versions": {}}
+                for platform, app_version, sessions, actions, duration in cursor.fetchall():
+                    totals["sessions"] += sessions
+                    totals["actions"] += actions
+                    totals["duration_minutes"] += duration
+                    totals["platforms"][platform] = totals["platforms"].get(platform, 0) + sessions
+                    totals["app_versions"][app_version] = totals["app_versions"].get(app_version, 0) + sessions
+                return totals
+        except Exception as e:
+            logger.error(f"Failed to get rollup totals: {e}")
+            return {"sessions": 0, "actions": 0, "duration_minutes": 0.0, "platforms": {}, "app_versions": {}}
+
+    def get_user_counts(self, active_since: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Count users in user_stats (one row per user, maintained by the rollups)
+
+        Args:
+            active_since: ISO timestamps; users last seen after each one are counted
+
+        Returns:
+            {"total": int, "active": [count per active_since timestamp]}
+        """
+        active_since = active_since or []
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                columns = "".join(", COALESCE(SUM(last_seen > ?), 0)" for _ in active_since)
+                cursor.execute(f"SELECT COUNT(*){columns} FROM user_stats", active_since)
+                row = cursor.fetchone()
+                return {"total": row[0], "active": list(row[1:])}
+        except Exception as e:
+            logger.error(f"Failed to count users: {e}")
+            return {"total": 0, "active": [0] * len(active_since)}
+
+    def get_top_endpoints(self, start_date: Optional[str] = None, limit: int = 10) -> Dict[str, int]:
+        """Get the most used endpoints from the daily rollups (start_date as YYYY-MM-DD)"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT endpoint, SUM(count) AS total
+                    FROM rollup_daily_endpoints
+                    WHERE date >= ?
+                    GROUP BY endpoint
+                    ORDER BY total DESC, endpoint
+                    LIMIT ?
+                """,
+                    (start_date or "", limit),
+                )
+                return {row[0]: row[1] for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Failed to get top endpoints: {e}")
+            return {}
+
+    def get_daily_user_ids(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, list]:
+        """Get the discord_ids active per day ({date: [discord_id, ...]}) from the daily rollups"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT date, json_group_array(discord_id)
+                    FROM rollup_daily_users
+                    WHERE date >= ? AND date <= ?
+                    GROUP BY date
+                """,
+                    (start_date or "", end_date or "9999-12-31"),
+                )
+                return {row[0]: json.loads(row[1]) for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Failed to get daily user ids: {e}")
+            return {}
+
+    def _get_meta_int(self, cursor: sqlite3.Cursor, key: str) -> int:
+        """Read an integer value from analytics_meta (0 if unset)"""
+        cursor.execute("SELECT value FROM analytics_meta WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None else 0
+
+    def _set_meta(self, cursor: sqlite3.Cursor, key: str, value: Any) -> None:
+        """Write a value to analytics_meta"""
+        cursor.execute("INSERT OR REPLACE INTO analytics_meta (key, value) VALUES (?, ?)", (key, str(value)))
+
     # ==================== User Stats Operations ====================
 
     def upsert_user_stats(self, user_data: Dict[str, Any]) -> bool:
@@ -524,13 +1245,20 @@ class AnalyticsDatabase:
         result = dict(row)
 
         # Deserialize JSON fields
-        json_fields = ["endpoints_used", "screens_visited", "endpoints_accessed", "platforms", "top_endpoints"]
+        json_fields = [
+            "endpoints_used",
+            "screens_visited",
+            "endpoints_accessed",
+            "platforms",
+            "top_endpoints",
+            "device_history",
+        ]
         for field in json_fields:
             if field in result and result[field]:
                 try:
                     result[field] = json.loads(result[field])
                 except (json.JSONDecodeError, TypeError):
-                    result[field] = {} if field != "screens_visited" else []
+                    result[field] = [] if field in ("screens_visited", "device_history") else {}
 
         return result
 
@@ -576,9 +1304,14 @@ class AnalyticsDatabase:
 
                 # Delete all data
                 cursor.execute("DELETE FROM sessions")
+                cursor.execute("DELETE FROM session_endpoints")
                 cursor.execute("DELETE FROM user_stats")
                 cursor.execute("DELETE FROM daily_stats")
                 cursor.execute("DELETE FROM error_logs")
+                for table in ("rollup_daily", "rollup_daily_users", "rollup_daily_endpoints", "rollup_dirty_days"):
+                    cursor.execute(f"DELETE FROM {table}")
+                cursor.execute("DELETE FROM analytics_meta WHERE key LIKE 'rollup_%'")
+                sessions_count += self.partitions.drop_all(cursor)
 
                 # Reset autoincrement counters
                 cursor.execute("DELETE FROM sqlite_sequence WHERE name='error_logs'")
@@ -0,0 +1,376 @@
+"""
+Monthly Partitioning for Analytics Sessions
+Keeps the hot `sessions` table small by moving completed months into their own tables.
+
+Key Features:
+- Recent sessions live in `sessions` / `session_endpoints` (the hot tables)
+- Completed months are moved into `sessions_YYYYMM` / `session_endpoints_YYYYMM`
+  once the rollup materializer has seen them (rowid <= rollup high-water mark)
+- `sessions_all` view (UNION ALL of hot table + every partition) for ad-hoc queries
+- Date-range queries only touch the partitions overlapping the range
+- Retention drops whole partition tables instead of DELETE + VACUUM
+
+Usage:
+    python -m api.analytics_partitioning --stats
+    python -m api.analytics_partitioning --archive
+    python -m api.analytics_partitioning --drop-before 2025-01-01
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from Utils.Logger import Logger as logger
+
+# Shared DDL - the hot tables and every partition use the exact same layout
+SESSIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        session_id TEXT PRIMARY KEY,
+        discord_id TEXT NOT NULL,
+        username TEXT NOT NULL,
+        started_at TEXT NOT NULL,
+        ended_at TEXT,
+        duration_minutes REAL DEFAULT 0,
+        platform TEXT,
+        device_info TEXT,
+        app_version TEXT,
+        ip_address TEXT,
+        actions_count INTEGER DEFAULT 0,
+        endpoints_used TEXT,  -- JSON: {{"endpoint": count}}
+        screens_visited TEXT,  -- JSON array
+        created_at TEXT DEFAULT (datetime('now'))
+    )
+"""
+
+SESSION_ENDPOINTS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        session_id TEXT NOT NULL,
+        endpoint TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        started_at TEXT,
+        discord_id TEXT,
+        username TEXT,
+        category TEXT NOT NULL DEFAULT 'Other',
+        PRIMARY KEY (session_id, endpoint)
+    ) WITHOUT ROWID
+"""
+
+SESSION_COLUMNS = (
+    "session_id, discord_id, username, started_at, ended_at, duration_minutes, platform, "
+    "device_info, app_version, ip_address, actions_count, endpoints_used, screens_visited, created_at"
+)
+
+SESSION_ENDPOINT_COLUMNS = "session_id, endpoint, count, started_at, discord_id, username, category"
+
+# Index DDL per table ({table} = table name, {name} = index name prefix)
+SESSIONS_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_{name}_discord_id ON {table}(discord_id)",
+    "CREATE INDEX IF NOT EXISTS idx_{name}_started_at ON {table}(started_at)",
+    "CREATE INDEX IF NOT EXISTS idx_{name}_ended_at ON {table}(ended_at)",
+    "CREATE INDEX IF NOT EXISTS idx_{name}_platform ON {table}(platform)",
+]
+
+# Covering and ordered like the feature GROUP BYs (see AnalyticsDatabase.get_feature_usage)
+SESSION_ENDPOINTS_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_{name}_category_endpoint ON {table}(category, endpoint, started_at, count)",
+    "CREATE INDEX IF NOT EXISTS idx_{name}_category_user ON {table}(category, discord_id, username, started_at, count)",
+]
+
+# A month is archived once it ended at least this many days ago (late session updates land first)
+ARCHIVE_GRACE_DAYS = 1
+
+_MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+
+
+def month_bounds(month: str) -> tuple:
+    """Get the [start, end) dates of a YYYY-MM month as ISO date strings"""
+    start = datetime.strptime(month, "%Y-%m")
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start.date().isoformat(), end.date().isoformat()
+
+
+def partition_suffix(month: str) -> str:
+    """YYYY-MM -> YYYYMM"""
+    return month.replace("-", "")
+
+
+class SessionPartitionManager:
+    """Manages monthly session partitions of an AnalyticsDatabase"""
+
+    def __init__(self, db):
+        """
+        Args:
+            db: AnalyticsDatabase instance (connections are borrowed from it)
+        """
+        self.db = db
+
+    def initialize(self, cursor) -> None:
+        """Create the partition registry and the sessions_all view (called during schema setup)"""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS session_partitions (
+                month TEXT PRIMARY KEY,  -- YYYY-MM
+                sessions_table TEXT NOT NULL,
+                endpoints_table TEXT NOT NULL,
+                sessions INTEGER NOT NULL DEFAULT 0,
+                users INTEGER NOT NULL DEFAULT 0,
+                first_started TEXT,
+                last_started TEXT,
+                archived_at TEXT
+            )
+        """)
+        self._rebuild_view(cursor)
+
+    # ==================== Partition Lookup ====================
+
+    def get_partitions(self, cursor=None) -> List[Dict[str, Any]]:
+        """Get all partitions (oldest first)"""
+        query = "SELECT * FROM session_partitions ORDER BY month"
+        if cursor is not None:
+            cursor.execute(query)
+            return [dict(row) for row in cursor.fetchall()]
+
+        with self.db._get_connection() as conn:
+            return [dict(row) for row in conn.execute(query).fetchall()]
+
+    def _overlapping(self, start_date: Optional[str], end_date: Optional[str], cursor=None) -> List[Dict[str, Any]]:
+        """Partitions whose month overlaps [start_date, end_date] (newest first)"""
+        partitions = []
+        for partition in reversed(self.get_partitions(cursor)):
+            month_start, month_end = month_bounds(partition["month"])
+            if start_date and start_date >= month_end:
+                continue
+            if end_date and end_date < month_start:
+                continue
+            partitions.append(partition)
+        return partitions
+
+    def session_tables(
+        self, start_date: Optional[str] = None, end_date: Optional[str] = None, cursor=None
+    ) -> List[str]:
+        """Session tables holding rows started in [start_date, end_date] (hot table first)"""
+        return ["sessions"] + [p["sessions_table"] for p in self._overlapping(start_date, end_date, cursor)]
+
+    def endpoint_tables(
+        self, start_date: Optional[str] = None, end_date: Optional[str] = None, cursor=None
+    ) -> List[str]:
+        """session_endpoints tables holding rows started in [start_date, end_date] (hot table first)"""
+        return ["session_endpoints"] + [p["endpoints_table"] for p in self._overlapping(start_date, end_date, cursor)]
+
+    def table_pairs(self, cursor=None) -> List[Tuple[str, str]]:
+        """(sessions table, session_endpoints table) of the hot tables and every partition (newest first)"""
+        partitions = reversed(self.get_partitions(cursor))
+        return [("sessions", "session_endpoints")] + [(p["sessions_table"], p["endpoints_table"]) for p in partitions]
+
+    def sessions_source(self, start_date: Optional[str] = None, end_date: Optional[str] = None, cursor=None) -> str:
+        """FROM-clause source covering only the relevant session tables"""
+        tables = self.session_tables(start_date, end_date, cursor)
+        if len(tables) == 1:
+            return tables[0]
+        return "(" + " UNION ALL ".join(f"SELECT {SESSION_COLUMNS} FROM {table}" for table in tables) + ")"
+
+    # ==================== Archiving ====================
+
+    def archive_months(self, before: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Move every complete month that ended before `before` out of the hot tables
+
+        Args:
+            before: Archive months ending on or before this time
+                    (default: now - ARCHIVE_GRACE_DAYS)
+
+        Returns:
+            {month: sessions moved}
+        """
+        before = before or datetime.utcnow() - timedelta(days=ARCHIVE_GRACE_DAYS)
+        # First day of the month containing `before` - everything earlier is complete
+        boundary = before.replace(day=1).date().isoformat()
+
+        with self.db._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT DISTINCT substr(started_at, 1, 7) FROM sessions WHERE started_at < ? AND rowid <= ? ORDER BY 1",
+                (boundary, self.db._get_meta_int(cursor, "rollup_high_water_mark")),
+            )
+            months = [row[0] for row in cursor.fetchall() if row[0] and _MONTH_RE.match(row[0])]
+
+        archived = {}
+        for month in months:
+            try:
+                archived[month] = self._archive_month(month)
+            except Exception as e:
+                logger.error(f"Failed to archive analytics month {month}: {e}")
+
+        if archived:
+            logger.info(f"📦 Archived {sum(archived.values())} sessions into {len(archived)} monthly partitions")
+        return archived
+
+    def _archive_month(self, month: str) -> int:
+        """
+        Move one month from the hot tables into its partition (single transaction)
+
+        Only sessions the rollup materializer has already seen (rowid <= its
+        high-water mark) are moved: it scans the hot table only, so anything newer
+        stays hot until the next run and is archived afterwards.
+        """
+        month_start, month_end = month_bounds(month)
+        suffix = partition_suffix(month)
+        sessions_table = f"sessions_{suffix}"
+        endpoints_table = f"session_endpoints_{suffix}"
+        in_month = "started_at >= ? AND started_at < ? AND rowid <= ?"
+
+        with self.db._get_connection() as conn:
+            cursor = conn.cursor()
+            if conn.in_transaction:
+                conn.commit()
+            cursor.execute("BEGIN IMMEDIATE")
+            month_range = (month_start, month_end, self.db._get_meta_int(cursor, "rollup_high_water_mark"))
+
+            cursor.execute(SESSIONS_TABLE_SQL.format(table=sessions_table))
+            cursor.execute(SESSION_ENDPOINTS_TABLE_SQL.format(table=endpoints_table))
+            for index_sql in SESSIONS_INDEXES:
+                cursor.execute(index_sql.format(name=sessions_table, table=sessions_table))
+            for index_sql in SESSION_ENDPOINTS_INDEXES:
+                cursor.execute(index_sql.format(name=endpoints_table, table=endpoints_table))
+
+            # Endpoint rows are selected through their sessions (session_endpoints is keyed by session_id)
+            cursor.execute(
+                f"""
+                INSERT OR IGNORE INTO {endpoints_table} ({SESSION_ENDPOINT_COLUMNS})
+                SELECT {SESSION_ENDPOINT_COLUMNS} FROM session_endpoints
+                WHERE session_id IN (SELECT session_id FROM sessions WHERE {in_month})
+            """,
+                month_range,
+            )
+            cursor.execute(
+                f"DELETE FROM session_endpoints WHERE session_id IN (SELECT session_id FROM sessions WHERE {in_month})",
+                month_range,
+            )
+            cursor.execute(
+                f"""
+                INSERT OR IGNORE INTO {sessions_table} ({SESSION_COLUMNS})
+                SELECT {SESSION_COLUMNS} FROM sessions WHERE {in_month}
+            """,
+                month_range,
+            )
+            cursor.execute(f"DELETE FROM sessions WHERE {in_month}", month_range)
+            moved = cursor.rowcount
+
+            cursor.execute(
+                f"""
+                INSERT OR REPLACE INTO session_partitions (
+                    month, sessions_table, endpoints_table, sessions, users,
+                    first_started, last_started, archived_at
+                )
+                SELECT ?, ?, ?, COUNT(*), COUNT(DISTINCT discord_id), MIN(started_at), MAX(started_at), ?
+                FROM {sessions_table}
+            """,
+                (month, sessions_table, endpoints_table, datetime.utcnow().isoformat()),
+            )
+            self._rebuild_view(cursor)
+
+        return moved
+
+    # ==================== Retention ====================
+
+    def drop_partitions(self, before: datetime) -> Dict[str, int]:
+        """
+        Drop every partition whose month ended on or before `before`
+
+        Months still in the hot table are archived first, so retention never
+        deletes individual rows. Rollups of dropped months are kept.
+
+        Returns:
+            {month: sessions dropped}
+        """
+        self.archive_months(before=before)
+        boundary = before.replace(day=1).date().isoformat()
+
+        dropped = {}
+        with self.db._get_connection() as conn:
+            cursor = conn.cursor()
+            for partition in self.get_partitions(cursor):
+                if month_bounds(partition["month"])[1] > boundary:
+                    continue
+                cursor.execute(f"DROP TABLE IF EXISTS {partition['sessions_table']}")
+                cursor.execute(f"DROP TABLE IF EXISTS {partition['endpoints_table']}")
+                cursor.execute("DELETE FROM session_partitions WHERE month = ?", (partition["month"],))
+                dropped[partition["month"]] = partition["sessions"]
+            if dropped:
+                self._rebuild_view(cursor)
+
+        if dropped:
+            logger.info(f"🗑️ Dropped {len(dropped)} analytics partitions ({sum(dropped.values())} sessions)")
+        return dropped
+
+    def drop_all(self, cursor) -> int:
+        """Drop every partition (used by reset). Returns number of sessions dropped"""
+        total = 0
+        for partition in self.get_partitions(cursor):
+            cursor.execute(f"DROP TABLE IF EXISTS {partition['sessions_table']}")
+            cursor.execute(f"DROP TABLE IF EXISTS {partition['endpoints_table']}")
+            total += partition["sessions"]
+        cursor.execute("DELETE FROM session_partitions")
+        self._rebuild_view(cursor)
+        return total
+
+    # ==================== Stats ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics about archived months"""
+        partitions = self.get_partitions()
+        with self.db._get_connection() as conn:
+            hot_sessions = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+        return {
+            "archive_enabled": True,
+            "archived_months": len(partitions),
+            "total_archived_sessions": sum(p["sessions"] for p in partitions),
+            "hot_sessions": hot_sessions,
+            "months": [
+                {
+                    "month": p["month"],
+                    "sessions": p["sessions"],
+                    "users": p["users"],
+                    "table": p["sessions_table"],
+                    "archived_at": p["archived_at"],
+                }
+                for p in partitions
+            ],
+        }
+
+    def _rebuild_view(self, cursor) -> None:
+        """(Re)create sessions_all over the hot table and every partition"""
+        cursor.execute("SELECT sessions_table FROM session_partitions ORDER BY month")
+        tables = ["sessions"] + [row[0] for row in cursor.fetchall()]
+        cursor.execute("DROP VIEW IF EXISTS sessions_all")
+        cursor.execute(
+            "CREATE VIEW sessions_all AS "
+            + " UNION ALL ".join(f"SELECT {SESSION_COLUMNS} FROM {table}" for table in tables)
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from pathlib import Path
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+    from api.analytics_db import AnalyticsDatabase
+
+    parser = argparse.ArgumentParser(description="Manage monthly analytics partitions")
+    parser.add_argument("--db", type=str, default="Data/analytics.db", help="Path to analytics.db")
+    parser.add_argument("--stats", action="store_true", help="Show partition statistics")
+    parser.add_argument("--archive", action="store_true", help="Archive completed months")
+    parser.add_argument("--drop-before", type=str, help="Drop partitions of months ending before YYYY-MM-DD")
+    args = parser.parse_args()
+
+    database = AnalyticsDatabase(Path(args.db))
+    if args.archive:
+        print(database.partitions.archive_months())
+    if args.drop_before:
+        print(database.partitions.drop_partitions(datetime.fromisoformat(args.drop_before)))
+    if args.stats or not (args.archive or args.drop_before):
+        for key, value in database.partitions.get_stats().items():
+            print(f"{key}: {value}")
+    database.close()
@@ -23,6 +23,7 @@ import Config
 from api.cache import cache
 import api.cache as cache_module  # Also import module for admin routes
 from Utils.ConfigLoader import load_config_from_file
+from Utils.LoopBridge import LoopBusyError
 from Utils.Logger import Logger as logger
 
 # Import all Blueprint modules
@@ -256,6 +257,13 @@ def method_not_allowed(e):
     return jsonify({"error": "Method not allowed"}), 405
 
 
+@app.errorhandler(LoopBusyError)
+def loop_busy(e):
+    """Handle calls rejected by the bot loop bridge (backpressure)"""
+    logger.warning(f"Bot loop busy, rejecting request: {e}")
+    return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+
+
 @app.errorhandler(500)
 def internal_error(e):
     """Handle 500 errors"""
@@ -400,13 +408,9 @@ def get_feature_analytics():
 
         days = int(request.args.get("days", 30))
 
-        # Get sessions from analytics
-        export_data = analytics.get_export_data(days=days)
-        sessions = export_data.get("sessions", [])
-
-        # Analyze feature usage
+        # Analyze feature usage (aggregated in SQLite)
         analyzer = feature_analytics_module.FeatureUsageAnalyzer()
-        analysis = analyzer.analyze_feature_usage(sessions, days=days)
+        analysis = analyzer.analyze_feature_usage_db(analytics.db, days=days)
 
         return jsonify(analysis), 200
     except Exception as e:
@@ -489,13 +493,9 @@ def get_feature_comparison():
         days1 = int(request.args.get("days1", 7))
         days2 = int(request.args.get("days2", 30))
 
-        # Get sessions
-        export_data = analytics.get_export_data(days=days2)
-        sessions = export_data.get("sessions", [])
-
-        # Compare feature usage
+        # Compare feature usage (aggregated in SQLite)
         analyzer = feature_analytics_module.FeatureUsageAnalyzer()
-        comparison = analyzer.get_feature_comparison(sessions, days1=days1, days2=days2)
+        comparison = analyzer.get_feature_comparison_db(analytics.db, days1=days1, days2=days2)
 
         return jsonify(comparison), 200
     except Exception as e:
@@ -572,6 +572,7 @@ if __name__ == "__main__":
         print("\n🛑 Shutting down...")
         flushed = analytics.force_flush()
         print(f"✅ Flushed {flushed} pending analytics updates")
+        helpers_module.flush_app_usage()
         analytics.shutdown()
 
     atexit.register(shutdown_handler)
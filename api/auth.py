@@ -2,8 +2,11 @@
 Authentication and authorization for the Flask API
 """
 
+import hashlib
 import os
 import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from functools import wraps
 
@@ -39,6 +42,12 @@ ROLE_PERMISSIONS = {
     "lootling": ["meme_generator"],
 }
 
+# Verified-token cache sizing (Flutter clients poll with the same token for hours)
+TOKEN_CACHE_MAX_ENTRIES = 2048
+CLIENT_INFO_CACHE_MAX_ENTRIES = 4096
+# Upper bound for tokens without an "exp" claim
+TOKEN_CACHE_DEFAULT_TTL = 300
+
 # Will be initialized by init_auth()
 Config = None
 app_instance = None
@@ -49,6 +58,104 @@ app_usage_file_path = None
 analytics_aggregator = None
 
 
+class _LRUCache:
+    """Thread-safe bounded LRU cache with optional per-entry expiry and hit/miss counters"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # {key: (value, expires_at)}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key):
+        """Return cached value or None (expired entries count as misses)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key, value, expires_at=None) -> None:
+        """Store value, evicting the least recently used entries when full"""
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        with self._lock:
+            total_requests = self._stats["hits"] + self._stats["misses"]
+            hit_rate = (self._stats["hits"] / total_requests * 100) if total_requests > 0 else 0
+            return {
+                **self._stats,
+                "total_requests": total_requests,
+                "hit_rate": round(hit_rate, 2),
+                "cache_size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# Verified JWT payloads keyed by token digest (expire at the JWT "exp" claim)
+verified_token_cache = _LRUCache(TOKEN_CACHE_MAX_ENTRIES)
+
+# Derived device/platform/emulator/debug classification per session + client headers
+client_info_cache = _LRUCache(CLIENT_INFO_CACHE_MAX_ENTRIES)
+
+
+def _decode_token_cached(token: str, secret_key: str) -> dict:
+    """
+    Decode and verify a JWT, reusing previously verified payloads.
+
+    Cache misses fall through to jwt.decode (under jwt_decode_lock), so expired or
+    invalid tokens raise the same PyJWT exceptions as before.
+    """
+    token_key = hashlib.sha256(token.encode()).digest()
+    data = verified_token_cache.get(token_key)
+    if data is not None:
+        return data
+
+    with jwt_decode_lock:
+        data = jwt.decode(token, secret_key, algorithms=["HS256"])
+
+    exp_timestamp = data.get("exp")
+    expires_at = exp_timestamp if exp_timestamp else time.time() + TOKEN_CACHE_DEFAULT_TTL
+    verified_token_cache.set(token_key, data, expires_at=expires_at)
+    return data
+
+
+def get_token_cache_stats() -> dict:
+    """Get hit/miss statistics for the verified-token and client-info caches"""
+    return {
+        "verified_tokens": verified_token_cache.get_stats(),
+        "client_info": client_info_cache.get_stats(),
+    }
+
+
+def clear_token_cache() -> None:
+    """Forget all verified tokens (e.g. after rotating API_SECRET_KEY)"""
+    verified_token_cache.clear()
+    client_info_cache.clear()
+
+
 def _detect_emulator(device_info: str, user_agent: str) -> bool:
     """
     Detect if device is an Android emulator based on device info and user agent.
@@ -103,6 +210,88 @@ def init_auth(
         analytics_aggregator = analytics
 
 
+def _classify_client(
+    user_agent: str, device_info: str, platform_header: str, app_version: str, is_analytics_endpoint: bool
+) -> tuple:
+    """
+    Derive device, platform, debug and emulator classification from client headers.
+
+    Returns:
+        Tuple of (device_info, platform, is_debug_session, is_emulator)
+    """
+    if not device_info or device_info == "Unknown":
+        # Priority 1: Use X-Platform header if present (sent by Flutter app)
+        # This works for ALL Flutter builds: Web, Android, iOS, Desktop
+        if platform_header and platform_header != "Unknown":
+            device_info = platform_header
+
+        # Priority 2: Check for Flutter App identifiers in User-Agent
+        elif "Chillventory" in user_agent or "Testventory" in user_agent:
+            # Flutter app with custom User-Agent
+            if "Android" in user_agent:
+                device_info = "Android"
+            elif "iPhone" in user_agent or "iPad" in user_agent:
+                device_info = "iOS"
+            elif "Windows" in user_agent:
+                device_info = "Windows Desktop"
+            elif "Linux" in user_agent:
+                device_info = "Linux Desktop"
+            elif "Macintosh" in user_agent:
+                device_info = "macOS Desktop"
+            else:
+                device_info = "Flutter App"
+
+        # Priority 3: Detect Web Browser (Analytics Dashboard or external)
+        elif "Mozilla" in user_agent and (
+            "Chrome" in user_agent or "Firefox" in user_agent or "Safari" in user_agent or "Edge" in user_agent
+        ):
+            # Check if this is Analytics Dashboard (no app version header)
+            if app_version == "Unknown" and is_analytics_endpoint:
+                device_info = "Analytics Dashboard"
+            else:
+                device_info = "Web Browser"
+
+        # Priority 4: API Client / Script
+        elif "python-requests" in user_agent.lower() or "curl" in user_agent.lower() or "postman" in user_agent.lower():
+            device_info = "API Client"
+
+        # Priority 5: Fallback
+        else:
+            # Extract first part of User-Agent (e.g., "Dart/3.5" → "Dart")
+            device_info = user_agent.split("/")[0] if "/" in user_agent else "Unknown"
+
+    # Extract platform and check for debug builds
+    platform = platform_header
+
+    # 🐛 ANALYTICS FIX: Infer platform from User-Agent if Unknown
+    if platform == "Unknown" and user_agent:
+        original_platform = platform
+        if "Android" in user_agent:
+            platform = "Android"
+        elif "iPhone" in user_agent or "iPad" in user_agent:
+            platform = "iOS"
+        elif "Windows" in user_agent:
+            platform = "Windows"
+        elif "Macintosh" in user_agent:
+            platform = "macOS"
+        elif "Linux" in user_agent:
+            platform = "Linux"
+        elif any(browser in user_agent for browser in ["Chrome", "Firefox", "Safari", "Edge"]):
+            platform = "Web"
+
+        # Only log if we successfully inferred something (not still Unknown)
+        if platform != original_platform and platform != "Unknown":
+            logger.debug(f"📱 Inferred platform: {platform} from User-Agent")
+
+    # 🐛 ANALYTICS FIX: Check if this is a debug session
+    is_debug_session = "(Debug)" in platform or "(Debug)" in device_info
+
+    # 📱 EMULATOR DETECTION: Check if device is an Android emulator
+    is_emulator = _detect_emulator(device_info, user_agent)
+
+    return device_info, platform, is_debug_session, is_emulator
+
+
 def create_token_required_decorator():
     """Create token_required decorator with initialized dependencies"""
 
@@ -176,9 +365,8 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
                 logger.warning(f"❌ Malformed token structure | Endpoint: {request.endpoint}")
                 return jsonify({"error": "token_invalid"}), 401
 
-            # Thread-safe JWT decode (prevents race conditions during parallel requests)
-            with jwt_decode_lock:
-                data = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
+            # Verified-token cache (falls back to thread-safe JWT decode on miss)
+            data = _decode_token_cached(token, app.config["SECRET_KEY"])
 
             # Check token expiry
             exp_timestamp = data.get("exp")
@@ -192,7 +380,10 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
             # DEBUG: Log token validation success with auth_type
             auth_type = data.get("auth_type", "unknown")
             logger.debug(
-                f"✅ Token validated | User: {data.get('user')} | Auth: {auth_type} | Endpoint: {request.endpoint}"
+                "✅ Token validated | User: %s | Auth: %s | Endpoint: %s",
+                data.get("user"),
+                auth_type,
+                request.endpoint,
             )
 
             # Store username and permissions in request context
@@ -216,8 +407,6 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
                 request.session_id = data["session_id"]
             else:
                 # Fallback: Create session ID from user data
-                import hashlib
-
                 session_data = f"{data.get('discord_id', 'unknown')}_{token[:20]}"
                 request.session_id = hashlib.sha256(session_data.encode()).hexdigest()[:32]
 
@@ -229,56 +418,28 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
                 or request.remote_addr
             )
 
-            # Better device detection with proper priority
+            # Client classification (memoized per session and client headers)
             user_agent = request.headers.get("User-Agent", "Unknown")
-            device_info = request.headers.get("X-Device-Info")
+            device_header = request.headers.get("X-Device-Info")
             platform_header = request.headers.get("X-Platform", "Unknown")
             app_version = request.headers.get("X-App-Version", "Unknown")
-
-            if not device_info or device_info == "Unknown":
-                # Priority 1: Use X-Platform header if present (sent by Flutter app)
-                # This works for ALL Flutter builds: Web, Android, iOS, Desktop
-                if platform_header and platform_header != "Unknown":
-                    device_info = platform_header
-
-                # Priority 2: Check for Flutter App identifiers in User-Agent
-                elif "Chillventory" in user_agent or "Testventory" in user_agent:
-                    # Flutter app with custom User-Agent
-                    if "Android" in user_agent:
-                        device_info = "Android"
-                    elif "iPhone" in user_agent or "iPad" in user_agent:
-                        device_info = "iOS"
-                    elif "Windows" in user_agent:
-                        device_info = "Windows Desktop"
-                    elif "Linux" in user_agent:
-                        device_info = "Linux Desktop"
-                    elif "Macintosh" in user_agent:
-                        device_info = "macOS Desktop"
-                    else:
-                        device_info = "Flutter App"
-
-                # Priority 3: Detect Web Browser (Analytics Dashboard or external)
-                elif "Mozilla" in user_agent and (
-                    "Chrome" in user_agent or "Firefox" in user_agent or "Safari" in user_agent or "Edge" in user_agent
-                ):
-                    # Check if this is Analytics Dashboard (no app version header)
-                    if app_version == "Unknown" and request.endpoint and "analytics" in request.endpoint.lower():
-                        device_info = "Analytics Dashboard"
-                    else:
-                        device_info = "Web Browser"
-
-                # Priority 4: API Client / Script
-                elif (
-                    "python-requests" in user_agent.lower()
-                    or "curl" in user_agent.lower()
-                    or "postman" in user_agent.lower()
-                ):
-                    device_info = "API Client"
-
-                # Priority 5: Fallback
-                else:
-                    # Extract first part of User-Agent (e.g., "Dart/3.5" → "Dart")
-                    device_info = user_agent.split("/")[0] if "/" in user_agent else "Unknown"
+            is_analytics_endpoint = bool(request.endpoint and "analytics" in request.endpoint.lower())
+
+            client_key = (
+                request.session_id,
+                user_agent,
+                device_header,
+                platform_header,
+                app_version,
+                is_analytics_endpoint,
+            )
+            client_info = client_info_cache.get(client_key)
+            if client_info is None:
+                client_info = _classify_client(
+                    user_agent, device_header, platform_header, app_version, is_analytics_endpoint
+                )
+                client_info_cache.set(client_key, client_info)
+            device_info, platform, is_debug_session, is_emulator = client_info
 
             # Determine endpoint and check if it's analytics-related (before session tracking)
             endpoint_name = request.endpoint or "unknown"
@@ -286,8 +447,6 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
 
             # Check if this is a fresh OAuth login by checking token age
             # JWT tokens from OAuth have 'exp' and we can calculate how old the token is
-            import time
-
             token_exp = data.get("exp", 0)
             token_age_seconds = token_exp - time.time() if token_exp else 999999
             # OAuth tokens are valid for 7 days (604800s), fresh ones will be ~604800s away from expiry
@@ -314,35 +473,6 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
                 is_discord_oauth
             )
 
-            # Extract platform and check for debug builds
-            platform = request.headers.get("X-Platform", "Unknown")
-
-            # 🐛 ANALYTICS FIX: Infer platform from User-Agent if Unknown
-            if platform == "Unknown" and user_agent:
-                original_platform = platform
-                if "Android" in user_agent:
-                    platform = "Android"
-                elif "iPhone" in user_agent or "iPad" in user_agent:
-                    platform = "iOS"
-                elif "Windows" in user_agent:
-                    platform = "Windows"
-                elif "Macintosh" in user_agent:
-                    platform = "macOS"
-                elif "Linux" in user_agent:
-                    platform = "Linux"
-                elif any(browser in user_agent for browser in ["Chrome", "Firefox", "Safari", "Edge"]):
-                    platform = "Web"
-
-                # Only log if we successfully inferred something (not still Unknown)
-                if platform != original_platform and platform != "Unknown":
-                    logger.debug(f"📱 Inferred platform: {platform} from User-Agent")
-
-            # 🐛 ANALYTICS FIX: Check if this is a debug session
-            is_debug_session = "(Debug)" in platform or "(Debug)" in device_info
-
-            # 📱 EMULATOR DETECTION: Check if device is an Android emulator
-            is_emulator = _detect_emulator(device_info, user_agent)
-
             session_info = {
                 "username": request.username,
                 "discord_id": request.discord_id,
@@ -365,7 +495,7 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
 
             # 🐛 ANALYTICS FIX: Skip analytics tracking for debug sessions (log only for new sessions)
             if is_debug_session and is_new_session:
-                logger.info(f"🐛 Debug session detected (analytics disabled): {platform} / {device_info}")
+                logger.info("🐛 Debug session detected (analytics disabled): %s / %s", platform, device_info)
 
             # 📊 ANALYTICS FIX: Check if device_info is meaningful (not just generic platform name)
             # Generic device names indicate first request before device_plugin loaded:
@@ -387,7 +517,7 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
                 old_device_info = active_sessions.get(request.session_id, {}).get("device_info", "Unknown")
                 if old_device_info in generic_device_names and has_meaningful_device_info:
                     device_info_upgraded = True
-                    logger.debug(f"📱 Device info upgraded: {old_device_info} → {device_info}")
+                    logger.debug("📱 Device info upgraded: %s → %s", old_device_info, device_info)
 
             # Analytics: Start session tracking when we have meaningful device info
             # - New sessions with specific device info (e.g. "Google Pixel 9 Pro XL")
@@ -456,7 +586,7 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
 
         except jwt.ExpiredSignatureError:
             # Token is expired - this is EXPECTED during token refresh
-            logger.debug(f"⏱️ Token expired | Endpoint: {request.endpoint}")
+            logger.debug("⏱️ Token expired | Endpoint: %s", request.endpoint)
             return jsonify({"error": "token_expired"}), 401
         except (jwt.DecodeError, jwt.InvalidTokenError) as e:
             # PyJWT errors: DecodeError (malformed/corrupted payload), InvalidTokenError (wrong signature)
@@ -466,7 +596,7 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
             # During token refresh, old tokens may fail decoding - treat as expired
             if "Expecting value" in error_msg or "JSON" in error_msg.lower():
                 logger.debug(
-                    f"⏱️ Token decode failed (likely during refresh): {error_msg} | Endpoint: {request.endpoint}"
+                    "⏱️ Token decode failed (likely during refresh): %s | Endpoint: %s", error_msg, request.endpoint
                 )
                 return jsonify({"error": "token_expired"}), 401
 
@@ -480,7 +610,9 @@ def token_required(f, app, Config, active_sessions, recent_activity, max_activit
             # Check if it's a JSON decode error that escaped PyJWT exception handling
             if "Expecting value" in error_msg or "JSONDecodeError" in str(type(e)):
                 logger.debug(
-                    f"⏱️ Unexpected JSON decode error (treating as expired): {error_msg} | Endpoint: {request.endpoint}"
+                    "⏱️ Unexpected JSON decode error (treating as expired): %s | Endpoint: %s",
+                    error_msg,
+                    request.endpoint,
                 )
                 return jsonify({"error": "token_expired"}), 401
 
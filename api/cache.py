@@ -20,6 +20,7 @@ class APICache:
             "sets": 0,
             "invalidations": 0,
         }
+        self._stats_providers = {}  # {name: callable returning a stats dict or None}
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
@@ -98,13 +99,25 @@ class APICache:
         total_requests = self._stats["hits"] + self._stats["misses"]
         hit_rate = (self._stats["hits"] / total_requests * 100) if total_requests > 0 else 0
 
-        return {
+        stats = {
             **self._stats,
             "total_requests": total_requests,
             "hit_rate": round(hit_rate, 2),
             "cache_size": len(self._cache),
         }
 
+        # Stats from other caches reported alongside (e.g. image_proxy)
+        for name, provider in self._stats_providers.items():
+            provider_stats = provider()
+            if provider_stats is not None:
+                stats[name] = provider_stats
+
+        return stats
+
+    def register_stats_provider(self, name: str, provider: Callable[[], Optional[dict]]) -> None:
+        """Report another cache's stats under stats[name] in get_stats()"""
+        self._stats_providers[name] = provider
+
     def get_all_keys(self) -> list:
         """Get all cache keys (for debugging)"""
         return list(self._cache.keys())
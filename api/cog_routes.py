@@ -3,12 +3,14 @@ Cog Management Routes Blueprint
 Handles all /api/cogs/* endpoints for bot cog management
 """
 
-import asyncio
-import os
 import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 from flask import Blueprint, jsonify
 
+from Utils.LogStore import format_time, get_log_store
+from Utils.LoopBridge import LoopBusyError, get_loop_bridge
+
 # Will be initialized by init_cog_routes()
 logger = None
 token_required = None
@@ -541,8 +543,8 @@ def load_cog(cog_name):
             return jsonify({"error": f"Cog '{cog_name}' is already loaded"}), 400
 
         # Load the cog
-        success, message = asyncio.run_coroutine_threadsafe(cog_manager.load_cog_api(file_name), bot.loop).result(
-            timeout=10
+        success, message = get_loop_bridge(bot.loop).call(
+            "cogs.load", cog_manager.load_cog_api, file_name, key=file_name, timeout=10
         )
 
         if success:
@@ -556,6 +558,8 @@ def load_cog(cog_name):
         else:
             return jsonify({"error": message}), 500
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error loading cog {cog_name}: {e}")
         return jsonify({"error": f"Failed to load cog: {str(e)}"}), 500
@@ -606,8 +610,8 @@ def unload_cog(cog_name):
             return jsonify({"error": f"Cog '{cog_name}' is not loaded"}), 400
 
         # Unload the cog
-        success, message = asyncio.run_coroutine_threadsafe(cog_manager.unload_cog_api(class_name), bot.loop).result(
-            timeout=10
+        success, message = get_loop_bridge(bot.loop).call(
+            "cogs.unload", cog_manager.unload_cog_api, class_name, key=class_name, timeout=10
         )
 
         if success:
@@ -621,6 +625,8 @@ def unload_cog(cog_name):
         else:
             return jsonify({"error": message}), 500
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error unloading cog {cog_name}: {e}")
         return jsonify({"error": f"Failed to unload cog: {str(e)}"}), 500
@@ -671,9 +677,9 @@ def reload_cog(cog_name):
         timeout = 35 if class_name == "APIServer" else 15
 
         try:
-            success, message = asyncio.run_coroutine_threadsafe(
-                cog_manager.reload_cog_api(class_name), bot.loop
-            ).result(timeout=timeout)
+            success, message = get_loop_bridge(bot.loop).call(
+                "cogs.reload", cog_manager.reload_cog_api, class_name, key=class_name, timeout=timeout
+            )
 
             if success:
                 return jsonify(
@@ -686,7 +692,7 @@ def reload_cog(cog_name):
             else:
                 return jsonify({"error": message}), 500
 
-        except asyncio.TimeoutError:
+        except FutureTimeoutError:
             # For APIServer, timeout might occur during reload (expected)
             # Wait a bit more and check if it's actually loaded
             if class_name == "APIServer":
@@ -702,6 +708,8 @@ def reload_cog(cog_name):
                     )
             raise
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         # Don't log expected errors for APIServer reload
         if not (class_name == "APIServer" and ("timeout" in str(e).lower() or "file descriptor" in str(e).lower())):
@@ -725,61 +733,32 @@ def get_cog_logs(cog_name):
         if not cog_manager:
             return jsonify({"error": "CogManager not available"}), 503
 
-        # Find the actual cog name
+        # Find the actual cog name (records are keyed by the cog's module/file name)
         all_cogs = cog_manager.get_all_cog_files()
         actual_cog_name = cog_name
+        module_name = cog_name
 
         # Try to match by class name first, then by file name
         for fname, cname in all_cogs.items():
             if cname == cog_name or fname == cog_name:
                 actual_cog_name = cname
+                module_name = fname
                 break
 
-        # Read log file
-        log_file = os.path.join(os.getcwd(), "Logs", "HazeBot.log")
-
-        if not os.path.exists(log_file):
-            # Try alternative paths
-            alternative_paths = [
-                "Logs/HazeBot.log",
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), "Logs", "HazeBot.log"),
-                "/home/liq/gitProjects/HazeBot/Logs/HazeBot.log",
-            ]
-
-            for alt_path in alternative_paths:
-                if os.path.exists(alt_path):
-                    log_file = alt_path
-                    break
-            else:
-                return jsonify({"error": "Log file not found"}), 404
-
-        # Read last 1000 lines
-        with open(log_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            lines = lines[-1000:]
-
-        # Filter logs for this cog
-        cog_filter = actual_cog_name.lower()
-        filtered_logs = [line for line in lines if cog_filter in line.lower()]
-
-        # Format logs for API response
-        logs = []
-        for log_line in filtered_logs[-100:]:  # Last 100 entries
-            parts = log_line.strip().split(None, 3)
-            if len(parts) >= 4:
-                timestamp = parts[0]
-                level = parts[1].strip("[]")
-                cog = parts[2].strip("[]")
-                message = parts[3] if len(parts) > 3 else ""
-
-                logs.append(
-                    {
-                        "timestamp": timestamp,
-                        "level": level,
-                        "cog": cog,
-                        "message": message,
-                    }
-                )
+        store = get_log_store()
+        if not store.exists():
+            return jsonify({"error": "Log store not found"}), 404
+
+        # Last 100 entries of this cog via the (cog, id) index
+        logs = [
+            {
+                "timestamp": format_time(record["ts"]),
+                "level": record["level"],
+                "cog": actual_cog_name,
+                "message": record["message"],
+            }
+            for record in store.query(cog=module_name, limit=100)
+        ]
 
         return jsonify({"success": True, "cog": actual_cog_name, "logs": logs, "count": len(logs)})
 
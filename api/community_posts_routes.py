@@ -22,13 +22,23 @@ Date: 15. Dezember 2025
 from flask import Blueprint, request, jsonify, current_app, send_from_directory
 from datetime import datetime
 from pathlib import Path
-import sqlite3
 import base64
-import asyncio
 import discord
 import os
+import threading
+import time
 import traceback
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from Utils.CacheUtils import cache_instance as cache
+from Utils.DatabaseUtils import get_community_posts_db
+from Utils.LoopBridge import LoopBusyError, get_loop_bridge
+from api.image_variants import (
+    SourceFetchError,
+    get_variant_renderer,
+    mimetype_for,
+    normalize_format,
+    width_bucket,
+)
 
 # Will be initialized by init_community_posts_routes()
 Config = None
@@ -132,40 +142,12 @@ def get_posts_db():
     Automatically uses correct directory based on PROD_MODE.
     Initializes database from init_community_posts.sql if it doesn't exist.
 
+    Connections come from the shared pool; conn.close() hands them back.
+
     Returns:
-        sqlite3.Connection: Database connection with row_factory enabled
+        PooledConnection: sqlite3.Connection proxy with row_factory enabled
     """
-    db_path = Path(Config.DATA_DIR) / "community_posts.db"
-
-    # Initialize DB if it doesn't exist
-    if not db_path.exists():
-        # Try multiple locations for init script
-        init_script_locations = [
-            Path(Config.DATA_DIR) / "init_community_posts.sql",  # Local copy
-            Path(__file__).parent.parent / "sql" / "schemas" / "init_community_posts.sql",  # Git-tracked
-        ]
-
-        init_script = None
-        for location in init_script_locations:
-            if location.exists():
-                init_script = location
-                break
-
-        if init_script:
-            conn = sqlite3.connect(str(db_path))
-            with open(init_script, "r", encoding="utf-8") as f:
-                conn.executescript(f.read())
-            conn.commit()
-            conn.close()
-            print(f"✅ Initialized community_posts.db in {Config.DATA_DIR} from {init_script}")
-        else:
-            print("❌ ERROR: init_community_posts.sql not found in any location!")
-            print(f"   Searched: {', '.join(str(loc) for loc in init_script_locations)}")
-            raise FileNotFoundError("Community posts schema not found")
-
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-    return conn
+    return get_community_posts_db().acquire()
 
 
 # ============================================================================
@@ -263,6 +245,7 @@ def create_post():
         post_id = cur.lastrowid
         created_at = datetime.now().isoformat()
         conn.commit()
+        _invalidate_post_counts()
 
         # Post to Discord asynchronously
         bot = current_app.config.get("bot_instance")
@@ -270,9 +253,18 @@ def create_post():
             try:
                 # Run async function in bot's event loop
                 user_data = {"username": request.username, "id": user_id}
-                result = asyncio.run_coroutine_threadsafe(
-                    _post_to_discord(bot, post_id, content, image_data, user_data, post_type, is_announcement), bot.loop
-                ).result(timeout=10)
+                result = get_loop_bridge(bot.loop).call(
+                    "community.post",
+                    _post_to_discord,
+                    bot,
+                    post_id,
+                    content,
+                    image_data,
+                    user_data,
+                    post_type,
+                    is_announcement,
+                    timeout=10,
+                )
 
                 discord_message_id, discord_image_url = result
 
@@ -293,6 +285,8 @@ def create_post():
 
                 # Update image_url for response
                 image_url = discord_image_url
+                if image_url:
+                    get_variant_renderer(Config.DATA_DIR).prerender(post_id, image_url, image_url, logger)
             except Exception as e:
                 print(f"⚠️ Failed to post to Discord: {e}")
 
@@ -339,6 +333,41 @@ def create_post():
 # ============================================================================
 
 
+# Post totals per (author_id, type) filter; dropped whenever a post is created or deleted
+POST_COUNT_TTL = 300
+_post_counts = {}  # (author_id, post_type) -> (total, expires_at)
+_post_counts_lock = threading.Lock()
+
+
+def _count_posts(cur, author_id, post_type) -> int:
+    """Number of non-deleted posts matching the feed filter (cached)"""
+    key = (author_id or None, post_type)
+    with _post_counts_lock:
+        cached = _post_counts.get(key)
+    if cached and cached[1] > time.time():
+        return cached[0]
+
+    count_query = "SELECT COUNT(*) FROM community_posts WHERE is_deleted = 0"
+    count_params = []
+    if author_id:
+        count_query += " AND author_id = ?"
+        count_params.append(author_id)
+    if post_type != "all":
+        count_query += " AND post_type = ?"
+        count_params.append(post_type)
+
+    cur.execute(count_query, count_params)
+    total = cur.fetchone()[0]
+    with _post_counts_lock:
+        _post_counts[key] = (total, time.time() + POST_COUNT_TTL)
+    return total
+
+
+def _invalidate_post_counts() -> None:
+    with _post_counts_lock:
+        _post_counts.clear()
+
+
 @bp.route("/api/posts", methods=["GET"])
 def get_posts():
     """
@@ -346,99 +375,109 @@ def get_posts():
 
     Query params:
     - limit: int (default 20, max 100)
-    - offset: int (default 0)
+    - before_id / before_created_at: cursor from pagination.next_cursor (keyset pagination)
+    - offset: int (default 0, only used without a cursor)
     - author_id: int (filter by author)
     - type: 'all'|'normal'|'admin'|'announcement' (default 'all')
 
     Returns:
-        200: List of posts with pagination info
+        200: List of posts with pagination info (next_cursor is null on the last page)
         500: Server error
     """
     try:
         limit = min(int(request.args.get("limit", 20)), 100)
         offset = int(request.args.get("offset", 0))
+        before_id = request.args.get("before_id", type=int)
+        before_created_at = request.args.get("before_created_at")
         author_id = request.args.get("author_id")
         post_type = request.args.get("type", "all")
 
+        # Get current user's discord_id (if authenticated)
+        discord_id = getattr(request, "discord_id", "unknown")
+        if discord_id in ["legacy_user", "unknown"]:
+            discord_id = None
+
         conn = get_posts_db()
         cur = conn.cursor()
 
+        # Cursor from an older client that only sends the post ID
+        if before_id is not None and not before_created_at:
+            cur.execute("SELECT created_at FROM community_posts WHERE id = ?", (before_id,))
+            row = cur.fetchone()
+            before_created_at = row["created_at"] if row else None
+
         # Build query (SQLite uses ? placeholders)
-        query = """
+        page_query = """
             SELECT id, content, image_url, author_id, author_name, author_avatar,
                    post_type, is_announcement, created_at, updated_at, edited_at,
-                   discord_message_id
+                   discord_message_id, like_count
             FROM community_posts
             WHERE is_deleted = 0
         """
         params = []
 
         if author_id:
-            query += " AND author_id = ?"
+            page_query += " AND author_id = ?"
             params.append(author_id)
 
         if post_type != "all":
-            query += " AND post_type = ?"
+            page_query += " AND post_type = ?"
             params.append(post_type)
 
-        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+        # Keyset pagination: continue right after the last post of the previous page
+        use_cursor = before_id is not None and before_created_at is not None
+        if use_cursor:
+            page_query += " AND (created_at, id) < (?, ?)"
+            params.extend([before_created_at, before_id])
+
+        # One extra row tells us whether there is another page
+        page_query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        if not use_cursor:
+            page_query += " OFFSET ?"
+            params.append(offset)
+
+        # Like state of the current user for just this page (post_likes primary key lookups)
+        query = f"""
+            WITH page AS ({page_query})
+            SELECT page.*, post_likes.user_id IS NOT NULL AS has_liked
+            FROM page
+            LEFT JOIN post_likes ON post_likes.post_id = page.id AND post_likes.user_id = ?
+            ORDER BY page.created_at DESC, page.id DESC
+        """
+        params.append(discord_id)
 
         cur.execute(query, params)
         posts = cur.fetchall()
+        has_more = len(posts) > limit
+        posts = posts[:limit]
 
-        # Get total count
-        count_query = """
-            SELECT COUNT(*) FROM community_posts 
-            WHERE is_deleted = 0
-        """
-        count_params = []
-        if author_id:
-            count_query += " AND author_id = ?"
-            count_params.append(author_id)
-        if post_type != "all":
-            count_query += " AND post_type = ?"
-            count_params.append(post_type)
-
-        cur.execute(count_query, count_params)
-        total_count = cur.fetchone()[0]
+        total_count = _count_posts(cur, author_id, post_type)
 
         cur.close()
         conn.close()
 
-        # Load likes and add to posts
-        from api.helpers import load_community_post_likes
-
-        likes_file = Path(Config.DATA_DIR) / "community_post_likes.json"
-        all_likes = load_community_post_likes(likes_file)
-
-        # Get current user's discord_id (if authenticated)
-        discord_id = getattr(request, "discord_id", "unknown")
-
         # Format posts and add like data
         formatted_posts = []
         for post in posts:
             formatted_post = _format_post(post)
-            post_id_str = str(formatted_post["id"])
-            user_likes = all_likes.get(post_id_str, [])
-            formatted_post["like_count"] = len(user_likes)
-
-            # Check if current user has liked
-            if discord_id not in ["legacy_user", "unknown"]:
-                formatted_post["has_liked"] = discord_id in user_likes
-            else:
-                formatted_post["has_liked"] = False
-
+            formatted_post["like_count"] = post["like_count"]
+            formatted_post["has_liked"] = bool(post["has_liked"])
             formatted_posts.append(formatted_post)
 
+        next_cursor = None
+        if has_more and posts:
+            next_cursor = {"before_id": posts[-1]["id"], "before_created_at": posts[-1]["created_at"]}
+
         return jsonify(
             {
                 "posts": formatted_posts,
                 "pagination": {
                     "total": total_count,
                     "limit": limit,
-                    "offset": offset,
-                    "has_more": offset + len(posts) < total_count,
+                    "offset": 0 if use_cursor else offset,
+                    "has_more": has_more,
+                    "next_cursor": next_cursor,
                 },
             }
         )
@@ -537,13 +576,17 @@ def update_post(post_id):
         cur.close()
         conn.close()
 
+        # Render the common variants of the new image ahead of the first view
+        if image_url and image_url != old_image_url:
+            get_variant_renderer(Config.DATA_DIR).prerender(post_id, image_url, _image_source(image_url), logger)
+
         # Update Discord message
         bot = current_app.config.get("bot_instance")
         if bot and discord_msg_id:
             try:
-                asyncio.run_coroutine_threadsafe(
-                    _update_discord_message(bot, discord_msg_id, new_content, image_url), bot.loop
-                ).result(timeout=10)
+                get_loop_bridge(bot.loop).call(
+                    "community.update", _update_discord_message, bot, discord_msg_id, new_content, image_url, timeout=10
+                )
                 print(f"✅ Updated Discord message: {discord_msg_id}")
             except Exception as e:
                 print(f"⚠️ Failed to update Discord message: {e}")
@@ -633,15 +676,19 @@ def delete_post(post_id):
         )
 
         conn.commit()
+        _invalidate_post_counts()
         cur.close()
         conn.close()
 
+        # Rendered variants are unreachable now
+        get_variant_renderer(Config.DATA_DIR).drop_post(post_id)
+
         # Delete Discord message
         bot = current_app.config.get("bot_instance")
         if bot and discord_msg_id:
             try:
-                asyncio.run_coroutine_threadsafe(_delete_discord_message(bot, discord_msg_id), bot.loop).result(
-                    timeout=10
+                get_loop_bridge(bot.loop).call(
+                    "community.delete", _delete_discord_message, bot, discord_msg_id, key=discord_msg_id, timeout=10
                 )
                 print(f"✅ Deleted Discord message: {discord_msg_id}")
             except Exception as e:
@@ -891,6 +938,24 @@ def _format_post(post_row) -> dict:
     }
 
 
+def _toggle_like(conn, post_id: int, user_id: str) -> tuple:
+    """
+    Like or unlike a post for a user, keeping community_posts.like_count in step.
+
+    Returns:
+        tuple: (has_liked: bool, like_count: int) after the toggle
+    """
+    added = conn.execute("INSERT OR IGNORE INTO post_likes (post_id, user_id) VALUES (?, ?)", (post_id, user_id))
+    if added.rowcount:
+        delta = 1
+    else:
+        conn.execute("DELETE FROM post_likes WHERE post_id = ? AND user_id = ?", (post_id, user_id))
+        delta = -1
+    conn.execute("UPDATE community_posts SET like_count = like_count + ? WHERE id = ?", (delta, post_id))
+    like_count = conn.execute("SELECT like_count FROM community_posts WHERE id = ?", (post_id,)).fetchone()[0]
+    return delta > 0, like_count
+
+
 # ============================================================================
 # LIKE SYSTEM (Instagram-Style)
 # ============================================================================
@@ -900,7 +965,6 @@ def _format_post(post_row) -> dict:
 def toggle_like_post(post_id):
     """Toggle like on a community post"""
     try:
-        from api.helpers import load_community_post_likes, save_community_post_likes
         from api.level_helpers import award_xp_from_api
 
         discord_id = getattr(request, "discord_id", "unknown")
@@ -911,12 +975,9 @@ def toggle_like_post(post_id):
             return jsonify({"error": "Discord authentication required"}), 401
 
         # Check if post exists
-        db_path = Path(Config.DATA_DIR) / "community_posts.db"
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, author_id FROM community_posts WHERE id = ? AND deleted_at IS NULL", (post_id,))
-        post = cursor.fetchone()
-        conn.close()
+        post = get_community_posts_db().fetchone(
+            "SELECT id, author_id FROM community_posts WHERE id = ? AND deleted_at IS NULL", (post_id,)
+        )
 
         if not post:
             return jsonify({"error": "Post not found"}), 404
@@ -927,31 +988,13 @@ def toggle_like_post(post_id):
         if str(discord_id) == str(post_author_id):
             return jsonify({"error": "Cannot like your own post"}), 400
 
-        # Load current likes
-        likes_file = Path(Config.DATA_DIR) / "community_post_likes.json"
-        likes = load_community_post_likes(likes_file)
-
-        # Initialize post likes if not exists
-        post_id_str = str(post_id)
-        if post_id_str not in likes:
-            likes[post_id_str] = []
-
-        # Check if user has already liked
-        user_likes = likes[post_id_str]
-        has_liked = discord_id in user_likes
+        # Toggle the like (post_likes row + like_count in one transaction)
+        has_liked_now, like_count = get_community_posts_db().run(_toggle_like, post_id, str(discord_id))
 
         # Award XP ONLY when adding like (not removing)
         xp_awarded = False
 
-        # Toggle the like
-        if has_liked:
-            # Remove like
-            user_likes.remove(discord_id)
-            action = "removed"
-            logger.info(f"➖ Removed like from post {post_id} by {discord_id}")
-        else:
-            # Add like
-            user_likes.append(discord_id)
+        if has_liked_now:
             action = "added"
             logger.info(f"➕ Added like to post {post_id} by {discord_id}")
 
@@ -974,10 +1017,9 @@ def toggle_like_post(post_id):
                     logger.warning("⚠️  Guild not found for XP award")
             else:
                 logger.warning("⚠️  Bot instance not available for XP award")
-
-        # Save updated likes
-        save_community_post_likes(likes, likes_file)
-        logger.info(f"💾 Saved likes for post {post_id}, new count: {len(user_likes)}")
+        else:
+            action = "removed"
+            logger.info(f"➖ Removed like from post {post_id} by {discord_id}")
 
         # Invalidate cache after like toggle (like counts changed)
         cache_key = "community_posts:all"
@@ -985,10 +1027,6 @@ def toggle_like_post(post_id):
             cache.delete(cache_key)
             logger.info("🗑️ Invalidated community posts cache after like toggle")
 
-        # Get current counts
-        like_count = len(user_likes)
-        has_liked_now = discord_id in user_likes
-
         logger.info(
             f"✅ Like toggle: post={post_id}, action={action}, "
             f"count={like_count}, liked={has_liked_now}, xp={xp_awarded}"
@@ -1014,22 +1052,21 @@ def toggle_like_post(post_id):
 def get_post_likes(post_id):
     """Get like count and user's like status for a post"""
     try:
-        from api.helpers import load_community_post_likes
-
         discord_id = request.discord_id
+        if discord_id in ["legacy_user", "unknown"]:
+            discord_id = None
 
-        # Load likes
-        likes_file = Path(Config.DATA_DIR) / "community_post_likes.json"
-        likes = load_community_post_likes(likes_file)
-
-        post_id_str = str(post_id)
-        user_likes = likes.get(post_id_str, [])
-        like_count = len(user_likes)
-
-        # Check if current user has liked
-        has_liked = False
-        if discord_id not in ["legacy_user", "unknown"]:
-            has_liked = discord_id in user_likes
+        row = get_community_posts_db().fetchone(
+            """
+            SELECT community_posts.like_count, post_likes.user_id IS NOT NULL AS has_liked
+            FROM community_posts
+            LEFT JOIN post_likes ON post_likes.post_id = community_posts.id AND post_likes.user_id = ?
+            WHERE community_posts.id = ?
+        """,
+            (discord_id, post_id),
+        )
+        like_count = row["like_count"] if row else 0
+        has_liked = bool(row["has_liked"]) if row else False
 
         return jsonify({"success": True, "post_id": post_id, "like_count": like_count, "has_liked": has_liked})
 
@@ -1048,18 +1085,11 @@ def get_fresh_image_url(post_id):
         JSON with fresh image URL or error
     """
     try:
-        db_path = Path(Config.DATA_DIR) / "community_posts.db"
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
         # Get discord_message_id for this post
-        cursor.execute(
+        row = get_community_posts_db().fetchone(
             "SELECT discord_message_id FROM community_posts WHERE id = ? AND is_deleted = 0",
             (post_id,)
         )
-        row = cursor.fetchone()
-        conn.close()
         
         if not row or not row["discord_message_id"]:
             return jsonify({"error": "Post not found or no Discord message"}), 404
@@ -1074,15 +1104,22 @@ def get_fresh_image_url(post_id):
             return jsonify({"error": "Bot not available"}), 503
         
         # Run async function to fetch message
-        result = asyncio.run_coroutine_threadsafe(
-            _fetch_fresh_discord_image_url(bot, discord_message_id), bot.loop
-        ).result(timeout=5)
+        result = get_loop_bridge(bot.loop).call(
+            "community.image_url",
+            _fetch_fresh_discord_image_url,
+            bot,
+            discord_message_id,
+            key=discord_message_id,
+            timeout=5,
+        )
         
         if not result:
             return jsonify({"error": "No image found in Discord message"}), 404
         
         return jsonify({"success": True, "image_url": result})
         
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error getting fresh image URL: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to get fresh image URL: {str(e)}"}), 500
@@ -1158,13 +1195,14 @@ def get_post_image(post_id):
     Optimized image proxy for community posts
     
     Features:
-    - Automatic URL expiry detection & refresh
-    - On-the-fly resize & compression
-    - Browser caching (6 hours)
+    - Pre-rendered variants (common sizes are rendered when the post image is set)
+    - Resize & compression in a worker process pool, served from disk afterwards
+    - Automatic URL expiry detection & refresh (only when the original must be fetched)
+    - Browser caching (6 hours) with strong ETags / 304 revalidation
     - JPEG/WebP output
     
     Query Parameters:
-        - width: Max width in pixels (default: 800, max: 1920)
+        - width: Max width in pixels (default: 800, max: 1920, rounded up to a size bucket)
         - quality: JPEG/WebP quality 1-100 (default: 80)
         - format: 'jpeg' or 'webp' (default: 'jpeg')
         - original: 'true' to bypass proxy (default: 'false')
@@ -1178,124 +1216,93 @@ def get_post_image(post_id):
     Returns:
         - 200: Compressed image (image/jpeg or image/webp)
         - 302: Redirect to original Discord URL (if original=true)
+        - 304: Client copy is still current
         - 404: Post not found
         - 502: Failed to fetch from Discord
     """
-    from PIL import Image
-    import io
-    import requests
-    from flask import make_response, redirect, send_file
+    from flask import redirect, send_file
     from werkzeug.http import http_date
     from datetime import timedelta
     
     # Parse parameters
-    width = min(int(request.args.get('width', 800)), 1920)
+    width = width_bucket(min(int(request.args.get('width', 800)), 1920))
     quality = max(1, min(int(request.args.get('quality', 80)), 100))
-    output_format = request.args.get('format', 'jpeg').lower()
+    output_format = normalize_format(request.args.get('format', 'jpeg').lower())
     bypass_proxy = request.args.get('original', 'false').lower() == 'true'
     
     # 1. Get post from database
-    db_path = Path(Config.DATA_DIR) / "community_posts.db"
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+    row = get_community_posts_db().fetchone("""
         SELECT image_url, discord_message_id 
         FROM community_posts 
         WHERE id = ? AND is_deleted = 0
     """, (post_id,))
     
-    row = cursor.fetchone()
-    conn.close()
-    
     if not row or not row["image_url"]:
         return jsonify({"error": "Post not found or no image"}), 404
     
-    image_url = row["image_url"]
+    stored_url = row["image_url"]
+    image_url = stored_url
+    renderer = get_variant_renderer(Config.DATA_DIR)
+    variant_path = renderer.variant_path(post_id, stored_url, width, quality, output_format)
     
-    # 2. Check if URL expired, get fresh one if needed
-    if is_discord_url_expired(image_url) and row["discord_message_id"]:
-        logger.info(f"🔄 Discord URL expired for post {post_id}, fetching fresh URL...")
-        bot = current_app.config.get("bot_instance")
-        if bot:
-            try:
-                fresh_url = asyncio.run_coroutine_threadsafe(
-                    _fetch_fresh_discord_image_url(bot, row["discord_message_id"]),
-                    bot.loop
-                ).result(timeout=5)
-                if fresh_url:
-                    image_url = fresh_url
-                    logger.info(f"✅ Got fresh URL for post {post_id}")
-            except Exception as e:
-                logger.error(f"❌ Failed to get fresh URL: {e}")
+    # 2. Render the variant unless it's already on disk
+    if bypass_proxy or not variant_path.exists():
+        # Check if URL expired, get fresh one if needed
+        if is_discord_url_expired(image_url) and row["discord_message_id"]:
+            logger.info(f"🔄 Discord URL expired for post {post_id}, fetching fresh URL...")
+            bot = current_app.config.get("bot_instance")
+            if bot:
+                try:
+                    fresh_url = get_loop_bridge(bot.loop).call(
+                        "community.image_url",
+                        _fetch_fresh_discord_image_url,
+                        bot,
+                        row["discord_message_id"],
+                        key=row["discord_message_id"],
+                        timeout=5,
+                    )
+                    if fresh_url:
+                        image_url = fresh_url
+                        logger.info(f"✅ Got fresh URL for post {post_id}")
+                except Exception as e:
+                    logger.error(f"❌ Failed to get fresh URL: {e}")
+        
+        # If original requested, redirect to Discord CDN
+        if bypass_proxy:
+            return redirect(image_url, code=302)
+        
+        try:
+            renderer.get(post_id, stored_url, _image_source(image_url), width, quality, output_format)
+        except (SourceFetchError, FutureTimeoutError) as e:
+            logger.error(f"Failed to fetch image from Discord: {e}")
+            return jsonify({"error": "Failed to fetch image from Discord"}), 502
+        except Exception as e:
+            logger.error(f"Failed to process image: {e}")
+            return jsonify({"error": "Failed to process image"}), 500
     
-    # 3. If original requested, redirect to Discord CDN
-    if bypass_proxy:
-        return redirect(image_url, code=302)
+    # 3. Serve the file with caching headers
+    response = send_file(
+        variant_path,
+        mimetype=mimetype_for(output_format),
+        as_attachment=False,
+        download_name=f'post_{post_id}.{variant_path.suffix.lstrip(".")}',
+        etag=f"{post_id}-{variant_path.parent.name}-{variant_path.stem}",
+        conditional=True,
+        max_age=21600,
+    )
     
-    # 4. Download original image
-    try:
-        response = requests.get(image_url, timeout=15)
-        response.raise_for_status()
-    except Exception as e:
-        logger.error(f"Failed to fetch image from Discord: {e}")
-        return jsonify({"error": "Failed to fetch image from Discord"}), 502
+    # Cache for 6 hours
+    response.headers['Cache-Control'] = 'public, max-age=21600'
+    response.headers['Expires'] = http_date(datetime.utcnow() + timedelta(hours=6))
     
-    # 5. Resize & Compress
-    try:
-        img = Image.open(io.BytesIO(response.content))
-        
-        # Convert to RGB if needed (PNG with transparency)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            if img.mode in ('RGBA', 'LA'):
-                background.paste(img, mask=img.split()[-1])
-            else:
-                background.paste(img)
-            img = background
-        
-        # Resize if image is larger than requested width
-        if img.width > width:
-            aspect_ratio = img.height / img.width
-            new_height = int(width * aspect_ratio)
-            img = img.resize((width, new_height), Image.Resampling.LANCZOS)
-        
-        # Save to BytesIO
-        output = io.BytesIO()
-        if output_format == 'webp':
-            img.save(output, format='WEBP', quality=quality, method=6)
-            mimetype = 'image/webp'
-            ext = 'webp'
-        else:
-            img.save(output, format='JPEG', quality=quality, optimize=True)
-            mimetype = 'image/jpeg'
-            ext = 'jpg'
-        
-        output.seek(0)
-        
-        # 6. Create response with caching headers
-        response = make_response(send_file(
-            output,
-            mimetype=mimetype,
-            as_attachment=False,
-            download_name=f'post_{post_id}.{ext}'
-        ))
-        
-        # Cache for 6 hours
-        response.headers['Cache-Control'] = 'public, max-age=21600'
-        response.headers['Expires'] = http_date(datetime.utcnow() + timedelta(hours=6))
-        response.headers['ETag'] = f'"{post_id}-{width}-{quality}-{output_format}"'
-        
-        # Add original URL as header (for debugging/fullscreen view)
-        response.headers['X-Original-URL'] = image_url
-        
-        logger.info(f"✅ Served optimized image for post {post_id}: {width}px, {quality}% quality")
-        
-        return response
-        
-    except Exception as e:
-        logger.error(f"Failed to process image: {e}")
-        return jsonify({"error": "Failed to process image"}), 500
+    # Add original URL as header (for debugging/fullscreen view)
+    response.headers['X-Original-URL'] = image_url
+    
+    return response
+
+
+def _image_source(image_url: str) -> str:
+    """Where the resize workers fetch an original from (uploads are stored relative to DATA_DIR)"""
+    if image_url.startswith(("http://", "https://")):
+        return image_url
+    return str(Path(Config.DATA_DIR) / image_url)
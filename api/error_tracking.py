@@ -1,55 +1,109 @@
 """
 Error Tracking System for API
 Captures, aggregates, and stores error/exception data for monitoring
+
+Errors are tracked in memory (a bounded ring buffer of recent errors plus
+per-signature group aggregates); a background thread writes the JSON file
+every few seconds, so a failing request never waits on disk I/O.
 """
 
+import atexit
+import hashlib
 import json
+import logging
+import os
+import threading
 import traceback
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, Optional
-import logging
-import hashlib
+from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Recent errors kept (oldest are dropped)
+MAX_ERRORS = 1000
 
-class ErrorTracker:
-    """Handles error tracking and aggregation"""
+# Seconds between write-behind flushes of error_analytics.json
+ERROR_FLUSH_INTERVAL = 5
+
+_trackers = []  # every ErrorTracker, flushed on shutdown
 
-    def __init__(self, error_file: Path):
-        self.error_file = error_file
-        self.data = self._load_data()
 
-    def _load_data(self) -> Dict[str, Any]:
+class ErrorTracker:
+    """Handles error tracking and aggregation (in memory, write-behind persistence)"""
+
+    def __init__(self, error_file: Path, flush_interval: float = ERROR_FLUSH_INTERVAL):
+        self.error_file = Path(error_file)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._errors: deque = deque(maxlen=MAX_ERRORS)
+        self._groups: Dict[str, Dict[str, Any]] = {}  # signature -> aggregate (affected_users is a set)
+        self._daily_counts: Dict[str, int] = {}
+        self._load_data()
+        self._dirty = False
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True, name="ErrorTrackerFlush")
+        self._flush_thread.start()
+        _trackers.append(self)
+
+    def _load_data(self) -> None:
         """Load error data from file"""
-        if self.error_file.exists():
-            try:
-                with open(self.error_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to load error data: {e}")
-                return self._get_empty_structure()
-        return self._get_empty_structure()
-
-    def _get_empty_structure(self) -> Dict[str, Any]:
-        """Return empty error data structure"""
+        if not self.error_file.exists():
+            return
+        try:
+            with open(self.error_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load error data: {e}")
+            return
+
+        self._errors.extend(data.get("errors", []))
+        for signature, group in data.get("error_groups", {}).items():
+            self._groups[signature] = {**group, "affected_users": set(group.get("affected_users") or [])}
+        self._daily_counts.update(data.get("daily_error_counts", {}))
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """JSON-ready copy of the tracked data (caller holds the lock)"""
         return {
-            "errors": [],
-            "error_groups": {},
-            "daily_error_counts": {},
+            "errors": list(self._errors),
+            "error_groups": {
+                signature: {**group, "affected_users": sorted(group["affected_users"])}
+                for signature, group in self._groups.items()
+            },
+            "daily_error_counts": dict(self._daily_counts),
             "last_updated": datetime.utcnow().isoformat(),
         }
 
-    def _save_data(self):
-        """Save error data to file"""
+    def flush(self) -> bool:
+        """Write error data to file if it changed since the last flush"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            snapshot = self._snapshot()
+            self._dirty = False
+
         try:
             self.error_file.parent.mkdir(parents=True, exist_ok=True)
-            self.data["last_updated"] = datetime.utcnow().isoformat()
-            with open(self.error_file, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, indent=2)
+            tmp_file = self.error_file.with_name(f"{self.error_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_file, self.error_file)
+            return True
         except Exception as e:
             logger.error(f"Failed to save error data: {e}")
+            with self._lock:
+                self._dirty = True
+            return False
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def shutdown(self) -> None:
+        """Stop the background flusher and persist pending errors"""
+        self._stop_event.set()
+        self.flush()
 
     def _generate_error_signature(self, error_type: str, message: str, endpoint: str) -> str:
         """Generate unique signature for error grouping"""
@@ -69,7 +123,7 @@ class ErrorTracker:
         request_data: Optional[Dict] = None,
     ) -> None:
         """
-        Track an error occurrence
+        Track an error occurrence (memory only, flushed to disk later)
 
         Args:
             error_type: Exception type (e.g., "KeyError", "ValueError")
@@ -81,6 +135,7 @@ class ErrorTracker:
             request_data: Additional request context
         """
         now = datetime.utcnow()
+        now_iso = now.isoformat()
         today = now.date().isoformat()
 
         # Generate error signature for grouping
@@ -88,7 +143,7 @@ class ErrorTracker:
 
         # Create error entry
         error_entry = {
-            "timestamp": now.isoformat(),
+            "timestamp": now_iso,
             "error_type": error_type,
             "message": message,
             "endpoint": endpoint,
@@ -99,68 +154,63 @@ class ErrorTracker:
             "signature": signature,
         }
 
-        # Add to errors list (keep last 1000)
-        self.data["errors"].append(error_entry)
-        if len(self.data["errors"]) > 1000:
-            self.data["errors"] = self.data["errors"][-1000:]
-
-        # Update error groups (for aggregation)
-        if signature not in self.data["error_groups"]:
-            self.data["error_groups"][signature] = {
-                "error_type": error_type,
-                "message": message.split("\n")[0][:200],  # First line only
-                "endpoint": endpoint,
-                "first_seen": now.isoformat(),
-                "last_seen": now.isoformat(),
-                "count": 0,
-                "affected_users": set(),
-            }
-
-        group = self.data["error_groups"][signature]
-        group["count"] += 1
-        group["last_seen"] = now.isoformat()
-
-        # Track affected users (convert set to list for JSON)
-        if isinstance(group["affected_users"], list):
-            affected_users = set(group["affected_users"])
-        else:
-            affected_users = group["affected_users"]
-
-        if user_id:
-            affected_users.add(user_id)
-        group["affected_users"] = list(affected_users)
-
-        # Update daily error counts
-        if today not in self.data["daily_error_counts"]:
-            self.data["daily_error_counts"][today] = 0
-        self.data["daily_error_counts"][today] += 1
-
-        self._save_data()
+        with self._lock:
+            # Ring buffer: the oldest error drops out once MAX_ERRORS are kept
+            self._errors.append(error_entry)
+
+            # Update error groups (for aggregation)
+            group = self._groups.get(signature)
+            if group is None:
+                group = self._groups[signature] = {
+                    "error_type": error_type,
+                    "message": message.split("\n")[0][:200],  # First line only
+                    "endpoint": endpoint,
+                    "first_seen": now_iso,
+                    "last_seen": now_iso,
+                    "count": 0,
+                    "affected_users": set(),
+                }
+            group["count"] += 1
+            group["last_seen"] = now_iso
+            if user_id:
+                group["affected_users"].add(user_id)
+
+            # Update daily error counts
+            self._daily_counts[today] = self._daily_counts.get(today, 0) + 1
+            self._dirty = True
+
         logger.debug(f"Tracked error: {error_type} in {endpoint}")
 
     def get_error_summary(self, days: int = 7) -> Dict[str, Any]:
-        """Get error summary for dashboard"""
+        """Get error summary for dashboard (from the in-memory aggregates)"""
         now = datetime.utcnow()
-        cutoff = now - timedelta(days=days)
-
-        # Filter recent errors
-        recent_errors = [e for e in self.data["errors"] if datetime.fromisoformat(e["timestamp"]) > cutoff]
-
-        # Get top error groups
-        error_groups_list = []
-        for signature, group in self.data["error_groups"].items():
-            if datetime.fromisoformat(group["last_seen"]) > cutoff:
-                error_groups_list.append({"signature": signature, **group})
+        cutoff = (now - timedelta(days=days)).isoformat()
+
+        with self._lock:
+            # Errors are in time order: walk back from the newest until the cutoff
+            recent_errors = []
+            for error in reversed(self._errors):
+                if error["timestamp"] <= cutoff:
+                    break
+                recent_errors.append(error)
+            recent_errors.reverse()
+
+            # Get top error groups
+            error_groups_list = [
+                {"signature": signature, **group, "affected_users": list(group["affected_users"])}
+                for signature, group in self._groups.items()
+                if group["last_seen"] > cutoff
+            ]
+
+            # Get daily error trend
+            daily_trend = {}
+            for i in range(days):
+                date = (now - timedelta(days=i)).date().isoformat()
+                daily_trend[date] = self._daily_counts.get(date, 0)
 
         # Sort by count
         error_groups_list.sort(key=lambda x: x["count"], reverse=True)
 
-        # Get daily error trend
-        daily_trend = {}
-        for i in range(days):
-            date = (now - timedelta(days=i)).date().isoformat()
-            daily_trend[date] = self.data["daily_error_counts"].get(date, 0)
-
         return {
             "total_errors": len(recent_errors),
             "unique_error_types": len(error_groups_list),
@@ -172,28 +222,42 @@ class ErrorTracker:
 
     def cleanup_old_errors(self, days_to_keep: int = 30) -> int:
         """Remove errors older than specified days"""
-        cutoff = datetime.utcnow() - timedelta(days=days_to_keep)
-        original_count = len(self.data["errors"])
-
-        self.data["errors"] = [e for e in self.data["errors"] if datetime.fromisoformat(e["timestamp"]) > cutoff]
+        cutoff_time = datetime.utcnow() - timedelta(days=days_to_keep)
+        cutoff = cutoff_time.isoformat()
+        cutoff_day = cutoff_time.date().isoformat()
+
+        with self._lock:
+            removed = 0
+            while self._errors and self._errors[0]["timestamp"] <= cutoff:
+                self._errors.popleft()
+                removed += 1
+
+            # Cleanup error groups and daily counts with no recent occurrences
+            old_groups = [signature for signature, group in self._groups.items() if group["last_seen"] < cutoff]
+            old_days = [day for day in self._daily_counts if day < cutoff_day]
+            for signature in old_groups:
+                del self._groups[signature]
+            for day in old_days:
+                del self._daily_counts[day]
+
+            if removed or old_groups or old_days:
+                self._dirty = True
 
-        # Cleanup error groups with no recent occurrences
-        groups_to_remove = []
-        for signature, group in self.data["error_groups"].items():
-            if datetime.fromisoformat(group["last_seen"]) < cutoff:
-                groups_to_remove.append(signature)
-
-        for signature in groups_to_remove:
-            del self.data["error_groups"][signature]
-
-        removed = original_count - len(self.data["errors"])
         if removed > 0:
-            self._save_data()
             logger.info(f"Cleaned up {removed} old errors (older than {days_to_keep} days)")
 
         return removed
 
 
+def flush_error_trackers() -> None:
+    """Flush all error trackers to disk (called on shutdown)"""
+    for tracker in list(_trackers):
+        tracker.flush()
+
+
+atexit.register(flush_error_trackers)
+
+
 def track_api_error(
     error_tracker: ErrorTracker,
     exception: Exception,
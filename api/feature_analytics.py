@@ -104,6 +104,21 @@ class FeatureUsageAnalyzer:
     def __init__(self):
         pass
 
+    def analyze_feature_usage_db(self, db, days: int = 30) -> Dict[str, Any]:
+        """
+        Analyze feature usage with the aggregation done in SQLite
+
+        Groups the pre-categorized session_endpoints rows in SQL instead of
+        exporting every session and walking its endpoints_used JSON.
+
+        Args:
+            db: AnalyticsDatabase instance
+            days: Number of days to analyze
+        """
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        usage = db.get_feature_usage(start_date=cutoff.isoformat())
+        return self._build_analysis(usage, days)
+
     def analyze_feature_usage(self, sessions: List[Dict[str, Any]], days: int = 30) -> Dict[str, Any]:
         """
         Analyze feature usage across sessions
@@ -133,37 +148,57 @@ class FeatureUsageAnalyzer:
         cutoff = datetime.utcnow() - timedelta(days=days)
         recent_sessions = [s for s in sessions if datetime.fromisoformat(s["started_at"]) > cutoff]
 
-        if not recent_sessions:
+        # Collapse sessions into the same aggregates get_feature_usage() returns from SQL
+        endpoint_usage = defaultdict(int)
+        user_usage = defaultdict(int)
+        total_users = set()
+        for session in recent_sessions:
+            total_users.add(session["discord_id"])
+            for endpoint, count in session.get("endpoints_used", {}).items():
+                category = categorize_endpoint(endpoint)
+                endpoint_usage[(category, endpoint)] += count
+                user_usage[(category, session["discord_id"], session["username"])] += count
+
+        usage = {
+            "total_users": len(total_users),
+            "endpoint_usage": [(*key, count) for key, count in endpoint_usage.items()],
+            "user_usage": [(*key, count) for key, count in user_usage.items()],
+        }
+        return self._build_analysis(usage, days)
+
+    def _build_analysis(self, usage: Dict[str, Any], days: int) -> Dict[str, Any]:
+        """
+        Build the feature analysis from pre-aggregated usage
+
+        Args:
+            usage: {"total_users": int, "endpoint_usage": [(category, endpoint, uses)],
+                    "user_usage": [(category, discord_id, username, uses)]}
+            days: Number of days analyzed
+        """
+        total_unique_users = usage["total_users"]
+        if not total_unique_users:
             return self._get_empty_analysis()
 
         # Track feature usage
         feature_data = defaultdict(
-            lambda: {"total_uses": 0, "users": set(), "user_counts": defaultdict(int), "endpoints": defaultdict(int)}
+            lambda: {"total_uses": 0, "users": set(), "user_counts": defaultdict(int), "endpoints": {}}
         )
-
-        total_users = set()
+        power_users = defaultdict(lambda: {"features": set(), "total_actions": 0})
         total_actions = 0
 
-        # Process each session
-        for session in recent_sessions:
-            user_id = session["discord_id"]
-            username = session["username"]
-            total_users.add(user_id)
-
-            endpoints_used = session.get("endpoints_used", {})
-            total_actions += sum(endpoints_used.values())
+        for category, endpoint, count in usage["endpoint_usage"]:
+            total_actions += count
+            feature_data[category]["total_uses"] += count
+            feature_data[category]["endpoints"][endpoint] = count
 
-            # Categorize each endpoint
-            for endpoint, count in endpoints_used.items():
-                category = categorize_endpoint(endpoint)
+        for category, user_id, username, count in usage["user_usage"]:
+            feature_data[category]["users"].add(user_id)
+            feature_data[category]["user_counts"][username] += count
 
-                feature_data[category]["total_uses"] += count
-                feature_data[category]["users"].add(user_id)
-                feature_data[category]["user_counts"][username] += count
-                feature_data[category]["endpoints"][endpoint] += count
+            power_users[username]["features"].add(category)
+            power_users[username]["total_actions"] += count
 
         # Calculate metrics
-        total_unique_users = len(total_users)
         features = {}
 
         for category, data in feature_data.items():
@@ -172,8 +207,8 @@ class FeatureUsageAnalyzer:
             adoption_rate = unique_users / total_unique_users if total_unique_users > 0 else 0
             avg_uses = total_uses / unique_users if unique_users > 0 else 0
 
-            # Top users for this feature
-            top_users = sorted(data["user_counts"].items(), key=lambda x: x[1], reverse=True)[:10]
+            # Top users for this feature (ties broken by name for stable output)
+            top_users = sorted(data["user_counts"].items(), key=lambda x: (-x[1], x[0]))[:10]
 
             features[category] = {
                 "total_uses": total_uses,
@@ -181,26 +216,14 @@ class FeatureUsageAnalyzer:
                 "adoption_rate": round(adoption_rate, 3),
                 "avg_uses_per_user": round(avg_uses, 2),
                 "top_users": top_users,
-                "endpoints": dict(data["endpoints"]),
+                "endpoints": dict(sorted(data["endpoints"].items())),
             }
 
         # Feature ranking by total uses
         feature_ranking = sorted(
-            [(name, stats["total_uses"]) for name, stats in features.items()], key=lambda x: x[1], reverse=True
+            [(name, stats["total_uses"]) for name, stats in features.items()], key=lambda x: (-x[1], x[0])
         )
 
-        # Power users analysis
-        power_users = defaultdict(lambda: {"features": set(), "total_actions": 0})
-
-        for session in recent_sessions:
-            username = session["username"]
-            endpoints_used = session.get("endpoints_used", {})
-
-            for endpoint, count in endpoints_used.items():
-                category = categorize_endpoint(endpoint)
-                power_users[username]["features"].add(category)
-                power_users[username]["total_actions"] += count
-
         # Convert to sorted list
         power_users_list = {
             username: {
@@ -213,7 +236,7 @@ class FeatureUsageAnalyzer:
 
         # Sort by total actions
         power_users_sorted = dict(
-            sorted(power_users_list.items(), key=lambda x: x[1]["total_actions"], reverse=True)[:20]
+            sorted(power_users_list.items(), key=lambda x: (-x[1]["total_actions"], x[0]))[:20]
         )  # Top 20 power users
 
         return {
@@ -238,6 +261,12 @@ class FeatureUsageAnalyzer:
             "analysis_date": datetime.utcnow().isoformat(),
         }
 
+    def get_feature_comparison_db(self, db, days1: int = 7, days2: int = 30) -> Dict[str, Any]:
+        """Compare feature usage between two time periods (aggregated in SQLite)"""
+        analysis1 = self.analyze_feature_usage_db(db, days=days1)
+        analysis2 = self.analyze_feature_usage_db(db, days=days2)
+        return self._compare_analyses(analysis1, analysis2, days1, days2)
+
     def get_feature_comparison(self, sessions: List[Dict[str, Any]], days1: int = 7, days2: int = 30) -> Dict[str, Any]:
         """
         Compare feature usage between two time periods
@@ -246,7 +275,12 @@ class FeatureUsageAnalyzer:
         """
         analysis1 = self.analyze_feature_usage(sessions, days=days1)
         analysis2 = self.analyze_feature_usage(sessions, days=days2)
+        return self._compare_analyses(analysis1, analysis2, days1, days2)
 
+    def _compare_analyses(
+        self, analysis1: Dict[str, Any], analysis2: Dict[str, Any], days1: int, days2: int
+    ) -> Dict[str, Any]:
+        """Build growth/decline metrics from two feature analyses"""
         comparison = {}
 
         for feature_name in set(list(analysis1["features"].keys()) + list(analysis2["features"].keys())):
@@ -3,12 +3,13 @@ HazeHub, Cogs, and Content Routes Blueprint
 Handles /api/hazehub/*, /api/cogs/*, /api/memes/*/upvote endpoints
 """
 
-import asyncio
 import traceback
 from pathlib import Path
 
 from flask import Blueprint, jsonify, request
 
+from Utils.LoopBridge import LoopBusyError, get_loop_bridge
+
 # Will be initialized by init_hazehub_cogs_routes()
 Config = None
 logger = None
@@ -262,8 +263,8 @@ def get_latest_memes():
 
             return memes
 
-        # Run async function
-        memes = asyncio.run_coroutine_threadsafe(fetch_memes(), bot.loop).result(timeout=10)
+        # Run on the bot loop (concurrent cache misses share one channel scan)
+        memes = get_loop_bridge(bot.loop).call("hazehub.latest_memes", fetch_memes, key=limit, timeout=10)
 
         if memes is None:
             return jsonify({"error": "Meme channel not found"}), 404
@@ -275,6 +276,8 @@ def get_latest_memes():
 
         return jsonify(result)
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error fetching latest memes: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to fetch memes: {str(e)}"}), 500
@@ -418,8 +421,8 @@ def get_latest_rankups():
 
             return rankups
 
-        # Run async function
-        rankups = asyncio.run_coroutine_threadsafe(fetch_rankups(), bot.loop).result(timeout=10)
+        # Run on the bot loop (concurrent cache misses share one channel scan)
+        rankups = get_loop_bridge(bot.loop).call("hazehub.latest_rankups", fetch_rankups, key=limit, timeout=10)
 
         if rankups is None:
             return jsonify({"error": "Rocket League channel not found"}), 404
@@ -431,6 +434,8 @@ def get_latest_rankups():
 
         return jsonify(result)
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error fetching latest rank-ups: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to fetch rank-ups: {str(e)}"}), 500
@@ -480,9 +485,11 @@ def toggle_upvote_meme(message_id):
                         return False
 
                 try:
-                    has_discord_upvoted = asyncio.run_coroutine_threadsafe(
-                        fetch_discord_user_reacted(), bot.loop
-                    ).result(timeout=5)
+                    has_discord_upvoted = get_loop_bridge(bot.loop).call(
+                        "hazehub.user_reacted", fetch_discord_user_reacted, timeout=5
+                    )
+                except LoopBusyError:
+                    raise  # 503 via the app error handler, never treat as "not upvoted"
                 except Exception:
                     pass
 
@@ -547,6 +554,8 @@ def toggle_upvote_meme(message_id):
             }
         )
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error toggling upvote: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to toggle upvote: {str(e)}"}), 500
@@ -611,9 +620,11 @@ def get_meme_reactions(message_id):
                         return 0, False
 
                 try:
-                    discord_count, has_discord_upvoted = asyncio.run_coroutine_threadsafe(
-                        fetch_discord_reactions_and_user(), bot.loop
-                    ).result(timeout=5.0)
+                    discord_count, has_discord_upvoted = get_loop_bridge(bot.loop).call(
+                        "hazehub.reactions", fetch_discord_reactions_and_user, timeout=5.0
+                    )
+                except LoopBusyError:
+                    raise  # 503 via the app error handler
                 except Exception as e:
                     logger.error(f"Error fetching Discord reactions: {e}")
 
@@ -636,6 +647,8 @@ def get_meme_reactions(message_id):
             }
         )
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error getting meme reactions: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to get reactions: {str(e)}"}), 500
@@ -2,11 +2,15 @@
 Helper functions and utilities for the Flask API
 """
 
+import atexit
 import json
 import logging
-from datetime import datetime, timedelta
+import os
+import threading
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from Utils.FileLock import file_lock
 from Utils.Logger import Logger as logger
 
 # Will be initialized by init_helpers()
@@ -40,22 +44,6 @@ def save_upvotes(upvotes, upvotes_file):
         json.dump(upvotes, f, indent=2)
 
 
-# Community Post Likes storage helpers
-def load_community_post_likes(likes_file):
-    """Load community post likes from file"""
-    if likes_file.exists():
-        with open(likes_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}  # {post_id: [discord_id1, discord_id2, ...]}
-
-
-def save_community_post_likes(likes, likes_file):
-    """Save community post likes to file"""
-    likes_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(likes_file, "w", encoding="utf-8") as f:
-        json.dump(likes, f, indent=2)
-
-
 # App usage tracking helpers
 def load_app_usage(app_usage_file):
     """Load app usage data from file"""
@@ -72,37 +60,167 @@ def save_app_usage(app_usage, app_usage_file):
         json.dump(app_usage, f, indent=2)
 
 
+# Seconds between write-behind flushes of app_usage.json
+APP_USAGE_FLUSH_INTERVAL = 30
+
+
+class AppUsageTracker:
+    """
+    In-memory last-seen table for app users with write-behind persistence.
+
+    Updates only touch the in-memory dict; a background thread flushes the
+    coalesced table to disk every flush_interval seconds (and on shutdown), so
+    disk I/O no longer scales with request count.
+
+    Several processes (the bot, gunicorn API workers) share the file: a flush
+    takes a cross-process file lock, merges the table on disk into memory
+    (newest timestamp per user wins, users pruned here stay pruned) and writes
+    the result back with a temp file + atomic rename. Each process also picks
+    up the other processes' users this way.
+    """
+
+    def __init__(self, app_usage_file, flush_interval=APP_USAGE_FLUSH_INTERVAL):
+        self.app_usage_file = Path(app_usage_file)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._last_seen = self._load()  # {discord_id: aware datetime}
+        self._pruned = {}  # {discord_id: last_seen} pruned since the last flush (not merged back in)
+        self._dirty = False
+        self._synced_mtime = self._file_mtime()
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True, name="AppUsageFlush")
+        self._flush_thread.start()
+
+    def _load(self):
+        """Load and parse the persisted table once (invalid entries are dropped)"""
+        try:
+            raw = load_app_usage(self.app_usage_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not load {self.app_usage_file.name}, starting empty: {e}")
+            return {}
+
+        last_seen = {}
+        for discord_id, last_seen_str in raw.items():
+            try:
+                timestamp = datetime.fromisoformat(last_seen_str)
+            except (ValueError, TypeError):
+                continue
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+            last_seen[discord_id] = timestamp
+        return last_seen
+
+    def _file_mtime(self):
+        try:
+            return self.app_usage_file.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def touch(self, discord_id, timestamp):
+        """Record that a user was seen (memory only, flushed later)"""
+        with self._lock:
+            self._last_seen[discord_id] = timestamp
+            self._dirty = True
+
+    def get_active_users(self, expiry_days, current_time):
+        """Get discord IDs seen within expiry_days, pruning expired entries"""
+        active_users = set()
+        with self._lock:
+            for discord_id, last_seen in list(self._last_seen.items()):
+                if (current_time - last_seen).days <= expiry_days:
+                    active_users.add(discord_id)
+                else:
+                    self._pruned[discord_id] = self._last_seen.pop(discord_id)
+                    self._dirty = True
+        return active_users
+
+    def flush(self):
+        """Merge with the file on disk and write it back if this process changed anything"""
+        try:
+            with file_lock(self.app_usage_file):
+                mtime = self._file_mtime()
+                with self._lock:
+                    if not self._dirty and mtime == self._synced_mtime:
+                        return False
+                on_disk = self._load() if mtime is not None else {}
+
+                with self._lock:
+                    for discord_id, timestamp in on_disk.items():
+                        pruned = self._pruned.get(discord_id)
+                        if pruned is not None and timestamp <= pruned:
+                            continue
+                        current = self._last_seen.get(discord_id)
+                        if current is None or timestamp > current:
+                            self._last_seen[discord_id] = timestamp
+                    dirty, pruned = self._dirty, self._pruned
+                    snapshot = {discord_id: ts.isoformat() for discord_id, ts in self._last_seen.items()}
+                    self._dirty, self._pruned = False, {}
+
+                try:
+                    if dirty:
+                        self.app_usage_file.parent.mkdir(parents=True, exist_ok=True)
+                        tmp_file = self.app_usage_file.with_name(f"{self.app_usage_file.name}.{os.getpid()}.tmp")
+                        with open(tmp_file, "w", encoding="utf-8") as f:
+                            json.dump(snapshot, f, indent=2)
+                        os.replace(tmp_file, self.app_usage_file)
+                except OSError:
+                    with self._lock:
+                        self._dirty = True
+                        self._pruned = {**pruned, **self._pruned}
+                    raise
+                self._synced_mtime = self._file_mtime()
+                return dirty
+        except OSError as e:
+            logger.error(f"❌ Failed to flush app usage: {e}")
+            with self._lock:
+                self._dirty = True
+            return False
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def shutdown(self):
+        """Stop the background flusher and persist pending updates"""
+        self._stop_event.set()
+        self.flush()
+
+
+_app_usage_trackers = {}  # {resolved app_usage_file path: AppUsageTracker}
+_app_usage_trackers_lock = threading.Lock()
+
+
+def get_app_usage_tracker(app_usage_file):
+    """Get (or lazily create) the shared tracker for an app_usage.json file"""
+    key = str(Path(app_usage_file).resolve())
+    tracker = _app_usage_trackers.get(key)
+    if tracker is None:
+        with _app_usage_trackers_lock:
+            tracker = _app_usage_trackers.get(key)
+            if tracker is None:
+                tracker = AppUsageTracker(app_usage_file)
+                _app_usage_trackers[key] = tracker
+    return tracker
+
+
+def flush_app_usage():
+    """Flush all app usage trackers to disk (called on shutdown)"""
+    for tracker in list(_app_usage_trackers.values()):
+        tracker.flush()
+
+
+atexit.register(flush_app_usage)
+
+
 def update_app_usage(discord_id, app_usage_file, Config):
     """Update last seen timestamp for a user"""
     if discord_id and discord_id not in ["legacy_user", "unknown"]:
-        app_usage = load_app_usage(app_usage_file)
-        app_usage[discord_id] = Config.get_utc_now().isoformat()
-        save_app_usage(app_usage, app_usage_file)
+        get_app_usage_tracker(app_usage_file).touch(discord_id, Config.get_utc_now())
 
 
 def get_active_app_users(app_usage_file, app_usage_expiry_days, Config):
     """Get list of discord IDs who have used the app within the expiry period"""
-    app_usage = load_app_usage(app_usage_file)
-    current_time = Config.get_utc_now()
-    active_users = set()
-
-    for discord_id, last_seen_str in list(app_usage.items()):
-        try:
-            last_seen = datetime.fromisoformat(last_seen_str)
-            days_inactive = (current_time - last_seen).days
-
-            if days_inactive <= app_usage_expiry_days:
-                active_users.add(discord_id)
-            else:
-                # Clean up old entries
-                del app_usage[discord_id]
-        except (ValueError, TypeError):
-            # Invalid timestamp, remove it
-            del app_usage[discord_id]
-
-    # Save cleaned up data
-    save_app_usage(app_usage, app_usage_file)
-    return active_users
+    return get_app_usage_tracker(app_usage_file).get_active_users(app_usage_expiry_days, Config.get_utc_now())
 
 
 # Audit logging
@@ -0,0 +1,360 @@
+"""
+Disk-backed LRU cache for proxied images (/api/proxy/image)
+
+- Entries are stored under Data/image_cache/<sha256(url)> with a small JSON sidecar
+  (url, content type, ETag, Last-Modified, size, fetch time)
+- Total size is capped (IMAGE_CACHE_MAX_BYTES); least recently used entries are evicted
+- Entries older than IMAGE_CACHE_FRESH_SECONDS are revalidated upstream with
+  If-None-Match / If-Modified-Since, a 304 keeps the cached bytes
+- Concurrent misses for the same URL share one upstream fetch
+- pinned() keeps an entry from being evicted while its file is being served
+- Hit ratio and bytes saved are reported through APICache.get_stats()
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+
+from Utils.LoopBridge import wait_for
+
+# Byte cap for all cached images together
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Refuse to cache (or proxy) single images larger than this
+IMAGE_CACHE_MAX_ENTRY_BYTES = 25 * 1024 * 1024
+
+# Serve cached bytes without asking upstream for this long
+IMAGE_CACHE_FRESH_SECONDS = 6 * 3600
+
+# Upstream request timeout (seconds)
+UPSTREAM_TIMEOUT = 10
+
+# Attempts to pin an entry that keeps getting evicted before it can be served
+_PIN_ATTEMPTS = 3
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class ImageTooLargeError(Exception):
+    """Upstream image exceeds IMAGE_CACHE_MAX_ENTRY_BYTES"""
+
+
+class ImageCache:
+    """Content-addressed on-disk image cache with LRU eviction and conditional revalidation"""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+        fresh_seconds: int = IMAGE_CACHE_FRESH_SECONDS,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # key -> metadata, LRU order
+        self._total_bytes = 0
+        self._inflight: Dict[str, Future] = {}  # key -> pending upstream fetch
+        self._pins: Dict[str, int] = {}  # key -> requests serving the file (never evicted)
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "errors": 0,
+            "bytes_served_from_cache": 0,
+            "bytes_fetched": 0,
+        }
+        self._load_index()
+
+    # ==================== Index ====================
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from disk (least recently used first by file mtime)"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for meta_path in self.cache_dir.glob("*.json"):
+            key = meta_path.stem
+            data_path = self.path_for(key)
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                meta["size"] = data_path.stat().st_size
+                entries.append((data_path.stat().st_mtime, key, meta))
+            except (OSError, ValueError):
+                self._remove_files(key)
+        for _, key, meta in sorted(entries, key=lambda e: e[0]):
+            self._entries[key] = meta
+            self._total_bytes += meta["size"]
+        # Leftover temp files from interrupted fetches
+        for tmp_path in self.cache_dir.glob("*.tmp"):
+            tmp_path.unlink(missing_ok=True)
+        self._evict()
+
+    def _remove_files(self, key: str) -> None:
+        for path in (self.path_for(key), self._meta_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        """Drop least recently used unpinned entries until under the byte cap (caller holds the lock or is __init__)"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if self._pins.get(key):
+                continue
+            meta = self._entries.pop(key)
+            self._total_bytes -= meta["size"]
+            self._stats["evictions"] += 1
+            self._remove_files(key)
+
+    def _store(self, key: str, meta: Dict[str, Any]) -> None:
+        with open(self._meta_path(key), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._total_bytes -= old["size"]
+            self._entries[key] = meta
+            self._total_bytes += meta["size"]
+            self._evict()
+
+    # ==================== Fetching ====================
+
+    def get(self, url: str) -> Dict[str, Any]:
+        """
+        Get a cached image, fetching or revalidating upstream if needed
+
+        Returns:
+            Dict with "path", "content_type", "size"
+
+        Raises:
+            requests.exceptions.RequestException: Upstream failed and nothing usable is cached
+            ImageTooLargeError: Upstream image exceeds IMAGE_CACHE_MAX_ENTRY_BYTES
+        """
+        key = self.key_for(url)
+        with self._lock:
+            meta = self._entries.get(key)
+            if meta and time.time() - meta["fetched_at"] < self.fresh_seconds:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["bytes_served_from_cache"] += meta["size"]
+                return self._result(key, meta)
+
+            # Single-flight: join an in-progress fetch for the same URL
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            try:
+                meta = wait_for(future, UPSTREAM_TIMEOUT * 3)
+            except FutureTimeoutError:
+                raise requests.exceptions.Timeout(f"Timed out waiting for the in-flight fetch of {url}")
+            with self._lock:
+                self._stats["bytes_served_from_cache"] += meta["size"]
+            return self._result(key, meta)
+
+        try:
+            meta = self._fetch(url, key, meta)
+            future.set_result(meta)
+            return self._result(key, meta)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _fetch(self, url: str, key: str, cached: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fetch from upstream (conditional if we have a stale copy)"""
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = requests.get(url, timeout=UPSTREAM_TIMEOUT, stream=True, headers=headers)
+            with response:
+                if cached and response.status_code == 304:
+                    with self._lock:
+                        # Evicted while revalidating: the bytes are gone, fetch them again
+                        revalidated = key in self._entries
+                        if revalidated:
+                            cached = dict(cached, fetched_at=time.time())
+                            self._entries[key] = cached
+                            self._entries.move_to_end(key)
+                            self._stats["revalidated"] += 1
+                            self._stats["bytes_served_from_cache"] += cached["size"]
+                    if not revalidated:
+                        return self._fetch(url, key, None)
+                    with open(self._meta_path(key), "w", encoding="utf-8") as f:
+                        json.dump(cached, f)
+                    try:
+                        os.utime(self.path_for(key))
+                    except FileNotFoundError:
+                        pass  # evicted right after revalidating; served entries are pinned
+                    return cached
+
+                response.raise_for_status()
+                declared = int(response.headers.get("Content-Length") or 0)
+                if declared > IMAGE_CACHE_MAX_ENTRY_BYTES:
+                    raise ImageTooLargeError(url)
+
+                # Stream to a temp file, then atomically move into place
+                tmp_path = self.cache_dir / f"{key}.{threading.get_ident()}.tmp"
+                size = 0
+                try:
+                    with open(tmp_path, "wb") as f:
+                        for chunk in response.iter_content(_CHUNK_SIZE):
+                            size += len(chunk)
+                            if size > IMAGE_CACHE_MAX_ENTRY_BYTES:
+                                raise ImageTooLargeError(url)
+                            f.write(chunk)
+                    os.replace(tmp_path, self.path_for(key))
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+
+                meta = {
+                    "url": url,
+                    "content_type": response.headers.get("Content-Type", "image/jpeg"),
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "size": size,
+                    "fetched_at": time.time(),
+                }
+                self._store(key, meta)
+                with self._lock:
+                    self._stats["misses"] += 1
+                    self._stats["bytes_fetched"] += size
+                return meta
+
+        except requests.exceptions.RequestException:
+            with self._lock:
+                self._stats["errors"] += 1
+                # Upstream down: a stale copy is better than nothing
+                if cached and key in self._entries:
+                    self._stats["hits"] += 1
+                    self._stats["bytes_served_from_cache"] += cached["size"]
+                    return cached
+            raise
+
+    @contextmanager
+    def pinned(self, url: str) -> Iterator[Dict[str, Any]]:
+        """
+        get() an image and keep its file on disk until the block exits
+
+        Serve the file inside the block; without the pin a concurrent eviction
+        could unlink it between get() returning and the file being opened.
+
+        Raises:
+            Same as get(); FileNotFoundError if the entry was evicted before it
+            could be pinned on every attempt
+        """
+        for _ in range(_PIN_ATTEMPTS):
+            result = self.get(url)
+            key = result["key"]
+            with self._lock:
+                # Files are only removed together with their index entry, so a listed entry has its file
+                if key in self._entries:
+                    self._pins[key] = self._pins.get(key, 0) + 1
+                    break
+        else:
+            raise FileNotFoundError(f"Cached image for {url} was evicted before it could be served")
+
+        try:
+            yield result
+        finally:
+            with self._lock:
+                self._pins[key] -= 1
+                if not self._pins[key]:
+                    del self._pins[key]
+                    self._evict()  # pinned entries may have kept the cache over its cap
+
+    def _result(self, key: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "key": key,
+            "path": str(self.path_for(key)),
+            "content_type": meta["content_type"],
+            "size": meta["size"],
+        }
+
+    # ==================== Stats ====================
+
+    def get_stats(self) -> dict:
+        """Hit ratio, bytes saved and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+            total_bytes = self._total_bytes
+        served_from_cache = stats["hits"] + stats["revalidated"] + stats["coalesced"]
+        total_requests = served_from_cache + stats["misses"]
+        hit_rate = (served_from_cache / total_requests * 100) if total_requests > 0 else 0
+        return {
+            **stats,
+            "total_requests": total_requests,
+            "hit_rate": round(hit_rate, 2),
+            "bytes_saved": stats["bytes_served_from_cache"],
+            "entries": entries,
+            "size_bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self) -> int:
+        """Remove every cached image that is not being served, return count removed"""
+        with self._lock:
+            keys = [key for key in self._entries if not self._pins.get(key)]
+            for key in keys:
+                self._total_bytes -= self._entries.pop(key)["size"]
+                self._remove_files(key)
+        return len(keys)
+
+
+_image_cache = None
+_image_cache_lock = threading.Lock()
+
+
+def get_image_cache(data_dir: str) -> ImageCache:
+    """Get (or lazily create) the shared image cache under data_dir/image_cache"""
+    global _image_cache
+    if _image_cache is None:
+        with _image_cache_lock:
+            if _image_cache is None:
+                _image_cache = ImageCache(Path(data_dir) / "image_cache")
+    return _image_cache
+
+
+def get_image_cache_stats() -> Optional[dict]:
+    """Stats for the shared cache (None until the first proxied image)"""
+    return _image_cache.get_stats() if _image_cache is not None else None
@@ -0,0 +1,246 @@
+"""
+Pre-rendered image variants for community posts (/api/community_posts/images/<post_id>)
+
+- Variants are keyed by (post_id, source image, width bucket, quality, format) and
+  stored under Data/community_posts_variants/<post_id>/<source_id>/
+- Requested widths are rounded up to a fixed set of buckets so clients can't
+  create unbounded variants
+- Downloading the original and all PIL work (decode, alpha flatten, resize,
+  encode) runs in a small process pool, never in the Flask/gevent worker
+- Common variants are rendered eagerly when a post image is created or changed,
+  anything else lazily on first request; afterwards variants are plain files
+"""
+
+import hashlib
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+from Utils.LoopBridge import wait_for
+
+# Output widths; requested widths are rounded up to the next bucket
+VARIANT_WIDTHS = (160, 320, 400, 480, 640, 800, 1080, 1280, 1600, 1920)
+
+# Rendered as soon as a post image is known (API defaults + thumbnail)
+PRERENDER_VARIANTS = ((800, 80, "jpeg"), (400, 60, "jpeg"))
+
+# Resize worker processes
+RESIZE_WORKERS = 2
+
+# Seconds to wait for a lazily rendered variant (includes downloading the original)
+RENDER_TIMEOUT = 30
+
+
+class SourceFetchError(Exception):
+    """The original image could not be downloaded (or the upload is gone)"""
+
+
+_EXTENSIONS = {"jpeg": "jpg", "webp": "webp"}
+_MIMETYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+def width_bucket(width: int) -> int:
+    """Smallest bucket >= width (capped at the largest)"""
+    for bucket in VARIANT_WIDTHS:
+        if width <= bucket:
+            return bucket
+    return VARIANT_WIDTHS[-1]
+
+
+def normalize_format(output_format: str) -> str:
+    return "webp" if output_format == "webp" else "jpeg"
+
+
+def mimetype_for(output_format: str) -> str:
+    return _MIMETYPES[output_format]
+
+
+def source_id(image_url: str) -> str:
+    """Stable id for a post's source image (Discord CDN signature params are ignored)"""
+    parts = urlsplit(image_url)
+    identity = f"{parts.netloc}{parts.path}" if parts.scheme else image_url
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+
+
+def variant_filename(width: int, quality: int, output_format: str) -> str:
+    return f"w{width}_q{quality}.{_EXTENSIONS[output_format]}"
+
+
+# ==================== Worker side (runs in the resize processes) ====================
+
+
+def _fetch_original(source: str, original_path: Path) -> None:
+    """Download (or copy, for local uploads) the original image"""
+    tmp_path = original_path.with_name(f"original.{os.getpid()}.tmp")
+    try:
+        if urlsplit(source).scheme in ("http", "https"):
+            import requests
+
+            with requests.get(source, timeout=15, stream=True) as response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    for chunk in response.iter_content(64 * 1024):
+                        f.write(chunk)
+        else:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, original_path)
+    except Exception as e:
+        raise SourceFetchError(f"{source}: {e}") from None
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _render(original_path: Path, dst_path: Path, width: int, quality: int, output_format: str) -> None:
+    """Decode, flatten alpha onto white, downscale and encode one variant"""
+    from PIL import Image
+
+    with Image.open(original_path) as img:
+        # Convert to RGB if needed (PNG with transparency)
+        if img.mode in ("RGBA", "LA", "P"):
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            if img.mode == "P":
+                img = img.convert("RGBA")
+            if img.mode in ("RGBA", "LA"):
+                background.paste(img, mask=img.split()[-1])
+            else:
+                background.paste(img)
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+
+        # Resize if image is larger than requested width
+        if img.width > width:
+            aspect_ratio = img.height / img.width
+            new_height = int(width * aspect_ratio)
+            img = img.resize((width, new_height), Image.Resampling.LANCZOS)
+
+        tmp_path = dst_path.with_name(f"{dst_path.name}.{os.getpid()}.tmp")
+        if output_format == "webp":
+            img.save(tmp_path, format="WEBP", quality=quality, method=6)
+        else:
+            img.save(tmp_path, format="JPEG", quality=quality, optimize=True)
+        os.replace(tmp_path, dst_path)
+
+
+def render_variants(source: str, post_dir: str, src_id: str, variants: Iterable[Tuple[int, int, str]]) -> None:
+    """
+    Render variants for one post image (process pool entry point)
+
+    Args:
+        source: Image URL or local file path of the original
+        post_dir: Variant directory of the post
+        src_id: source_id() of the image
+        variants: (width bucket, quality, format) tuples
+    """
+    post_path = Path(post_dir)
+    src_dir = post_path / src_id
+    src_dir.mkdir(parents=True, exist_ok=True)
+
+    original_path = src_dir / "original"
+    if not original_path.exists():
+        _fetch_original(source, original_path)
+
+    for width, quality, output_format in variants:
+        dst_path = src_dir / variant_filename(width, quality, output_format)
+        if not dst_path.exists():
+            _render(original_path, dst_path, width, quality, output_format)
+
+    # The post's image changed: variants of the previous one are unreachable now
+    for sibling in post_path.iterdir():
+        if sibling.name != src_id:
+            shutil.rmtree(sibling, ignore_errors=True)
+
+
+# ==================== Server side ====================
+
+
+class VariantRenderer:
+    """Looks up variants on disk and renders missing ones in the resize process pool"""
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+        self._lock = threading.Lock()
+        self._executor_lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, Future] = {}  # variant path -> pending render
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn: workers don't inherit the bot's threads/event loop
+                self._executor = ProcessPoolExecutor(
+                    max_workers=RESIZE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def post_dir(self, post_id: int) -> Path:
+        return self.base_dir / str(post_id)
+
+    def variant_path(self, post_id: int, image_url: str, width: int, quality: int, output_format: str) -> Path:
+        return self.post_dir(post_id) / source_id(image_url) / variant_filename(width, quality, output_format)
+
+    def _submit(self, post_id: int, image_url: str, source: str, variants) -> Future:
+        return self._get_executor().submit(
+            render_variants, source, str(self.post_dir(post_id)), source_id(image_url), tuple(variants)
+        )
+
+    def get(self, post_id: int, image_url: str, source: str, width: int, quality: int, output_format: str) -> Path:
+        """
+        Path of a rendered variant, rendering it first if needed
+
+        Args:
+            image_url: Stored image_url of the post (identifies the source image)
+            source: Where to fetch the original from (fresh Discord URL or local path)
+
+        Raises:
+            SourceFetchError: The original could not be fetched
+            concurrent.futures.TimeoutError: Rendering took longer than RENDER_TIMEOUT
+        """
+        path = self.variant_path(post_id, image_url, width, quality, output_format)
+        if path.exists():
+            return path
+
+        key = str(path)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._submit(post_id, image_url, source, [(width, quality, output_format)])
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        wait_for(future, RENDER_TIMEOUT)
+        return path
+
+    def prerender(self, post_id: int, image_url: str, source: str, logger=None) -> None:
+        """Render PRERENDER_VARIANTS in the background (fire and forget)"""
+
+        def _done(future: Future) -> None:
+            error = future.exception()
+            if error and logger:
+                logger.warning(f"⚠️ Pre-rendering image variants for post {post_id} failed: {error}")
+
+        self._submit(post_id, image_url, source, PRERENDER_VARIANTS).add_done_callback(_done)
+
+    def drop_post(self, post_id: int) -> None:
+        """Remove all variants of a post"""
+        shutil.rmtree(self.post_dir(post_id), ignore_errors=True)
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_variant_renderer(data_dir: str) -> VariantRenderer:
+    """Get (or lazily create) the shared renderer for data_dir/community_posts_variants"""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = VariantRenderer(Path(data_dir) / "community_posts_variants")
+    return _renderer
@@ -7,6 +7,8 @@ Provides XP tracking for API endpoints (used by Flutter app)
 import logging
 from typing import Optional
 
+from Utils.LoopBridge import get_loop_bridge
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,14 +37,10 @@ def award_xp_from_api(bot, user_id: str, username: str, xp_type: str, amount: in
             logger.warning("⚠️ LevelSystem cog not loaded")
             return None
 
-        # Use bot's event loop to run async function
-        import asyncio
-
-        loop = bot.loop
-
-        future = asyncio.run_coroutine_threadsafe(level_cog.add_xp(user_id, username, xp_type, amount), loop)
-
-        result = future.result(timeout=5)
+        # Run on the bot's event loop
+        result = get_loop_bridge(bot.loop).call(
+            "levels.add_xp", level_cog.add_xp, user_id, username, xp_type, amount, timeout=5
+        )
 
         if result and result.get("leveled_up"):
             logger.info(f"🎉 {username} leveled up to {result['level']} via API!")
@@ -90,13 +88,9 @@ def award_xp_with_cooldown(
             level_cog._update_meme_fetch_cooldown(user_id)
 
         # Award XP (same as award_xp_from_api)
-        import asyncio
-
-        loop = bot.loop
-
-        future = asyncio.run_coroutine_threadsafe(level_cog.add_xp(user_id, username, xp_type), loop)
-
-        result = future.result(timeout=5)
+        result = get_loop_bridge(bot.loop).call(
+            "levels.add_xp", level_cog.add_xp, user_id, username, xp_type, timeout=5
+        )
 
         if result and result.get("leveled_up"):
             logger.info(f"🎉 {username} leveled up to {result['level']} via API!")
@@ -3,13 +3,14 @@ Meme Routes Blueprint
 Handles all /api/meme* and /api/daily-meme* endpoints for meme generation and management
 """
 
-import asyncio
-import json
-import os
 import traceback
 
 import requests
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, send_file
+
+from api.cache import cache
+from api.image_cache import ImageTooLargeError, get_image_cache, get_image_cache_stats
+from Utils.LoopBridge import LoopBusyError, get_loop_bridge
 
 # Will be initialized by init_meme_routes()
 Config = None
@@ -40,6 +41,9 @@ def init_meme_routes(app, config, log, auth_module):
     require_permission = auth_module.require_permission
     log_config_action = auth_module.log_config_action
 
+    # Report image proxy cache stats on /api/admin/cache/stats
+    cache.register_stats_provider("image_proxy", get_image_cache_stats)
+
     # Register blueprint WITHOUT decorators first
     app.register_blueprint(meme_bp)
 
@@ -66,39 +70,22 @@ def init_meme_routes(app, config, log, auth_module):
 # ===== ACTIVITY TRACKING HELPER =====
 
 
-def increment_activity_counter(file_name: str, user_id: str) -> None:
+def increment_activity_counter(counter: str, user_id: str) -> None:
     """
-    Thread-safe increment counter in JSON file for user activity tracking
+    Increment a user's activity counter (shared store, flushed in the background)
 
     Args:
-        file_name: Name of JSON file (e.g., 'memes_generated.json')
+        counter: Counter name (e.g., 'memes_generated', 'meme_requests')
         user_id: Discord user ID as string
     """
     try:
-        # Get data directory from Config
-        data_dir = Config.get_data_dir()
-        file_path = os.path.join(data_dir, file_name)
-
-        # Load existing data
-        data = {}
-        if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-        # Increment counter for user
-        data[user_id] = data.get(user_id, 0) + 1
+        from Utils.ActivityStore import get_activity_store
 
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-        # Save updated data
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
-
-        logger.info(f"✅ Activity tracked for user {user_id} in {file_name}: {data[user_id]} total")
+        get_activity_store().increment(counter, user_id)
+        logger.info(f"✅ Activity tracked for user {user_id} in {counter}")
 
     except Exception as e:
-        logger.error(f"❌ Failed to track activity in {file_name} for user {user_id}: {e}")
+        logger.error(f"❌ Failed to track activity in {counter} for user {user_id}: {e}")
 
 
 # ===== MEME SOURCES =====
@@ -163,12 +150,11 @@ def get_meme_templates():
                 503,
             )
 
-        loop = bot.loop
+        bridge = get_loop_bridge(bot.loop)
 
         # Ensure templates are loaded
         if not meme_gen_cog.templates:
-            future = asyncio.run_coroutine_threadsafe(meme_gen_cog.fetch_templates(), loop)
-            future.result(timeout=10)
+            bridge.call("memes.templates", meme_gen_cog.fetch_templates, key="templates", timeout=10)
 
         templates = meme_gen_cog.templates
 
@@ -181,6 +167,8 @@ def get_meme_templates():
             }
         )
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to get templates: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -199,11 +187,12 @@ def refresh_meme_templates():
         if not meme_gen_cog:
             return jsonify({"error": "MemeGenerator cog not loaded"}), 503
 
-        loop = bot.loop
+        bridge = get_loop_bridge(bot.loop)
 
         # Force fetch new templates
-        future = asyncio.run_coroutine_threadsafe(meme_gen_cog.fetch_templates(force=True), loop)
-        templates = future.result(timeout=10)
+        templates = bridge.call(
+            "memes.templates_refresh", meme_gen_cog.fetch_templates, force=True, key="templates", timeout=10
+        )
 
         return jsonify(
             {
@@ -214,6 +203,8 @@ def refresh_meme_templates():
             }
         )
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to refresh templates: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -239,20 +230,33 @@ def generate_meme():
         if not meme_gen_cog:
             return jsonify({"error": "MemeGenerator cog not loaded"}), 503
 
-        loop = bot.loop
+        bridge = get_loop_bridge(bot.loop)
 
         # Generate meme based on text count
         if len(texts) <= 2:
             # Simple meme with top/bottom text
             text0 = texts[0] if len(texts) > 0 else ""
             text1 = texts[1] if len(texts) > 1 else ""
-            future = asyncio.run_coroutine_threadsafe(meme_gen_cog.create_meme(template_id, text0, text1), loop)
+            meme_url = bridge.call(
+                "memes.generate",
+                meme_gen_cog.create_meme,
+                template_id,
+                text0,
+                text1,
+                key=(template_id, text0, text1),
+                timeout=15,
+            )
         else:
             # Advanced meme with multiple text boxes
             text_params = {f"text{i}": text for i, text in enumerate(texts)}
-            future = asyncio.run_coroutine_threadsafe(meme_gen_cog.create_meme_advanced(template_id, text_params), loop)
-
-        meme_url = future.result(timeout=15)
+            meme_url = bridge.call(
+                "memes.generate_advanced",
+                meme_gen_cog.create_meme_advanced,
+                template_id,
+                text_params,
+                key=(template_id, tuple(texts)),
+                timeout=15,
+            )
 
         if not meme_url:
             return jsonify({"error": "Failed to generate meme"}), 500
@@ -270,6 +274,8 @@ def generate_meme():
 
         return jsonify({"success": True, "url": meme_url})
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to generate meme: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -303,7 +309,7 @@ def post_generated_meme_to_discord():
         if not channel:
             return jsonify({"error": f"Meme channel {meme_channel_id} not found"}), 404
 
-        loop = bot.loop
+        bridge = get_loop_bridge(bot.loop)
 
         # Get Discord user from JWT token
         discord_id = request.discord_id
@@ -345,8 +351,7 @@ def post_generated_meme_to_discord():
             else:
                 await channel.send("🎨 New custom meme generated!", embed=embed)
 
-        future = asyncio.run_coroutine_threadsafe(post_meme(), loop)
-        future.result(timeout=30)
+        bridge.call("memes.post_generated", post_meme, timeout=30)
 
         # Award XP for posting generated meme (8 XP) - NEW
         from api.level_helpers import award_xp_from_api
@@ -363,7 +368,7 @@ def post_generated_meme_to_discord():
         # Track meme generation activity
         discord_id = request.discord_id
         if discord_id and discord_id not in ["legacy_user", "unknown"]:
-            increment_activity_counter("memes_generated.json", str(discord_id))
+            increment_activity_counter("memes_generated", str(discord_id))
 
         return jsonify(
             {
@@ -373,6 +378,8 @@ def post_generated_meme_to_discord():
             }
         )
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to post meme to Discord: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -516,7 +523,6 @@ def proxy_image():
     """Proxy external images to bypass CORS restrictions"""
     try:
         from urllib.parse import urlparse
-        from flask import current_app
 
         # Get the image URL from query parameter
         image_url = request.args.get("url")
@@ -538,23 +544,22 @@ def proxy_image():
         if not any(domain in parsed_url.netloc for domain in allowed_domains):
             return jsonify({"error": "URL domain not allowed"}), 403
 
-        # Fetch the image
-        response = requests.get(image_url, timeout=10, stream=True)
-        response.raise_for_status()
-
-        # Get content type
-        content_type = response.headers.get("Content-Type", "image/jpeg")
-
-        # Return the image with proper CORS headers
-        return current_app.response_class(
-            response.content,
-            mimetype=content_type,
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Cache-Control": "public, max-age=86400",  # Cache for 24 hours
-            },
-        )
+        # Serve from the disk cache (fetches/revalidates upstream only when needed);
+        # the pin keeps the file from being evicted until send_file has opened it
+        with get_image_cache(Config.DATA_DIR).pinned(image_url) as cached:
+            # Return the image with proper CORS headers
+            response = send_file(
+                cached["path"],
+                mimetype=cached["content_type"],
+                max_age=86400,  # Cache for 24 hours
+                conditional=True,
+            )
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        response.headers["Cache-Control"] = "public, max-age=86400"
+        return response
 
+    except ImageTooLargeError:
+        return jsonify({"error": "Image too large"}), 413
     except requests.exceptions.Timeout:
         return jsonify({"error": "Image request timed out"}), 504
     except requests.exceptions.RequestException as e:
@@ -592,7 +597,7 @@ def test_meme_from_source():
             return jsonify({"error": "DailyMeme cog not loaded"}), 503
 
         # Use the bot's existing event loop
-        loop = bot.loop
+        bridge = get_loop_bridge(bot.loop)
 
         # Determine if it's Lemmy or Reddit
         if "@" in source:
@@ -608,11 +613,9 @@ def test_meme_from_source():
                 ), 400
 
             # Fetch from Lemmy
-            future = asyncio.run_coroutine_threadsafe(
-                daily_meme_cog.fetch_lemmy_meme(lemmy_source),
-                loop,
+            memes = bridge.call(
+                "memes.lemmy", daily_meme_cog.fetch_lemmy_meme, lemmy_source, key=lemmy_source, timeout=30
             )
-            memes = future.result(timeout=30)
             source_display = lemmy_source
             source_type = "lemmy"
 
@@ -633,11 +636,7 @@ def test_meme_from_source():
                 ), 400
 
             # Fetch from Reddit
-            future = asyncio.run_coroutine_threadsafe(
-                daily_meme_cog.fetch_reddit_meme(subreddit),
-                loop,
-            )
-            memes = future.result(timeout=30)
+            memes = bridge.call("memes.reddit", daily_meme_cog.fetch_reddit_meme, subreddit, key=subreddit, timeout=30)
             source_display = f"r/{subreddit}"
             source_type = "reddit"
 
@@ -679,6 +678,8 @@ def test_meme_from_source():
             }
         )
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to fetch meme: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -700,22 +701,19 @@ def test_random_meme():
             return jsonify({"error": "DailyMeme cog not loaded"}), 503
 
         # Use the bot's existing event loop instead of creating a new one
-        loop = bot.loop
-
-        # Create a future and schedule it on the bot's loop
-        future = asyncio.run_coroutine_threadsafe(
-            daily_meme_cog.get_daily_meme(
-                allow_nsfw=False,  # Don't allow NSFW for admin panel
-                max_sources=3,  # Fetch from 3 sources for speed
-                min_score=50,  # Lower threshold for testing
-                pool_size=25,  # Smaller pool for speed
-            ),
-            loop,
+        bridge = get_loop_bridge(bot.loop)
+
+        # Run on the bot's loop and wait for the result
+        meme = bridge.call(
+            "memes.random",
+            daily_meme_cog.get_daily_meme,
+            allow_nsfw=False,  # Don't allow NSFW for admin panel
+            max_sources=3,  # Fetch from 3 sources for speed
+            min_score=50,  # Lower threshold for testing
+            pool_size=25,  # Smaller pool for speed
+            timeout=30,
         )
 
-        # Wait for result with timeout
-        meme = future.result(timeout=30)
-
         if meme:
             # Award XP for random meme fetch with cooldown (2 XP, 30s cooldown)
             from api.level_helpers import award_xp_with_cooldown
@@ -749,6 +747,8 @@ def test_random_meme():
         else:
             return jsonify({"error": "No suitable memes found"}), 404
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to get random meme: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -770,13 +770,10 @@ def test_daily_meme():
             return jsonify({"error": "DailyMeme cog not loaded"}), 503
 
         # Use the bot's existing event loop
-        loop = bot.loop
-
-        # Call the actual daily meme task function
-        future = asyncio.run_coroutine_threadsafe(daily_meme_cog.daily_meme_task(), loop)
+        bridge = get_loop_bridge(bot.loop)
 
-        # Wait for result with timeout
-        future.result(timeout=30)
+        # Call the actual daily meme task function (concurrent triggers post once)
+        bridge.call("memes.daily_post", daily_meme_cog.daily_meme_task, key="daily", timeout=30)
 
         return jsonify(
             {
@@ -786,6 +783,8 @@ def test_daily_meme():
             }
         )
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to post daily meme: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -828,7 +827,7 @@ def send_meme_to_discord():
             return jsonify({"error": f"Meme channel {meme_channel_id} not found"}), 404
 
         # Use the bot's existing event loop
-        loop = bot.loop
+        bridge = get_loop_bridge(bot.loop)
 
         # Post the meme to Discord with custom message
         async def post_meme():
@@ -872,8 +871,7 @@ def send_meme_to_discord():
 
             await channel.send(message_text, embed=embed)
 
-        future = asyncio.run_coroutine_threadsafe(post_meme(), loop)
-        future.result(timeout=30)
+        bridge.call("memes.post_fetched", post_meme, timeout=30)
 
         # Award XP for posting fetched meme (5 XP) - NEW
         from api.level_helpers import award_xp_from_api
@@ -889,9 +887,11 @@ def send_meme_to_discord():
 
         # Track meme request activity
         if discord_id and discord_id not in ["legacy_user", "unknown"]:
-            increment_activity_counter("meme_requests.json", str(discord_id))
+            increment_activity_counter("meme_requests", str(discord_id))
 
         return jsonify({"success": True, "message": "Meme sent to Discord successfully", "channel_id": meme_channel_id})
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to send meme to Discord: {str(e)}", "details": traceback.format_exc()}), 500
@@ -65,7 +65,7 @@ async def get_monitoring_status():
 
                 # Get JSON data (API endpoint returns JSON directly)
                 base_data = await resp.json()
-                logger.debug(f"Received base data from Uptime Kuma: {list(base_data.keys())}")
+                logger.debug("Received base data from Uptime Kuma: %s", base_data.keys())
 
             # Fetch heartbeat data (real uptime, ping, status)
             heartbeat_url = UPTIME_KUMA_URL.replace("/status-page/", "/status-page/heartbeat/")
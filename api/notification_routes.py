@@ -309,133 +309,21 @@ def register_socketio_handlers(socketio_instance):
         else:
             logger.debug(f"🎫 JOIN | Client: {request.sid} | Room: {room} | No user_id provided")
 
-        # ✅ FIX: Check cache first before fetching from Discord
-        from Utils.CacheUtils import cache_instance as cache
-
-        cache_key = f"ticket:messages:{ticket_id}"
-        cached_messages = cache.get(cache_key)
-
-        if cached_messages is not None:
-            logger.debug(f"✅ Serving {len(cached_messages)} message(s) from cache (WebSocket join_ticket)")
-            emit("message_history", {"ticket_id": ticket_id, "messages": cached_messages})
-            return
-
-        # Send recent message history to newly joined client (only on cache miss)
+        # Send message history from the local message mirror (after: only messages the client doesn't have)
         try:
             from flask import current_app
-            from Cogs.TicketSystem import load_tickets, ADMIN_ROLE_ID, MODERATOR_ROLE_ID
-            import asyncio
+            from Cogs.TicketSystem import read_app_messages
+            from Utils.TicketStore import get_ticket_store
 
             bot = current_app.config.get("bot_instance")
-            if bot:
-
-                async def fetch_recent_messages():
-                    tickets = await load_tickets()
-                    ticket = next((t for t in tickets if t.get("ticket_id") == ticket_id), None)
-
-                    if not ticket:
-                        return []
-
-                    channel_id = ticket.get("channel_id")
-                    channel = bot.get_channel(channel_id)
-
-                    if not channel:
-                        return []
-
-                    messages = []
-                    total_fetched = 0
-                    total_filtered = 0
-                    async for message in channel.history(limit=100, oldest_first=False):
-                        total_fetched += 1
-
-                        # Skip bot system messages except important ones
-                        if message.author.bot:
-                            # Check if it's a user message from app (has [username]: prefix)
-                            is_user_message_from_app = (
-                                message.content.startswith("**[")
-                                and not message.content.startswith("**[Admin Panel")
-                                and "]:**" in message.content
-                            )
-
-                            # Keep important bot messages
-                            if not (
-                                message.content.startswith("**Initial details")
-                                or message.content.startswith("**Subject:")  # API-created tickets
-                                or message.content.startswith("**[Admin Panel")
-                                or is_user_message_from_app  # User messages from app
-                                or "Ticket successfully closed" in message.content
-                                or "Ticket claimed by" in message.content
-                                or "Ticket assigned to" in message.content
-                                or "Ticket has been reopened" in message.content
-                            ):
-                                total_filtered += 1
-                                logger.debug(f"🔇 Filtered bot message: {message.content[:50]}...")
-                                continue
-
-                        # Get avatar URL
-                        avatar_url = None
-                        is_admin = False
-                        user_role = None
-
-                        # Check if author has admin or moderator role
-                        if hasattr(message.author, "roles") and message.author.roles:
-                            for role in message.author.roles:
-                                if role.id == ADMIN_ROLE_ID:
-                                    is_admin = True
-                                    user_role = "admin"
-                                    break
-                                elif role.id == MODERATOR_ROLE_ID:
-                                    is_admin = True
-                                    user_role = "moderator"
-                                    break
-
-                        if message.content.startswith("**[Admin Panel"):
-                            is_admin = True
-
-                        try:
-                            if message.author.display_avatar:
-                                avatar_url = str(message.author.display_avatar.url)
-                            elif message.author.avatar:
-                                avatar_url = str(message.author.avatar.url)
-                        except Exception:
-                            pass
-
-                        messages.append(
-                            {
-                                "id": str(message.id),
-                                "author_id": str(message.author.id),
-                                "author_name": message.author.name,
-                                "author_avatar": avatar_url,
-                                "content": message.content,
-                                "timestamp": message.created_at.isoformat(),
-                                "is_bot": message.author.bot,
-                                "is_admin": is_admin,
-                                "role": user_role,
-                            }
-                        )
-
-                    # Reverse to get oldest first
-                    messages.reverse()
-                    logger.debug(
-                        f"📊 Message history: fetched={total_fetched}, filtered={total_filtered}, sent={len(messages)}"
-                    )
-                    return messages
-
-                loop = bot.loop
-                future = asyncio.run_coroutine_threadsafe(fetch_recent_messages(), loop)
-                messages = future.result(timeout=10)
-
-                # ✅ FIX: Cache messages after fetching from Discord
-                from Utils.CacheUtils import cache_instance as cache
-
-                cache_key = f"ticket:messages:{ticket_id}"
-                cache.set(cache_key, messages, ttl_seconds=300)  # 5 minutes
-                logger.debug(f"💾 Cached {len(messages)} message(s) for ticket {ticket_id} (300s TTL)")
-
+            ticket = get_ticket_store().get_by_id(ticket_id)
+            if bot and ticket:
+                after = data.get("after")
+                messages = read_app_messages(bot, ticket, after=int(after) if after else None)
                 emit("message_history", {"ticket_id": ticket_id, "messages": messages})
-                logger.debug(f"📨 Sent {len(messages)} message(s) history to client {request.sid}")
+                logger.debug("📨 Sent %d message(s) history to client %s", len(messages), request.sid)
         except Exception as e:
-            logger.error(f"Failed to fetch message history: {e}")
+            logger.error(f"Failed to load message history: {e}")
 
         emit("joined_ticket", {"ticket_id": ticket_id, "room": room})
 
@@ -531,7 +419,7 @@ async def send_push_notification_for_ticket_event(ticket_id, event_type, ticket_
         message_data: Optional message data (for new_message events)
     """
     try:
-        from Utils.notification_service import is_fcm_enabled, send_notification
+        from Utils.notification_service import is_fcm_enabled, send_notification_to_multiple_users
 
         if not is_fcm_enabled():
             return
@@ -669,35 +557,23 @@ async def send_push_notification_for_ticket_event(ticket_id, event_type, ticket_
         else:
             logger.debug(f"📱 No active viewers for ticket {ticket_id}, sending to all recipients")
 
-        # Send notification to each recipient
-        for user_id in recipients:
-            try:
-                # Fetch username from Discord for better logging
-                username = None
-                try:
-                    discord_user = bot.get_user(int(user_id))
-                    if not discord_user:
-                        discord_user = await bot.fetch_user(int(user_id))
-                    username = discord_user.name if discord_user else None
-                except Exception as e:
-                    logger.debug(f"Could not fetch username for {user_id}: {e}")
-
-                await send_notification(
-                    user_id,
-                    title,
-                    body,
-                    data={
-                        "ticket_id": ticket_id,
-                        "ticket_num": str(ticket_data.get("ticket_num", "")),
-                        "event_type": event_type,
-                        "click_action": "FLUTTER_NOTIFICATION_CLICK",
-                        "route": f"/tickets/{ticket_id}",
-                    },
-                    username=username,
-                )
-                logger.debug(f"📱 Sent push notification to user {user_id} for {event_type}")
-            except Exception as e:
-                logger.warning(f"Failed to send push notification to user {user_id}: {e}")
+        if not recipients:
+            return
+
+        # One batched fan-out for all recipients (multicast per 500 devices)
+        await send_notification_to_multiple_users(
+            recipients,
+            title,
+            body,
+            data={
+                "ticket_id": ticket_id,
+                "ticket_num": str(ticket_data.get("ticket_num", "")),
+                "event_type": event_type,
+                "click_action": "FLUTTER_NOTIFICATION_CLICK",
+                "route": f"/tickets/{ticket_id}",
+            },
+        )
+        logger.debug(f"📱 Sent push notification to {len(recipients)} recipient(s) for {event_type}")
 
     except Exception as e:
         logger.error(f"Error in send_push_notification_for_ticket_event: {e}\n{traceback.format_exc()}")
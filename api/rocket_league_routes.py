@@ -3,12 +3,13 @@ Rocket League Routes Blueprint
 Handles all /api/rocket-league/* and /api/user/rocket-league/* endpoints
 """
 
-import asyncio
 import traceback
 from datetime import datetime, timezone
 
 from flask import Blueprint, jsonify, request
 
+from Utils.LoopBridge import LoopBusyError, get_loop_bridge
+
 # Will be initialized by init_rocket_league_routes()
 Config = None
 logger = None
@@ -136,14 +137,10 @@ def trigger_rank_check():
         if not rl_cog:
             return jsonify({"error": "RocketLeague cog not loaded"}), 503
 
-        # Use the bot's existing event loop
-        loop = bot.loop
-
-        # Call the rank check function with force=True
-        future = asyncio.run_coroutine_threadsafe(rl_cog._check_and_update_ranks(force=True), loop)
-
-        # Wait for result with timeout
-        future.result(timeout=120)  # 2 minutes timeout
+        # Call the rank check function with force=True (concurrent triggers share one run)
+        get_loop_bridge(bot.loop).call(
+            "rl.check_ranks", rl_cog._check_and_update_ranks, force=True, key="all", timeout=120
+        )  # 2 minutes timeout
 
         return jsonify(
             {
@@ -152,6 +149,8 @@ def trigger_rank_check():
                 "note": "Check the RL channel for any rank promotion notifications",
             }
         )
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to check ranks: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -177,14 +176,11 @@ def get_rl_stats(platform, username):
         # Log the request
         logger.info(f"🔍 Fetching RL stats for {username} on {platform.upper()} (via API by {request.username})")
 
-        # Use the bot's existing event loop
-        loop = bot.loop
-
-        # Fetch stats using the bot's function
-        future = asyncio.run_coroutine_threadsafe(rl_cog.get_player_stats(platform.lower(), username), loop)
-
-        # Wait for result with timeout
-        stats = future.result(timeout=90)
+        # Fetch stats using the bot's function (identical lookups in flight are shared)
+        platform = platform.lower()
+        stats = get_loop_bridge(bot.loop).call(
+            "rl.player_stats", rl_cog.get_player_stats, platform, username, key=(platform, username), timeout=90
+        )
 
         if not stats:
             logger.warning(f"❌ Player {username} not found on {platform.upper()}")
@@ -226,6 +222,8 @@ def get_rl_stats(platform, username):
                 },
             }
         )
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to get stats: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -271,9 +269,9 @@ def link_user_rl_account():
         if not rl_cog:
             return jsonify({"error": "RocketLeague cog not loaded"}), 503
 
-        loop = bot.loop
-        future = asyncio.run_coroutine_threadsafe(rl_cog.get_player_stats(platform, username), loop)
-        stats = future.result(timeout=30)
+        stats = get_loop_bridge(bot.loop).call(
+            "rl.player_stats", rl_cog.get_player_stats, platform, username, key=(platform, username), timeout=30
+        )
 
         if not stats:
             return jsonify({"error": "Player not found. Please check your platform and username."}), 404
@@ -318,6 +316,8 @@ def link_user_rl_account():
                 },
             }
         )
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to link account: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -411,10 +411,10 @@ def post_user_rl_stats():
 
         logger.info(f"📊 User {discord_id} posting RL stats to configured RL channel...")
 
-        # Use the bot's existing event loop (same as /rlstats)
-        loop = bot.loop
-        future = asyncio.run_coroutine_threadsafe(rl_cog.post_stats_to_channel(int(discord_id)), loop)
-        result = future.result(timeout=30)
+        # Run on the bot's event loop (same as /rlstats)
+        result = get_loop_bridge(bot.loop).call(
+            "rl.post_stats", rl_cog.post_stats_to_channel, int(discord_id), timeout=30
+        )
 
         if result["success"]:
             logger.info(f"✅ RL stats posted successfully: {result['message']}")
@@ -423,6 +423,8 @@ def post_user_rl_stats():
             logger.warning(f"❌ Failed to post RL stats: {result['message']}")
             return jsonify(result), 400
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error posting RL stats: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to post RL stats: {str(e)}", "details": traceback.format_exc()}), 500
@@ -3,7 +3,6 @@ Ticket System Routes Blueprint
 Handles all /api/tickets/* endpoints for ticket management
 """
 
-import asyncio
 import json
 import traceback
 import uuid
@@ -12,6 +11,9 @@ from pathlib import Path
 
 from flask import Blueprint, jsonify, request
 
+from Utils.LoopBridge import LoopBusyError, get_loop_bridge
+from Utils.TicketStore import get_ticket_store
+
 # Will be initialized by init_ticket_routes()
 Config = None
 logger = None
@@ -77,6 +79,9 @@ def init_ticket_routes(
     vf["tickets.reopen_ticket_endpoint"] = token_required(vf["tickets.reopen_ticket_endpoint"])
     vf["tickets.get_ticket_messages_endpoint"] = token_required(vf["tickets.get_ticket_messages_endpoint"])
     vf["tickets.send_ticket_message_endpoint"] = token_required(vf["tickets.send_ticket_message_endpoint"])
+    vf["tickets.get_ticket_transcript_endpoint"] = token_required(
+        require_permission("tickets_read")(vf["tickets.get_ticket_transcript_endpoint"])
+    )
 
 
 # ============================================================================
@@ -90,21 +95,13 @@ def get_tickets():
     try:
         from flask import current_app
 
-        from Cogs.TicketSystem import load_tickets
-
-        # Get tickets data
         bot = current_app.config.get("bot_instance")
         if not bot:
             return jsonify({"error": "Bot not initialized"}), 503
 
-        loop = bot.loop
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
-
-        # Filter by status if provided
+        # Get tickets data (status filter is case-insensitive, see TicketStore)
         status_filter = request.args.get("status")
-        if status_filter:
-            tickets = [t for t in tickets if t.get("status", "").lower() == status_filter.lower()]
+        tickets = get_ticket_store().find(status=status_filter or None)
 
         # Enrich with Discord user information
         guild = bot.get_guild(Config.GUILD_ID)
@@ -166,8 +163,6 @@ def get_my_tickets():
     try:
         from flask import current_app
 
-        from Cogs.TicketSystem import load_tickets
-
         bot = current_app.config.get("bot_instance")
         if not bot:
             return jsonify({"error": "Bot not initialized"}), 503
@@ -179,18 +174,9 @@ def get_my_tickets():
 
         user_id = int(discord_id)
 
-        # Get all tickets
-        loop = bot.loop
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
-
-        # Filter by current user
-        user_tickets = [t for t in tickets if t.get("user_id") == user_id]
-
-        # Filter by status if provided
+        # Get current user's tickets, filtered by status if provided
         status_filter = request.args.get("status")
-        if status_filter:
-            user_tickets = [t for t in user_tickets if t.get("status", "").lower() == status_filter.lower()]
+        user_tickets = get_ticket_store().find(status=status_filter or None, user_id=user_id)
 
         # Enrich with Discord user information
         guild = bot.get_guild(Config.GUILD_ID)
@@ -287,9 +273,7 @@ def create_ticket_endpoint():
             TICKETS_CATEGORY_ID,
             TicketControlView,
             create_ticket_embed,
-            load_counter,
-            load_tickets,
-            save_counter,
+            allocate_ticket_num,
             save_ticket,
             update_ticket,
         )
@@ -347,14 +331,9 @@ def create_ticket_endpoint():
         is_admin_or_mod = any(role.id in [ADMIN_ROLE_ID, MODERATOR_ROLE_ID] for role in member.roles)
 
         if not is_admin_or_mod:
-            loop = bot.loop
-            future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-            tickets = future.result(timeout=10)
-
-            user_tickets = [t for t in tickets if t["user_id"] == user_id]
-            if user_tickets:
-                last_ticket = max(user_tickets, key=lambda t: datetime.fromisoformat(t["created_at"]))
-                time_since_last = datetime.now() - datetime.fromisoformat(last_ticket["created_at"])
+            last_created_at = get_ticket_store().last_created_at(user_id)
+            if last_created_at:
+                time_since_last = datetime.now() - datetime.fromisoformat(last_created_at)
                 if time_since_last < timedelta(hours=1):
                     remaining_minutes = int((timedelta(hours=1) - time_since_last).total_seconds() / 60)
                     error_msg = f"You can only create one ticket per hour. Please wait {remaining_minutes} minutes."
@@ -366,13 +345,11 @@ def create_ticket_endpoint():
         # Create initial message combining subject and description
         initial_message = f"**Subject:** {subject}\n\n**Description:**\n{description}"
 
-        loop = bot.loop
+        bridge = get_loop_bridge(bot.loop)
 
         async def create_ticket_from_api():
             import discord
 
-            tickets = await load_tickets()
-
             guild = bot.get_guild(Config.GUILD_ID)
             category = guild.get_channel(TICKETS_CATEGORY_ID)
             if not category or not isinstance(category, discord.CategoryChannel):
@@ -387,16 +364,7 @@ def create_ticket_endpoint():
             if moderator_role:
                 overwrites[moderator_role] = discord.PermissionOverwrite(view_channel=True)
 
-            # Calculate ticket_num
-            existing_nums = [t.get("ticket_num", 0) for t in tickets]
-            max_existing = max(existing_nums) if existing_nums else 0
-            current_counter = await load_counter()
-            if current_counter <= max_existing:
-                ticket_num = max_existing + 1
-                await save_counter(ticket_num + 1)
-            else:
-                ticket_num = current_counter
-                await save_counter(ticket_num + 1)
+            ticket_num = await allocate_ticket_num()
 
             channel = await guild.create_text_channel(
                 name=f"ticket-{ticket_num}-{ticket_type}-{member.name}",
@@ -459,8 +427,7 @@ def create_ticket_endpoint():
 
             return ticket_data
 
-        future = asyncio.run_coroutine_threadsafe(create_ticket_from_api(), loop)
-        ticket_data = future.result(timeout=15)
+        ticket_data = bridge.call("tickets.create", create_ticket_from_api, timeout=15)
 
         logger.info(
             f"✅ Ticket created via API: #{ticket_data['ticket_num']} "
@@ -481,7 +448,7 @@ def create_ticket_endpoint():
                 ticket_data["user_name"] = member.display_name if member else "Unknown"
                 await send_push_notification_for_ticket_event(ticket_data["ticket_id"], "new_ticket", ticket_data)
 
-            asyncio.run_coroutine_threadsafe(notify_push(), loop)
+            bridge.submit("tickets.push", notify_push)
 
         return (
             jsonify(
@@ -496,6 +463,8 @@ def create_ticket_endpoint():
             201,
         )
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"❌ Error creating ticket via API: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to create ticket: {str(e)}"}), 500
@@ -507,18 +476,12 @@ def get_ticket(ticket_id):
     try:
         from flask import current_app
 
-        from Cogs.TicketSystem import load_tickets
-
         bot = current_app.config.get("bot_instance")
         if not bot:
             return jsonify({"error": "Bot not initialized"}), 503
 
-        loop = bot.loop
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
-
         # Find ticket
-        ticket = next((t for t in tickets if t.get("ticket_id") == ticket_id), None)
+        ticket = get_ticket_store().get_by_id(ticket_id)
         if not ticket:
             return jsonify({"error": "Ticket not found"}), 404
 
@@ -565,7 +528,6 @@ def update_ticket_endpoint(ticket_id):
     try:
         from flask import current_app
 
-        from Cogs.TicketSystem import load_tickets
         from Cogs.TicketSystem import update_ticket as update_ticket_data
 
         bot = current_app.config.get("bot_instance")
@@ -576,12 +538,10 @@ def update_ticket_endpoint(ticket_id):
         if not data:
             return jsonify({"error": "No data provided"}), 400
 
-        # Load tickets to find the channel_id
-        loop = bot.loop
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
+        # Look up the ticket to find the channel_id
+        bridge = get_loop_bridge(bot.loop)
 
-        ticket = next((t for t in tickets if t.get("ticket_id") == ticket_id), None)
+        ticket = get_ticket_store().get_by_id(ticket_id)
         if not ticket:
             return jsonify({"error": "Ticket not found"}), 404
 
@@ -600,8 +560,7 @@ def update_ticket_endpoint(ticket_id):
             updates["type"] = data["type"]
 
         # Update ticket
-        future = asyncio.run_coroutine_threadsafe(update_ticket_data(channel_id, updates), loop)
-        future.result(timeout=10)
+        bridge.call("tickets.update", update_ticket_data, channel_id, updates, timeout=10)
 
         # Log the action
         log_action(
@@ -612,6 +571,8 @@ def update_ticket_endpoint(ticket_id):
 
         return jsonify({"success": True, "message": "Ticket updated successfully"})
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error updating ticket {ticket_id}: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to update ticket: {str(e)}"}), 500
@@ -623,18 +584,16 @@ def delete_ticket_endpoint(ticket_id):
     try:
         from flask import current_app
 
-        from Cogs.TicketSystem import delete_ticket, load_tickets
+        from Cogs.TicketSystem import delete_ticket
 
         bot = current_app.config.get("bot_instance")
         if not bot:
             return jsonify({"error": "Bot not initialized"}), 503
 
-        # Load tickets to find the channel_id and ticket_num
-        loop = bot.loop
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
+        # Look up the ticket to find the channel_id and ticket_num
+        bridge = get_loop_bridge(bot.loop)
 
-        ticket = next((t for t in tickets if t.get("ticket_id") == ticket_id), None)
+        ticket = get_ticket_store().get_by_id(ticket_id)
         if not ticket:
             return jsonify({"error": "Ticket not found"}), 404
 
@@ -642,8 +601,7 @@ def delete_ticket_endpoint(ticket_id):
         ticket_num = ticket.get("ticket_num")
 
         # Delete ticket from database
-        future = asyncio.run_coroutine_threadsafe(delete_ticket(channel_id), loop)
-        future.result(timeout=10)
+        bridge.call("tickets.delete", delete_ticket, channel_id, timeout=10)
 
         # Log the action
         log_action(
@@ -652,6 +610,8 @@ def delete_ticket_endpoint(ticket_id):
 
         return jsonify({"success": True, "message": f"Ticket #{ticket_num} deleted successfully"})
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error deleting ticket {ticket_id}: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to delete ticket: {str(e)}"}), 500
@@ -663,7 +623,7 @@ def claim_ticket_endpoint(ticket_id):
     try:
         from flask import current_app
 
-        from Cogs.TicketSystem import claim_ticket_from_api, load_tickets
+        from Cogs.TicketSystem import claim_ticket_from_api
 
         bot = current_app.config.get("bot_instance")
         if not bot:
@@ -675,13 +635,9 @@ def claim_ticket_endpoint(ticket_id):
         if not user_id:
             return jsonify({"error": "user_id required"}), 400
 
-        loop = bot.loop
-
-        # Load ticket data
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
+        bridge = get_loop_bridge(bot.loop)
 
-        ticket = next((t for t in tickets if t.get("ticket_id") == ticket_id), None)
+        ticket = get_ticket_store().get_by_id(ticket_id)
         if not ticket:
             return jsonify({"error": "Ticket not found"}), 404
 
@@ -691,8 +647,7 @@ def claim_ticket_endpoint(ticket_id):
         channel_id = ticket.get("channel_id")
 
         # Use Discord bot function to claim (ensures button updates, logging, etc.)
-        future = asyncio.run_coroutine_threadsafe(claim_ticket_from_api(bot, channel_id, int(user_id), ticket), loop)
-        result = future.result(timeout=10)
+        result = bridge.call("tickets.claim", claim_ticket_from_api, bot, channel_id, int(user_id), ticket, timeout=10)
 
         if not result.get("success"):
             return jsonify({"error": result.get("error", "Unknown error")}), 400
@@ -719,6 +674,8 @@ def claim_ticket_endpoint(ticket_id):
 
         return jsonify({"success": True, "message": result.get("message", "Ticket claimed successfully")})
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error claiming ticket {ticket_id}: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to claim ticket: {str(e)}"}), 500
@@ -730,7 +687,7 @@ def assign_ticket_endpoint(ticket_id):
     try:
         from flask import current_app
 
-        from Cogs.TicketSystem import assign_ticket_from_api, load_tickets
+        from Cogs.TicketSystem import assign_ticket_from_api
 
         bot = current_app.config.get("bot_instance")
         if not bot:
@@ -742,13 +699,9 @@ def assign_ticket_endpoint(ticket_id):
         if not assigned_to:
             return jsonify({"error": "assigned_to user_id required"}), 400
 
-        loop = bot.loop
-
-        # Load ticket data
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
+        bridge = get_loop_bridge(bot.loop)
 
-        ticket = next((t for t in tickets if t.get("ticket_id") == ticket_id), None)
+        ticket = get_ticket_store().get_by_id(ticket_id)
         if not ticket:
             return jsonify({"error": "Ticket not found"}), 404
 
@@ -758,10 +711,9 @@ def assign_ticket_endpoint(ticket_id):
         channel_id = ticket.get("channel_id")
 
         # Use Discord bot function to assign (ensures button updates, logging, etc.)
-        future = asyncio.run_coroutine_threadsafe(
-            assign_ticket_from_api(bot, channel_id, int(assigned_to), ticket), loop
+        result = bridge.call(
+            "tickets.assign", assign_ticket_from_api, bot, channel_id, int(assigned_to), ticket, timeout=10
         )
-        result = future.result(timeout=10)
 
         if not result.get("success"):
             return jsonify({"error": result.get("error", "Unknown error")}), 400
@@ -773,7 +725,7 @@ def assign_ticket_endpoint(ticket_id):
                 ticket["assigned_to"] = int(assigned_to)
                 await send_push_notification_for_ticket_event(ticket_id, "ticket_assigned", ticket)
 
-            asyncio.run_coroutine_threadsafe(notify_push(), loop)
+            bridge.submit("tickets.push", notify_push)
 
         # WebSocket notification for real-time updates
         if notify_ticket_update:
@@ -788,6 +740,8 @@ def assign_ticket_endpoint(ticket_id):
 
         return jsonify({"success": True, "message": result.get("message", "Ticket assigned successfully")})
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error assigning ticket {ticket_id}: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to assign ticket: {str(e)}"}), 500
@@ -805,7 +759,7 @@ def close_ticket_endpoint(ticket_id):
 
         import jwt
         from flask import current_app
-        from Cogs.TicketSystem import close_ticket_from_api, load_tickets, is_allowed_for_ticket_actions
+        from Cogs.TicketSystem import close_ticket_from_api, is_allowed_for_ticket_actions
 
         token = auth_header.split(" ")[1]
         try:
@@ -829,13 +783,9 @@ def close_ticket_endpoint(ticket_id):
         data = request.get_json() or {}
         close_message = data.get("close_message", "")
 
-        loop = bot.loop
+        bridge = get_loop_bridge(bot.loop)
 
-        # Load ticket data
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
-
-        ticket = next((t for t in tickets if t.get("ticket_id") == ticket_id), None)
+        ticket = get_ticket_store().get_by_id(ticket_id)
         if not ticket:
             logger.error(f"[CLOSE TICKET] Ticket {ticket_id} not found!")
             return jsonify({"error": "Ticket not found"}), 404
@@ -862,17 +812,16 @@ def close_ticket_endpoint(ticket_id):
         channel_id = ticket.get("channel_id")
 
         # Use Discord bot function to close (ensures transcript, email, button updates, etc.)
-        future = asyncio.run_coroutine_threadsafe(
-            close_ticket_from_api(
-                bot,
-                channel_id,
-                ticket,
-                close_message if close_message.strip() else None,
-                closed_by=int(user_discord_id),
-            ),
-            loop,
+        result = bridge.call(
+            "tickets.close",
+            close_ticket_from_api,
+            bot,
+            channel_id,
+            ticket,
+            close_message if close_message.strip() else None,
+            closed_by=int(user_discord_id),
+            timeout=10,
         )
-        result = future.result(timeout=10)
 
         if not result.get("success"):
             logger.error(f"[CLOSE TICKET] Failed: {result.get('error')}")
@@ -906,6 +855,8 @@ def close_ticket_endpoint(ticket_id):
 
         return jsonify({"success": True, "message": result.get("message", "Ticket closed successfully")})
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"[CLOSE TICKET] EXCEPTION: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to close ticket: {str(e)}"}), 500
@@ -925,7 +876,7 @@ def reopen_ticket_endpoint(ticket_id):
 
         import jwt
         from flask import current_app
-        from Cogs.TicketSystem import load_tickets, reopen_ticket_from_api, is_allowed_for_ticket_actions
+        from Cogs.TicketSystem import reopen_ticket_from_api, is_allowed_for_ticket_actions
 
         token = auth_header.split(" ")[1]
         try:
@@ -947,14 +898,9 @@ def reopen_ticket_endpoint(ticket_id):
             logger.error("[REOPEN TICKET] Bot not initialized!")
             return jsonify({"error": "Bot not initialized"}), 503
 
-        loop = bot.loop
+        bridge = get_loop_bridge(bot.loop)
 
-        # Load ticket data
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
-        logger.info(f"[REOPEN TICKET] Loaded {len(tickets)} tickets")
-
-        ticket = next((t for t in tickets if t.get("ticket_id") == ticket_id), None)
+        ticket = get_ticket_store().get_by_id(ticket_id)
         if not ticket:
             logger.error(f"[REOPEN TICKET] Ticket {ticket_id} not found!")
             return jsonify({"error": "Ticket not found"}), 404
@@ -982,8 +928,7 @@ def reopen_ticket_endpoint(ticket_id):
 
         # Use Discord bot function to reopen (ensures button updates, embed refresh, etc.)
         logger.info(f"[REOPEN TICKET] Calling reopen_ticket_from_api for channel {channel_id}")
-        future = asyncio.run_coroutine_threadsafe(reopen_ticket_from_api(bot, channel_id, ticket), loop)
-        result = future.result(timeout=10)
+        result = bridge.call("tickets.reopen", reopen_ticket_from_api, bot, channel_id, ticket, timeout=10)
         logger.info(f"[REOPEN TICKET] Result: {result}")
 
         if not result.get("success"):
@@ -1000,6 +945,8 @@ def reopen_ticket_endpoint(ticket_id):
         logger.info("[REOPEN TICKET] Success! Returning 200 OK")
         return jsonify({"success": True, "message": result.get("message", "Ticket reopened successfully")})
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error reopening ticket {ticket_id}: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to reopen ticket: {str(e)}"}), 500
@@ -1007,189 +954,31 @@ def reopen_ticket_endpoint(ticket_id):
 
 @ticket_bp.route("/api/tickets/<ticket_id>/messages", methods=["GET"])
 def get_ticket_messages_endpoint(ticket_id):
-    """Get messages from a ticket channel"""
+    """
+    Get messages of a ticket from the local message mirror (no Discord history reads)
+
+    Query params: after (message ID; only newer messages are returned, for polling deltas)
+    """
     try:
         from flask import current_app
-        from Utils.CacheUtils import cache_instance as cache
 
-        # ✅ FIX: Check cache first before fetching from Discord
-        cache_key = f"ticket:messages:{ticket_id}"
-        cached_messages = cache.get(cache_key)
-
-        if cached_messages is not None:
-            logger.debug(f"✅ Serving {len(cached_messages)} message(s) from cache (REST API)")
-            return jsonify({"messages": cached_messages, "from_cache": True})
-
-        from Cogs.TicketSystem import load_tickets
+        from Cogs.TicketSystem import read_app_messages
 
         bot = current_app.config.get("bot_instance")
         if not bot:
             return jsonify({"error": "Bot not initialized"}), 503
 
-        loop = bot.loop
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
+        after = request.args.get("after", type=int)
 
-        ticket = next((t for t in tickets if t.get("ticket_id") == ticket_id), None)
+        ticket = get_ticket_store().get_by_id(ticket_id)
         if not ticket:
             return jsonify({"error": "Ticket not found"}), 404
 
-        channel_id = ticket.get("channel_id")
-        channel = bot.get_channel(channel_id)
-        if not channel:
-            return jsonify({"error": "Ticket channel not found"}), 404
-
-        # Fetch messages from channel (only on cache miss)
-        async def fetch_messages():
-            from Cogs.TicketSystem import ADMIN_ROLE_ID, MODERATOR_ROLE_ID
-
-            messages = []
-            async for message in channel.history(limit=100, oldest_first=True):
-                # Skip bot system messages
-                # (but keep Initial details, Admin Panel, user messages, important system messages)
-                if message.author.bot:
-                    # Check if it's a user message from app (has [username]: prefix)
-                    is_user_message_from_app = (
-                        message.content.startswith("**[")
-                        and not message.content.startswith("**[Admin Panel")
-                        and "]:**" in message.content
-                    )
-
-                    # Include important bot messages (initial, admin panel, user messages, close/claim/assign/reopen)
-                    if not (
-                        message.content.startswith("**Initial details")
-                        or message.content.startswith("**Subject:")  # API-created tickets
-                        or message.content.startswith("**[Admin Panel")
-                        or is_user_message_from_app  # User messages from app
-                        or "Ticket successfully closed" in message.content
-                        or "Ticket claimed by" in message.content
-                        or "Ticket assigned to" in message.content
-                        or "Ticket has been reopened" in message.content
-                    ):
-                        continue
-
-                # Get avatar URL with fallback
-                # For admin panel messages and user messages from app,
-                # extract the real user's username and get their avatar
-                avatar_url = None
-                is_admin = False
-                user_role = None  # 'admin', 'moderator', or None
-
-                # Check if author has admin or moderator role
-                if hasattr(message.author, "roles") and message.author.roles:
-                    for role in message.author.roles:
-                        if role.id == ADMIN_ROLE_ID:
-                            is_admin = True
-                            user_role = "admin"
-                            break
-                        elif role.id == MODERATOR_ROLE_ID:
-                            is_admin = True
-                            user_role = "moderator"
-                            break
-
-                # Check if this is an admin panel message or user message from app
-                if message.content.startswith("**[Admin Panel"):
-                    is_admin = True
-                    # Parse admin username from message like "**[Admin Panel - username]:**"
-                    import re
-
-                    admin_match = re.search(r"\[Admin Panel - ([^\]]+)\]", message.content)
-                    if admin_match:
-                        admin_username = admin_match.group(1)
-                        # Try to find member by username
-                        guild = message.guild
-                        admin_member = None
-                        for member in guild.members:
-                            if (
-                                member.name == admin_username
-                                or member.display_name == admin_username
-                                or member.global_name == admin_username
-                            ):
-                                admin_member = member
-                                break
-
-                        if admin_member:
-                            # Determine role for admin panel sender
-                            if hasattr(admin_member, "roles") and admin_member.roles:
-                                for role in admin_member.roles:
-                                    if role.id == ADMIN_ROLE_ID:
-                                        user_role = "admin"
-                                        break
-                                    elif role.id == MODERATOR_ROLE_ID:
-                                        user_role = "moderator"
-                                        break
-                            try:
-                                if admin_member.display_avatar:
-                                    avatar_url = str(admin_member.display_avatar.url)
-                                elif admin_member.avatar:
-                                    avatar_url = str(admin_member.avatar.url)
-                            except (AttributeError, Exception) as e:
-                                logger.debug(f"Could not get avatar for admin {admin_member.id}: {e}")
-
-                elif is_user_message_from_app:
-                    # Parse username from user message like "**[username]:**"
-                    import re
-
-                    user_match = re.search(r"\*\*\[([^\]]+)\]:\*\*", message.content)
-                    if user_match:
-                        username = user_match.group(1)
-                        # Try to find member by username
-                        guild = message.guild
-                        user_member = None
-                        for member in guild.members:
-                            if (
-                                member.name == username
-                                or member.display_name == username
-                                or member.global_name == username
-                            ):
-                                user_member = member
-                                break
-
-                        if user_member:
-                            try:
-                                if user_member.display_avatar:
-                                    avatar_url = str(user_member.display_avatar.url)
-                                elif user_member.avatar:
-                                    avatar_url = str(user_member.avatar.url)
-                            except (AttributeError, Exception) as e:
-                                logger.debug(f"Could not get avatar for user {user_member.id}: {e}")
-
-                # If not an admin/user message from app or avatar not found, use message author's avatar
-                if avatar_url is None:
-                    try:
-                        if message.author.display_avatar:
-                            avatar_url = str(message.author.display_avatar.url)
-                        elif message.author.avatar:
-                            avatar_url = str(message.author.avatar.url)
-                    except (AttributeError, Exception) as e:
-                        logger.debug(f"Could not get avatar for user {message.author.id}: {e}")
-                        avatar_url = None
-
-                messages.append(
-                    {
-                        "id": str(message.id),
-                        "author_id": str(message.author.id),
-                        "author_name": message.author.name,
-                        "author_avatar": avatar_url,
-                        "content": message.content,
-                        "timestamp": message.created_at.isoformat(),
-                        "is_bot": message.author.bot,
-                        "is_admin": is_admin,
-                        "role": user_role,  # 'admin', 'moderator', or None
-                    }
-                )
-
-            return messages  # Already in correct order (oldest first)
-            return messages  # Already in correct order (oldest first)
-
-        future = asyncio.run_coroutine_threadsafe(fetch_messages(), loop)
-        messages = future.result(timeout=10)
+        messages = read_app_messages(bot, ticket, after=after)
+        logger.debug("✅ Serving %d message(s) for ticket %s from the message mirror", len(messages), ticket_id)
 
-        # ✅ FIX: Cache messages after fetching from Discord
-        cache.set(cache_key, messages, ttl_seconds=300)  # 5 minutes
-        logger.debug(f"💾 Cached {len(messages)} message(s) for ticket {ticket_id} (REST API, 300s TTL)")
-
-        return jsonify({"messages": messages, "from_cache": False})
+        # from_cache kept for existing clients: the mirror is always a local read
+        return jsonify({"messages": messages, "from_cache": True})
 
     except Exception as e:
         logger.error(f"Error fetching messages for ticket {ticket_id}: {e}\n{traceback.format_exc()}")
@@ -1202,7 +991,7 @@ def send_ticket_message_endpoint(ticket_id):
     try:
         from flask import current_app
 
-        from Cogs.TicketSystem import ADMIN_ROLE_ID, MODERATOR_ROLE_ID, load_tickets
+        from Cogs.TicketSystem import ADMIN_ROLE_ID, MODERATOR_ROLE_ID, record_message
 
         bot = current_app.config.get("bot_instance")
         if not bot:
@@ -1214,11 +1003,9 @@ def send_ticket_message_endpoint(ticket_id):
         if not message_content:
             return jsonify({"error": "Message content required"}), 400
 
-        loop = bot.loop
-        future = asyncio.run_coroutine_threadsafe(load_tickets(), loop)
-        tickets = future.result(timeout=10)
+        bridge = get_loop_bridge(bot.loop)
 
-        ticket = next((t for t in tickets if t.get("ticket_id") == ticket_id), None)
+        ticket = get_ticket_store().get_by_id(ticket_id)
         if not ticket:
             return jsonify({"error": "Ticket not found"}), 404
 
@@ -1258,6 +1045,12 @@ def send_ticket_message_endpoint(ticket_id):
 
             msg = await channel.send(formatted_content)
 
+            # Mirror it right away (on_message stores the same row; whichever comes first wins)
+            try:
+                await record_message(ticket, msg)
+            except Exception as e:
+                logger.error(f"Failed to mirror message for ticket {ticket_id}: {e}")
+
             # Get avatar URL with fallback
             avatar_url = None
             try:
@@ -1294,15 +1087,7 @@ def send_ticket_message_endpoint(ticket_id):
                 "role": user_role,
             }
 
-        future = asyncio.run_coroutine_threadsafe(send_message(), loop)
-        message_data = future.result(timeout=10)
-
-        # ✅ FIX: Invalidate message cache after sending new message
-        from Utils.CacheUtils import cache_instance as cache
-
-        cache_key = f"ticket:messages:{ticket_id}"
-        cache.clear(cache_key)  # ✅ FIX: clear() statt delete()
-        logger.debug(f"🗑️ Invalidated message cache for ticket {ticket_id}")
+        message_data = bridge.call("tickets.send_message", send_message, timeout=10)
 
         # Notify WebSocket clients about new message
         author = message_data.get("author_name")
@@ -1324,10 +1109,9 @@ def send_ticket_message_endpoint(ticket_id):
                     logger.error(traceback.format_exc())
 
             try:
-                future = asyncio.run_coroutine_threadsafe(notify_push(), loop)
                 logger.debug("📱 Push notification scheduled, waiting for result...")
                 # Wait for it to complete to see any errors
-                future.result(timeout=5)
+                bridge.call("tickets.push", notify_push, timeout=5)
                 logger.debug("📱 Push notification future completed")
             except Exception as e:
                 logger.error(f"❌ Push notification future failed: {e}")
@@ -1341,6 +1125,46 @@ def send_ticket_message_endpoint(ticket_id):
 
         return jsonify({"success": True, "message": "Message sent successfully", "data": message_data})
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error sending message to ticket {ticket_id}: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to send message: {str(e)}"}), 500
+
+
+@ticket_bp.route("/api/tickets/<ticket_id>/transcript", methods=["GET"])
+def get_ticket_transcript_endpoint(ticket_id):
+    """
+    Page through a ticket's stored transcript (oldest first, no Discord history reads)
+
+    Query params: after (message ID cursor from next_after), limit (max 500)
+    """
+    try:
+        limit = min(request.args.get("limit", 200, type=int), 500)
+        after = request.args.get("after", type=int)
+
+        store = get_ticket_store()
+        ticket = store.get_by_id(ticket_id)
+        if not ticket:
+            return jsonify({"error": "Ticket not found"}), 404
+
+        messages = store.messages(ticket_id, after=after, limit=limit + 1)
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        checkpoint = store.transcript_checkpoint(ticket_id)
+
+        return jsonify(
+            {
+                "ticket_id": ticket_id,
+                "ticket_num": ticket.get("ticket_num"),
+                "messages": messages,
+                "has_more": has_more,
+                "next_after": messages[-1]["id"] if has_more else None,
+                # Open tickets can have newer messages that aren't captured yet (bot offline), closing syncs them
+                "complete_until": str(checkpoint) if checkpoint else None,
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error fetching transcript for ticket {ticket_id}: {e}\n{traceback.format_exc()}")
+        return jsonify({"error": f"Failed to fetch transcript: {str(e)}"}), 500
@@ -4,11 +4,15 @@ Handles all /api/user/* and /api/gaming/* endpoints for user-specific functions
 """
 
 import asyncio
+import json
 import sqlite3
 import traceback
 from pathlib import Path
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
+
+from Utils.LoopBridge import LoopBusyError, get_loop_bridge
+from Utils.PresenceIndex import get_presence_index
 
 # Constants
 APP_USAGE_EXPIRY_DAYS = 30  # Remove badge after 30 days of inactivity
@@ -113,7 +117,7 @@ def get_user_profile():
         rl_rank = None
         try:
             from Cogs.RocketLeague import RANK_EMOJIS, load_rl_accounts
-            from Config import RL_TIER_ORDER
+            from Config import RL_TIER_RANK
 
             rl_accounts = load_rl_accounts()
             if str(discord_id) in rl_accounts:
@@ -125,7 +129,7 @@ def get_user_profile():
                 highest_tier = "Unranked"
                 highest_playlist = None
                 for playlist, tier in ranks.items():
-                    if tier in RL_TIER_ORDER and RL_TIER_ORDER.index(tier) > RL_TIER_ORDER.index(highest_tier):
+                    if RL_TIER_RANK.get(tier, 0) > RL_TIER_RANK[highest_tier]:
                         highest_tier = tier
                         highest_playlist = playlist
 
@@ -171,21 +175,9 @@ def get_user_profile():
         resolved_tickets = 0
         if any(role.id in [Config.ADMIN_ROLE_ID, Config.MODERATOR_ROLE_ID] for role in member.roles):
             try:
-                from Cogs.TicketSystem import load_tickets
+                from Utils.TicketStore import get_ticket_store
 
-                tickets_sync = load_tickets()
-                if hasattr(tickets_sync, "__await__"):
-                    tickets = asyncio.run(tickets_sync)
-                else:
-                    tickets = tickets_sync
-
-                for ticket in tickets:
-                    if ticket["status"] == "Closed" and (
-                        ticket.get("claimed_by") == int(discord_id)
-                        or ticket.get("assigned_to") == int(discord_id)
-                        or ticket.get("closed_by") == int(discord_id)
-                    ):
-                        resolved_tickets += 1
+                resolved_tickets = get_ticket_store().resolved_count(int(discord_id))
             except Exception:
                 pass
 
@@ -201,17 +193,8 @@ def get_user_profile():
                 activity_data = activity_sync
             activity["messages"] = activity_data.get("messages", 0)
             activity["images"] = activity_data.get("images", 0)
-        except Exception:
-            pass
-
-        # Get meme stats
-        try:
-            from Cogs.Profile import load_meme_requests, load_memes_generated
-
-            meme_requests = load_meme_requests()
-            memes_generated = load_memes_generated()
-            activity["memes_requested"] = meme_requests.get(str(discord_id), 0)
-            activity["memes_generated"] = memes_generated.get(str(discord_id), 0)
+            activity["memes_requested"] = activity_data.get("meme_requests", 0)
+            activity["memes_generated"] = activity_data.get("memes_generated", 0)
         except Exception:
             pass
 
@@ -354,7 +337,7 @@ def get_user_profile_by_id(user_id):
         rl_rank = None
         try:
             from Cogs.RocketLeague import RANK_EMOJIS, load_rl_accounts
-            from Config import RL_TIER_ORDER
+            from Config import RL_TIER_RANK
 
             rl_accounts = load_rl_accounts()
             if str(discord_id) in rl_accounts:
@@ -366,7 +349,7 @@ def get_user_profile_by_id(user_id):
                 highest_tier = "Unranked"
                 highest_playlist = None
                 for playlist, tier in ranks.items():
-                    if tier in RL_TIER_ORDER and RL_TIER_ORDER.index(tier) > RL_TIER_ORDER.index(highest_tier):
+                    if RL_TIER_RANK.get(tier, 0) > RL_TIER_RANK[highest_tier]:
                         highest_tier = tier
                         highest_playlist = playlist
 
@@ -396,17 +379,8 @@ def get_user_profile_by_id(user_id):
                 activity_data = activity_sync
             activity["messages"] = activity_data.get("messages", 0)
             activity["images"] = activity_data.get("images", 0)
-        except Exception:
-            pass
-
-        # Get meme stats
-        try:
-            from Cogs.Profile import load_meme_requests, load_memes_generated
-
-            meme_requests = load_meme_requests()
-            memes_generated = load_memes_generated()
-            activity["memes_requested"] = meme_requests.get(str(discord_id), 0)
-            activity["memes_generated"] = memes_generated.get(str(discord_id), 0)
+            activity["memes_requested"] = activity_data.get("meme_requests", 0)
+            activity["memes_generated"] = activity_data.get("memes_generated", 0)
         except Exception:
             pass
 
@@ -510,18 +484,19 @@ def update_user_preferences():
         if not member:
             return jsonify({"error": "Member not found in guild"}), 404
 
+        # Role changes are collected and sent to the bot loop together
+        role_calls = []
+
         # Handle changelog opt-in/out
         if "changelog_opt_in" in data:
             changelog_role = guild.get_role(Config.CHANGELOG_ROLE_ID)
             if changelog_role:
                 if data["changelog_opt_in"]:
                     if changelog_role not in member.roles:
-                        asyncio.run_coroutine_threadsafe(member.add_roles(changelog_role), bot.loop).result(timeout=5)
+                        role_calls.append(("user.add_role", member.add_roles, (changelog_role,)))
                 else:
                     if changelog_role in member.roles:
-                        asyncio.run_coroutine_threadsafe(member.remove_roles(changelog_role), bot.loop).result(
-                            timeout=5
-                        )
+                        role_calls.append(("user.remove_role", member.remove_roles, (changelog_role,)))
 
         # Handle meme opt-in/out
         if "meme_opt_in" in data:
@@ -529,12 +504,16 @@ def update_user_preferences():
             if meme_role:
                 if data["meme_opt_in"]:
                     if meme_role not in member.roles:
-                        asyncio.run_coroutine_threadsafe(member.add_roles(meme_role), bot.loop).result(timeout=5)
+                        role_calls.append(("user.add_role", member.add_roles, (meme_role,)))
                 else:
                     if meme_role in member.roles:
-                        asyncio.run_coroutine_threadsafe(member.remove_roles(meme_role), bot.loop).result(timeout=5)
+                        role_calls.append(("user.remove_role", member.remove_roles, (meme_role,)))
+
+        get_loop_bridge(bot.loop).call_many(role_calls, timeout=5)
 
         return jsonify({"message": "Preferences updated successfully"})
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         return jsonify({"error": f"Failed to update preferences: {str(e)}", "details": traceback.format_exc()}), 500
 
@@ -544,93 +523,40 @@ def update_user_preferences():
 
 @user_bp.route("/api/gaming/members", methods=["GET"])
 def get_gaming_members():
-    """Get all server members with their presence/activity data + app usage status (with cache)"""
-    try:
-        # Check cache first (30 second TTL - users change status frequently)
-        cache_key = "gaming:members"
-        cached_result = cache.get(cache_key)
-        if cached_result is not None:
-            return jsonify(cached_result)
-
-        import discord
-        from flask import current_app
-
-        bot = current_app.config.get("bot_instance")
-        if not bot:
-            return jsonify({"error": "Bot not initialized"}), 503
+    """
+    Get all server members with their presence/activity data + app usage status
 
-        guild = bot.get_guild(Config.GUILD_ID)
-        if not guild:
-            return jsonify({"error": "Guild not found"}), 500
+    Served from the presence index the GamingHub cog keeps up to date. With
+    ?since=<version> (the "version" of an earlier response) only members changed
+    since then are returned ("full": false, plus "removed" member IDs); if that
+    version is too old the full list is returned instead ("full": true).
+    """
+    try:
+        index = get_presence_index()
+        if not index.ready:
+            return jsonify({"error": "Member presence not available yet (GamingHub cog not ready)"}), 503
 
-        # Get list of users who have used the app within the last 30 days
+        # Users who have used the app within the last 30 days (in-memory tracker)
         app_usage_file = Path(Config.DATA_DIR) / "app_usage.json"
         app_users = get_active_app_users(app_usage_file, APP_USAGE_EXPIRY_DAYS, Config)
-
-        members_data = []
-        for member in guild.members:
-            if member.bot:
-                continue  # Skip bots
-
-            # Get member status and activity
-            status = str(member.status) if member.status else "offline"
-            activity_data = None
-
-            if member.activities:
-                # Filter out custom status (ActivityType.custom = 4)
-                # Get first non-custom activity (game/streaming/etc)
-                for activity in member.activities:
-                    activity_type = activity.type
-
-                    # Skip custom status activities
-                    if activity_type == discord.ActivityType.custom:
-                        continue
-
-                    # Found a real activity (game, streaming, etc)
-                    activity_type_str = str(activity_type).replace("ActivityType.", "").lower()
-
-                    activity_data = {
-                        "type": activity_type_str,
-                        "name": activity.name,
-                    }
-
-                    # Add game-specific details
-                    if hasattr(activity, "details") and activity.details:
-                        activity_data["details"] = activity.details
-                    if hasattr(activity, "state") and activity.state:
-                        activity_data["state"] = activity.state
-                    if hasattr(activity, "large_image_url") and activity.large_image_url:
-                        activity_data["image_url"] = activity.large_image_url
-                    elif hasattr(activity, "small_image_url") and activity.small_image_url:
-                        activity_data["image_url"] = activity.small_image_url
-
-                    # Found valid activity, stop searching
-                    break
-
-            # Check if user is using the app
-            is_using_app = str(member.id) in app_users
-
-            members_data.append(
-                {
-                    "id": str(member.id),
-                    "username": member.name,
-                    "display_name": member.display_name,
-                    "avatar_url": str(member.display_avatar.url) if member.display_avatar else None,
-                    "status": status,
-                    "activity": activity_data,
-                    "using_app": is_using_app,
-                }
+        index.sync_app_users(app_users)
+
+        # Member entries are pre-serialized, so the body is assembled from JSON fragments
+        since = request.args.get("since", type=int)
+        delta = index.changes_since(since) if since is not None else None
+        if delta is not None:
+            version, members_json, removed = delta
+            body = (
+                f'{{"full":false,"version":{version},"members":{members_json},'
+                f'"removed":{json.dumps(removed)},"app_users_count":{len(app_users)}}}'
             )
-
-        # Sort: online users first, then by username
-        members_data.sort(key=lambda m: (m["status"] == "offline", m["display_name"].lower()))
-
-        result = {"members": members_data, "total": len(members_data), "app_users_count": len(app_users)}
-
-        # Cache result for 30 seconds (users change status frequently)
-        cache.set(cache_key, result, ttl=30)
-
-        return jsonify(result)
+        else:
+            version, total, members_json = index.listing_json()
+            body = (
+                f'{{"full":true,"version":{version},"members":{members_json},'
+                f'"total":{total},"app_users_count":{len(app_users)}}}'
+            )
+        return Response(body, mimetype="application/json")
 
     except Exception as e:
         logger.error(f"Error fetching gaming members: {e}\n{traceback.format_exc()}")
@@ -713,9 +639,7 @@ def post_game_request():
 
             return msg
 
-        loop = bot.loop
-        future = asyncio.run_coroutine_threadsafe(send_request(), loop)
-        message = future.result(timeout=10)
+        message = get_loop_bridge(bot.loop).call("gaming.send_request", send_request, timeout=10)
 
         logger.info(f"🎮 Game request posted: {requester.name} -> {target.name} for {game_name}")
 
@@ -733,6 +657,8 @@ def post_game_request():
             }
         )
 
+    except LoopBusyError:
+        raise  # 503 via the app error handler
     except Exception as e:
         logger.error(f"Error posting game request: {e}\n{traceback.format_exc()}")
         return jsonify({"error": f"Failed to post game request: {str(e)}"}), 500
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Feature Analytics (Python scan vs. SQL aggregation)
+Builds a synthetic analytics.db and compares the old export-and-scan path of
+/api/analytics/features with the SQL-side GROUP BY in FeatureUsageAnalyzer.
+
+Usage:
+    python scripts/benchmark_feature_analytics.py                  # 1M sessions
+    python scripts/benchmark_feature_analytics.py --sessions 100000
+    python scripts/benchmark_feature_analytics.py --db /tmp/bench_analytics.db --reuse
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from api.analytics_db import AnalyticsDatabase  # noqa: E402
+from api.feature_analytics import FEATURE_CATEGORIES, FeatureUsageAnalyzer, categorize_endpoint  # noqa: E402
+
+PLATFORMS = ["Android", "iOS", "Web", "Windows", "Linux"]
+EXTRA_ENDPOINTS = ["auth_routes.ping", "user.get_level", "tickets.get_ticket_messages", "config.get_general"]
+
+
+def build_database(db_path, num_sessions, num_users, days, batch_size=50000):
+    """Populate a synthetic analytics.db with sessions and endpoint histograms"""
+    print(f"🏗️  Building synthetic database: {num_sessions:,} sessions, {num_users:,} users, {days} days")
+    db = AnalyticsDatabase(db_path)
+    endpoints = [e for group in FEATURE_CATEGORIES.values() for e in group] + EXTRA_ENDPOINTS
+    now = datetime.utcnow()
+    rng = random.Random(42)
+
+    start = time.perf_counter()
+    with db._get_connection() as conn:
+        conn.execute("PRAGMA synchronous=OFF")
+        for offset in range(0, num_sessions, batch_size):
+            session_rows = []
+            endpoint_rows = []
+            for i in range(offset, min(offset + batch_size, num_sessions)):
+                session_id = f"bench_{i:08d}"
+                user = rng.randrange(num_users)
+                discord_id, username = str(100000 + user), f"user{user}"
+                # Half-hour offset keeps sessions away from the days=N cutoff while the benchmark runs
+                started = now - timedelta(hours=rng.randrange(days * 24), minutes=30)
+                used = {}
+                for endpoint in rng.sample(endpoints, rng.randint(1, 6)):
+                    used[endpoint] = rng.randint(1, 20)
+                    endpoint_rows.append(
+                        (
+                            session_id,
+                            endpoint,
+                            used[endpoint],
+                            started.isoformat(),
+                            discord_id,
+                            username,
+                            categorize_endpoint(endpoint),
+                        )
+                    )
+                session_rows.append(
+                    (
+                        session_id,
+                        discord_id,
+                        username,
+                        started.isoformat(),
+                        (started + timedelta(minutes=5)).isoformat(),
+                        5.0,
+                        rng.choice(PLATFORMS),
+                        "Benchmark Device",
+                        "1.0.0",
+                        "127.0.0.1",
+                        sum(used.values()),
+                        json.dumps(used),
+                        "[]",
+                    )
+                )
+            conn.executemany(
+                """
+                INSERT INTO sessions (
+                    session_id, discord_id, username, started_at, ended_at,
+                    duration_minutes, platform, device_info, app_version,
+                    ip_address, actions_count, endpoints_used, screens_visited
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                session_rows,
+            )
+            conn.executemany(
+                """
+                INSERT INTO session_endpoints (
+                    session_id, endpoint, count, started_at, discord_id, username, category
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                endpoint_rows,
+            )
+            conn.commit()
+            print(f"   ... {min(offset + batch_size, num_sessions):,} sessions", end="\r")
+        conn.execute("ANALYZE")
+    print(f"\n✅ Database built in {time.perf_counter() - start:.1f}s ({db.get_database_size() / 1e6:.0f} MB)")
+    return db
+
+
+def time_call(label, func, repeat):
+    """Run func repeat times and return (best_seconds, last_result)"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"   {label:<28} {best * 1000:>10.1f} ms")
+    return best, result
+
+
+def old_path(db, analyzer, days):
+    """Previous implementation: export every session, then scan in Python"""
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=days)
+    sessions = db.get_sessions(start_date=cutoff.isoformat(), end_date=now.isoformat())
+    return analyzer.analyze_feature_usage(sessions, days=days)
+
+
+def strip_volatile(analysis):
+    """Drop fields that legitimately differ between runs"""
+    analysis = dict(analysis)
+    analysis.pop("analysis_date", None)
+    return analysis
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feature analytics aggregation")
+    parser.add_argument("--sessions", type=int, default=1_000_000, help="Number of synthetic sessions")
+    parser.add_argument("--users", type=int, default=5000, help="Number of distinct users")
+    parser.add_argument("--days", type=int, default=90, help="Days of history to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--db", type=str, default=None, help="Database path (default: temp file)")
+    parser.add_argument("--reuse", action="store_true", help="Reuse an existing database at --db")
+    args = parser.parse_args()
+
+    db_path = Path(args.db) if args.db else Path(tempfile.mkdtemp()) / "analytics.db"
+    if args.reuse and db_path.exists():
+        db = AnalyticsDatabase(db_path)
+    else:
+        if db_path.exists():
+            db_path.unlink()
+        db = build_database(db_path, args.sessions, args.users, args.days)
+
+    analyzer = FeatureUsageAnalyzer()
+
+    print("\n" + "=" * 60)
+    print("📊 /api/analytics/features")
+    print("=" * 60)
+    for days in (7, 30, 90):
+        print(f"\n🗓️  days={days}")
+        old_time, old_result = time_call(
+            "old (export + Python scan)", lambda: old_path(db, analyzer, days), args.repeat
+        )
+        new_time, new_result = time_call(
+            "new (SQL GROUP BY)", lambda: analyzer.analyze_feature_usage_db(db, days=days), args.repeat
+        )
+        speedup = old_time / new_time if new_time > 0 else float("inf")
+        match = strip_volatile(old_result) == strip_volatile(new_result)
+        print(f"   speedup: {speedup:.1f}x | results identical: {'✅' if match else '❌'}")
+
+    print("\n" + "=" * 60)
+    print("📊 /api/analytics/features/comparison (7d vs 30d)")
+    print("=" * 60)
+
+    def old_comparison():
+        now = datetime.utcnow()
+        sessions = db.get_sessions(start_date=(now - timedelta(days=30)).isoformat(), end_date=now.isoformat())
+        return analyzer.get_feature_comparison(sessions, days1=7, days2=30)
+
+    old_time, _ = time_call("old (export + Python scan)", old_comparison, args.repeat)
+    new_time, _ = time_call(
+        "new (SQL GROUP BY)", lambda: analyzer.get_feature_comparison_db(db, days1=7, days2=30), args.repeat
+    )
+    print(f"   speedup: {old_time / new_time if new_time > 0 else float('inf'):.1f}x")
+
+    db.close()
+    if not args.db:
+        print(f"\n🧹 Temporary database: {db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Per-message XP handling latency with synchronous vs. queued log handlers
+Runs a stand-in for LevelSystem.add_xp (cooldown check, in-memory XP update and the
+"gained XP" log line) once per simulated message and measures how long each call
+takes when the Rich console, rotating text log and structured log store handlers
+run on the calling thread (old setup) vs. behind LogQueueHandler/QueueListener
+(Utils.Logger.InitLogging).
+
+Console output is rendered into /dev/null (Rich still formats it); log files go
+to a temporary directory.
+
+Usage:
+    python scripts/benchmark_logging_xp.py                    # 5000 messages
+    python scripts/benchmark_logging_xp.py --messages 20000
+    python scripts/benchmark_logging_xp.py --tty              # render the console output for real
+"""
+
+import argparse
+import logging
+import os
+import queue
+import random
+import statistics
+import sys
+import tempfile
+import time
+from logging.handlers import QueueListener
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+# Utils.Logger sets up the bot's own Logs/ directory on import: keep it out of the repo
+work_dir = tempfile.mkdtemp(prefix="bench_logging_")
+os.chdir(work_dir)
+
+from Utils.Logger import BuildConsoleHandler, BuildFileHandlers, LogQueueHandler  # noqa: E402
+
+XP_COOLDOWN = 0.0  # every message earns XP, so every call logs
+
+
+class XPState:
+    """Minimal resident XP state, like LevelSystem's user cache"""
+
+    def __init__(self):
+        self.users = {}
+        self.cooldowns = {}
+
+
+def handle_message(state, logger, user_id, username):
+    """Stand-in for LevelSystem.add_xp on the message path"""
+    now = time.monotonic()
+    if now - state.cooldowns.get(user_id, 0) < XP_COOLDOWN:
+        return None
+    state.cooldowns[user_id] = now
+
+    user = state.users.setdefault(user_id, {"total_xp": 0, "level": 1})
+    user["total_xp"] += 15
+    user["level"] = 1 + user["total_xp"] // 1000
+
+    logger.info(
+        "✅ %s gained %s XP (%s) → Level %s (%s total XP)",
+        username,
+        15,
+        "message_sent",
+        user["level"],
+        user["total_xp"],
+    )
+    return user
+
+
+def run(mode, handlers, messages, users):
+    logger = logging.getLogger(f"Cogs.LevelSystem.bench_{mode}")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    listener = None
+    if mode == "queued":
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        logger.addHandler(LogQueueHandler(log_queue))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
+
+    state = XPState()
+    rng = random.Random(42)
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(messages):
+        user_id = rng.randrange(users)
+        t0 = time.perf_counter_ns()
+        handle_message(state, logger, str(user_id), f"user{user_id}")
+        latencies.append(time.perf_counter_ns() - t0)
+    total = time.perf_counter() - start
+
+    drain = 0.0
+    if listener:
+        t0 = time.perf_counter()
+        listener.stop()  # waits until the listener thread has written everything
+        drain = time.perf_counter() - t0
+    for handler in handlers:
+        handler.close()
+
+    latencies.sort()
+    return {
+        "mean": statistics.fmean(latencies) / 1000,
+        "p50": latencies[len(latencies) // 2] / 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] / 1000,
+        "max": latencies[-1] / 1000,
+        "total": total,
+        "drain": drain,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark XP message handling with sync vs. queued logging")
+    parser.add_argument("--messages", type=int, default=5000, help="Simulated messages (default: 5000)")
+    parser.add_argument("--users", type=int, default=200, help="Distinct users (default: 200)")
+    parser.add_argument("--tty", action="store_true", help="Render console output to stdout instead of /dev/null")
+    args = parser.parse_args()
+
+    console_file = None if args.tty else open(os.devnull, "w")
+    print(f"💬 {args.messages} messages from {args.users} users, logs in {work_dir}\n")
+
+    results = {}
+    for mode in ("sync", "queued"):
+        _, console_handler = BuildConsoleHandler(file=console_file)
+        file_handlers = BuildFileHandlers(
+            os.path.join(work_dir, mode, "HazeBot.log"), os.path.join(work_dir, mode, "HazeBot.db")
+        )
+        results[mode] = run(mode, [console_handler, *file_handlers], args.messages, args.users)
+
+    print(f"{'':10} {'mean µs':>10} {'p50 µs':>10} {'p99 µs':>10} {'max µs':>10} {'loop s':>8} {'drain s':>8}")
+    for mode, r in results.items():
+        print(
+            f"{mode:10} {r['mean']:10.1f} {r['p50']:10.1f} {r['p99']:10.1f} {r['max']:10.1f} "
+            f"{r['total']:8.3f} {r['drain']:8.3f}"
+        )
+    if results["queued"]["mean"] > 0:
+        print(f"\nPer-message speedup (mean): {results['sync']['mean'] / results['queued']['mean']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Push notification fan-out (per-device sends vs. batched multicast)
+Replaces firebase-admin with a local stub that sleeps for a simulated FCM round
+trip, then compares the old one-send-per-device loop with
+notification_service.send_notification_to_multiple_users (multicast batches of
+up to 500 devices, bounded concurrency, one token write per fan-out).
+
+Nothing is sent anywhere; token/settings files go to a temporary data dir.
+
+Usage:
+    python scripts/benchmark_push_fanout.py                      # 40 users x 3 devices, 80 ms RTT
+    python scripts/benchmark_push_fanout.py --users 600 --devices 2 --rtt 0.05
+    python scripts/benchmark_push_fanout.py --invalid 0.1        # 10% unregistered tokens
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import types
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+
+# ==================== firebase-admin stub ====================
+
+
+class StubFCM:
+    """Counts requests and simulates one network round trip per HTTP request"""
+
+    def __init__(self, rtt, invalid_tokens):
+        self.rtt = rtt
+        self.invalid_tokens = invalid_tokens
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def round_trip(self):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.rtt)
+
+
+def install_firebase_stub(fcm):
+    """Register fake firebase_admin / firebase_admin.messaging / firebase_admin.exceptions modules"""
+    firebase_admin = types.ModuleType("firebase_admin")
+    messaging = types.ModuleType("firebase_admin.messaging")
+    exceptions = types.ModuleType("firebase_admin.exceptions")
+
+    class FirebaseError(Exception):
+        pass
+
+    class InvalidArgumentError(FirebaseError):
+        pass
+
+    class UnregisteredError(FirebaseError):
+        pass
+
+    class SenderIdMismatchError(FirebaseError):
+        pass
+
+    class AndroidConfig:
+        def __init__(self, priority=None, **kwargs):
+            self.priority = priority
+
+    class Message:
+        def __init__(self, data=None, token=None, android=None, **kwargs):
+            self.data, self.token, self.android = data, token, android
+
+    class MulticastMessage:
+        def __init__(self, tokens, data=None, android=None, **kwargs):
+            if len(tokens) > 500:
+                raise ValueError("tokens must not contain more than 500 elements")
+            self.tokens, self.data, self.android = tokens, data, android
+
+    class SendResponse:
+        def __init__(self, message_id=None, exception=None):
+            self.message_id, self.exception = message_id, exception
+
+        @property
+        def success(self):
+            return self.exception is None
+
+    class BatchResponse:
+        def __init__(self, responses):
+            self.responses = responses
+            self.success_count = sum(1 for r in responses if r.success)
+            self.failure_count = len(responses) - self.success_count
+
+    def send(message):
+        fcm.round_trip()
+        if message.token in fcm.invalid_tokens:
+            raise UnregisteredError("Requested entity was not found.")
+        return f"projects/stub/messages/{message.token}"
+
+    def send_each_for_multicast(multicast_message):
+        # firebase-admin sends the messages of one multicast in parallel: ~one round trip
+        fcm.round_trip()
+        return BatchResponse(
+            [
+                SendResponse(exception=UnregisteredError("Requested entity was not found."))
+                if token in fcm.invalid_tokens
+                else SendResponse(message_id=f"projects/stub/messages/{token}")
+                for token in multicast_message.tokens
+            ]
+        )
+
+    exceptions.FirebaseError = FirebaseError
+    exceptions.InvalidArgumentError = InvalidArgumentError
+    for name, value in {
+        "AndroidConfig": AndroidConfig,
+        "Message": Message,
+        "MulticastMessage": MulticastMessage,
+        "UnregisteredError": UnregisteredError,
+        "SenderIdMismatchError": SenderIdMismatchError,
+        "send": send,
+        "send_each_for_multicast": send_each_for_multicast,
+    }.items():
+        setattr(messaging, name, value)
+    firebase_admin.messaging = messaging
+    firebase_admin.exceptions = exceptions
+
+    sys.modules["firebase_admin"] = firebase_admin
+    sys.modules["firebase_admin.messaging"] = messaging
+    sys.modules["firebase_admin.exceptions"] = exceptions
+
+
+# ==================== Fan-out strategies ====================
+
+
+async def legacy_fanout(tokens, user_ids):
+    """Old behaviour: users one after another, one messaging.send per device"""
+    from firebase_admin import messaging
+
+    reached = 0
+    for user_id in user_ids:
+        ok = False
+        for token in tokens.get(user_id, []):
+            try:
+                await asyncio.to_thread(messaging.send, messaging.Message(data={"title": "t"}, token=token))
+                ok = True
+            except Exception:
+                pass
+        reached += ok
+    return reached
+
+
+async def run(args):
+    import Config
+    from Utils import notification_service
+
+    data_dir = tempfile.mkdtemp(prefix="bench_push_")
+    Config.DATA_DIR = data_dir
+
+    rng = random.Random(42)
+    tokens = {str(100000 + u): [f"tok_{u}_{d}" for d in range(args.devices)] for u in range(args.users)}
+    all_tokens = [t for user_tokens in tokens.values() for t in user_tokens]
+    invalid = set(rng.sample(all_tokens, int(len(all_tokens) * args.invalid)))
+    user_ids = list(tokens)
+
+    fcm = StubFCM(args.rtt, invalid)
+    install_firebase_stub(fcm)
+    notification_service._fcm_enabled = True
+
+    print(f"📱 {args.users} users x {args.devices} devices = {len(all_tokens)} tokens ({len(invalid)} invalid)")
+    print(f"   Simulated FCM round trip: {args.rtt * 1000:.0f} ms\n")
+
+    # Old path
+    start = time.perf_counter()
+    legacy_reached = await legacy_fanout(tokens, user_ids)
+    legacy_time = time.perf_counter() - start
+    legacy_requests = fcm.requests
+    print(
+        f"Per-device sends:   {legacy_time * 1000:9.1f} ms  {legacy_requests:6d} requests  "
+        f"{legacy_reached} users reached"
+    )
+
+    # New path
+    await notification_service.save_notification_tokens(tokens)
+    fcm.requests = 0
+    start = time.perf_counter()
+    reached = await notification_service.send_notification_to_multiple_users(
+        user_ids, "Ticket #1", "**New** message", data={"ticket_id": "bench"}
+    )
+    batched_time = time.perf_counter() - start
+    print(f"Batched multicast:  {batched_time * 1000:9.1f} ms  {fcm.requests:6d} requests  {reached} users reached")
+
+    remaining = await notification_service.load_notification_tokens()
+    remaining_count = sum(len(t) for t in remaining.values())
+    print(f"\nTokens after pruning: {remaining_count} (removed {len(all_tokens) - remaining_count})")
+    if legacy_time > 0 and batched_time > 0:
+        print(f"Speedup: {legacy_time / batched_time:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark push notification fan-out against a stub FCM")
+    parser.add_argument("--users", type=int, default=40, help="Recipients (default: 40)")
+    parser.add_argument("--devices", type=int, default=3, help="Registered devices per user (default: 3)")
+    parser.add_argument("--rtt", type=float, default=0.08, help="Simulated FCM round trip in seconds (default: 0.08)")
+    parser.add_argument("--invalid", type=float, default=0.05, help="Fraction of unregistered tokens (default: 0.05)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Import community post likes from community_post_likes.json into community_posts.db
+
+The import runs automatically once when community_posts.db is first opened by a
+version with the post_likes table. Use this script to re-run it by hand (e.g. after
+restoring an old JSON backup); existing likes are kept and like_count is recomputed.
+
+Usage:
+    python scripts/import_community_post_likes.py [path/to/community_post_likes.json]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import Config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import Config
+from Utils.DatabaseUtils import get_community_posts_db, import_legacy_post_likes
+
+
+def main():
+    likes_file = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(Config.DATA_DIR) / "community_post_likes.json"
+    if not likes_file.exists():
+        print(f"❌ {likes_file} not found")
+        return 1
+
+    imported = get_community_posts_db().run(import_legacy_post_likes, likes_file)
+    print(f"✅ Imported {imported} likes from {likes_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Stress test: API -> bot loop calls via run_coroutine_threadsafe vs. Utils.LoopBridge
+Starts a stub bot event loop in its own thread and an "API server" thread that
+runs parallel requests as gevent greenlets (plain threads if gevent is missing),
+like Cogs/APIServer. Every request reads a ticket (a few hot tickets, so
+identical reads overlap), some also write (claim) and some update several roles
+at once. Stub operations await a simulated Discord round trip and hold the loop
+for a moment, like real handlers do.
+
+Reports p50/p99 request latency, loop lag (how late a 10 ms ticker on the bot
+loop wakes up), how many coroutines actually ran on the loop and, for the bridge,
+its per-call histograms and rejected (backpressure) calls.
+
+Usage:
+    python scripts/stress_loop_bridge.py                        # 2000 requests, 100 in parallel
+    python scripts/stress_loop_bridge.py --requests 5000 --concurrency 300 --rtt 0.05
+    python scripts/stress_loop_bridge.py --threads              # drive with OS threads instead of greenlets
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from Utils.LoopBridge import LoopBridge, LoopBusyError  # noqa: E402
+
+try:
+    import gevent
+    import gevent.pool
+except ImportError:
+    gevent = None
+
+LAG_TICK = 0.01
+
+
+# ==================== Stub bot ====================
+
+
+class StubBot:
+    """Bot loop thread with a lag monitor and a few Discord-like coroutines"""
+
+    def __init__(self, rtt, hold):
+        self.rtt = rtt
+        self.hold = hold
+        self.runs = 0
+        self.lags = []
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        self._monitor = asyncio.run_coroutine_threadsafe(self._lag_monitor(), self.loop)
+
+    async def _lag_monitor(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_TICK)
+            self.lags.append((time.perf_counter() - start - LAG_TICK) * 1000)
+
+    async def _work(self):
+        self.runs += 1
+        time.sleep(self.hold)  # handler code between awaits (holds the loop)
+        await asyncio.sleep(self.rtt)  # Discord round trip
+
+    async def load_ticket(self, ticket_id):
+        await self._work()
+        return {"ticket_id": ticket_id, "status": "Open"}
+
+    async def claim_ticket(self, ticket_id, user_id):
+        await self._work()
+        return {"success": True}
+
+    async def add_role(self, user_id, role):
+        await self._work()
+        return True
+
+    def stop(self):
+        self._monitor.cancel()
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(LAG_TICK), self.loop).result()  # let the cancel land
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+# ==================== Request handlers ====================
+
+
+def direct_request(bot, rng):
+    """Old route code: one blocking run_coroutine_threadsafe(...).result() per call"""
+    ticket_id = f"t{rng.randrange(8)}"
+    asyncio.run_coroutine_threadsafe(bot.load_ticket(ticket_id), bot.loop).result(timeout=30)
+    if rng.random() < 0.2:
+        asyncio.run_coroutine_threadsafe(bot.claim_ticket(ticket_id, 1), bot.loop).result(timeout=30)
+    if rng.random() < 0.1:
+        for role in ("changelog", "memes"):
+            asyncio.run_coroutine_threadsafe(bot.add_role(1, role), bot.loop).result(timeout=30)
+
+
+def bridge_request(bridge, bot, rng):
+    ticket_id = f"t{rng.randrange(8)}"
+    bridge.call("tickets.load", bot.load_ticket, ticket_id, key=ticket_id, timeout=30)
+    if rng.random() < 0.2:
+        bridge.call("tickets.claim", bot.claim_ticket, ticket_id, 1, timeout=30)
+    if rng.random() < 0.1:
+        bridge.call_many([("user.add_role", bot.add_role, (1, role)) for role in ("changelog", "memes")], timeout=30)
+
+
+# ==================== Driver ====================
+
+
+def drive(handler, requests, concurrency, use_threads):
+    """Run requests in parallel (greenlets in one API thread, or OS threads); returns latencies, rejected"""
+    latencies, rejected = [], []
+
+    def one(seed):
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        try:
+            handler(rng)
+        except LoopBusyError:
+            rejected.append(seed)
+            return
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    if use_threads:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(requests)))
+    else:
+
+        def api_thread():
+            pool = gevent.pool.Pool(concurrency)
+            for seed in range(requests):
+                pool.spawn(one, seed)
+            pool.join()
+
+        thread = threading.Thread(target=api_thread)
+        thread.start()
+        thread.join()
+    return latencies, len(rejected)
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run_mode(mode, args):
+    bot = StubBot(args.rtt, args.hold)
+    bridge = LoopBridge(bot.loop, max_pending=args.max_pending) if mode == "bridge" else None
+    time.sleep(0.05)
+    bot.lags.clear()
+
+    if mode == "bridge":
+
+        def handler(rng):
+            bridge_request(bridge, bot, rng)
+    else:
+
+        def handler(rng):
+            direct_request(bot, rng)
+
+    start = time.perf_counter()
+    latencies, rejected = drive(handler, args.requests, args.concurrency, args.threads or gevent is None)
+    elapsed = time.perf_counter() - start
+    lags = list(bot.lags)
+    runs = bot.runs
+    bot.stop()
+    return {
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "rps": len(latencies) / elapsed,
+        "lag_p50": percentile(lags, 50),
+        "lag_p99": percentile(lags, 99),
+        "runs": runs,
+        "rejected": rejected,
+        "stats": bridge.stats() if bridge else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress API -> bot loop calls against a stub bot loop")
+    parser.add_argument("--requests", type=int, default=2000, help="API requests (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in parallel (default: 100)")
+    parser.add_argument("--rtt", type=float, default=0.02, help="Simulated Discord round trip in s (default: 0.02)")
+    parser.add_argument("--hold", type=float, default=0.0005, help="Loop time per operation in s (default: 0.0005)")
+    parser.add_argument("--max-pending", type=int, default=64, help="Bridge backpressure limit (default: 64)")
+    parser.add_argument("--threads", action="store_true", help="Drive with OS threads instead of gevent greenlets")
+    args = parser.parse_args()
+
+    driver = "threads" if args.threads or gevent is None else "gevent greenlets"
+    print(f"🔁 {args.requests} requests, {args.concurrency} in parallel ({driver})")
+    print(f"   Stub loop: {args.rtt * 1000:.0f} ms round trip, {args.hold * 1000:.1f} ms loop time per operation\n")
+
+    results = {mode: run_mode(mode, args) for mode in ("direct", "bridge")}
+
+    print(
+        f"{'':8} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>8} {'lag p50':>9} {'lag p99':>9} "
+        f"{'loop runs':>10} {'rejected':>9}"
+    )
+    for mode, r in results.items():
+        print(
+            f"{mode:8} {r['p50']:9.1f} {r['p99']:9.1f} {r['rps']:8.0f} {r['lag_p50']:9.2f} {r['lag_p99']:9.2f} "
+            f"{r['runs']:10d} {r['rejected']:9d}"
+        )
+
+    stats = results["bridge"]["stats"]
+    print(f"\nBridge: {stats['hops']} loop hops, {stats['coalesced']} coalesced calls, {stats['rejected']} rejected")
+    for name, histogram in stats["calls"].items():
+        print(
+            f"  {name:16} n={histogram['count']:6d}  p50<={histogram['p50_ms']} ms  "
+            f"p99<={histogram['p99_ms']} ms  max={histogram['max_ms']} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
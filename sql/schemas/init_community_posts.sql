@@ -24,6 +24,9 @@ CREATE TABLE IF NOT EXISTS community_posts (
     post_type TEXT DEFAULT 'normal',       -- 'normal', 'admin', 'announcement'
     is_announcement INTEGER DEFAULT 0,     -- 0=false, 1=true (SQLite boolean)
     
+    -- Likes (denormalized, maintained together with post_likes)
+    like_count INTEGER NOT NULL DEFAULT 0,
+    
     -- Discord Integration
     discord_message_id INTEGER,            -- Message ID in Discord Channel
     discord_channel_id INTEGER,            -- Channel ID (from Config)
@@ -65,6 +68,33 @@ CREATE INDEX IF NOT EXISTS idx_posts_active_by_date
     ON community_posts(is_deleted, created_at DESC) 
     WHERE is_deleted = 0;
 
+-- Unfiltered feed, keyset-paginated on (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_posts_active_feed 
+    ON community_posts(created_at DESC, id DESC) 
+    WHERE is_deleted = 0;
+
+-- Feed filtered by post type, keyset-paginated on (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_posts_active_type_by_date 
+    ON community_posts(post_type, created_at DESC, id DESC) 
+    WHERE is_deleted = 0;
+
+-- Posts of one author, keyset-paginated on (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_posts_active_author_by_date 
+    ON community_posts(author_id, created_at DESC, id DESC) 
+    WHERE is_deleted = 0;
+
+-- ============================================================================
+-- Likes
+-- ============================================================================
+
+-- One row per (post, user); the PK answers "has this user liked this post"
+CREATE TABLE IF NOT EXISTS post_likes (
+    post_id INTEGER NOT NULL,              -- community_posts.id
+    user_id TEXT NOT NULL,                 -- Discord User ID
+    created_at TEXT DEFAULT (datetime('now')),
+    PRIMARY KEY (post_id, user_id)
+) WITHOUT ROWID;
+
 -- ============================================================================
 -- Database Metadata
 -- ============================================================================
@@ -76,7 +106,7 @@ CREATE TABLE IF NOT EXISTS schema_info (
 );
 
 INSERT OR REPLACE INTO schema_info (key, value) 
-VALUES ('version', '1.0.0');
+VALUES ('version', '1.2.0');
 
 INSERT OR REPLACE INTO schema_info (key, value) 
 VALUES ('created_at', datetime('now'));